@@ -40,6 +40,65 @@ class Settings(BaseSettings):
         ollama_host: Hostname del servidor Ollama (default: 'ollama' para Docker)
         ollama_port: Puerto del servidor Ollama (default: 11434)
         model_name: Nombre del modelo de IA a usar
+        ollama_timeout: Tiempo máximo (segundos) de espera de una inferencia
+        ollama_connect_timeout: Tiempo máximo (segundos) para abrir la conexión
+        ollama_max_connections: Máximo de conexiones simultáneas hacia Ollama
+        ollama_max_keepalive_connections: Conexiones ociosas que se mantienen abiertas
+        ollama_keepalive_expiry: Segundos que una conexión ociosa permanece en el pool
+        ollama_num_parallel: Inferencias simultáneas que acepta Ollama (OLLAMA_NUM_PARALLEL)
+        ollama_keep_alive: Tiempo que Ollama mantiene el modelo en memoria (OLLAMA_KEEP_ALIVE)
+        precarga_habilitada: Precargar y calentar el modelo al arrancar (/ready espera a que termine)
+        salud_intervalo: Segundos entre consultas de estado a Ollama para /health
+        salud_timeout: Tiempo máximo de cada consulta de estado
+        mantener_caliente_intervalo: Segundos de inactividad tras los que se renueva el keep_alive (0 = nunca)
+        cola_max_espera: Peticiones que pueden esperar turno antes de responder 429
+        cola_plazo_segundos: Espera máxima por defecto de /clasificar (0 = sin plazo)
+        cola_tiempo_servicio_inicial: Duración estimada de una inferencia al arrancar
+        reglas_habilitadas: Clasificar sin modelo los casos que las reglas deciden
+        prompt_version: Versión de la plantilla clasificar_dolmen (vacío = la más reciente)
+        salida_max_reintentos: Reintentos de inferencia ante una salida irreparable del modelo
+        generacion_corte_anticipado: Leer la respuesta en streaming y cancelarla con el JSON completo
+        cascada_modelo_rapido: Modelo pequeño que clasifica primero (vacío = sin cascada)
+        cascada_confianza_min: Inicio de la banda de confianza ambigua que se escala a model_name
+        cascada_confianza_max: Fin (excluido) de la banda de confianza ambigua
+        vecinos_modelo_embeddings: Modelo de embeddings del nivel de vecinos (vacío = deshabilitado)
+        vecinos_ruta: Directorio del índice de ejemplos etiquetados (vacío = solo memoria)
+        vecinos_k: Vecinos más cercanos que votan
+        vecinos_similitud_min: Similitud coseno mínima para que un vecino vote
+        vecinos_acuerdo_min: Fracción del voto necesaria para decidir sin generar
+        duplicados_habilitado: Reutilizar la clasificación de documentos casi idénticos
+        duplicados_distancia_max: Bits de diferencia SimHash tolerados para considerar duplicado
+        duplicados_max_entradas: Huellas en memoria antes de expulsar la más antigua
+        duplicados_ruta_sqlite: Archivo SQLite del índice de casi duplicados (vacío = solo memoria)
+        limpieza_habilitada: Limpiar el texto de los PDF antes del extracto
+        limpieza_min_repeticiones: Repeticiones de una línea corta para tratarla como encabezado o pie
+        contexto_cubetas: Tamaños de num_ctx permitidos, separados por comas
+        contexto_bajar_tras: Peticiones seguidas que caben en una cubeta menor antes de bajar a ella
+        contexto_excedido: Qué hacer si el prompt no cabe en la cubeta mayor (extracto o rechazar)
+        tokenizador_ruta: tokenizer.json del modelo para contar tokens (vacío = estimación)
+        extracto_habilitado: Reducir documentos largos antes de enviarlos al modelo
+        extracto_max_caracteres: Presupuesto de caracteres del extracto
+        extracto_ventana: Caracteres conservados a cada lado de una señal de relevancia
+        extracto_cabecera: Caracteres iniciales del documento que siempre se conservan
+        cache_max_entradas: Tamaño máximo de la caché de clasificaciones en memoria
+        cache_ttl_segundos: Vida de cada entrada de la caché
+        cache_ruta_sqlite: Archivo SQLite de la caché persistente (vacío = solo memoria)
+        lote_max_procesos: Máximo de procesos por petición de lote
+        ndjson_cola_max: Documentos leídos en espera de inferencia antes de pausar la carga
+        ndjson_max_bytes_linea: Tamaño máximo de una línea NDJSON
+        compresion_max_bytes_cuerpo: Tamaño máximo de un cuerpo de petición descomprimido (gzip/zstd)
+        compresion_respuestas: Comprimir las respuestas cuando el cliente envía Accept-Encoding
+        compresion_min_bytes: Tamaño mínimo de una respuesta para comprimirla
+        compresion_nivel_gzip: Nivel de gzip de las respuestas (1 = menos CPU ... 9 = menos bytes)
+        compresion_nivel_zstd: Nivel de zstd de las respuestas (1 = menos CPU ... 19 = menos bytes)
+        trabajos_ruta_sqlite: Archivo SQLite de la cola de trabajos asíncronos
+        trabajos_trabajadores: Trabajadores que consumen la cola (0 = OLLAMA_NUM_PARALLEL)
+        trabajos_retencion_segundos: Vida de un trabajo terminado antes de purgarlo
+        trabajos_purga_intervalo_segundos: Cada cuánto se purgan los trabajos terminados
+        trabajos_max_intentos: Veces que se toma un trabajo antes de darlo por fallido
+        trabajos_callback_hosts: Hosts permitidos en callback_url, separados por coma
+                                 ("*.dominio" admite subdominios; vacío = sin callbacks)
+        trabajos_callback_esquemas: Esquemas permitidos en callback_url, separados por coma
         app_name: Nombre público de la aplicación
         app_version: Versión actual de la API
         debug: Modo debug activado/desactivado
@@ -59,6 +118,92 @@ class Settings(BaseSettings):
     ollama_port: int = 11434  # Puerto estándar de Ollama
     model_name: str = "qwen2.5:3b"  # Modelo Qwen optimizado para velocidad
     
+    # -------------------------------------------------------------------------
+    # Pool de conexiones hacia Ollama (cliente asíncrono compartido)
+    # -------------------------------------------------------------------------
+    ollama_timeout: float = 300.0  # Una inferencia larga puede tardar minutos
+    ollama_connect_timeout: float = 5.0  # Fallar rápido si Ollama no responde
+    ollama_max_connections: int = 10  # Límite de conexiones simultáneas
+    ollama_max_keepalive_connections: int = 10  # Conexiones reutilizables (keep-alive)
+    ollama_keepalive_expiry: float = 60.0  # Segundos antes de cerrar una conexión ociosa
+    ollama_num_parallel: int = 1  # Misma variable que usa el servicio ollama en docker-compose
+    ollama_keep_alive: str = "60m"  # Misma variable y valor por defecto que en docker-compose
+    
+    # -------------------------------------------------------------------------
+    # Arranque en frío
+    # -------------------------------------------------------------------------
+    precarga_habilitada: bool = True  # El primer cliente no paga la carga del modelo
+    mantener_caliente_intervalo: float = 600.0  # Debe ser menor que ollama_keep_alive
+    
+    # -------------------------------------------------------------------------
+    # Health checks (instantánea refrescada en segundo plano)
+    # -------------------------------------------------------------------------
+    salud_intervalo: float = 10.0  # /health nunca consulta Ollama directamente
+    salud_timeout: float = 5.0  # Una consulta lenta cuenta como Ollama no disponible
+    
+    # -------------------------------------------------------------------------
+    # Control de admisión (cola delante de Ollama)
+    # -------------------------------------------------------------------------
+    cola_max_espera: int = 16  # Más allá de esto se responde 429 de inmediato
+    cola_plazo_segundos: float = 120.0  # Se puede ajustar por petición con X-Request-Timeout
+    cola_tiempo_servicio_inicial: float = 5.0  # Semilla de la media móvil
+    
+    # -------------------------------------------------------------------------
+    # Clasificación
+    # -------------------------------------------------------------------------
+    reglas_habilitadas: bool = True  # Atajo determinístico antes del modelo
+    prompt_version: str = ""  # Ver app/services/prompts.py
+    salida_max_reintentos: int = 1  # Cada reintento es una inferencia completa
+    generacion_corte_anticipado: bool = True  # Stream cortado al cerrarse el JSON
+    cascada_modelo_rapido: str = ""  # Ej: qwen2.5:0.5b o qwen2.5:1.5b
+    cascada_confianza_min: float = 0.3  # Por debajo: el modelo rápido descarta con seguridad
+    cascada_confianza_max: float = 0.7  # Desde aquí: relevante con seguridad (ver prompt)
+    vecinos_modelo_embeddings: str = ""  # Ej: nomic-embed-text
+    vecinos_ruta: str = "data/vecinos"  # Matriz mapeada con np.memmap
+    vecinos_k: int = 5  # Con menos ejemplos en el índice siempre se genera
+    vecinos_similitud_min: float = 0.85  # Por debajo, el vecino resta acuerdo
+    vecinos_acuerdo_min: float = 0.9  # Casi unanimidad de vecinos muy similares
+    duplicados_habilitado: bool = False  # Índice SimHash de documentos ya clasificados
+    duplicados_distancia_max: int = 4  # De 64 bits; más bits = más candidatos por consulta
+    duplicados_max_entradas: int = 1_000_000  # ~250 MB con un millón de huellas
+    duplicados_ruta_sqlite: str = ""  # Ej: /app/data/duplicados.sqlite3
+    limpieza_habilitada: bool = True  # Encabezados, números de página y ruido de los PDF
+    limpieza_min_repeticiones: int = 3  # Apariciones para tratar una línea como encabezado
+    contexto_cubetas: str = "2048,4096,8192"  # num_ctx permitidos (cada cambio recarga el modelo)
+    contexto_bajar_tras: int = 20  # Peticiones seguidas que caben en una cubeta menor antes de bajar
+    contexto_excedido: str = "extracto"  # extracto | rechazar (413)
+    tokenizador_ruta: str = ""  # tokenizer.json del modelo; vacío = estimación
+    extracto_habilitado: bool = True  # Evita que Ollama trunque en silencio
+    extracto_max_caracteres: int = 12000  # ~3000 tokens: cabe en el contexto con el prompt
+    extracto_ventana: int = 400  # Contexto alrededor de cada señal
+    extracto_cabecera: int = 1500  # Partes, clase de proceso, radicación
+    cache_max_entradas: int = 10000  # Entradas en el LRU en memoria
+    cache_ttl_segundos: float = 7 * 24 * 3600  # Una semana
+    cache_ruta_sqlite: str = ""  # Ej: /app/data/cache.sqlite3 para sobrevivir reinicios
+    lote_max_procesos: int = 1000  # Tamaño máximo de /clasificar/lote
+    ndjson_cola_max: int = 8  # Backpressure de /clasificar/ndjson
+    ndjson_max_bytes_linea: int = 32 * 1024 * 1024  # 32 MB por documento
+    
+    # -------------------------------------------------------------------------
+    # Compresión de cuerpos (Content-Encoding / Accept-Encoding: gzip, zstd)
+    # -------------------------------------------------------------------------
+    compresion_max_bytes_cuerpo: int = 256 * 1024 * 1024  # Protege de bombas de compresión
+    compresion_respuestas: bool = True  # Solo si el cliente lo pide con Accept-Encoding
+    compresion_min_bytes: int = 1024  # Respuestas resumidas pequeñas: no compensa
+    compresion_nivel_gzip: int = 5  # Nivel 9: ~10% más pequeño con 3x más CPU
+    compresion_nivel_zstd: int = 3  # Como gzip 5 en tamaño, ~6x más rápido
+    
+    # -------------------------------------------------------------------------
+    # Trabajos asíncronos (POST/GET /api/v1/trabajos)
+    # -------------------------------------------------------------------------
+    trabajos_ruta_sqlite: str = "data/trabajos.sqlite3"  # En Docker: volumen api_data (/app/data)
+    trabajos_trabajadores: int = 0  # Más trabajadores solo esperan en la cola de admisión
+    trabajos_retencion_segundos: float = 7 * 24 * 3600  # Una semana
+    trabajos_purga_intervalo_segundos: float = 3600  # Sin esperar a un reinicio
+    trabajos_max_intentos: int = 3  # Un trabajo que tumba el proceso no se repite para siempre
+    trabajos_callback_hosts: str = ""  # Evita que la API llame a direcciones internas (SSRF)
+    trabajos_callback_esquemas: str = "https"
+    
     # -------------------------------------------------------------------------
     # Configuración de la aplicación
     # -------------------------------------------------------------------------
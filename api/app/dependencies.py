@@ -16,8 +16,14 @@ Se inyectan usando el parámetro Depends() en los endpoints.
 # -----------------------------------------------------------------------------
 # IMPORTACIONES
 # -----------------------------------------------------------------------------
-from fastapi import Header, HTTPException, status  # Herramientas de FastAPI
+from fastapi import Header, HTTPException, Request, status  # Herramientas de FastAPI
+import ollama  # Cliente para el servidor de modelos Ollama
 from app.config import get_settings  # Configuración de la aplicación
+from app.services.cache import CacheClasificaciones  # Caché de resultados
+from app.services.calentamiento import CalentadorModelo  # Precarga del modelo
+from app.services.clasificador import Clasificador  # Pipeline de clasificación
+from app.services.salud import MonitorSalud  # Instantánea de estado para /health
+from app.services.trabajos import PoolTrabajadores  # Cola de trabajos asíncronos
 
 # -----------------------------------------------------------------------------
 # CONFIGURACIÓN GLOBAL
@@ -66,4 +72,163 @@ async def verificar_api_key(
         )
     
     # Si es válida, retornamos la key (disponible en el endpoint si se necesita)
-    return x_api_key
\ No newline at end of file
+    return x_api_key
+
+
+# -----------------------------------------------------------------------------
+# DEPENDENCIA DEL CLIENTE OLLAMA
+# -----------------------------------------------------------------------------
+def obtener_cliente_ollama(request: Request) -> ollama.AsyncClient:
+    """
+    Devuelve el cliente asíncrono de Ollama compartido por la aplicación.
+
+    El cliente se crea en el lifespan de main.py y se guarda en
+    app.state, de modo que todas las peticiones reutilizan el mismo
+    pool de conexiones keep-alive.
+
+    Args:
+        request: Petición actual (inyectada automáticamente)
+
+    Returns:
+        ollama.AsyncClient: Cliente compartido
+
+    Raises:
+        HTTPException: Error 503 si la aplicación aún no ha creado el cliente
+    """
+    cliente = getattr(request.app.state, "ollama", None)
+    if cliente is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Cliente de Ollama no inicializado"
+        )
+    return cliente
+
+
+
+# -----------------------------------------------------------------------------
+# DEPENDENCIA DE LA CACHÉ DE CLASIFICACIONES
+# -----------------------------------------------------------------------------
+def obtener_cache(request: Request) -> CacheClasificaciones:
+    """
+    Devuelve la caché de clasificaciones compartida por la aplicación.
+
+    Args:
+        request: Petición actual (inyectada automáticamente)
+
+    Returns:
+        CacheClasificaciones: Caché creada en el lifespan
+
+    Raises:
+        HTTPException: Error 503 si la aplicación aún no ha creado la caché
+    """
+    cache = getattr(request.app.state, "cache", None)
+    if cache is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Caché de clasificaciones no inicializada"
+        )
+    return cache
+
+
+
+# -----------------------------------------------------------------------------
+# DEPENDENCIA DEL CLASIFICADOR
+# -----------------------------------------------------------------------------
+def obtener_clasificador(request: Request) -> Clasificador:
+    """
+    Devuelve el pipeline de clasificación compartido por la aplicación.
+
+    Args:
+        request: Petición actual (inyectada automáticamente)
+
+    Returns:
+        Clasificador: Clasificador creado en el lifespan
+
+    Raises:
+        HTTPException: Error 503 si la aplicación aún no ha creado el clasificador
+    """
+    clasificador = getattr(request.app.state, "clasificador", None)
+    if clasificador is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Clasificador no inicializado"
+        )
+    return clasificador
+
+
+
+# -----------------------------------------------------------------------------
+# DEPENDENCIA DE LA COLA DE TRABAJOS
+# -----------------------------------------------------------------------------
+def obtener_trabajos(request: Request) -> PoolTrabajadores:
+    """
+    Devuelve los trabajadores de la cola de trabajos asíncronos.
+
+    Args:
+        request: Petición actual (inyectada automáticamente)
+
+    Returns:
+        PoolTrabajadores: Trabajadores (y su almacén) creados en el lifespan
+
+    Raises:
+        HTTPException: Error 503 si la aplicación aún no ha creado la cola
+    """
+    trabajos = getattr(request.app.state, "trabajos", None)
+    if trabajos is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Cola de trabajos no inicializada"
+        )
+    return trabajos
+
+
+
+# -----------------------------------------------------------------------------
+# DEPENDENCIA DEL CALENTADOR DEL MODELO
+# -----------------------------------------------------------------------------
+def obtener_calentador(request: Request) -> CalentadorModelo:
+    """
+    Devuelve el calentador del modelo creado por la aplicación.
+
+    Args:
+        request: Petición actual (inyectada automáticamente)
+
+    Returns:
+        CalentadorModelo: Calentador creado en el lifespan
+
+    Raises:
+        HTTPException: Error 503 si la aplicación aún no ha arrancado
+    """
+    calentador = getattr(request.app.state, "calentador", None)
+    if calentador is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Aplicación iniciándose"
+        )
+    return calentador
+
+
+
+# -----------------------------------------------------------------------------
+# DEPENDENCIA DEL MONITOR DE SALUD
+# -----------------------------------------------------------------------------
+def obtener_monitor_salud(request: Request) -> MonitorSalud:
+    """
+    Devuelve el monitor que mantiene la instantánea de estado de Ollama.
+
+    Args:
+        request: Petición actual (inyectada automáticamente)
+
+    Returns:
+        MonitorSalud: Monitor creado en el lifespan
+
+    Raises:
+        HTTPException: Error 503 si la aplicación aún no ha arrancado
+    """
+    monitor = getattr(request.app.state, "salud", None)
+    if monitor is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Aplicación iniciándose"
+        )
+    return monitor
@@ -6,7 +6,10 @@ Punto de entrada de la aplicación FastAPI para análisis de texto con IA.
 
 Este módulo configura:
 - La instancia principal de FastAPI con metadatos
+- El ciclo de vida (lifespan) con el cliente compartido de Ollama, la caché
+  y los trabajadores de la cola de trabajos asíncronos
 - Middleware CORS para peticiones cross-origin
+- Middleware de compresión (cuerpos gzip/zstd en peticiones y respuestas)
 - Registro de routers para organizar los endpoints
 - Endpoint raíz informativo
 
@@ -19,10 +22,21 @@ Versión: 1.0.0
 # IMPORTACIONES
 # -----------------------------------------------------------------------------
 import logging  # Módulo estándar de Python para logging
+from contextlib import asynccontextmanager  # Para definir el ciclo de vida de la app
 from fastapi import FastAPI  # Framework principal para crear la API
 from fastapi.middleware.cors import CORSMiddleware  # Middleware para CORS
 from app.config import get_settings  # Función para obtener configuración
-from app.routers import health, analisis  # Routers de la aplicación
+from prometheus_client import REGISTRY  # Registro global de métricas
+from app.routers import health, analisis, metricas, trabajos, vecinos  # Routers de la aplicación
+from app.services.ollama_cliente import crear_cliente_ollama, cerrar_cliente_ollama  # Cliente compartido
+from app.services.cache import CacheClasificaciones  # Caché de clasificaciones
+from app.services.calentamiento import CalentadorModelo  # Precarga y keep-warm del modelo
+from app.services.clasificador import Clasificador  # Pipeline de clasificación
+from app.services.metricas import ColectorEstado  # Estado exportado en /metrics
+from app.services.salud import MonitorSalud  # Instantánea de estado para /health
+from app.services.serializacion import RespuestaJSON  # Respuesta por defecto (orjson)
+from app.services.compresion import MiddlewareCompresion  # Cuerpos gzip / zstd
+from app.services.trabajos import AlmacenTrabajos, PoolTrabajadores  # Trabajos asíncronos
 
 # -----------------------------------------------------------------------------
 # CONFIGURACIÓN DE LOGGING
@@ -44,6 +58,64 @@ logger = logging.getLogger(__name__)
 # Obtenemos la configuración global de la aplicación (singleton con caché)
 settings = get_settings()
 
+# -----------------------------------------------------------------------------
+# CICLO DE VIDA DE LA APLICACIÓN (LIFESPAN)
+# -----------------------------------------------------------------------------
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Gestiona los recursos compartidos durante la vida de la aplicación.
+
+    Al iniciar crea un único cliente asíncrono de Ollama con pool de
+    conexiones keep-alive, la caché de clasificaciones, el clasificador
+    que los usa, los trabajadores de la cola de trabajos y el calentador
+    que precarga el modelo (sin bloquear el arranque: /ready informa
+    cuándo termina) y el monitor que refresca el estado de Ollama para
+    /health; al apagar detiene las tareas y cierra las conexiones.
+
+    Args:
+        app: Instancia de FastAPI
+    """
+    app.state.ollama, app.state.ollama_http = crear_cliente_ollama(settings)
+    logger.info(
+        f"Cliente Ollama creado (max_conexiones={settings.ollama_max_connections}, "
+        f"timeout={settings.ollama_timeout}s)"
+    )
+    app.state.cache = CacheClasificaciones(
+        max_entradas=settings.cache_max_entradas,
+        ttl_segundos=settings.cache_ttl_segundos,
+        ruta_sqlite=settings.cache_ruta_sqlite
+    )
+    app.state.clasificador = Clasificador(app.state.ollama, app.state.cache, settings)
+    colector = ColectorEstado(app.state.clasificador)
+    REGISTRY.register(colector)
+    app.state.trabajos = PoolTrabajadores(
+        AlmacenTrabajos(
+            settings.trabajos_ruta_sqlite,
+            settings.trabajos_retencion_segundos,
+            max_intentos=settings.trabajos_max_intentos
+        ),
+        app.state.clasificador,
+        num_trabajadores=settings.trabajos_trabajadores or settings.ollama_num_parallel,
+        intervalo_purga=settings.trabajos_purga_intervalo_segundos
+    )
+    app.state.trabajos.iniciar()
+    app.state.calentador = CalentadorModelo(app.state.clasificador, settings)
+    app.state.calentador.iniciar()
+    app.state.salud = MonitorSalud(app.state.clasificador, settings, app.state.ollama_http)
+    app.state.salud.iniciar()
+    yield
+    await app.state.salud.detener()
+    await app.state.calentador.detener()
+    await app.state.trabajos.detener()
+    app.state.trabajos.almacen.cerrar()
+    REGISTRY.unregister(colector)
+    app.state.clasificador.cerrar()
+    app.state.cache.cerrar()
+    await cerrar_cliente_ollama(app.state.ollama_http)
+    logger.info("Cliente Ollama cerrado")
+
+
 # -----------------------------------------------------------------------------
 # INSTANCIA DE LA APLICACIÓN FASTAPI
 # -----------------------------------------------------------------------------
@@ -53,7 +125,9 @@ app = FastAPI(
     description="API profesional para análisis de texto usando Qwen 2.5",
     version=settings.app_version,  # Versión de la API
     docs_url="/docs",  # URL de la documentación Swagger UI
-    redoc_url="/redoc"  # URL de la documentación alternativa ReDoc
+    redoc_url="/redoc",  # URL de la documentación alternativa ReDoc
+    lifespan=lifespan,  # Recursos compartidos (cliente Ollama)
+    default_response_class=RespuestaJSON  # Respuestas serializadas con orjson
 )
 
 # Log de inicio de la aplicación
@@ -74,12 +148,29 @@ app.add_middleware(
     allow_headers=["*"],  # Permite todos los headers
 )
 
+# -----------------------------------------------------------------------------
+# COMPRESIÓN DE CUERPOS (gzip / zstd)
+# -----------------------------------------------------------------------------
+# Descomprime las peticiones con Content-Encoding y comprime las respuestas
+# según Accept-Encoding (ver app/services/compresion.py)
+app.add_middleware(
+    MiddlewareCompresion,
+    max_bytes_cuerpo=settings.compresion_max_bytes_cuerpo,  # Límite del cuerpo descomprimido
+    comprimir_respuestas=settings.compresion_respuestas,  # Respuestas comprimidas si se piden
+    min_bytes=settings.compresion_min_bytes,  # Respuestas pequeñas sin comprimir
+    nivel_gzip=settings.compresion_nivel_gzip,  # Equilibrio CPU / ancho de banda
+    nivel_zstd=settings.compresion_nivel_zstd
+)
+
 # -----------------------------------------------------------------------------
 # REGISTRO DE ROUTERS
 # -----------------------------------------------------------------------------
 # Los routers organizan los endpoints en grupos lógicos
 app.include_router(health.router)  # Endpoints de salud (sin prefijo, /health)
+app.include_router(metricas.router)  # Métricas Prometheus (sin prefijo, /metrics)
 app.include_router(analisis.router, prefix="/api/v1")  # Endpoints de análisis con versionado
+app.include_router(trabajos.router, prefix="/api/v1")  # Trabajos asíncronos (enviar y consultar)
+app.include_router(vecinos.router, prefix="/api/v1")  # Índice de ejemplos etiquetados
 
 
 # -----------------------------------------------------------------------------
@@ -15,6 +15,8 @@ Los modelos proporcionan:
 # -----------------------------------------------------------------------------
 # IMPORTACIONES
 # -----------------------------------------------------------------------------
+from enum import Enum  # Para valores permitidos de parámetros
+from typing import Optional, Union  # Campos opcionales y alternativos
 from pydantic import BaseModel, Field  # Clases base y validadores de campos
 
 
@@ -27,16 +29,46 @@ class HealthResponse(BaseModel):
 
     Proporciona información sobre el estado del servicio y sus dependencias.
 
+    El estado de Ollama proviene de una instantánea refrescada en segundo
+    plano (ver app/services/salud.py); la cola se lee en el momento.
+
     Attributes:
-        status: Estado general del servicio ('healthy', 'modelo_no_encontrado', etc.)
+        status: Estado general del servicio ('healthy', 'modelo_no_encontrado',
+                'ollama_no_disponible', 'iniciando')
         modelo: Nombre del modelo configurado
         ollama_conectado: Indica si hay conexión con el servidor Ollama
         version: Versión actual de la API
+        modelo_cargado: True si el modelo está en memoria (lista de modelos en ejecución de Ollama)
+        en_cola: Peticiones esperando turno para llamar a Ollama
+        en_curso: Inferencias en curso
+        edad_segundos: Antigüedad de la instantánea de Ollama (None si aún no hay)
+        error: Último error al consultar Ollama (None si no hubo)
     """
     status: str  # Estado del servicio
     modelo: str  # Modelo configurado
     ollama_conectado: bool  # True si Ollama está accesible
     version: str  # Versión de la API
+    modelo_cargado: bool = False  # True si no habrá arranque en frío
+    en_cola: int = 0  # Profundidad de la cola de admisión
+    en_curso: int = 0  # Inferencias en curso
+    edad_segundos: Optional[float] = None  # Antigüedad de la instantánea
+    error: Optional[str] = None  # Último error de la consulta a Ollama
+
+
+class ReadyResponse(BaseModel):
+    """
+    Modelo de respuesta de preparación (readiness).
+
+    Attributes:
+        listo: True cuando el modelo está precargado y calentado
+        modelo: Nombre del modelo configurado
+        detalle: Estado del calentamiento ('listo', 'calentando', error...)
+        segundos_calentamiento: Duración de precarga + calentamiento (None si no terminó)
+    """
+    listo: bool
+    modelo: str
+    detalle: str
+    segundos_calentamiento: Optional[float] = None
 
 
 class ProcesoLegalRequest(BaseModel):
@@ -63,30 +95,232 @@ class ProcesoLegalRequest(BaseModel):
     contenido_demanda: str = Field(default="")
 
 
-class ProcesoLegalResponse(BaseModel):
-    """
-    Modelo de respuesta con proceso clasificado.
-    """
-
-    juzgado_o_tribunal:str
-    juzgado_administrativo:str
-    reg: str
-    radicacion: str
-    ponente: str
-    demandante: str
-    demandado: str
-    clase: str
-    fecha_providencia: str
-    actuacion: str
-    documento: str
-    fecha_estado: str
-    pdf_descargado: bool
-    ruta_pdf: str
-    enlace: str
-    texto_pdf_completo: str
-    contenido_demanda: str
+class ModoRespuesta(str, Enum):
+    """
+    Forma de la respuesta de clasificación.
+
+    - completo: el proceso completo (incluido el texto) + clasificación
+    - resumido: solo identificadores (radicacion, reg, enlace) + clasificación,
+      sin devolver el texto que el cliente ya tiene
+    """
+    completo = "completo"
+    resumido = "resumido"
+
+
+class Clasificacion(BaseModel):
+    """
+    Campos de clasificación que agrega la API a un proceso.
+    """
+
     es_relevante: bool
     keywords_encontrados: list = Field(default_factory=list)
     confianza: float
     razon: str
-    metodo_clasificacion: str = Field(default="IA")
\ No newline at end of file
+    metodo_clasificacion: str = Field(default="IA")
+    version_prompt: Optional[str] = None  # Plantilla usada por el modelo (ej: clasificar_dolmen@2)
+    longitud_extracto: Optional[int] = None  # Caracteres enviados al modelo
+    ratio_compresion: Optional[float] = None  # Longitud original / longitud del extracto
+    tokens_original: Optional[int] = None  # Tokens estimados del texto recibido
+    tokens_limpio: Optional[int] = None  # Tokens estimados tras la limpieza (antes del extracto)
+
+
+class ProcesoLegalResponse(Clasificacion, ProcesoLegalRequest):
+    """
+    Modelo de respuesta con proceso clasificado (modo completo).
+
+    Incluye todos los campos del proceso recibido seguidos de los campos
+    de clasificación.
+    """
+
+
+class ProcesoClasificadoResumen(Clasificacion):
+    """
+    Modelo de respuesta con proceso clasificado (modo resumido).
+
+    Solo devuelve los identificadores del proceso y la clasificación.
+    """
+
+    radicacion: str = Field(default="")
+    reg: str = Field(default="")
+    enlace: str = Field(default="")
+
+
+class ResultadoLoteItem(BaseModel):
+    """
+    Resultado de un proceso dentro de una clasificación por lotes.
+
+    Attributes:
+        indice: Posición del proceso en la lista enviada
+        status_code: 200 si se clasificó, o el código HTTP del error
+        resultado: Proceso clasificado (None si hubo error)
+        error: Descripción del error (None si se clasificó)
+    """
+    indice: int
+    status_code: int = 200
+    resultado: Optional[Union[ProcesoClasificadoResumen, ProcesoLegalResponse]] = None
+    error: Optional[str] = None
+
+
+# -----------------------------------------------------------------------------
+# MODELOS DEL ÍNDICE DE VECINOS
+# -----------------------------------------------------------------------------
+class EjemploEtiquetado(ProcesoLegalRequest):
+    """
+    Proceso con su etiqueta, para el índice de vecinos más cercanos.
+
+    Acepta directamente un ProcesoLegalResponse (modo completo) de una
+    clasificación anterior, o una semilla curada con solo el texto y la
+    etiqueta.
+
+    Attributes:
+        es_relevante: Etiqueta del proceso
+    """
+    es_relevante: bool
+
+
+class EjemplosAgregadosResponse(BaseModel):
+    """
+    Resultado de agregar ejemplos al índice de vecinos.
+
+    Attributes:
+        agregados: Ejemplos agregados en esta petición
+        ejemplos: Ejemplos en el índice tras agregar
+    """
+    agregados: int
+    ejemplos: int
+
+
+class EstadisticasVecinosResponse(BaseModel):
+    """
+    Tamaño y composición del índice de vecinos.
+
+    Attributes:
+        ejemplos: Ejemplos etiquetados en el índice
+        relevantes: Ejemplos etiquetados como relevantes
+        dimension: Dimensión de los embeddings (None si está vacío)
+        modelo: Modelo de embeddings
+        persistente: True si el índice se guarda en disco
+    """
+    ejemplos: int
+    relevantes: int
+    dimension: Optional[int] = None
+    modelo: str
+    persistente: bool
+
+
+# -----------------------------------------------------------------------------
+# MODELOS DE TRABAJOS ASÍNCRONOS
+# -----------------------------------------------------------------------------
+class EstadoTrabajo(str, Enum):
+    """
+    Estados de un trabajo de clasificación asíncrono.
+    """
+    pendiente = "pendiente"
+    en_proceso = "en_proceso"
+    completado = "completado"
+    error = "error"
+
+
+class TrabajoCreadoResponse(BaseModel):
+    """
+    Respuesta inmediata al encolar un trabajo.
+
+    Attributes:
+        id: Identificador para consultar GET /api/v1/trabajos/{id}
+        estado: Estado inicial (pendiente)
+        url: Ruta de consulta del trabajo
+    """
+    id: str
+    estado: EstadoTrabajo
+    url: str
+
+
+class TrabajoResponse(BaseModel):
+    """
+    Estado y resultado de un trabajo de clasificación asíncrono.
+
+    Attributes:
+        id: Identificador del trabajo
+        estado: pendiente, en_proceso, completado o error
+        modo: Forma del resultado (completo o resumido)
+        intentos: Veces que un trabajador tomó el trabajo
+        status_code: 200 si se clasificó, o el código HTTP del error (None si no terminó)
+        resultado: Proceso clasificado (None si no terminó o hubo error)
+        error: Descripción del error (None si no hubo)
+        creado: Marca de tiempo Unix de creación
+        actualizado: Marca de tiempo Unix del último cambio de estado
+    """
+    id: str
+    estado: EstadoTrabajo
+    modo: ModoRespuesta
+    intentos: int = 0
+    status_code: Optional[int] = None
+    resultado: Optional[Union[ProcesoClasificadoResumen, ProcesoLegalResponse]] = None
+    error: Optional[str] = None
+    creado: float
+    actualizado: float
+
+
+# -----------------------------------------------------------------------------
+# MODELOS DE MONITOREO
+# -----------------------------------------------------------------------------
+class EstadisticasCacheResponse(BaseModel):
+    """
+    Contadores de la caché de clasificaciones.
+
+    Attributes:
+        aciertos: Peticiones resueltas desde la caché (memoria o disco)
+        aciertos_disco: Aciertos que vinieron del nivel persistente
+        fallos: Peticiones que tuvieron que llamar al modelo
+        tasa_aciertos: aciertos / (aciertos + fallos)
+        entradas_memoria: Entradas actuales en el LRU
+        persistente: True si el nivel SQLite está habilitado
+    """
+    aciertos: int
+    aciertos_disco: int
+    fallos: int
+    tasa_aciertos: float
+    entradas_memoria: int
+    persistente: bool
+
+
+
+class EstadisticasCoalescenciaResponse(BaseModel):
+    """
+    Contadores de coalescencia de inferencias idénticas.
+
+    Attributes:
+        ejecuciones: Inferencias realmente enviadas al modelo
+        coalescidas: Peticiones que esperaron una inferencia ya en curso
+        en_vuelo: Inferencias compartidas en curso en este momento
+    """
+    ejecuciones: int
+    coalescidas: int
+    en_vuelo: int
+
+
+
+class EstadoColaResponse(BaseModel):
+    """
+    Estado de la cola de inferencias delante de Ollama.
+
+    Attributes:
+        en_espera: Peticiones esperando turno
+        en_curso: Inferencias en curso
+        concurrencia: Inferencias simultáneas permitidas
+        max_cola: Peticiones que pueden esperar antes de responder 429
+        espera_estimada_segundos: Espera estimada para una petición nueva
+        espera_promedio_segundos: Media móvil de la espera en cola
+        tiempo_servicio_segundos: Media móvil de la duración de una inferencia
+        admitidas: Peticiones que obtuvieron turno
+        rechazadas: Peticiones rechazadas con 429
+    """
+    en_espera: int
+    en_curso: int
+    concurrencia: int
+    max_cola: int
+    espera_estimada_segundos: float
+    espera_promedio_segundos: float
+    tiempo_servicio_segundos: float
+    admitidas: int
+    rechazadas: int
@@ -4,4 +4,7 @@ Paquete de routers de la aplicación.
 Contiene los diferentes routers que agrupan los endpoints de la API:
 - health: Verificación del estado del servicio
 - analisis: Endpoints de análisis de texto con IA
+- metricas: Métricas en formato Prometheus
+- trabajos: Trabajos de clasificación asíncronos
+- vecinos: Índice de ejemplos etiquetados (vecinos más cercanos)
 """
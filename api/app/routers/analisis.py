@@ -2,10 +2,16 @@
 =============================================================================
 ROUTER DE CLASIFICACIÓN - analisis.py
 =============================================================================
-Endpoint para clasificar procesos legales del Consejo de Estado colombiano.
+Endpoints para clasificar procesos legales del Consejo de Estado colombiano.
 
 Funcionalidad:
 - Clasificación de procesos relacionados con DOLMEN o alumbrado público
+- Clasificación por lotes con concurrencia acotada hacia Ollama
+- Ingesta NDJSON en streaming: resultados a medida que termina cada documento
+- Estadísticas de la caché, de la coalescencia y de la cola de inferencias
+
+La lógica de clasificación (reglas, caché y modelo) vive en
+app/services/clasificador.py.
 
 Requiere autenticación mediante API Key.
 =============================================================================
@@ -14,14 +20,34 @@ Requiere autenticación mediante API Key.
 # -----------------------------------------------------------------------------
 # IMPORTACIONES
 # -----------------------------------------------------------------------------
+import asyncio  # Para el fan-out concurrente de los lotes
 import logging  # Para logging estructurado
-import re  # Para extraer JSON de respuestas
-from fastapi import APIRouter, Depends, HTTPException  # Herramientas de FastAPI
-import ollama  # Cliente para el servidor de modelos Ollama
-import json  # Para parsear respuestas JSON
+from typing import AsyncIterator, List, Optional, Union  # Tipos para anotaciones
+from typing_extensions import Annotated  # Restricciones del lote
+import orjson  # Decodificación de cada línea NDJSON
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request  # Herramientas de FastAPI
+from pydantic import Field, TypeAdapter, ValidationError  # Validación de los cuerpos ya decodificados
+from starlette.requests import ClientDisconnect  # Desconexión durante la carga
 from app.config import get_settings  # Configuración de la aplicación
-from app.models import ProcesoLegalRequest, ProcesoLegalResponse  # Modelos de datos
-from app.dependencies import verificar_api_key  # Dependencia de autenticación
+from app.models import (  # Modelos de datos
+    ModoRespuesta,
+    ProcesoLegalRequest,
+    ProcesoLegalResponse,
+    ProcesoClasificadoResumen,
+    ResultadoLoteItem,
+    EstadisticasCacheResponse,
+    EstadisticasCoalescenciaResponse,
+    EstadoColaResponse
+)
+from app.dependencies import verificar_api_key, obtener_cache, obtener_clasificador  # Dependencias
+from app.services.cache import CacheClasificaciones  # Caché por contenido
+from app.services.clasificador import Clasificador, construir_respuesta, texto_a_clasificar  # Pipeline
+from app.services.ndjson import MEDIA_TYPE_NDJSON, RespuestaNDJSON, leer_lineas  # Streaming NDJSON
+from app.services.serializacion import (  # Camino rápido de JSON (orjson)
+    leer_cuerpo_json,
+    linea_ndjson,
+    respuesta_json
+)
 
 # Logger para este módulo
 logger = logging.getLogger(__name__)
@@ -32,196 +58,382 @@ logger = logging.getLogger(__name__)
 router = APIRouter()  # Router para agrupar endpoints de análisis
 settings = get_settings()  # Configuración global de la aplicación
 
-# -----------------------------------------------------------------------------
-# PROMPT DEL CLASIFICADOR
-# -----------------------------------------------------------------------------
-# Define el prompt para clasificar procesos legales
-# El placeholder {texto} será reemplazado con el texto del proceso
-PROMPTS = {
-    "clasificar_dolmen": """
-     TAREA:
-     Clasificar un proceso judicial colombiano como RELEVANTE o NO RELEVANTE
-     respecto a ALUMBRADO PÚBLICO o la empresa DOLMEN.
-
-REGLA PRIORITARIA (OBLIGATORIA):
-Si el texto contiene literalmente AL MENOS UNA de las siguientes expresiones:
-- "alumbrado"
-- "alumbrado público"
-- "iluminación pública"
-
-ENTONCES la clasificación DEBE ser:
-"es_relevante": true
-y la confianza DEBE ser >= 0.7
-
-REGLAS DE RELEVANCIA:
-También es RELEVANTE si menciona:
-- "DOLMEN"
-- contratos de alumbrado público
-- servicio de alumbrado público
-- cobros, tarifas, facturación o prestación del alumbrado público
-
-REGLAS DE NO RELEVANCIA:
-Es NO RELEVANTE si el texto trata EXCLUSIVAMENTE de:
-- agua, gas, energía residencial, alcantarillado
-- otros contratos que NO sean de alumbrado público
-- demandas sin relación con alumbrado
-- uso figurativo de la palabra "luz" (ej: "a la luz de la ley")
-
-IMPORTANTE:
-- El tipo de proceso (tutela, ordinario, etc.) NO afecta la decisión
-- El demandado (municipio, empresa, persona) NO afecta la decisión
-- No inventar información
-- No interpretar fuera de las reglas
-
-CONFIDENCIA:
-- 0.9 → menciona "DOLMEN" + alumbrado público
-- 0.7 → mención clara de alumbrado o iluminación pública
-- 0.5 → relación probable pero ambigua
-- 0.3 → mención débil o indirecta
-- 0.0 → no relacionado
-
-RESTRICCIONES:
-- NO explicar
-- NO agregar texto fuera del JSON
-- RESPONDER SOLO JSON válido
-
-FORMATO DE RESPUESTA OBLIGATORIO (INCLUYE LOS 3 CAMPOS):
-{{"es_relevante": true/false, "confianza": 0.9, "razon": "breve explicacion de maximo 50 palabras"}}
-
-IMPORTANTE: Debes incluir OBLIGATORIAMENTE estos 3 campos en tu respuesta:
-1. es_relevante (boolean)
-2. confianza (number)
-3. razon (string con explicación breve)
-
-Ejemplo de respuesta válida:
-{{"es_relevante": true, "confianza": 0.9, "razon": "El texto menciona explícitamente alumbrado público y contrato con DOLMEN"}}
-
-TEXTO A CLASIFICAR:
-{texto}
-"""
-}
+# Validador del lote, que se decodifica con orjson
+LOTE = TypeAdapter(Annotated[List[ProcesoLegalRequest], Field(min_length=1)])
 
 
 # -----------------------------------------------------------------------------
 # ENDPOINT DE CLASIFICACIÓN DE PROCESOS LEGALES
 # -----------------------------------------------------------------------------
-@router.post("/clasificar", response_model=ProcesoLegalResponse, tags=["Clasificación"])
+@router.post(
+    "/clasificar",
+    response_model=None,
+    responses={200: {"model": Union[ProcesoLegalResponse, ProcesoClasificadoResumen]}},
+    tags=["Clasificación"]
+)
 async def clasificar_proceso(
     request: ProcesoLegalRequest,
-    api_key: str = Depends(verificar_api_key)
+    modo: ModoRespuesta = Query(ModoRespuesta.completo, description="completo o resumido (sin el texto)"),
+    x_request_timeout: Optional[float] = Header(
+        None,
+        description="Segundos que el cliente puede esperar turno (por defecto COLA_PLAZO_SEGUNDOS)"
+    ),
+    api_key: str = Depends(verificar_api_key),
+    clasificador: Clasificador = Depends(obtener_clasificador)
 ):
     """
     Clasifica procesos legales relacionados con DOLMEN o alumbrado público.
 
     Recibe un proceso judicial completo y devuelve el mismo objeto con
     los campos de clasificación agregados (es_relevante, confianza, razon).
+    Con ?modo=resumido solo devuelve los identificadores (radicacion, reg,
+    enlace) y la clasificación, sin repetir el texto del documento.
 
     Args:
         request: Objeto completo del proceso judicial
+        modo: Forma de la respuesta (completo por defecto)
+        x_request_timeout: Plazo de espera en cola del cliente (header X-Request-Timeout)
         api_key: API key validada (inyectada por Depends)
+        clasificador: Pipeline de clasificación compartido (inyectado por Depends)
 
     Returns:
-        ProcesoLegalResponse: Proceso completo con clasificación agregada
+        ProcesoLegalResponse | ProcesoClasificadoResumen: Proceso con clasificación agregada
 
     Raises:
-        HTTPException: Error 500 si falla el procesamiento
+        HTTPException: Error 400 si no hay texto, 429 (con Retry-After) si la
+                       cola está saturada, 500 si falla el procesamiento
     """
-    try:
-        logger.info(f"Nueva solicitud de clasificación - Radicación: {request.radicacion or 'N/A'}")
+    logger.info(f"Nueva solicitud de clasificación - Radicación: {request.radicacion or 'N/A'}")
 
-        client = ollama.Client(host=settings.ollama_base_url)
+    texto_clasificar = texto_a_clasificar(request)
+    plazo = x_request_timeout if x_request_timeout is not None else settings.cola_plazo_segundos
+    clasificacion = await clasificador.clasificar(texto_clasificar, plazo=plazo or None)
 
-        # Usar texto_pdf_completo o contenido_demanda para clasificar
-        texto_clasificar = request.texto_pdf_completo or request.contenido_demanda
+    return respuesta_json(construir_respuesta(request, modo, **clasificacion))
 
-        if not texto_clasificar:
-            logger.warning("Solicitud rechazada: no se proporcionó texto para clasificar")
-            raise HTTPException(
-                status_code=400,
-                detail="Debe proporcionar texto_pdf_completo o contenido_demanda"
-            )
 
-        prompt = PROMPTS["clasificar_dolmen"].format(texto=texto_clasificar)
-
-        logger.debug(f"Enviando texto al modelo ({len(texto_clasificar)} caracteres)")
-
-        response = client.chat(
-            model=settings.model_name,
-            messages=[{"role": "user", "content": prompt}],
-            options={
-                "temperature": 0.1,      # Casi determinístico
-                "top_p": 0.3,            # Un poco más de creatividad para generar la razón
-                "num_predict": 200,      # Espacio suficiente para los 3 campos
-                "repeat_penalty": 1.1,   # Evita repeticiones
-                "num_ctx": 8192          # Contexto extendido para textos largos
-            },
-            keep_alive="15m"
+# -----------------------------------------------------------------------------
+# ENDPOINT DE CLASIFICACIÓN POR LOTES
+# -----------------------------------------------------------------------------
+@router.post(
+    "/clasificar/lote",
+    response_model=None,
+    responses={200: {"model": List[ResultadoLoteItem]}},
+    tags=["Clasificación"],
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": {
+                "type": "array",
+                "minItems": 1,
+                "items": {"$ref": "#/components/schemas/ProcesoLegalRequest"}
+            }}}
+        }
+    }
+)
+async def clasificar_lote(
+    request: Request,
+    modo: ModoRespuesta = Query(ModoRespuesta.resumido, description="completo o resumido (sin el texto)"),
+    api_key: str = Depends(verificar_api_key),
+    clasificador: Clasificador = Depends(obtener_clasificador)
+):
+    """
+    Clasifica una lista de procesos en una sola petición HTTP.
+
+    - Los textos idénticos se clasifican una sola vez
+    - Los textos se clasifican en paralelo; reglas, caché y casi duplicados
+      responden sin esperar turno y la cola de admisión reparte los slots
+      de Ollama. Como máximo OLLAMA_NUM_PARALLEL + COLA_MAX_ESPERA textos
+      en curso, lo que cabe en la cola, para que el lote no reciba 429
+    - Un error en un proceso se reporta en su ítem sin fallar el lote
+    - Por defecto cada resultado viene en modo resumido (sin el texto)
+    - El cuerpo (una lista de ProcesoLegalRequest) se decodifica con orjson
+      y se valida sin pasar por json.loads
+
+    Args:
+        request: Petición cruda (lista de procesos a clasificar)
+        modo: Forma de cada resultado (resumido por defecto)
+        api_key: API key validada (inyectada por Depends)
+        clasificador: Pipeline de clasificación compartido (inyectado por Depends)
+
+    Returns:
+        List[ResultadoLoteItem]: Un resultado por proceso, en el mismo orden
+
+    Raises:
+        HTTPException: Error 413 si el lote supera lote_max_procesos
+        RequestValidationError: Error 422 si el cuerpo no es una lista de procesos
+    """
+    procesos: List[ProcesoLegalRequest] = await leer_cuerpo_json(request, LOTE)
+    if len(procesos) > settings.lote_max_procesos:
+        raise HTTPException(
+            status_code=413,
+            detail=f"El lote supera el máximo de {settings.lote_max_procesos} procesos"
         )
 
-        # Log de la respuesta cruda del modelo
-        respuesta_cruda = response['message']['content']
-        logger.info(f"Respuesta del modelo: {respuesta_cruda[:500]}")
+    logger.info(f"Nueva solicitud de lote - {len(procesos)} procesos")
+
+    # Agrupar procesos por texto para clasificar cada texto una sola vez
+    indices_por_texto = {}
+    resultados: List[ResultadoLoteItem] = [None] * len(procesos)
+    for indice, proceso in enumerate(procesos):
+        try:
+            texto = texto_a_clasificar(proceso)
+        except HTTPException as e:
+            resultados[indice] = ResultadoLoteItem(indice=indice, status_code=e.status_code, error=e.detail)
+            continue
+        indices_por_texto.setdefault(texto, []).append(indice)
+
+    # Solo acota el abanico: los slots del modelo los reparte la cola de admisión
+    semaforo = asyncio.Semaphore(settings.ollama_num_parallel + settings.cola_max_espera)
+
+    async def clasificar_texto(texto: str, indices: List[int]) -> None:
+        try:
+            async with semaforo:
+                clasificacion = await clasificador.clasificar(texto)
+        except HTTPException as e:
+            for indice in indices:
+                resultados[indice] = ResultadoLoteItem(indice=indice, status_code=e.status_code, error=e.detail)
+            return
+        except Exception as e:
+            logger.error(f"Error inesperado clasificando los procesos {indices} del lote: {e!r}")
+            for indice in indices:
+                resultados[indice] = ResultadoLoteItem(indice=indice, status_code=500, error=f"Error al procesar: {e}")
+            return
+        for indice in indices:
+            resultados[indice] = ResultadoLoteItem(
+                indice=indice,
+                resultado=construir_respuesta(procesos[indice], modo, **clasificacion)
+            )
 
-        # Intentar extraer JSON de la respuesta
-        if not respuesta_cruda or not respuesta_cruda.strip():
-            raise HTTPException(status_code=500, detail="El modelo devolvió una respuesta vacía")
+    await asyncio.gather(*(clasificar_texto(t, i) for t, i in indices_por_texto.items()))
 
-        # Buscar JSON en la respuesta (por si el modelo agrega texto extra)
-        json_match = re.search(r'\{[^{}]*\}', respuesta_cruda)
-        if json_match:
-            respuesta_json = json_match.group()
-        else:
-            respuesta_json = respuesta_cruda.strip()
+    logger.info(
+        f"Lote completado - {len(procesos)} procesos, {len(indices_por_texto)} textos únicos, "
+        f"{sum(1 for r in resultados if r.error)} errores"
+    )
+    return respuesta_json(resultados)
 
-        resultado = json.loads(respuesta_json)
 
-        # Validar que el resultado contenga los campos requeridos
-        if "es_relevante" not in resultado:
-            raise HTTPException(
-                status_code=500,
-                detail=f"El modelo no devolvió el campo 'es_relevante'. Respuesta: {resultado}"
-            )
+# -----------------------------------------------------------------------------
+# ENDPOINT DE CLASIFICACIÓN NDJSON EN STREAMING
+# -----------------------------------------------------------------------------
+@router.post(
+    "/clasificar/ndjson",
+    response_class=RespuestaNDJSON,
+    tags=["Clasificación"],
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {MEDIA_TYPE_NDJSON: {"schema": {"type": "string", "format": "binary"}}}
+        }
+    }
+)
+async def clasificar_ndjson(
+    request: Request,
+    modo: ModoRespuesta = Query(ModoRespuesta.resumido, description="completo o resumido (sin el texto)"),
+    api_key: str = Depends(verificar_api_key),
+    clasificador: Clasificador = Depends(obtener_clasificador)
+):
+    """
+    Clasifica un cuerpo NDJSON (un ProcesoLegalRequest por línea) en streaming.
+
+    - Las líneas se leen a medida que llegan: la memoria no crece con el
+      tamaño de la carga
+    - Cada resultado se envía como una línea NDJSON (ResultadoLoteItem)
+      apenas termina su documento, en orden de finalización; el campo
+      `indice` es el número de línea (base 0) de la entrada
+    - Si la cola de inferencia está llena se deja de leer la carga
+      (backpressure) hasta que se libere espacio
+    - Acepta el cuerpo comprimido (Content-Encoding: gzip o zstd); si la
+      descompresión falla o supera el límite, una última línea con el
+      error indica dónde se cortó la carga
+    - Por defecto cada resultado viene en modo resumido (sin el texto)
 
-        # Usar .get() con valores por defecto para campos opcionales
-        es_relevante = resultado.get("es_relevante", False)
-        confianza = resultado.get("confianza", 0.0)
-        # Intentar con y sin tilde
-        razon = resultado.get("razon") or resultado.get("razón", "Sin razón proporcionada por el modelo")
-        razon = str(razon)[:150]  # Limitar a 150 caracteres
-
-        logger.info(f"Clasificación exitosa - Relevante: {es_relevante}, Confianza: {confianza}")
-
-        # Devolver el objeto completo con clasificación
-        return ProcesoLegalResponse(
-            juzgado_o_tribunal=request.juzgado_o_tribunal,
-            juzgado_administrativo=request.juzgado_administrativo,
-            reg=request.reg,
-            radicacion=request.radicacion,
-            ponente=request.ponente,
-            demandante=request.demandante,
-            demandado=request.demandado,
-            clase=request.clase,
-            fecha_providencia=request.fecha_providencia,
-            actuacion=request.actuacion,
-            documento=request.documento,
-            fecha_estado=request.fecha_estado,
-            pdf_descargado=request.pdf_descargado,
-            ruta_pdf=request.ruta_pdf,
-            enlace=request.enlace.strip() if request.enlace else "",
-            texto_pdf_completo=request.texto_pdf_completo,
-            contenido_demanda=request.contenido_demanda,
-            es_relevante=es_relevante,
-            confianza=confianza,
-            razon=razon,
-            keywords_encontrados=[],
-            metodo_clasificacion="IA"
-        )
-    except json.JSONDecodeError as e:
-        logger.error(f"Error parseando JSON del modelo: {str(e)}")
-        raise HTTPException(
-            status_code=500,
-            detail=f"Error al parsear respuesta JSON del modelo: {str(e)}"
+    Args:
+        request: Petición cruda (el cuerpo se consume en streaming)
+        modo: Forma de cada resultado (resumido por defecto)
+        api_key: API key validada (inyectada por Depends)
+        clasificador: Pipeline de clasificación compartido (inyectado por Depends)
+
+    Returns:
+        RespuestaNDJSON: Resultados en streaming, uno por línea
+    """
+    logger.info("Nueva solicitud NDJSON en streaming")
+    return RespuestaNDJSON(_clasificar_flujo(request, modo, clasificador))
+
+
+async def _clasificar_flujo(
+    request: Request,
+    modo: ModoRespuesta,
+    clasificador: Clasificador
+) -> AsyncIterator[bytes]:
+    """
+    Orquesta lector, trabajadores y salida de una petición NDJSON.
+
+    La cola de entrada es acotada (ndjson_cola_max) para aplicar
+    backpressure sobre la carga; la de salida no lo es porque solo
+    contiene resultados pequeños y así un cliente que no lee la respuesta
+    hasta terminar de enviar no provoca un bloqueo mutuo.
+
+    Args:
+        request: Petición cruda
+        modo: Forma de cada resultado
+        clasificador: Pipeline de clasificación
+
+    Yields:
+        bytes: Una línea NDJSON por resultado
+    """
+    num_trabajadores = settings.ollama_num_parallel
+    entrada: asyncio.Queue = asyncio.Queue(maxsize=settings.ndjson_cola_max)
+    salida: asyncio.Queue = asyncio.Queue()
+
+    async def leer() -> None:
+        siguiente = 0
+        try:
+            async for item in leer_lineas(request.stream(), settings.ndjson_max_bytes_linea):
+                siguiente = item[0] + 1
+                await entrada.put(item)
+        except ClientDisconnect:
+            logger.warning("Cliente desconectado durante la carga NDJSON")
+        except HTTPException as e:
+            # Cuerpo comprimido inválido o demasiado grande: se deja de leer y
+            # se informa en la línea donde se cortó la carga
+            logger.warning(f"Carga NDJSON interrumpida en la línea {siguiente}: {e.detail}")
+            await salida.put(ResultadoLoteItem(indice=siguiente, status_code=e.status_code, error=e.detail))
+        finally:
+            for _ in range(num_trabajadores):
+                await entrada.put(None)
+
+    async def trabajar() -> None:
+        try:
+            while (item := await entrada.get()) is not None:
+                await salida.put(await _clasificar_linea(*item, modo, clasificador))
+        finally:
+            # Siempre avisar que terminó: si no, la salida espera para siempre
+            salida.put_nowait(None)
+
+    tareas = [asyncio.create_task(leer())]
+    tareas += [asyncio.create_task(trabajar()) for _ in range(num_trabajadores)]
+    enviados = 0
+    try:
+        terminados = 0
+        while terminados < num_trabajadores:
+            resultado = await salida.get()
+            if resultado is None:
+                terminados += 1
+                continue
+            enviados += 1
+            yield linea_ndjson(resultado)
+    finally:
+        for tarea in tareas:
+            tarea.cancel()
+        logger.info(f"NDJSON completado - {enviados} resultados enviados")
+
+
+async def _clasificar_linea(
+    indice: int,
+    linea: Optional[bytearray],
+    modo: ModoRespuesta,
+    clasificador: Clasificador
+) -> ResultadoLoteItem:
+    """
+    Valida y clasifica una línea NDJSON.
+
+    Args:
+        indice: Número de línea (base 0)
+        linea: Contenido de la línea (None si superó el tamaño máximo)
+        modo: Forma del resultado
+        clasificador: Pipeline de clasificación
+
+    Returns:
+        ResultadoLoteItem: Resultado o error de la línea
+    """
+    if linea is None:
+        return ResultadoLoteItem(
+            indice=indice,
+            status_code=413,
+            error=f"La línea supera el máximo de {settings.ndjson_max_bytes_linea} bytes"
         )
+    try:
+        proceso = ProcesoLegalRequest.model_validate(orjson.loads(linea))
+    except orjson.JSONDecodeError as e:
+        return ResultadoLoteItem(indice=indice, status_code=422, error=f"JSON inválido: {e}")
+    except ValidationError as e:
+        return ResultadoLoteItem(indice=indice, status_code=422, error=str(e))
+    try:
+        clasificacion = await clasificador.clasificar(texto_a_clasificar(proceso))
+    except HTTPException as e:
+        return ResultadoLoteItem(indice=indice, status_code=e.status_code, error=e.detail)
     except Exception as e:
-        logger.error(f"Error en clasificación: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        logger.error(f"Error inesperado clasificando la línea {indice}: {e!r}")
+        return ResultadoLoteItem(indice=indice, status_code=500, error=f"Error al procesar: {e}")
+    return ResultadoLoteItem(indice=indice, resultado=construir_respuesta(proceso, modo, **clasificacion))
+
+
+# -----------------------------------------------------------------------------
+# ENDPOINT DE ESTADÍSTICAS DE LA CACHÉ
+# -----------------------------------------------------------------------------
+@router.get("/cache/estadisticas", response_model=EstadisticasCacheResponse, tags=["Clasificación"])
+async def estadisticas_cache(
+    api_key: str = Depends(verificar_api_key),
+    cache: CacheClasificaciones = Depends(obtener_cache)
+):
+    """
+    Devuelve los contadores de aciertos y fallos de la caché de clasificaciones.
+
+    Args:
+        api_key: API key validada (inyectada por Depends)
+        cache: Caché de clasificaciones (inyectada por Depends)
+
+    Returns:
+        EstadisticasCacheResponse: Contadores de uso de la caché
+    """
+    return EstadisticasCacheResponse(**cache.estadisticas())
+
+
+
+# -----------------------------------------------------------------------------
+# ENDPOINT DE ESTADÍSTICAS DE COALESCENCIA
+# -----------------------------------------------------------------------------
+@router.get(
+    "/coalescencia/estadisticas",
+    response_model=EstadisticasCoalescenciaResponse,
+    tags=["Clasificación"]
+)
+async def estadisticas_coalescencia(
+    api_key: str = Depends(verificar_api_key),
+    clasificador: Clasificador = Depends(obtener_clasificador)
+):
+    """
+    Devuelve cuántas peticiones idénticas simultáneas compartieron una inferencia.
+
+    Args:
+        api_key: API key validada (inyectada por Depends)
+        clasificador: Pipeline de clasificación compartido (inyectado por Depends)
+
+    Returns:
+        EstadisticasCoalescenciaResponse: Contadores de coalescencia
+    """
+    return EstadisticasCoalescenciaResponse(**clasificador.coalescedor.estadisticas())
+
+
+
+# -----------------------------------------------------------------------------
+# ENDPOINT DE ESTADO DE LA COLA
+# -----------------------------------------------------------------------------
+@router.get("/cola", response_model=EstadoColaResponse, tags=["Clasificación"])
+async def estado_cola(
+    api_key: str = Depends(verificar_api_key),
+    clasificador: Clasificador = Depends(obtener_clasificador)
+):
+    """
+    Devuelve la profundidad de la cola de inferencias y los tiempos de espera.
+
+    Args:
+        api_key: API key validada (inyectada por Depends)
+        clasificador: Pipeline de clasificación compartido (inyectado por Depends)
+
+    Returns:
+        EstadoColaResponse: Estado actual de la cola
+    """
+    return EstadoColaResponse(**clasificador.admision.estado())
@@ -8,6 +8,9 @@ Los health checks son esenciales para:
 - Monitoreo de infraestructura (Docker, Kubernetes)
 - Balanceadores de carga
 - Sistemas de alerta y observabilidad
+
+/health indica si el proceso y Ollama están vivos; /ready indica si la
+réplica puede recibir tráfico (modelo precargado y calentado).
 =============================================================================
 """
 
@@ -15,10 +18,12 @@ Los health checks son esenciales para:
 # IMPORTACIONES
 # -----------------------------------------------------------------------------
 import logging  # Para logging estructurado
-from fastapi import APIRouter, HTTPException  # Router y excepciones HTTP
-import ollama  # Cliente para comunicarse con el servidor Ollama
-from app.config import get_settings  # Configuración de la aplicación
-from app.models import HealthResponse  # Modelo de respuesta
+from fastapi import APIRouter, Depends  # Router e inyección de dependencias
+from fastapi.responses import JSONResponse  # Respuesta 503 con el estado
+from app.dependencies import obtener_calentador, obtener_monitor_salud  # Estado de la aplicación
+from app.models import HealthResponse, ReadyResponse  # Modelos de respuesta
+from app.services.calentamiento import CalentadorModelo  # Precarga del modelo
+from app.services.salud import MonitorSalud  # Instantánea de estado de Ollama
 
 # Logger para este módulo
 logger = logging.getLogger(__name__)
@@ -27,58 +32,72 @@ logger = logging.getLogger(__name__)
 # CONFIGURACIÓN DEL ROUTER
 # -----------------------------------------------------------------------------
 router = APIRouter()  # Instancia del router para agrupar endpoints
-settings = get_settings()  # Configuración global
 
 
 # -----------------------------------------------------------------------------
 # ENDPOINT DE VERIFICACIÓN DE SALUD
 # -----------------------------------------------------------------------------
-@router.get("/health", response_model=HealthResponse, tags=["Health"])
-async def health_check():
+@router.get(
+    "/health",
+    response_model=HealthResponse,
+    responses={503: {"model": HealthResponse}},
+    tags=["Health"]
+)
+async def health_check(monitor: MonitorSalud = Depends(obtener_monitor_salud)):
     """
     Verifica el estado del servicio y conexión con Ollama.
     
-    Este endpoint realiza las siguientes verificaciones:
+    Responde desde la instantánea que el monitor de salud refresca en
+    segundo plano (cada SALUD_INTERVALO segundos), así que un sondeo no
+    llama a Ollama ni bloquea el tráfico de inferencia, sin importar con
+    qué frecuencia lo consulten Docker o los balanceadores.
+    
+    Incluye:
     1. Conexión con el servidor Ollama
-    2. Disponibilidad del modelo de IA configurado
+    2. Disponibilidad del modelo de IA configurado y si está cargado en memoria
+    3. Profundidad de la cola e inferencias en curso
     
     Es utilizado por:
     - Docker healthcheck (Dockerfile)
     - docker-compose para dependencias entre servicios
     - Sistemas de monitoreo externos
     
+    Args:
+        monitor: Monitor de salud (inyectado por Depends)
+    
+    Returns:
+        HealthResponse: Estado del servicio (503 si Ollama no está disponible
+                        o aún no hay instantánea)
+    """
+    estado = HealthResponse(**monitor.estado())
+    if not estado.ollama_conectado:
+        return JSONResponse(status_code=503, content=estado.model_dump())
+    return estado
+
+
+# -----------------------------------------------------------------------------
+# ENDPOINT DE PREPARACIÓN (READINESS)
+# -----------------------------------------------------------------------------
+@router.get(
+    "/ready",
+    response_model=ReadyResponse,
+    responses={503: {"model": ReadyResponse}},
+    tags=["Health"]
+)
+async def ready_check(calentador: CalentadorModelo = Depends(obtener_calentador)):
+    """
+    Indica si la réplica puede recibir tráfico.
+
+    Responde 503 hasta que el modelo está precargado y calentado, para que
+    el balanceador nunca envíe peticiones a una réplica en frío.
+
+    Args:
+        calentador: Calentador del modelo (inyectado por Depends)
+
     Returns:
-        HealthResponse: Estado del servicio con información de conexión
-        
-    Raises:
-        HTTPException: Error 503 si el servicio no está disponible
+        ReadyResponse: Estado del calentamiento (200 listo, 503 no listo)
     """
-    try:
-        # Creamos un cliente de Ollama con la URL configurada
-        client = ollama.Client(host=settings.ollama_base_url)
-        
-        # Obtenemos la lista de modelos disponibles en Ollama
-        modelos = client.list()
-        
-        # Verificamos si nuestro modelo configurado está disponible
-        # Usamos 'in' para permitir coincidencias parciales (ej: qwen2.5:3b)
-        modelo_existe = any(
-            settings.model_name in m['name'] 
-            for m in modelos.get('models', [])
-        )
-        
-        # Retornamos el estado con toda la información relevante
-        return HealthResponse(
-            status="healthy" if modelo_existe else "modelo_no_encontrado",
-            modelo=settings.model_name,
-            ollama_conectado=True,  # Si llegamos aquí, la conexión fue exitosa
-            version=settings.app_version
-        )
-        
-    except Exception as e:
-        # Si hay cualquier error (conexión, timeout, etc.), retornamos 503
-        logger.error(f"Health check falló: {str(e)}")
-        raise HTTPException(
-            status_code=503,  # Service Unavailable
-            detail=f"Servicio no disponible: {str(e)}"
-        )
\ No newline at end of file
+    estado = ReadyResponse(**calentador.estado())
+    if not estado.listo:
+        return JSONResponse(status_code=503, content=estado.model_dump())
+    return estado
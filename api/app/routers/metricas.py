@@ -0,0 +1,36 @@
+"""
+=============================================================================
+ROUTER DE MÉTRICAS - metricas.py
+=============================================================================
+Expone las métricas de la API en formato Prometheus.
+
+Se deja sin autenticación, como es habitual para el scrape de Prometheus;
+en producción debe quedar accesible solo desde la red de monitoreo.
+=============================================================================
+"""
+
+# -----------------------------------------------------------------------------
+# IMPORTACIONES
+# -----------------------------------------------------------------------------
+from fastapi import APIRouter  # Router de FastAPI
+from fastapi.responses import Response  # Respuesta en texto plano
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest  # Exposición
+
+# -----------------------------------------------------------------------------
+# CONFIGURACIÓN DEL ROUTER
+# -----------------------------------------------------------------------------
+router = APIRouter()  # Router para el endpoint de métricas
+
+
+# -----------------------------------------------------------------------------
+# ENDPOINT DE MÉTRICAS
+# -----------------------------------------------------------------------------
+@router.get("/metrics", tags=["Monitoreo"], include_in_schema=False)
+async def metricas():
+    """
+    Devuelve todas las métricas registradas en formato de texto Prometheus.
+
+    Returns:
+        Response: Métricas en formato de exposición de Prometheus
+    """
+    return Response(content=generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,154 @@
+"""
+=============================================================================
+ROUTER DE TRABAJOS ASÍNCRONOS - trabajos.py
+=============================================================================
+Enviar y consultar clasificaciones que pueden tardar más que el timeout
+del proxy inverso:
+
+- POST /api/v1/trabajos: encola un proceso y responde 202 con el id
+- GET /api/v1/trabajos/{id}: estado y resultado del trabajo
+
+La cola y sus trabajadores viven en app/services/trabajos.py.
+
+Requiere autenticación mediante API Key.
+=============================================================================
+"""
+
+# -----------------------------------------------------------------------------
+# IMPORTACIONES
+# -----------------------------------------------------------------------------
+import asyncio  # Para no bloquear el event loop con SQLite
+import logging  # Para logging estructurado
+from typing import Optional  # Tipos para anotaciones
+from fastapi import APIRouter, Depends, HTTPException, Query, Response  # Herramientas de FastAPI
+from pydantic import HttpUrl  # Validación de la URL de callback
+from app.config import get_settings  # Configuración de la aplicación
+from app.models import (  # Modelos de datos
+    ModoRespuesta,
+    ProcesoLegalRequest,
+    ProcesoLegalResponse,
+    ProcesoClasificadoResumen,
+    TrabajoCreadoResponse,
+    TrabajoResponse
+)
+from app.dependencies import verificar_api_key, obtener_trabajos  # Dependencias
+from app.services.clasificador import texto_a_clasificar  # Validación temprana del texto
+from app.services.trabajos import PoolTrabajadores, validar_callback  # Cola de trabajos asíncronos
+
+# Logger para este módulo
+logger = logging.getLogger(__name__)
+
+settings = get_settings()  # Configuración global de la aplicación
+
+# -----------------------------------------------------------------------------
+# CONFIGURACIÓN DEL ROUTER
+# -----------------------------------------------------------------------------
+router = APIRouter()  # Router para agrupar endpoints de trabajos
+
+
+# -----------------------------------------------------------------------------
+# ENDPOINT PARA ENCOLAR UN TRABAJO
+# -----------------------------------------------------------------------------
+@router.post(
+    "/trabajos",
+    status_code=202,
+    response_model=TrabajoCreadoResponse,
+    tags=["Trabajos"]
+)
+async def crear_trabajo(
+    request: ProcesoLegalRequest,
+    response: Response,
+    modo: ModoRespuesta = Query(ModoRespuesta.resumido, description="completo o resumido (sin el texto)"),
+    callback_url: Optional[HttpUrl] = Query(None, description="URL que recibirá un POST con el trabajo terminado"),
+    api_key: str = Depends(verificar_api_key),
+    trabajos: PoolTrabajadores = Depends(obtener_trabajos)
+):
+    """
+    Encola la clasificación de un proceso y responde de inmediato.
+
+    El resultado se consulta con GET /api/v1/trabajos/{id} o se recibe
+    en callback_url cuando el trabajo termina (con éxito o con error).
+
+    Args:
+        request: Proceso a clasificar
+        response: Respuesta HTTP (para el header Location)
+        modo: Forma del resultado (resumido por defecto)
+        callback_url: URL a notificar al terminar (opcional)
+        api_key: API key validada (inyectada por Depends)
+        trabajos: Cola de trabajos compartida (inyectada por Depends)
+
+    Returns:
+        TrabajoCreadoResponse: Id y estado inicial del trabajo
+
+    Raises:
+        HTTPException: Error 400 si no hay texto para analizar o callback_url
+                       no está en la lista permitida
+    """
+    # Rechazar ahora lo que de todas formas fallaría en el trabajador
+    texto_a_clasificar(request)
+    if callback_url:
+        validar_callback(str(callback_url), settings)
+
+    trabajo = await asyncio.to_thread(
+        trabajos.almacen.crear,
+        request.model_dump_json(),
+        modo.value,
+        str(callback_url) if callback_url else None
+    )
+    trabajos.notificar()
+    logger.info(f"Trabajo {trabajo['id']} encolado - Radicación: {request.radicacion}")
+
+    url = f"/api/v1/trabajos/{trabajo['id']}"
+    response.headers["Location"] = url
+    return TrabajoCreadoResponse(id=trabajo["id"], estado=trabajo["estado"], url=url)
+
+
+# -----------------------------------------------------------------------------
+# ENDPOINT DE CONSULTA DE UN TRABAJO
+# -----------------------------------------------------------------------------
+@router.get(
+    "/trabajos/{trabajo_id}",
+    response_model=None,
+    responses={200: {"model": TrabajoResponse}},
+    tags=["Trabajos"]
+)
+async def obtener_trabajo(
+    trabajo_id: str,
+    api_key: str = Depends(verificar_api_key),
+    trabajos: PoolTrabajadores = Depends(obtener_trabajos)
+) -> TrabajoResponse:
+    """
+    Devuelve el estado de un trabajo y, si terminó, su resultado.
+
+    Args:
+        trabajo_id: Id devuelto por POST /api/v1/trabajos
+        api_key: API key validada (inyectada por Depends)
+        trabajos: Cola de trabajos compartida (inyectada por Depends)
+
+    Returns:
+        TrabajoResponse: Estado, resultado o error del trabajo
+
+    Raises:
+        HTTPException: Error 404 si el trabajo no existe (o ya se purgó)
+    """
+    trabajo = await asyncio.to_thread(trabajos.almacen.obtener, trabajo_id)
+    if trabajo is None:
+        raise HTTPException(status_code=404, detail="Trabajo no encontrado")
+
+    resultado = trabajo["resultado"]
+    if resultado is not None:
+        # El modo decide el modelo; validar el dict contra la unión elegiría el primero
+        modelo = ProcesoClasificadoResumen if trabajo["modo"] == ModoRespuesta.resumido else ProcesoLegalResponse
+        resultado = modelo(**resultado)
+
+    return TrabajoResponse(
+        id=trabajo["id"],
+        estado=trabajo["estado"],
+        modo=trabajo["modo"],
+        intentos=trabajo["intentos"],
+        status_code=trabajo["status_code"],
+        resultado=resultado,
+        error=trabajo["error"],
+        creado=trabajo["creado"],
+        actualizado=trabajo["actualizado"]
+    )
@@ -0,0 +1,101 @@
+"""
+=============================================================================
+ROUTER DEL ÍNDICE DE VECINOS - vecinos.py
+=============================================================================
+Alimenta y consulta el índice de ejemplos etiquetados que permite
+clasificar por vecinos más cercanos sin generar:
+
+- POST /api/v1/vecinos/ejemplos: agrega ejemplos (sin reiniciar la API)
+- GET /api/v1/vecinos/estadisticas: tamaño y composición del índice
+
+El índice vive en app/services/vecinos.py y lo usa el clasificador.
+
+Requiere autenticación mediante API Key.
+=============================================================================
+"""
+
+# -----------------------------------------------------------------------------
+# IMPORTACIONES
+# -----------------------------------------------------------------------------
+import logging  # Para logging estructurado
+from typing import List  # Tipos para anotaciones
+from fastapi import APIRouter, Depends, HTTPException  # Herramientas de FastAPI
+from app.models import (  # Modelos de datos
+    EjemploEtiquetado,
+    EjemplosAgregadosResponse,
+    EstadisticasVecinosResponse
+)
+from app.dependencies import verificar_api_key, obtener_clasificador  # Dependencias
+from app.services.clasificador import Clasificador, texto_a_clasificar  # Pipeline
+
+# Logger para este módulo
+logger = logging.getLogger(__name__)
+
+# -----------------------------------------------------------------------------
+# CONFIGURACIÓN DEL ROUTER
+# -----------------------------------------------------------------------------
+router = APIRouter()  # Router para agrupar endpoints del índice de vecinos
+
+
+# -----------------------------------------------------------------------------
+# ENDPOINT PARA AGREGAR EJEMPLOS
+# -----------------------------------------------------------------------------
+@router.post("/vecinos/ejemplos", response_model=EjemplosAgregadosResponse, tags=["Vecinos"])
+async def agregar_ejemplos(
+    ejemplos: List[EjemploEtiquetado],
+    api_key: str = Depends(verificar_api_key),
+    clasificador: Clasificador = Depends(obtener_clasificador)
+):
+    """
+    Agrega procesos etiquetados al índice de vecinos más cercanos.
+
+    Acepta resultados anteriores de /clasificar en modo completo (el texto
+    y es_relevante están en la respuesta) o una semilla curada.
+
+    Args:
+        ejemplos: Procesos con texto y etiqueta
+        api_key: API key validada (inyectada por Depends)
+        clasificador: Pipeline de clasificación compartido (inyectado por Depends)
+
+    Returns:
+        EjemplosAgregadosResponse: Ejemplos agregados y tamaño del índice
+
+    Raises:
+        HTTPException: 400 si un ejemplo no trae texto, 503 si el índice
+                       está deshabilitado, 502 si fallan los embeddings
+    """
+    if not ejemplos:
+        raise HTTPException(status_code=400, detail="Debe enviar al menos un ejemplo")
+    pares = [(texto_a_clasificar(ejemplo), ejemplo.es_relevante) for ejemplo in ejemplos]
+    total = await clasificador.aprender(pares)
+    logger.info(f"{len(pares)} ejemplos agregados al índice de vecinos ({total} en total)")
+    return EjemplosAgregadosResponse(agregados=len(pares), ejemplos=total)
+
+
+# -----------------------------------------------------------------------------
+# ENDPOINT DE ESTADÍSTICAS DEL ÍNDICE
+# -----------------------------------------------------------------------------
+@router.get("/vecinos/estadisticas", response_model=EstadisticasVecinosResponse, tags=["Vecinos"])
+async def estadisticas_vecinos(
+    api_key: str = Depends(verificar_api_key),
+    clasificador: Clasificador = Depends(obtener_clasificador)
+):
+    """
+    Devuelve el tamaño y la composición del índice de vecinos.
+
+    Args:
+        api_key: API key validada (inyectada por Depends)
+        clasificador: Pipeline de clasificación compartido (inyectado por Depends)
+
+    Returns:
+        EstadisticasVecinosResponse: Ejemplos, relevantes y dimensión
+
+    Raises:
+        HTTPException: 503 si el índice está deshabilitado
+    """
+    if clasificador.vecinos is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Índice de vecinos deshabilitado (VECINOS_MODELO_EMBEDDINGS vacío)"
+        )
+    return EstadisticasVecinosResponse(**clasificador.vecinos.estadisticas())
@@ -0,0 +1,26 @@
+"""
+Paquete de servicios de la aplicación.
+
+Contiene la lógica reutilizable que no depende de un endpoint concreto:
+- ollama_cliente: Cliente asíncrono compartido hacia el servidor Ollama
+- calentamiento: Precarga, calentamiento y keep-warm del modelo
+- clasificador: Pipeline de clasificación (reglas, extracto, caché, modelo)
+- prompts: Registro versionado de plantillas de prompt
+- reglas: Atajo determinístico por palabras clave
+- salud: Instantánea del estado de Ollama para /health, refrescada en segundo plano
+- salida_modelo: Esquema JSON de la respuesta del modelo, reparación y validación
+- limpieza: Encabezados, números de página y ruido del texto de los PDF
+- tokens: Conteo local de tokens (tokenizador del modelo o estimación)
+- contexto: Elección de num_ctx por cubetas según los tokens del prompt
+- extractos: Pasajes relevantes de documentos largos
+- cache: Caché de clasificaciones por contenido
+- duplicados: Índice SimHash de documentos casi duplicados
+- coalescencia: Single-flight de inferencias idénticas
+- admision: Cola acotada delante de Ollama
+- ndjson: Lectura y escritura NDJSON en streaming
+- serializacion: Codificación y decodificación JSON con orjson
+- compresion: Middleware de cuerpos comprimidos (gzip y zstd)
+- metricas: Métricas Prometheus
+- trabajos: Cola persistente de trabajos asíncronos y sus trabajadores
+- vecinos: Índice de embeddings etiquetados (vecinos más cercanos, NumPy)
+"""
@@ -0,0 +1,145 @@
+"""
+=============================================================================
+SERVICIO DE CONTROL DE ADMISIÓN - admision.py
+=============================================================================
+Cola acotada y limitador de concurrencia delante de las llamadas al modelo.
+
+Ollama atiende OLLAMA_NUM_PARALLEL inferencias a la vez; el resto espera
+en esta cola. Si la cola está llena, o si la espera estimada supera el
+plazo de la petición, se rechaza de inmediato con 429 y un Retry-After
+calculado, en lugar de dejar que el cliente agote su timeout y se
+desperdicie el trabajo.
+
+La espera se estima con una media móvil (EWMA) del tiempo de servicio:
+    espera ≈ (peticiones delante + 1) / concurrencia * tiempo de servicio
+=============================================================================
+"""
+
+# -----------------------------------------------------------------------------
+# IMPORTACIONES
+# -----------------------------------------------------------------------------
+import asyncio  # Semáforo de concurrencia
+import logging  # Para logging estructurado
+import math  # Para redondear Retry-After
+import time  # Para medir esperas y tiempos de servicio
+from contextlib import asynccontextmanager  # Para el turno como context manager
+from typing import Any, AsyncIterator, Dict, Optional  # Tipos para anotaciones
+from fastapi import HTTPException  # Error 429 con Retry-After
+from app.services import metricas  # Histograma de espera en cola
+
+# Logger para este módulo
+logger = logging.getLogger(__name__)
+
+# Peso de la última medición en las medias móviles
+ALFA_EWMA = 0.2
+
+
+# -----------------------------------------------------------------------------
+# CONTROL DE ADMISIÓN
+# -----------------------------------------------------------------------------
+class ControlAdmision:
+    """
+    Limita las inferencias simultáneas y acota la cola de espera.
+
+    Attributes:
+        concurrencia: Inferencias simultáneas permitidas (OLLAMA_NUM_PARALLEL)
+        max_cola: Peticiones que pueden esperar turno a la vez
+        en_espera: Peticiones esperando turno ahora mismo
+        en_curso: Inferencias en curso ahora mismo
+        tiempo_servicio: Media móvil de la duración de una inferencia (s)
+        espera_promedio: Media móvil de la espera en cola (s)
+    """
+
+    def __init__(self, concurrencia: int, max_cola: int, tiempo_servicio_inicial: float):
+        self.concurrencia = concurrencia
+        self.max_cola = max_cola
+        self._semaforo = asyncio.Semaphore(concurrencia)
+        self.en_espera = 0
+        self.en_curso = 0
+        self.tiempo_servicio = tiempo_servicio_inicial
+        self.espera_promedio = 0.0
+        self.admitidas = 0
+        self.rechazadas = 0
+
+    def estimar_espera(self) -> float:
+        """
+        Estima cuántos segundos esperaría una petición que llega ahora.
+
+        Returns:
+            float: 0 si hay un slot libre; si no, la estimación por EWMA
+        """
+        if self.en_curso + self.en_espera < self.concurrencia:
+            return 0.0
+        return (self.en_espera + 1) / self.concurrencia * self.tiempo_servicio
+
+    def _rechazar(self, motivo: str, espera: float) -> HTTPException:
+        """Construye el error 429 con un Retry-After calculado."""
+        self.rechazadas += 1
+        retry_after = max(1, math.ceil(espera))
+        logger.warning(f"Petición rechazada ({motivo}) - Retry-After: {retry_after}s")
+        return HTTPException(
+            status_code=429,
+            detail=f"Servidor saturado: {motivo}",
+            headers={"Retry-After": str(retry_after)}
+        )
+
+    @asynccontextmanager
+    async def turno(self, plazo: Optional[float] = None) -> AsyncIterator[None]:
+        """
+        Espera un slot de inferencia o rechaza la petición de inmediato.
+
+        Args:
+            plazo: Segundos que el cliente está dispuesto a esperar (None = sin plazo)
+
+        Raises:
+            HTTPException: Error 429 si la cola está llena o la espera
+                           estimada supera el plazo
+        """
+        espera_estimada = self.estimar_espera()
+        if espera_estimada > 0 and self.en_espera >= self.max_cola:
+            raise self._rechazar(f"cola llena ({self.en_espera} en espera)", espera_estimada)
+        if plazo is not None and espera_estimada > plazo:
+            raise self._rechazar(
+                f"espera estimada {espera_estimada:.1f}s supera el plazo de {plazo:.1f}s",
+                espera_estimada
+            )
+
+        inicio_espera = time.monotonic()
+        self.en_espera += 1
+        try:
+            await self._semaforo.acquire()
+        finally:
+            self.en_espera -= 1
+        espera = time.monotonic() - inicio_espera
+        metricas.ESPERA_COLA.observe(espera)
+        self.espera_promedio += ALFA_EWMA * (espera - self.espera_promedio)
+        self.admitidas += 1
+
+        inicio_servicio = time.monotonic()
+        self.en_curso += 1
+        try:
+            yield
+        finally:
+            self.en_curso -= 1
+            self._semaforo.release()
+            servicio = time.monotonic() - inicio_servicio
+            self.tiempo_servicio += ALFA_EWMA * (servicio - self.tiempo_servicio)
+
+    def estado(self) -> Dict[str, Any]:
+        """
+        Devuelve el estado actual de la cola para operadores.
+
+        Returns:
+            Dict: Profundidad, ocupación, tiempos estimados y contadores
+        """
+        return {
+            "en_espera": self.en_espera,
+            "en_curso": self.en_curso,
+            "concurrencia": self.concurrencia,
+            "max_cola": self.max_cola,
+            "espera_estimada_segundos": round(self.estimar_espera(), 3),
+            "espera_promedio_segundos": round(self.espera_promedio, 3),
+            "tiempo_servicio_segundos": round(self.tiempo_servicio, 3),
+            "admitidas": self.admitidas,
+            "rechazadas": self.rechazadas,
+        }
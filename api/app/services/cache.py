@@ -0,0 +1,225 @@
+"""
+=============================================================================
+SERVICIO DE CACHÉ DE CLASIFICACIONES - cache.py
+=============================================================================
+Guarda el resultado del modelo indexado por el CONTENIDO de la petición,
+para que reenvíos del mismo documento (re-ejecuciones del scraper,
+reintentos por timeout) no vuelvan a pagar la inferencia.
+
+Niveles:
+1. Memoria: LRU acotado con TTL (acierto en microsegundos)
+2. Disco (opcional): SQLite en modo WAL que sobrevive reinicios del
+   contenedor. Un acierto en disco se promueve a memoria. Las lecturas y
+   escrituras en disco corren en un hilo para no bloquear el event loop.
+
+La clave es un hash SHA-256 del texto recibido (normalizado), la plantilla
+del prompt, el nombre del modelo y las opciones de generación y de
+preparación del extracto: cambiar cualquiera de ellos invalida
+automáticamente las entradas anteriores.
+=============================================================================
+"""
+
+# -----------------------------------------------------------------------------
+# IMPORTACIONES
+# -----------------------------------------------------------------------------
+import asyncio  # E/S de SQLite fuera del event loop
+import hashlib  # Para calcular la clave de contenido
+import json  # Para serializar valores y opciones
+import logging  # Para logging estructurado
+import sqlite3  # Nivel persistente opcional
+import threading  # Para proteger el LRU y la conexión SQLite (usada desde hilos)
+import time  # Para el TTL
+from collections import OrderedDict  # Estructura base del LRU
+from pathlib import Path  # Para crear el directorio de la base de datos
+from typing import Any, Dict, Optional, Tuple  # Tipos para anotaciones
+
+# Logger para este módulo
+logger = logging.getLogger(__name__)
+
+
+# -----------------------------------------------------------------------------
+# CÁLCULO DE LA CLAVE
+# -----------------------------------------------------------------------------
+def calcular_clave(texto: str, plantilla: str, modelo: str, opciones: Dict[str, Any]) -> str:
+    """
+    Calcula la clave de contenido de una clasificación.
+
+    El texto se normaliza colapsando espacios en blanco, de modo que el
+    mismo documento extraído con distinto espaciado produce la misma clave.
+
+    Args:
+        texto: Texto a clasificar
+        plantilla: Plantilla del prompt usada
+        modelo: Nombre del modelo
+        opciones: Opciones de generación enviadas a Ollama
+
+    Returns:
+        str: Hash SHA-256 en hexadecimal
+    """
+    h = hashlib.sha256()
+    for parte in (
+        plantilla,
+        modelo,
+        json.dumps(opciones, sort_keys=True),
+        " ".join(texto.split()),
+    ):
+        h.update(parte.encode("utf-8"))
+        h.update(b"\x00")  # Separador para evitar colisiones por concatenación
+    return h.hexdigest()
+
+
+# -----------------------------------------------------------------------------
+# CACHÉ DE DOS NIVELES
+# -----------------------------------------------------------------------------
+class CacheClasificaciones:
+    """
+    Caché LRU en memoria con TTL y nivel opcional en SQLite.
+
+    Attributes:
+        max_entradas: Tamaño máximo del LRU en memoria
+        ttl_segundos: Vida de cada entrada (memoria y disco)
+        ruta_sqlite: Ruta del archivo SQLite, o None para solo memoria
+    """
+
+    def __init__(self, max_entradas: int, ttl_segundos: float, ruta_sqlite: Optional[str] = None):
+        self.max_entradas = max_entradas
+        self.ttl_segundos = ttl_segundos
+        self.ruta_sqlite = ruta_sqlite or None
+        self._memoria: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()  # LRU (solo operaciones en memoria)
+        self._lock_disco = threading.Lock()  # Conexión SQLite: nunca se retiene con el LRU
+        self._conexion: Optional[sqlite3.Connection] = None
+        self.aciertos = 0
+        self.aciertos_disco = 0
+        self.fallos = 0
+
+        if self.ruta_sqlite:
+            self._abrir_sqlite()
+
+    def _abrir_sqlite(self) -> None:
+        """Abre (o crea) la base de datos SQLite del nivel persistente."""
+        Path(self.ruta_sqlite).parent.mkdir(parents=True, exist_ok=True)
+        self._conexion = sqlite3.connect(self.ruta_sqlite, check_same_thread=False)
+        self._conexion.execute("PRAGMA journal_mode=WAL")
+        self._conexion.execute("PRAGMA synchronous=NORMAL")
+        self._conexion.execute(
+            "CREATE TABLE IF NOT EXISTS clasificaciones ("
+            "clave TEXT PRIMARY KEY, valor TEXT NOT NULL, creado REAL NOT NULL)"
+        )
+        # Purga de entradas vencidas al arrancar
+        self._conexion.execute(
+            "DELETE FROM clasificaciones WHERE creado < ?",
+            (time.time() - self.ttl_segundos,)
+        )
+        self._conexion.commit()
+        logger.info(f"Caché persistente abierta en {self.ruta_sqlite}")
+
+    async def obtener(self, clave: str) -> Optional[Dict[str, Any]]:
+        """
+        Busca una clasificación en memoria y, si no está, en disco.
+
+        La lectura de SQLite corre en un hilo (asyncio.to_thread): mientras
+        espera el disco, el event loop sigue atendiendo otras peticiones.
+
+        Args:
+            clave: Clave calculada con calcular_clave
+
+        Returns:
+            Optional[Dict]: Resultado guardado, o None si no existe o venció
+        """
+        valor = self._obtener_memoria(clave)
+        if valor is None and self._conexion is not None:
+            encontrado = await asyncio.to_thread(self._obtener_disco, clave)
+            if encontrado is not None:
+                valor, creado = encontrado
+                with self._lock:
+                    self._guardar_memoria(clave, valor, creado)
+                self.aciertos_disco += 1
+        if valor is None:
+            self.fallos += 1
+        else:
+            self.aciertos += 1
+        return valor
+
+    async def guardar(self, clave: str, valor: Dict[str, Any]) -> None:
+        """
+        Guarda una clasificación en memoria y, si está habilitado, en disco.
+
+        La escritura en SQLite (y su commit) corre en un hilo, como la lectura.
+
+        Args:
+            clave: Clave calculada con calcular_clave
+            valor: Resultado serializable a JSON
+        """
+        creado = time.time()
+        with self._lock:
+            self._guardar_memoria(clave, valor, creado)
+        if self._conexion is not None:
+            await asyncio.to_thread(self._guardar_disco, clave, json.dumps(valor), creado)
+
+    def _obtener_memoria(self, clave: str) -> Optional[Dict[str, Any]]:
+        """Busca en el LRU; una entrada vencida se descarta."""
+        with self._lock:
+            entrada = self._memoria.get(clave)
+            if entrada is None:
+                return None
+            valor, creado = entrada
+            if time.time() - creado < self.ttl_segundos:
+                self._memoria.move_to_end(clave)
+                return valor
+            del self._memoria[clave]
+            return None
+
+    def _obtener_disco(self, clave: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Busca en SQLite (se llama desde un hilo). Devuelve (valor, creado) o None."""
+        with self._lock_disco:
+            if self._conexion is None:
+                return None
+            fila = self._conexion.execute(
+                "SELECT valor, creado FROM clasificaciones WHERE clave = ?", (clave,)
+            ).fetchone()
+        if fila is None or time.time() - fila[1] >= self.ttl_segundos:
+            return None
+        return json.loads(fila[0]), fila[1]
+
+    def _guardar_disco(self, clave: str, valor: str, creado: float) -> None:
+        """Escribe en SQLite (se llama desde un hilo)."""
+        with self._lock_disco:
+            if self._conexion is None:
+                return
+            self._conexion.execute(
+                "INSERT OR REPLACE INTO clasificaciones (clave, valor, creado) VALUES (?, ?, ?)",
+                (clave, valor, creado)
+            )
+            self._conexion.commit()
+
+    def _guardar_memoria(self, clave: str, valor: Dict[str, Any], creado: float) -> None:
+        """Inserta en el LRU y expulsa la entrada menos usada si se supera el límite."""
+        self._memoria[clave] = (valor, creado)
+        self._memoria.move_to_end(clave)
+        while len(self._memoria) > self.max_entradas:
+            self._memoria.popitem(last=False)
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """
+        Devuelve los contadores de uso de la caché.
+
+        Returns:
+            Dict: Aciertos, fallos, tasa de aciertos y tamaño actual
+        """
+        consultas = self.aciertos + self.fallos
+        return {
+            "aciertos": self.aciertos,
+            "aciertos_disco": self.aciertos_disco,
+            "fallos": self.fallos,
+            "tasa_aciertos": round(self.aciertos / consultas, 4) if consultas else 0.0,
+            "entradas_memoria": len(self._memoria),
+            "persistente": self._conexion is not None,
+        }
+
+    def cerrar(self) -> None:
+        """Cierra la conexión SQLite (si existe)."""
+        with self._lock_disco:
+            if self._conexion is not None:
+                self._conexion.close()
+                self._conexion = None
@@ -0,0 +1,142 @@
+"""
+=============================================================================
+SERVICIO DE CALENTAMIENTO DEL MODELO - calentamiento.py
+=============================================================================
+Evita que un cliente pague la carga del modelo (arranque en frío).
+
+1. Precarga: al arrancar la API se pide a Ollama que cargue model_name
+   (y el modelo rápido de la cascada, si hay) en memoria (generate con
+   prompt vacío, sin inferencia)
+2. Calentamiento: una inferencia real con la plantilla activa, que además
+   deja el prefijo del mensaje system evaluado en la caché KV
+3. Mantener caliente: una tarea en segundo plano renueva el keep_alive
+   cuando la API lleva mantener_caliente_intervalo segundos sin llamar al
+   modelo, para que los periodos de inactividad no lo descarguen
+
+Hasta que el calentamiento termina, GET /ready responde 503 y el balanceador
+no envía tráfico a la réplica. Si Ollama aún no responde, se reintenta con
+espera creciente.
+=============================================================================
+"""
+
+# -----------------------------------------------------------------------------
+# IMPORTACIONES
+# -----------------------------------------------------------------------------
+import asyncio  # Tareas en segundo plano
+import logging  # Para logging estructurado
+import time  # Para medir el calentamiento y la inactividad
+from typing import Any, Dict, List, Optional  # Tipos para anotaciones
+from app.config import Settings  # Tipo de la configuración
+from app.services.clasificador import Clasificador  # Modelo y plantilla activos
+
+# Logger para este módulo
+logger = logging.getLogger(__name__)
+
+# Espera entre reintentos del calentamiento (crece hasta el máximo)
+ESPERA_REINTENTO_INICIAL = 2.0
+ESPERA_REINTENTO_MAXIMA = 60.0
+
+
+# -----------------------------------------------------------------------------
+# CALENTADOR
+# -----------------------------------------------------------------------------
+class CalentadorModelo:
+    """
+    Precarga, calienta y mantiene residente el modelo en Ollama.
+
+    Attributes:
+        clasificador: Clasificador compartido (cliente, modelo y plantilla)
+        settings: Configuración de la aplicación
+        listo: True cuando el calentamiento terminó (o está deshabilitado)
+        detalle: Descripción del estado para /ready
+        segundos_calentamiento: Duración de precarga + calentamiento
+    """
+
+    def __init__(self, clasificador: Clasificador, settings: Settings):
+        self.clasificador = clasificador
+        self.settings = settings
+        self.listo = False
+        self.detalle = "calentando"
+        self.segundos_calentamiento: Optional[float] = None
+        self._tareas: List[asyncio.Task] = []
+
+    def iniciar(self) -> None:
+        """Lanza el calentamiento y la tarea de mantener caliente (llamar dentro del event loop)."""
+        if not self.settings.precarga_habilitada:
+            self.listo = True
+            self.detalle = "precarga deshabilitada"
+            return
+        self._tareas.append(asyncio.create_task(self._calentar(), name="calentamiento"))
+        if self.settings.mantener_caliente_intervalo > 0:
+            self._tareas.append(asyncio.create_task(self._mantener_caliente(), name="mantener-caliente"))
+
+    async def detener(self) -> None:
+        """Cancela las tareas en segundo plano."""
+        for tarea in self._tareas:
+            tarea.cancel()
+        await asyncio.gather(*self._tareas, return_exceptions=True)
+        self._tareas = []
+
+    async def precargar(self) -> None:
+        """Carga los modelos en memoria y renueva su keep_alive sin generar tokens."""
+        for modelo in self.clasificador.modelos:
+            # Con el num_ctx en uso: otro valor obligaría a Ollama a recargar el modelo
+            await self.clasificador.cliente.generate(
+                model=modelo,
+                options={"num_ctx": self.clasificador.contexto.en_uso(modelo)},
+                keep_alive=self.settings.ollama_keep_alive
+            )
+        self.clasificador.ultima_llamada = time.monotonic()
+
+    async def _calentar(self) -> None:
+        """Precarga y ejecuta la inferencia de calentamiento, reintentando hasta lograrlo."""
+        espera = ESPERA_REINTENTO_INICIAL
+        while True:
+            inicio = time.monotonic()
+            try:
+                await self.precargar()
+                await self.clasificador.calentar()
+            except Exception as e:
+                self.detalle = f"calentamiento fallido, reintento en {espera:.0f}s: {e}"
+                logger.warning(f"Calentamiento del modelo {self.settings.model_name} falló: {e}")
+                await asyncio.sleep(espera)
+                espera = min(espera * 2, ESPERA_REINTENTO_MAXIMA)
+                continue
+            self.segundos_calentamiento = round(time.monotonic() - inicio, 3)
+            self.listo = True
+            self.detalle = "listo"
+            logger.info(
+                f"Modelo {self.settings.model_name} precargado y calentado "
+                f"en {self.segundos_calentamiento}s"
+            )
+            return
+
+    async def _mantener_caliente(self) -> None:
+        """Renueva el keep_alive cuando el modelo lleva un intervalo sin usarse."""
+        intervalo = self.settings.mantener_caliente_intervalo
+        while True:
+            await asyncio.sleep(intervalo)
+            if not self.listo:
+                continue
+            inactivo = time.monotonic() - self.clasificador.ultima_llamada
+            if inactivo < intervalo:
+                continue
+            try:
+                await self.precargar()
+                logger.debug(f"keep_alive renovado tras {inactivo:.0f}s de inactividad")
+            except Exception as e:
+                logger.warning(f"No se pudo renovar el keep_alive del modelo: {e}")
+
+    def estado(self) -> Dict[str, Any]:
+        """
+        Devuelve el estado de preparación para /ready.
+
+        Returns:
+            Dict: listo, modelo, detalle y duración del calentamiento
+        """
+        return {
+            "listo": self.listo,
+            "modelo": self.settings.model_name,
+            "detalle": self.detalle,
+            "segundos_calentamiento": self.segundos_calentamiento,
+        }
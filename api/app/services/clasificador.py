@@ -0,0 +1,841 @@
+"""
+=============================================================================
+SERVICIO DE CLASIFICACIÓN - clasificador.py
+=============================================================================
+Pipeline de clasificación de un texto, compartido por todos los endpoints
+(individual, lote, ...):
+
+1. Reglas determinísticas: los casos decisivos no llaman al modelo
+2. Caché por contenido (del texto recibido): reenvíos del mismo documento
+   no repiten la inferencia ni la limpieza, el extracto o el conteo de tokens
+3. Limpieza: encabezados y pies repetidos, números de página, guiones de
+   fin de línea y ruido de los PDF fuera (menos tokens de prompt)
+4. Extracto: los documentos largos se reducen a los pasajes relevantes
+5. Coalescencia: peticiones idénticas simultáneas comparten una inferencia
+6. Casi duplicados (opcional): un extracto a pocos bits SimHash de otro
+   ya clasificado por el modelo reutiliza su clasificación
+7. Vecinos más cercanos (opcional): si los ejemplos etiquetados más
+   similares al embedding del extracto coinciden, se decide sin generar
+8. Control de admisión: cola acotada y concurrencia OLLAMA_NUM_PARALLEL
+   (antes, el prompt se cuenta localmente: num_ctx es la menor cubeta de
+   CONTEXTO_CUBETAS en la que cabe, y un documento que no cabe en la
+   mayor se recorta o se rechaza de forma explícita)
+9. Modelo Qwen vía Ollama (cliente asíncrono compartido), con salida
+   estructurada por esquema JSON, reparación local y reintentos acotados;
+   la respuesta llega en streaming y se corta en cuanto el objeto JSON
+   está completo (el texto que el modelo escribe después no se genera)
+10. Cascada (opcional): un modelo pequeño clasifica primero y solo se
+    escala a model_name si su confianza cae en la banda ambigua, no la
+    reporta o su salida no es válida; metodo_clasificacion indica qué nivel decidió
+
+Los errores se reportan como HTTPException para que cada endpoint decida
+si los propaga (individual) o los reporta por ítem (lote).
+=============================================================================
+"""
+
+# -----------------------------------------------------------------------------
+# IMPORTACIONES
+# -----------------------------------------------------------------------------
+import asyncio  # Embeddings concurrentes de los ejemplos
+import logging  # Para logging estructurado
+import time  # Para medir la latencia de cada etapa
+from typing import Any, Dict, List, Optional, Tuple, Union  # Tipos para anotaciones
+from fastapi import HTTPException  # Errores con código HTTP
+import ollama  # Cliente para el servidor de modelos Ollama
+from app.config import Settings  # Tipo de la configuración
+from app.models import (  # Modelos de entrada y salida
+    ModoRespuesta,
+    ProcesoClasificadoResumen,
+    ProcesoLegalRequest,
+    ProcesoLegalResponse
+)
+from app.services.cache import CacheClasificaciones, calcular_clave  # Caché por contenido
+from app.services.admision import ControlAdmision  # Cola acotada delante de Ollama
+from app.services.coalescencia import CoalescedorInferencias  # Single-flight
+from app.services.contexto import SelectorContexto, parsear_cubetas  # num_ctx por cubetas
+from app.services.extractos import extraer_fragmentos  # Reducción de documentos largos
+from app.services.limpieza import TextoLimpio, limpiar_texto  # Limpieza del texto de los PDF
+from app.services import metricas  # Métricas Prometheus por etapa
+from app.services.prompts import obtener_plantilla  # Registro versionado de prompts
+from app.services.reglas import evaluar_reglas  # Reglas determinísticas (sin modelo)
+from app.services.salida_modelo import (  # Salida estructurada
+    ESQUEMA_CLASIFICACION,
+    DetectorObjetoCompleto,
+    SalidaInvalida,
+    interpretar_salida
+)
+from app.services.tokens import ContadorTokens  # Tokens del prompt
+from app.services.vecinos import IndiceVecinos  # Nivel de vecinos más cercanos
+from app.services.duplicados import IndiceDuplicados  # Nivel de casi duplicados
+
+# Logger para este módulo
+logger = logging.getLogger(__name__)
+
+# -----------------------------------------------------------------------------
+# OPCIONES DE GENERACIÓN
+# -----------------------------------------------------------------------------
+# Opciones de generación enviadas a Ollama (también forman parte de la clave de caché).
+# num_ctx se agrega en cada llamada según los tokens del prompt (ver services/contexto.py)
+OPCIONES_GENERACION = {
+    "temperature": 0.1,      # Casi determinístico
+    "top_p": 0.3,            # Un poco más de creatividad para generar la razón
+    "num_predict": 96,       # El esquema limita la razón a 150 caracteres (~50 tokens)
+    "repeat_penalty": 1.1    # Evita repeticiones
+}
+
+# Reducciones del extracto para que un prompt quepa en la cubeta mayor
+MAX_AJUSTES_CONTEXTO = 3
+
+# Texto de la inferencia de calentamiento al arrancar (ver services/calentamiento.py)
+TEXTO_CALENTAMIENTO = "Acción de tutela por el cobro del servicio de acueducto en el municipio."
+
+# Temperatura de los reintentos tras una salida inválida (evita repetir la misma)
+TEMPERATURA_REINTENTO = 0.5
+
+# Caracteres del extracto enviados al modelo de embeddings (su contexto es menor)
+MAX_CARACTERES_EMBEDDING = 8000
+
+
+# -----------------------------------------------------------------------------
+# TEXTO A CLASIFICAR
+# -----------------------------------------------------------------------------
+def texto_a_clasificar(proceso: ProcesoLegalRequest) -> str:
+    """
+    Obtiene el texto a clasificar de un proceso.
+
+    Usa texto_pdf_completo y, si está vacío, contenido_demanda.
+
+    Args:
+        proceso: Proceso recibido
+
+    Returns:
+        str: Texto a clasificar
+
+    Raises:
+        HTTPException: Error 400 si el proceso no trae texto
+    """
+    texto = proceso.texto_pdf_completo or proceso.contenido_demanda
+    if not texto:
+        logger.warning("Solicitud rechazada: no se proporcionó texto para clasificar")
+        raise HTTPException(
+            status_code=400,
+            detail="Debe proporcionar texto_pdf_completo o contenido_demanda"
+        )
+    return texto
+
+
+# -----------------------------------------------------------------------------
+# CONSTRUCCIÓN DE LA RESPUESTA
+# -----------------------------------------------------------------------------
+def construir_respuesta(
+    request: ProcesoLegalRequest,
+    modo: ModoRespuesta,
+    **clasificacion
+) -> Union[ProcesoLegalResponse, ProcesoClasificadoResumen]:
+    """
+    Combina el proceso recibido con los campos de clasificación.
+
+    Args:
+        request: Proceso recibido
+        modo: completo (todo el proceso) o resumido (solo identificadores)
+        **clasificacion: Campos devueltos por Clasificador.clasificar
+
+    Returns:
+        ProcesoLegalResponse | ProcesoClasificadoResumen: Proceso clasificado
+    """
+    enlace = request.enlace.strip() if request.enlace else ""
+    if modo == ModoRespuesta.resumido:
+        return ProcesoClasificadoResumen(
+            radicacion=request.radicacion,
+            reg=request.reg,
+            enlace=enlace,
+            **clasificacion
+        )
+    return ProcesoLegalResponse(**{**request.model_dump(), "enlace": enlace}, **clasificacion)
+
+
+# -----------------------------------------------------------------------------
+# CLASIFICADOR
+# -----------------------------------------------------------------------------
+class Clasificador:
+    """
+    Clasifica textos aplicando reglas, extracto, caché y modelo, en ese orden.
+
+    Se crea una sola vez en el lifespan de main.py y se comparte entre
+    todas las peticiones.
+
+    Attributes:
+        cliente: Cliente asíncrono compartido de Ollama
+        cache: Caché de clasificaciones por contenido
+        settings: Configuración de la aplicación
+        plantilla: Versión activa del prompt (PROMPT_VERSION)
+        ultima_llamada: Instante (time.monotonic) de la última llamada a Ollama
+        modelos: Modelos que usa el clasificador (rápido de la cascada y principal)
+        vecinos: Índice de ejemplos etiquetados (None si está deshabilitado)
+        duplicados: Índice SimHash de extractos clasificados (None si está deshabilitado)
+        contador: Cuenta los tokens de cada prompt
+        contexto: Elige num_ctx por cubetas para cada modelo
+        coalescedor: Agrupa inferencias idénticas en curso
+        admision: Cola acotada y limitador de concurrencia hacia Ollama
+    """
+
+    def __init__(self, cliente: ollama.AsyncClient, cache: CacheClasificaciones, settings: Settings):
+        self.cliente = cliente
+        self.cache = cache
+        self.settings = settings
+        self.plantilla = obtener_plantilla("clasificar_dolmen", settings.prompt_version or None)
+        self.ultima_llamada = time.monotonic()
+        self.modelos = [m for m in (settings.cascada_modelo_rapido, settings.model_name) if m]
+        self.vecinos = (
+            IndiceVecinos(settings.vecinos_ruta, settings.vecinos_modelo_embeddings)
+            if settings.vecinos_modelo_embeddings else None
+        )
+        # Los resultados solo valen para la misma plantilla y los mismos modelos
+        self.duplicados = (
+            IndiceDuplicados(
+                distancia_max=settings.duplicados_distancia_max,
+                max_entradas=settings.duplicados_max_entradas,
+                contexto=f"{self.plantilla.huella}|{self._identificador_modelo()}",
+                ruta_sqlite=settings.duplicados_ruta_sqlite
+            )
+            if settings.duplicados_habilitado else None
+        )
+        self.contador = ContadorTokens(settings.tokenizador_ruta)
+        self.contexto = SelectorContexto(
+            parsear_cubetas(settings.contexto_cubetas),
+            num_predict=OPCIONES_GENERACION["num_predict"],
+            bajar_tras=settings.contexto_bajar_tras
+        )
+        self.coalescedor = CoalescedorInferencias()
+        self.admision = ControlAdmision(
+            concurrencia=settings.ollama_num_parallel,
+            max_cola=settings.cola_max_espera,
+            tiempo_servicio_inicial=settings.cola_tiempo_servicio_inicial
+        )
+
+    async def clasificar(self, texto: str, plazo: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Clasifica un texto y registra su latencia total por método.
+
+        Args:
+            texto: Texto del proceso (no vacío)
+            plazo: Segundos que el cliente puede esperar turno (None = sin plazo)
+
+        Returns:
+            Dict: Campos de clasificación (ver _clasificar)
+        """
+        inicio = time.perf_counter()
+        metodo = "ERROR"
+        try:
+            clasificacion = await self._clasificar(texto, plazo)
+            metodo = clasificacion["metodo_clasificacion"]
+            return clasificacion
+        finally:
+            metricas.LATENCIA_CLASIFICACION.labels(self.settings.model_name, metodo).observe(
+                time.perf_counter() - inicio
+            )
+
+    async def _clasificar(self, texto: str, plazo: Optional[float]) -> Dict[str, Any]:
+        """
+        Clasifica un texto.
+
+        Args:
+            texto: Texto del proceso (no vacío)
+            plazo: Segundos que el cliente puede esperar turno (None = sin plazo)
+
+        Returns:
+            Dict: Campos de clasificación (es_relevante, confianza, razon,
+                  keywords_encontrados, metodo_clasificacion y, si se usó
+                  el modelo, version_prompt, longitud_extracto,
+                  ratio_compresion y, con la limpieza habilitada,
+                  tokens_original y tokens_limpio)
+
+        Raises:
+            HTTPException: Error 413 si el documento no cabe en el contexto
+                           (CONTEXTO_EXCEDIDO=rechazar), 429 si la cola está
+                           saturada, 500 si falla el modelo o su respuesta
+        """
+        # Aplicar la REGLA PRIORITARIA localmente antes de pagar la inferencia
+        reglas = evaluar_reglas(texto)
+        if self.settings.reglas_habilitadas and reglas.decidido:
+            logger.info(
+                f"Clasificación por reglas - Relevante: {reglas.es_relevante}, "
+                f"Keywords: {reglas.keywords_encontrados}"
+            )
+            return {
+                "es_relevante": reglas.es_relevante,
+                "confianza": reglas.confianza,
+                "razon": reglas.razon,
+                "keywords_encontrados": reglas.keywords_encontrados,
+                "metodo_clasificacion": "REGLAS"
+            }
+
+        # Consultar la caché con el texto recibido: un acierto no paga la
+        # limpieza, el extracto ni el conteo de tokens
+        clave_cache = calcular_clave(
+            texto, self.plantilla.huella, self._identificador_modelo(), self._opciones_clave()
+        )
+        resultado = await self.cache.obtener(clave_cache)
+        if resultado is not None:
+            logger.info(f"Clasificación desde caché - Relevante: {resultado['es_relevante']}")
+        else:
+            # Limpiar el texto y reducir documentos largos a los pasajes alrededor de las señales
+            inicio_prompt = time.perf_counter()
+            extracto, limpio = self.preparar(texto)
+            extracto, tokens_prompt = self._ajustar_contexto(extracto)
+            preparacion = {
+                "longitud_extracto": len(extracto),
+                "ratio_compresion": round(len(texto) / len(extracto), 2) if extracto else 1.0,
+                "tokens_original": limpio.tokens_original if limpio else None,
+                "tokens_limpio": limpio.tokens if limpio else None
+            }
+            if (duplicado := self._buscar_duplicado(extracto)) is not None:
+                resultado = {**duplicado, **preparacion}
+            else:
+                mensajes = self.plantilla.mensajes(extracto)
+                metricas.CONSTRUCCION_PROMPT.labels(self.settings.model_name).observe(
+                    time.perf_counter() - inicio_prompt
+                )
+                resultado = await self.coalescedor.ejecutar(
+                    clave_cache,
+                    lambda: self._inferir_y_guardar(
+                        clave_cache, extracto, mensajes, plazo, preparacion, tokens_prompt
+                    )
+                )
+
+        clasificacion = {
+            "metodo_clasificacion": "IA",
+            **resultado,
+            "keywords_encontrados": reglas.keywords_encontrados,
+            "version_prompt": self.plantilla.identificador
+        }
+        if clasificacion["metodo_clasificacion"] == "VECINOS":
+            clasificacion["version_prompt"] = None  # No se usó el prompt
+        return clasificacion
+
+    def _opciones_clave(self) -> Dict[str, Any]:
+        """
+        Opciones que entran en la clave de caché.
+
+        La caché se consulta con el texto recibido, así que además de las
+        opciones de generación incluye todo lo que decide qué extracto
+        llega al modelo.
+        """
+        s = self.settings
+        return {
+            **OPCIONES_GENERACION,
+            "preparacion": [
+                s.limpieza_habilitada, s.limpieza_min_repeticiones,
+                s.extracto_habilitado, s.extracto_max_caracteres, s.extracto_ventana, s.extracto_cabecera,
+                s.contexto_cubetas, s.contexto_excedido, s.tokenizador_ruta
+            ]
+        }
+
+    def _ajustar_contexto(self, extracto: str) -> Tuple[str, int]:
+        """
+        Cuenta los tokens del prompt y garantiza que quepa en la cubeta mayor.
+
+        Un prompt que no cabe se recorta con un extracto más corto o se
+        rechaza (contexto_excedido), nunca se deja truncar a Ollama.
+
+        Args:
+            extracto: Extracto del documento
+
+        Returns:
+            Tuple: (extracto que cabe, tokens de su prompt)
+
+        Raises:
+            HTTPException: Error 413 si no cabe y contexto_excedido es "rechazar"
+        """
+        tokens = self.contador.contar_mensajes(self.plantilla.mensajes(extracto))
+        maximo = self.contexto.maximo
+        if tokens <= maximo:
+            return extracto, tokens
+
+        if self.settings.contexto_excedido == "rechazar":
+            metricas.CONTEXTO_EXCEDIDO.labels("rechazado").inc()
+            logger.warning(f"Documento rechazado: prompt de {tokens} tokens, máximo {maximo}")
+            raise HTTPException(
+                status_code=413,
+                detail=f"El documento necesita {tokens} tokens de prompt y el contexto máximo "
+                       f"admite {maximo} (CONTEXTO_CUBETAS)"
+            )
+
+        # Tokens de las instrucciones y la plantilla de chat (no dependen del extracto)
+        fijos = tokens - self.contador.contar(extracto)
+        reducido = extracto
+        for _ in range(MAX_AJUSTES_CONTEXTO):
+            proporcion = (maximo - fijos) / max(1, self.contador.contar(reducido))
+            reducido = extraer_fragmentos(
+                reducido,
+                max_caracteres=int(len(reducido) * proporcion * 0.95),
+                ventana=self.settings.extracto_ventana,
+                cabecera=self.settings.extracto_cabecera
+            ).texto
+            nuevos = self.contador.contar_mensajes(self.plantilla.mensajes(reducido))
+            if nuevos <= maximo:
+                break
+        else:
+            metricas.CONTEXTO_EXCEDIDO.labels("rechazado").inc()
+            raise HTTPException(
+                status_code=413,
+                detail=f"El documento no cabe en el contexto máximo ({maximo} tokens de prompt) "
+                       f"ni recortando el extracto"
+            )
+        metricas.CONTEXTO_EXCEDIDO.labels("extracto").inc()
+        logger.warning(
+            f"Prompt de {tokens} tokens no cabe en num_ctx={self.contexto.cubetas[-1]}: "
+            f"extracto recortado de {len(extracto)} a {len(reducido)} caracteres ({nuevos} tokens)"
+        )
+        return reducido, nuevos
+
+    def _buscar_duplicado(self, extracto: str) -> Optional[Dict[str, Any]]:
+        """
+        Busca un extracto casi idéntico ya clasificado por el modelo.
+
+        Args:
+            extracto: Extracto del documento
+
+        Returns:
+            Dict | None: Clasificación reutilizada (metodo DUPLICADO) o None
+        """
+        if self.duplicados is None:
+            return None
+        encontrado = self.duplicados.buscar(extracto)
+        if encontrado is None:
+            return None
+        resultado, distancia = encontrado
+        logger.info(
+            f"Clasificación por casi duplicado - Relevante: {resultado['es_relevante']}, "
+            f"distancia {distancia} bits"
+        )
+        return {**resultado, "metodo_clasificacion": "DUPLICADO"}
+
+    def cerrar(self) -> None:
+        """Cierra los índices persistentes del clasificador."""
+        if self.duplicados is not None:
+            self.duplicados.cerrar()
+
+    def preparar(self, texto: str) -> Tuple[str, Optional[TextoLimpio]]:
+        """
+        Limpia el texto y lo reduce al extracto que se envía al modelo.
+
+        Args:
+            texto: Texto completo del proceso
+
+        Returns:
+            Tuple: (extracto, resultado de la limpieza o None si está deshabilitada
+                   o dejó el texto vacío)
+        """
+        if not self.settings.limpieza_habilitada:
+            return self.extracto(texto), None
+        limpio = limpiar_texto(texto, self.settings.limpieza_min_repeticiones)
+        if not limpio.texto:
+            # Todo el texto era ruido (ej: solo números de página): se envía tal cual
+            logger.warning("La limpieza dejó el texto vacío; se usa el texto recibido")
+            return self.extracto(texto), None
+        metricas.REDUCCION_LIMPIEZA.observe(limpio.reduccion_tokens)
+        if limpio.lineas_eliminadas:
+            logger.info(
+                f"Limpieza: {limpio.tokens_original} -> {limpio.tokens} tokens estimados "
+                f"(-{limpio.reduccion_tokens:.1%}, {limpio.lineas_eliminadas} líneas eliminadas)"
+            )
+        return self.extracto(limpio.texto), limpio
+
+    def extracto(self, texto: str) -> str:
+        """
+        Reduce un documento largo a los pasajes alrededor de las señales.
+
+        Args:
+            texto: Texto completo del proceso
+
+        Returns:
+            str: Extracto (el texto sin cambios si el extracto está deshabilitado)
+        """
+        if not self.settings.extracto_habilitado:
+            return texto
+        reducido = extraer_fragmentos(
+            texto,
+            max_caracteres=self.settings.extracto_max_caracteres,
+            ventana=self.settings.extracto_ventana,
+            cabecera=self.settings.extracto_cabecera
+        )
+        if reducido.ratio_compresion > 1:
+            logger.info(
+                f"Extracto: {reducido.longitud_original} -> {reducido.longitud} caracteres "
+                f"(compresión {reducido.ratio_compresion}x)"
+            )
+        return reducido.texto
+
+    def _identificador_modelo(self) -> str:
+        """Modelos de embeddings y de la cascada, para la clave de caché."""
+        identificador = self.settings.model_name
+        rapido = self.settings.cascada_modelo_rapido
+        if rapido:
+            identificador = (
+                f"{rapido}>{identificador}"
+                f"[{self.settings.cascada_confianza_min},{self.settings.cascada_confianza_max})"
+            )
+        if self.vecinos is not None:
+            identificador = (
+                f"{self.settings.vecinos_modelo_embeddings}(k={self.settings.vecinos_k},"
+                f"{self.settings.vecinos_similitud_min},{self.settings.vecinos_acuerdo_min})>{identificador}"
+            )
+        return identificador
+
+    # -------------------------------------------------------------------------
+    # VECINOS MÁS CERCANOS
+    # -------------------------------------------------------------------------
+    async def _embedding(self, extracto: str) -> List[float]:
+        """Embedding del extracto con el modelo de embeddings configurado."""
+        modelo = self.settings.vecinos_modelo_embeddings
+        with metricas.LLAMADA_EMBEDDINGS.labels(modelo).time():
+            respuesta = await self.cliente.embeddings(
+                model=modelo,
+                prompt=extracto[:MAX_CARACTERES_EMBEDDING],
+                keep_alive=self.settings.ollama_keep_alive
+            )
+        return respuesta["embedding"]
+
+    async def _clasificar_por_vecinos(self, extracto: str) -> Optional[Dict[str, Any]]:
+        """
+        Intenta decidir por el voto de los ejemplos etiquetados más similares.
+
+        Un fallo del embedding no falla la clasificación: se genera.
+
+        Args:
+            extracto: Extracto del documento
+
+        Returns:
+            Dict | None: Clasificación (metodo VECINOS) o None si el voto no es concluyente
+        """
+        try:
+            voto = self.vecinos.votar(
+                await self._embedding(extracto),
+                k=self.settings.vecinos_k,
+                similitud_min=self.settings.vecinos_similitud_min,
+                acuerdo_min=self.settings.vecinos_acuerdo_min
+            )
+        except Exception as e:
+            metricas.VECINOS.labels("fallo").inc()
+            logger.warning(f"Clasificación por vecinos falló, se genera: {e!r}")
+            return None
+
+        if voto is None:
+            metricas.VECINOS.labels("insuficiente").inc()
+            return None
+        if not voto.decidido:
+            metricas.VECINOS.labels("indeciso").inc()
+            logger.debug(f"Vecinos indecisos (acuerdo {voto.acuerdo}), se genera")
+            return None
+
+        metricas.VECINOS.labels("decidido").inc()
+        etiqueta = "relevantes" if voto.es_relevante else "no relevantes"
+        logger.info(f"Clasificación por vecinos - Relevante: {voto.es_relevante}, acuerdo {voto.acuerdo}")
+        return {
+            "es_relevante": voto.es_relevante,
+            "confianza": voto.acuerdo,
+            "razon": (
+                f"{voto.votantes} de {self.settings.vecinos_k} documentos similares "
+                f"(similitud máx. {voto.similitud_max}) están etiquetados como {etiqueta}"
+            ),
+            "metodo_clasificacion": "VECINOS"
+        }
+
+    async def aprender(self, ejemplos: List[Tuple[str, bool]]) -> int:
+        """
+        Agrega ejemplos etiquetados al índice de vecinos, sin reiniciar.
+
+        Cada texto pasa por la misma limpieza y extracto que las clasificaciones, para
+        que los embeddings sean comparables.
+
+        Args:
+            ejemplos: Pares (texto, es_relevante)
+
+        Returns:
+            int: Ejemplos en el índice tras agregar
+
+        Raises:
+            HTTPException: Error 503 si el índice está deshabilitado,
+                           502 si Ollama no devuelve los embeddings
+        """
+        if self.vecinos is None:
+            raise HTTPException(
+                status_code=503,
+                detail="Índice de vecinos deshabilitado (VECINOS_MODELO_EMBEDDINGS vacío)"
+            )
+        limite = asyncio.Semaphore(self.settings.ollama_num_parallel)
+
+        async def embeber(texto: str) -> List[float]:
+            async with limite:
+                return await self._embedding(self.preparar(texto)[0])
+
+        try:
+            vectores = await asyncio.gather(*(embeber(texto) for texto, _ in ejemplos))
+        except Exception as e:
+            logger.error(f"No se pudieron calcular los embeddings de los ejemplos: {e!r}")
+            raise HTTPException(status_code=502, detail=f"Error al calcular embeddings: {e}")
+        try:
+            return self.vecinos.agregar(vectores, [etiqueta for _, etiqueta in ejemplos])
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    async def calentar(self) -> Dict[str, Any]:
+        """
+        Ejecuta una inferencia real sin caché ni cola de admisión.
+
+        Se usa al arrancar: además de terminar de cargar el modelo, deja
+        evaluado el prefijo del mensaje system de la plantilla activa
+        (en ambos modelos si hay cascada).
+
+        Returns:
+            Dict: Clasificación del texto de calentamiento (se descarta)
+
+        Raises:
+            HTTPException: Error 500 si Ollama no responde o la salida no es válida
+        """
+        mensajes = self.plantilla.mensajes(TEXTO_CALENTAMIENTO)
+        if self.settings.cascada_modelo_rapido:
+            await self._inferir(mensajes, modelo=self.settings.cascada_modelo_rapido)
+        return await self._inferir(mensajes)
+
+    async def _inferir_y_guardar(
+        self,
+        clave_cache: str,
+        extracto: str,
+        mensajes: List[Dict[str, str]],
+        plazo: Optional[float],
+        preparacion: Dict[str, Any],
+        tokens_prompt: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Espera turno en la cola, llama al modelo y guarda el resultado en caché.
+
+        Lo guardado incluye los datos de la preparación (longitud del
+        extracto, tokens), que un acierto de caché devuelve sin recalcularlos.
+
+        Si el índice de vecinos decide, no se genera (ni se espera turno:
+        el embedding no ocupa un slot del modelo de chat) y la decisión no
+        se guarda en caché: los ejemplos que se agreguen después deben
+        poder cambiarla sin esperar al TTL.
+
+        Se ejecuta como inferencia compartida: el resultado se guarda aunque
+        todos los clientes que lo esperaban se hayan desconectado.
+        """
+        if self.vecinos is not None:
+            resultado = await self._clasificar_por_vecinos(extracto)
+            if resultado is not None:
+                return {**resultado, **preparacion}
+        async with self.admision.turno(plazo):
+            resultado = await self._inferir_cascada(mensajes, tokens_prompt)
+        if self.duplicados is not None:
+            await self.duplicados.agregar(extracto, resultado)
+        resultado = {**resultado, **preparacion}
+        await self.cache.guardar(clave_cache, resultado)
+        return resultado
+
+    async def _inferir_cascada(
+        self,
+        mensajes: List[Dict[str, str]],
+        tokens_prompt: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Clasifica con el modelo rápido y escala al principal si hace falta.
+
+        El modelo rápido decide cuando su confianza queda fuera de la banda
+        [cascada_confianza_min, cascada_confianza_max); si cae dentro, si no
+        reporta confianza o si su salida no es válida (sin reintentos: el
+        escalado hace de reintento), decide model_name. Sin cascada
+        configurada, decide model_name.
+
+        Args:
+            mensajes: Mensajes de la plantilla activa
+            tokens_prompt: Tokens de los mensajes (None = contarlos)
+
+        Returns:
+            Dict: es_relevante, confianza, razon y, con cascada,
+                  metodo_clasificacion (IA_RAPIDO o IA_ESCALADO)
+
+        Raises:
+            HTTPException: Error 500 si el modelo principal falla
+        """
+        rapido = self.settings.cascada_modelo_rapido
+        if not rapido:
+            resultado = await self._inferir(mensajes, tokens_prompt=tokens_prompt)
+            resultado.pop("confianza_reportada")
+            return resultado
+
+        try:
+            resultado = await self._inferir(mensajes, modelo=rapido, reintentos=0, tokens_prompt=tokens_prompt)
+        except HTTPException as e:
+            motivo = "fallo"
+            logger.info(f"Cascada: {rapido} falló, se escala a {self.settings.model_name}: {e.detail}")
+        else:
+            confianza = resultado["confianza"]
+            if not resultado.pop("confianza_reportada"):
+                motivo = "sin_confianza"
+                logger.info(f"Cascada: {rapido} no reportó confianza, se escala a {self.settings.model_name}")
+            elif not (self.settings.cascada_confianza_min <= confianza < self.settings.cascada_confianza_max):
+                metricas.CASCADA.labels(rapido, "decidido").inc()
+                return {**resultado, "metodo_clasificacion": "IA_RAPIDO"}
+            else:
+                motivo = "ambigua"
+                logger.info(f"Cascada: confianza {confianza} ambigua, se escala a {self.settings.model_name}")
+
+        metricas.CASCADA.labels(rapido, f"escalado_{motivo}").inc()
+        resultado = await self._inferir(mensajes, tokens_prompt=tokens_prompt)
+        resultado.pop("confianza_reportada")
+        return {**resultado, "metodo_clasificacion": "IA_ESCALADO"}
+
+    async def _inferir(
+        self,
+        mensajes: List[Dict[str, str]],
+        modelo: Optional[str] = None,
+        reintentos: Optional[int] = None,
+        tokens_prompt: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Llama al modelo con salida estructurada y valida la clasificación.
+
+        Una salida casi válida se repara localmente; una irreparable se
+        reintenta hasta salida_max_reintentos veces (con más temperatura,
+        para no repetir la misma generación) antes de fallar.
+
+        Args:
+            mensajes: Mensajes de la plantilla activa (system + user con el texto)
+            modelo: Modelo a usar (None = model_name)
+            reintentos: Reintentos ante salida inválida (None = salida_max_reintentos)
+            tokens_prompt: Tokens de los mensajes, para elegir num_ctx (None = contarlos)
+
+        Returns:
+            Dict: es_relevante, confianza, razon y confianza_reportada
+
+        Raises:
+            HTTPException: Error 500 si la llamada falla o ninguna salida es válida
+        """
+        modelo = modelo or self.settings.model_name
+        if reintentos is None:
+            reintentos = self.settings.salida_max_reintentos
+        intentos = reintentos + 1
+        if tokens_prompt is None:
+            tokens_prompt = self.contador.contar_mensajes(mensajes)
+        opciones = {**OPCIONES_GENERACION, "num_ctx": self.contexto.elegir(modelo, tokens_prompt)}
+        try:
+            for intento in range(1, intentos + 1):
+                logger.debug(
+                    f"Enviando prompt al modelo ({self.plantilla.identificador}, "
+                    f"{len(mensajes[-1]['content'])} caracteres de usuario, ~{tokens_prompt} tokens, "
+                    f"num_ctx {opciones['num_ctx']}, intento {intento})"
+                )
+                with metricas.LLAMADA_OLLAMA.labels(modelo).time():
+                    if self.settings.generacion_corte_anticipado:
+                        response = await self._chat_con_corte(modelo, mensajes, opciones)
+                    else:
+                        response = await self.cliente.chat(
+                            model=modelo,
+                            messages=mensajes,
+                            format=ESQUEMA_CLASIFICACION,
+                            options=opciones,
+                            keep_alive=self.settings.ollama_keep_alive
+                        )
+                self.ultima_llamada = time.monotonic()
+                metricas.registrar_respuesta_ollama(modelo, response)
+
+                # Log de la respuesta cruda del modelo
+                respuesta_cruda = response['message']['content']
+                logger.info(f"Respuesta del modelo: {respuesta_cruda[:500]}")
+
+                inicio_parseo = time.perf_counter()
+                try:
+                    resultado, reparado = interpretar_salida(respuesta_cruda)
+                except SalidaInvalida as e:
+                    accion = "reintentada" if intento < intentos else "descartada"
+                    metricas.SALIDAS_INVALIDAS.labels(modelo, accion).inc()
+                    logger.warning(f"Salida inválida del modelo (intento {intento}/{intentos}): {e}")
+                    error = e
+                    opciones = {**opciones, "temperature": TEMPERATURA_REINTENTO}
+                    continue
+                finally:
+                    metricas.PARSEO_JSON.labels(modelo).observe(time.perf_counter() - inicio_parseo)
+
+                if reparado:
+                    metricas.SALIDAS_INVALIDAS.labels(modelo, "reparada").inc()
+                logger.info(
+                    f"Clasificación exitosa - Relevante: {resultado['es_relevante']}, "
+                    f"Confianza: {resultado['confianza']}"
+                )
+                return resultado
+        except Exception as e:
+            logger.error(f"Error en clasificación: {str(e)}")
+            raise HTTPException(status_code=500, detail=str(e))
+
+        raise HTTPException(
+            status_code=500,
+            detail=f"El modelo no devolvió una clasificación válida tras {intentos} intentos: {error}"
+        )
+
+    async def _chat_con_corte(
+        self,
+        modelo: str,
+        mensajes: List[Dict[str, str]],
+        opciones: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Llama a /api/chat en streaming y cancela la generación en cuanto
+        llega una clasificación completa y válida.
+
+        Cada chunk del stream es un token. Con el objeto completo se lee un
+        chunk más: si es el final del stream, el modelo ya había terminado
+        y no se corta nada; si trae más texto, se cancela. Los tokens
+        ahorrados se estiman como el presupuesto restante (num_predict
+        menos los generados) y los segundos, a la velocidad de generación
+        observada en el propio stream.
+
+        Args:
+            modelo: Modelo a usar
+            mensajes: Mensajes de la plantilla activa
+            opciones: Opciones de generación (incluye num_predict y num_ctx)
+
+        Returns:
+            Dict: Respuesta con la forma de la de /api/chat sin stream
+                  (message.content y, si el stream terminó, sus contadores;
+                  si se cortó, eval_count con los tokens generados)
+        """
+        flujo = await self.cliente.chat(
+            model=modelo,
+            messages=mensajes,
+            format=ESQUEMA_CLASIFICACION,
+            options=opciones,
+            keep_alive=self.settings.ollama_keep_alive,
+            stream=True
+        )
+        detector = DetectorObjetoCompleto()
+        objeto = None
+        generados = 0
+        primer_token = None
+        try:
+            async for chunk in flujo:
+                if chunk.get("done"):
+                    # Terminó por sí solo (sin nada tras el JSON): no hay corte
+                    return {**chunk, "message": {"role": "assistant", "content": detector.texto}}
+                generados += 1
+                if primer_token is None:
+                    primer_token = time.perf_counter()
+                if objeto is not None:
+                    break  # El modelo sigue escribiendo tras el JSON completo
+                objeto = detector.agregar(chunk.get("message", {}).get("content", ""))
+            else:
+                return {"message": {"role": "assistant", "content": detector.texto}}
+        finally:
+            # Cerrar el stream corta la conexión y Ollama deja de generar
+            await flujo.aclose()
+
+        ahorrados = max(0, opciones["num_predict"] - generados)
+        segundos_token = (time.perf_counter() - primer_token) / max(1, generados - 1)
+        metricas.CORTE_TOKENS_AHORRADOS.labels(modelo).observe(ahorrados)
+        metricas.CORTE_SEGUNDOS_AHORRADOS.labels(modelo).observe(ahorrados * segundos_token)
+        logger.info(
+            f"Generación cortada tras {generados} tokens con el JSON completo: "
+            f"~{ahorrados} tokens y ~{ahorrados * segundos_token * 1000:.0f} ms ahorrados"
+        )
+        return {"message": {"role": "assistant", "content": objeto}, "eval_count": generados}
@@ -0,0 +1,94 @@
+"""
+=============================================================================
+SERVICIO DE COALESCENCIA - coalescencia.py
+=============================================================================
+Agrupa ("single-flight") las inferencias idénticas que están en curso al
+mismo tiempo.
+
+Cuando el mismo texto llega varias veces en pocos segundos (reintentos
+del cliente, scrapers solapados), solo la primera petición llama al
+modelo; las demás esperan esa misma inferencia y reciben su resultado.
+Con OLLAMA_NUM_PARALLEL=1 esto evita ocupar el único slot de Ollama con
+trabajo repetido.
+
+Cancelación segura: la inferencia compartida corre en su propia tarea y
+cada petición la espera con asyncio.shield. Si el primer cliente se
+desconecta, la inferencia continúa y los demás reciben su respuesta.
+=============================================================================
+"""
+
+# -----------------------------------------------------------------------------
+# IMPORTACIONES
+# -----------------------------------------------------------------------------
+import asyncio  # Tareas y shield
+import logging  # Para logging estructurado
+from typing import Any, Awaitable, Callable, Dict  # Tipos para anotaciones
+
+# Logger para este módulo
+logger = logging.getLogger(__name__)
+
+
+# -----------------------------------------------------------------------------
+# COALESCEDOR DE INFERENCIAS
+# -----------------------------------------------------------------------------
+class CoalescedorInferencias:
+    """
+    Comparte una única ejecución entre las peticiones concurrentes con la misma clave.
+
+    Attributes:
+        ejecuciones: Inferencias realmente lanzadas
+        coalescidas: Peticiones que reutilizaron una inferencia en curso
+    """
+
+    def __init__(self):
+        self._en_vuelo: Dict[str, asyncio.Task] = {}
+        self.ejecuciones = 0
+        self.coalescidas = 0
+
+    async def ejecutar(self, clave: str, funcion: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Ejecuta la función o se une a la ejecución en curso con la misma clave.
+
+        Args:
+            clave: Clave de contenido (texto + prompt + modelo + opciones)
+            funcion: Función asíncrona que realiza la inferencia
+
+        Returns:
+            Any: Resultado de la ejecución compartida
+
+        Raises:
+            Exception: La misma excepción de la ejecución compartida
+        """
+        tarea = self._en_vuelo.get(clave)
+        if tarea is None:
+            tarea = asyncio.create_task(funcion())
+            self._en_vuelo[clave] = tarea
+            tarea.add_done_callback(lambda t: self._finalizar(clave, t))
+            self.ejecuciones += 1
+        else:
+            self.coalescidas += 1
+            logger.info(f"Inferencia coalescida con una en curso ({len(self._en_vuelo)} en vuelo)")
+
+        # shield: cancelar a este llamador no cancela la inferencia compartida
+        return await asyncio.shield(tarea)
+
+    def _finalizar(self, clave: str, tarea: asyncio.Task) -> None:
+        """Retira la tarea terminada y marca su excepción como consumida."""
+        if self._en_vuelo.get(clave) is tarea:
+            del self._en_vuelo[clave]
+        if not tarea.cancelled() and tarea.exception() is not None:
+            # Si todos los llamadores se fueron, nadie más leería la excepción
+            logger.debug(f"Inferencia compartida falló: {tarea.exception()}")
+
+    def estadisticas(self) -> Dict[str, int]:
+        """
+        Devuelve los contadores de coalescencia.
+
+        Returns:
+            Dict: Inferencias ejecutadas, peticiones coalescidas y en vuelo
+        """
+        return {
+            "ejecuciones": self.ejecuciones,
+            "coalescidas": self.coalescidas,
+            "en_vuelo": len(self._en_vuelo),
+        }
@@ -0,0 +1,294 @@
+"""
+=============================================================================
+SERVICIO DE COMPRESIÓN - compresion.py
+=============================================================================
+Middleware ASGI que comprime y descomprime los cuerpos HTTP, para enviar
+el texto completo de los PDF por la red (el texto jurídico se reduce
+4 veces o más).
+
+Peticiones (Content-Encoding: gzip o zstd):
+- Se descomprimen en streaming a medida que llegan los chunks, sin
+  cargar el cuerpo comprimido completo: sirve igual para /clasificar,
+  /clasificar/lote y la ingesta NDJSON
+- El cuerpo descomprimido está limitado a max_bytes_cuerpo (413), lo que
+  protege de bombas de compresión; un cuerpo corrupto responde 400 y una
+  codificación desconocida 415
+
+Respuestas (Accept-Encoding):
+- Se comprimen con zstd si el cliente lo acepta y el paquete zstandard
+  está instalado, si no con gzip; las de menos de min_bytes se envían tal
+  cual (comprimirlas cuesta más de lo que ahorran)
+- Las respuestas en streaming (NDJSON) se comprimen chunk a chunk con un
+  flush por chunk, así cada resultado sigue llegando apenas termina
+
+El nivel de cada algoritmo ajusta el equilibrio CPU / ancho de banda.
+=============================================================================
+"""
+
+# -----------------------------------------------------------------------------
+# IMPORTACIONES
+# -----------------------------------------------------------------------------
+import zlib  # gzip en streaming
+from typing import Callable, List, Optional, Tuple  # Tipos para anotaciones
+from fastapi import HTTPException  # Errores de descompresión (413 / 400)
+from starlette.datastructures import Headers, MutableHeaders  # Cabeceras ASGI
+from starlette.types import ASGIApp, Message, Receive, Scope, Send  # Tipos ASGI
+from app.services.serializacion import RespuestaJSON  # Respuesta 415
+
+try:
+    import zstandard  # zstd (opcional: sin él solo se acepta gzip)
+except ImportError:  # pragma: no cover - depende del entorno
+    zstandard = None
+
+# Bytes comprimidos que se descomprimen de una vez (acota la memoria de
+# cada paso aunque el cuerpo sea una bomba de compresión)
+TROZO_ENTRADA = 1024
+
+# Bytes descomprimidos que produce cada paso de gzip
+TROZO_SALIDA = 64 * 1024
+
+
+def codificaciones_disponibles() -> List[str]:
+    """Codificaciones soportadas, de la preferida a la menos preferida."""
+    return ["zstd", "gzip"] if zstandard is not None else ["gzip"]
+
+
+# -----------------------------------------------------------------------------
+# DESCOMPRESIÓN EN STREAMING
+# -----------------------------------------------------------------------------
+class Descompresor:
+    """
+    Descomprime un cuerpo chunk a chunk con un límite de tamaño.
+
+    Attributes:
+        codificacion: gzip o zstd
+        max_bytes: Tamaño máximo del cuerpo descomprimido
+        total: Bytes descomprimidos hasta ahora
+    """
+
+    def __init__(self, codificacion: str, max_bytes: int):
+        self.codificacion = codificacion
+        self.max_bytes = max_bytes
+        self.total = 0
+        if codificacion == "gzip":
+            self._objeto = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        else:
+            self._objeto = zstandard.ZstdDecompressor().decompressobj()
+
+    def _contar(self, datos: bytes) -> bytes:
+        self.total += len(datos)
+        if self.total > self.max_bytes:
+            raise HTTPException(
+                status_code=413,
+                detail=f"El cuerpo descomprimido supera el máximo de {self.max_bytes} bytes"
+            )
+        return datos
+
+    def descomprimir(self, chunk: bytes) -> bytes:
+        """
+        Descomprime un chunk del cuerpo.
+
+        Args:
+            chunk: Bytes comprimidos
+
+        Returns:
+            bytes: Bytes descomprimidos de este chunk
+
+        Raises:
+            HTTPException: 413 si se supera max_bytes, 400 si el cuerpo es inválido
+        """
+        salida = bytearray()
+        try:
+            for inicio in range(0, len(chunk), TROZO_ENTRADA):
+                trozo = chunk[inicio:inicio + TROZO_ENTRADA]
+                if self.codificacion == "gzip":
+                    while trozo:
+                        salida += self._contar(self._objeto.decompress(trozo, TROZO_SALIDA))
+                        trozo = self._objeto.unconsumed_tail
+                else:
+                    salida += self._contar(self._objeto.decompress(trozo))
+        except (zlib.error, getattr(zstandard, "ZstdError", zlib.error)) as e:
+            raise HTTPException(status_code=400, detail=f"Cuerpo {self.codificacion} inválido: {e}")
+        return bytes(salida)
+
+    def terminar(self) -> None:
+        """
+        Comprueba que el cuerpo comprimido llegó completo.
+
+        Un cuerpo truncado descomprime sin error hasta donde llegó: sin esta
+        comprobación se clasificaría un documento parcial.
+
+        Raises:
+            HTTPException: 400 si el flujo gzip o el frame zstd quedó incompleto
+        """
+        if not self._objeto.eof:
+            raise HTTPException(status_code=400, detail=f"Cuerpo {self.codificacion} incompleto")
+
+
+# -----------------------------------------------------------------------------
+# COMPRESIÓN DE RESPUESTAS
+# -----------------------------------------------------------------------------
+def elegir_codificacion(accept_encoding: str, disponibles: List[str]) -> Optional[str]:
+    """
+    Elige la codificación de la respuesta según Accept-Encoding.
+
+    Args:
+        accept_encoding: Cabecera del cliente (ej: "gzip, zstd;q=0.5")
+        disponibles: Codificaciones del servidor, por preferencia
+
+    Returns:
+        str | None: Codificación elegida, o None para enviar sin comprimir
+    """
+    aceptadas = {}
+    for parte in accept_encoding.lower().split(","):
+        nombre, _, parametros = parte.strip().partition(";")
+        calidad = 1.0
+        if parametros.strip().startswith("q="):
+            try:
+                calidad = float(parametros.strip()[2:])
+            except ValueError:
+                calidad = 0.0
+        aceptadas[nombre.strip()] = calidad
+    candidatas = [c for c in disponibles if aceptadas.get(c, aceptadas.get("*", 0.0)) > 0]
+    if not candidatas:
+        return None
+    # A igual calidad gana la preferencia del servidor
+    return max(candidatas, key=lambda c: aceptadas.get(c, aceptadas.get("*", 0.0)))
+
+
+def _compresor(codificacion: str, nivel: int) -> Tuple[Callable[[bytes], bytes], Callable[[], bytes]]:
+    """
+    Crea un compresor en streaming.
+
+    Returns:
+        Tuple: (comprimir un chunk con flush, terminar el flujo)
+    """
+    if codificacion == "gzip":
+        objeto = zlib.compressobj(nivel, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        return lambda datos: objeto.compress(datos) + objeto.flush(zlib.Z_SYNC_FLUSH), objeto.flush
+    objeto = zstandard.ZstdCompressor(level=nivel).compressobj()
+    return (
+        lambda datos: objeto.compress(datos) + objeto.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK),
+        objeto.flush
+    )
+
+
+# -----------------------------------------------------------------------------
+# MIDDLEWARE
+# -----------------------------------------------------------------------------
+class MiddlewareCompresion:
+    """
+    Descomprime las peticiones y comprime las respuestas (gzip y zstd).
+
+    Attributes:
+        app: Aplicación ASGI envuelta
+        max_bytes_cuerpo: Tamaño máximo de un cuerpo descomprimido
+        comprimir_respuestas: Comprimir respuestas si el cliente lo acepta
+        min_bytes: Tamaño mínimo de una respuesta para comprimirla
+        nivel_gzip: Nivel de gzip (1 = rápido ... 9 = más pequeño)
+        nivel_zstd: Nivel de zstd (1 = rápido ... 19 = más pequeño)
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        max_bytes_cuerpo: int,
+        comprimir_respuestas: bool = True,
+        min_bytes: int = 1024,
+        nivel_gzip: int = 5,
+        nivel_zstd: int = 3
+    ):
+        self.app = app
+        self.max_bytes_cuerpo = max_bytes_cuerpo
+        self.comprimir_respuestas = comprimir_respuestas
+        self.min_bytes = min_bytes
+        self.niveles = {"gzip": nivel_gzip, "zstd": nivel_zstd}
+        self.disponibles = codificaciones_disponibles()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        cabeceras = Headers(scope=scope)
+        codificacion = cabeceras.get("content-encoding", "identity").strip().lower()
+        if codificacion != "identity":
+            if codificacion not in self.disponibles:
+                respuesta = RespuestaJSON(
+                    status_code=415,
+                    content={"detail": f"Content-Encoding no soportado: {codificacion} "
+                                       f"(soportados: {', '.join(self.disponibles)})"}
+                )
+                await respuesta(scope, receive, send)
+                return
+            scope, receive = self._descomprimir(scope, receive, codificacion)
+
+        if self.comprimir_respuestas:
+            salida = elegir_codificacion(cabeceras.get("accept-encoding", ""), self.disponibles)
+            if salida is not None:
+                send = self._comprimir(send, salida)
+
+        await self.app(scope, receive, send)
+
+    def _descomprimir(self, scope: Scope, receive: Receive, codificacion: str) -> Tuple[Scope, Receive]:
+        """Quita Content-Encoding/Content-Length y descomprime cada chunk recibido."""
+        scope = dict(scope)
+        scope["headers"] = [
+            (nombre, valor) for nombre, valor in scope["headers"]
+            if nombre not in (b"content-encoding", b"content-length")
+        ]
+        descompresor = Descompresor(codificacion, self.max_bytes_cuerpo)
+
+        async def recibir() -> Message:
+            mensaje = await receive()
+            if mensaje["type"] == "http.request":
+                mensaje = dict(mensaje)
+                mensaje["body"] = descompresor.descomprimir(mensaje.get("body", b""))
+                if not mensaje.get("more_body", False):
+                    descompresor.terminar()
+            return mensaje
+
+        return scope, recibir
+
+    def _comprimir(self, send: Send, codificacion: str) -> Send:
+        """Envuelve send para comprimir el cuerpo de la respuesta."""
+        estado = {"inicio": None, "comprimir": None, "terminar": None, "sin_comprimir": False}
+
+        async def enviar(mensaje: Message) -> None:
+            if mensaje["type"] == "http.response.start":
+                estado["inicio"] = mensaje
+                return
+            if mensaje["type"] != "http.response.body" or estado["sin_comprimir"]:
+                await send(mensaje)
+                return
+
+            cuerpo = mensaje.get("body", b"")
+            mas = mensaje.get("more_body", False)
+
+            if estado["comprimir"] is None:
+                inicio = estado["inicio"]
+                cabeceras = MutableHeaders(raw=list(inicio["headers"]))
+                if "content-encoding" in cabeceras or (not mas and len(cuerpo) < self.min_bytes):
+                    estado["sin_comprimir"] = True
+                    await send(inicio)
+                    await send(mensaje)
+                    return
+                estado["comprimir"], estado["terminar"] = _compresor(codificacion, self.niveles[codificacion])
+                cabeceras["content-encoding"] = codificacion
+                cabeceras.add_vary_header("Accept-Encoding")
+                cuerpo = estado["comprimir"](cuerpo)
+                if mas:
+                    del cabeceras["content-length"]
+                else:
+                    cuerpo += estado["terminar"]()
+                    cabeceras["content-length"] = str(len(cuerpo))
+                await send({**inicio, "headers": cabeceras.raw})
+                await send({"type": "http.response.body", "body": cuerpo, "more_body": mas})
+                return
+
+            datos = estado["comprimir"](cuerpo) if cuerpo else b""
+            if not mas:
+                datos += estado["terminar"]()
+            await send({"type": "http.response.body", "body": datos, "more_body": mas})
+
+        return enviar
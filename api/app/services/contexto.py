@@ -0,0 +1,112 @@
+"""
+=============================================================================
+SERVICIO DE TAMAÑO DE CONTEXTO - contexto.py
+=============================================================================
+Elige num_ctx para cada llamada a Ollama según los tokens del prompt.
+
+Un contexto mayor que el necesario cuesta memoria (caché KV) y tiempo de
+preparación de la atención; uno menor hace que llama.cpp trunque el prompt
+en silencio. Pero cada cambio de num_ctx obliga a Ollama a recargar el
+modelo, así que:
+
+- num_ctx sale de un conjunto pequeño y fijo de cubetas (ej: 2048, 4096,
+  8192): la menor en la que caben el prompt y num_predict
+- Se mantiene la cubeta en uso mientras el prompt quepa; solo se sube
+  cuando no cabe y solo se baja tras bajar_tras peticiones seguidas que
+  caben en una menor, para que una mezcla de documentos cortos y largos no
+  recargue el modelo en cada petición
+- Un prompt que no cabe en la cubeta mayor no se envía tal cual (lo
+  decide el clasificador: extracto más corto o rechazo)
+
+Cada modelo (principal y rápido de la cascada) tiene su propia cubeta.
+=============================================================================
+"""
+
+# -----------------------------------------------------------------------------
+# IMPORTACIONES
+# -----------------------------------------------------------------------------
+import logging  # Cambios de cubeta
+from typing import Dict, List, Optional  # Tipos para anotaciones
+from app.services import metricas  # Uso de cubetas y cambios
+
+# Logger para este módulo
+logger = logging.getLogger(__name__)
+
+
+def parsear_cubetas(cubetas: str) -> List[int]:
+    """
+    Convierte "2048,4096,8192" en una lista ordenada de tamaños.
+
+    Raises:
+        ValueError: Si la lista está vacía o algún tamaño no es positivo
+    """
+    tamanos = sorted({int(c) for c in cubetas.split(",") if c.strip()})
+    if not tamanos or tamanos[0] <= 0:
+        raise ValueError(f"CONTEXTO_CUBETAS inválido: {cubetas!r}")
+    return tamanos
+
+
+class SelectorContexto:
+    """
+    Elige la cubeta de num_ctx de cada llamada, con histéresis por modelo.
+
+    Attributes:
+        cubetas: Tamaños de contexto permitidos, de menor a mayor
+        num_predict: Tokens de generación que también deben caber
+        bajar_tras: Peticiones seguidas que caben en una cubeta menor antes de bajar
+        actual: Cubeta en uso por modelo
+    """
+
+    def __init__(self, cubetas: List[int], num_predict: int, bajar_tras: int = 20):
+        self.cubetas = cubetas
+        self.num_predict = num_predict
+        self.bajar_tras = bajar_tras
+        self.actual: Dict[str, int] = {}
+        self._menores: Dict[str, int] = {}  # Peticiones seguidas que cabían en una cubeta menor
+
+    @property
+    def maximo(self) -> int:
+        """Tokens de prompt que caben en la cubeta mayor."""
+        return self.cubetas[-1] - self.num_predict
+
+    def minima(self, tokens_prompt: int) -> Optional[int]:
+        """Menor cubeta en la que caben el prompt y num_predict (None si ninguna)."""
+        necesarios = tokens_prompt + self.num_predict
+        return next((c for c in self.cubetas if c >= necesarios), None)
+
+    def en_uso(self, modelo: str) -> int:
+        """Cubeta con la que está cargado el modelo (la menor si aún no se usó)."""
+        return self.actual.get(modelo, self.cubetas[0])
+
+    def elegir(self, modelo: str, tokens_prompt: int) -> int:
+        """
+        Elige num_ctx para una llamada y registra el uso.
+
+        Args:
+            modelo: Modelo que atiende la llamada
+            tokens_prompt: Tokens del prompt (deben caber en la cubeta mayor)
+
+        Returns:
+            int: num_ctx a enviar a Ollama
+
+        Raises:
+            ValueError: Si el prompt no cabe en la cubeta mayor
+        """
+        necesaria = self.minima(tokens_prompt)
+        if necesaria is None:
+            raise ValueError(f"El prompt ({tokens_prompt} tokens) no cabe en num_ctx={self.cubetas[-1]}")
+        actual = self.actual.get(modelo)
+        elegida = necesaria
+        if actual is not None and actual >= necesaria:
+            # Cabe en la cubeta cargada: solo se baja tras bajar_tras peticiones seguidas
+            self._menores[modelo] = self._menores.get(modelo, 0) + 1 if necesaria < actual else 0
+            if self._menores[modelo] < self.bajar_tras:
+                elegida = actual
+        if elegida != actual:
+            self._menores[modelo] = 0
+            if actual is not None:
+                metricas.CONTEXTO_CAMBIOS.labels(modelo).inc()
+                logger.info(f"num_ctx de {modelo}: {actual} -> {elegida} (Ollama recarga el modelo)")
+            self.actual[modelo] = elegida
+        metricas.CONTEXTO_CUBETA.labels(modelo, str(elegida)).inc()
+        return elegida
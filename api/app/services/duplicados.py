@@ -0,0 +1,284 @@
+"""
+=============================================================================
+SERVICIO DE CASI DUPLICADOS - duplicados.py
+=============================================================================
+Reutiliza la clasificación de un documento casi idéntico a otro ya
+clasificado (autos y notificaciones repetidos entre radicaciones que solo
+cambian en números, fechas o nombres), que la caché exacta no detecta.
+
+1. Huella SimHash de 64 bits sobre shingles de 3 palabras del texto
+   normalizado (minúsculas, sin tildes, números reemplazados por #):
+   textos casi iguales producen huellas a pocos bits de distancia
+2. Búsqueda LSH por bandas: la huella se parte en distancia_max + 1
+   bandas; por el principio del palomar, dos huellas a distancia
+   <= distancia_max coinciden exactamente en al menos una banda. Cada
+   banda es un diccionario valor -> huellas, así que una consulta solo
+   compara la distancia de Hamming con unos pocos candidatos (tiempo
+   casi constante, también con un millón de documentos)
+3. Memoria acotada: a partir de max_entradas se expulsa la huella más
+   antigua (FIFO)
+4. Persistencia opcional en SQLite (modo WAL): al arrancar se recargan
+   las huellas más recientes del mismo contexto (plantilla y modelos); la
+   escritura de cada huella corre en un hilo para no bloquear el event loop
+
+Solo se guardan resultados del modelo: las reglas ya son instantáneas,
+los vecinos no usaron el prompt y un duplicado no se vuelve a registrar.
+=============================================================================
+"""
+
+# -----------------------------------------------------------------------------
+# IMPORTACIONES
+# -----------------------------------------------------------------------------
+import asyncio  # E/S de SQLite fuera del event loop
+import hashlib  # Hash de 64 bits de cada shingle
+import logging  # Para logging estructurado
+import re  # Tokenización y normalización
+import sqlite3  # Nivel persistente opcional
+import threading  # Para proteger el índice y la conexión SQLite (usada desde hilos)
+import time  # Marca de tiempo de cada entrada
+import unicodedata  # Eliminación de tildes
+from collections import OrderedDict  # Orden de inserción para la expulsión
+from pathlib import Path  # Para crear el directorio de la base de datos
+from typing import Any, Dict, List, Optional, Tuple  # Tipos para anotaciones
+
+import numpy as np  # Suma vectorizada de los bits de la huella
+
+# Logger para este módulo
+logger = logging.getLogger(__name__)
+
+# Palabras por shingle
+TAMANO_SHINGLE = 3
+
+# Textos con menos shingles no se indexan (pocas palabras: huella inestable)
+MIN_SHINGLES = 8
+
+BITS = 64
+_POSICIONES = np.arange(BITS, dtype=np.uint64)
+
+
+# -----------------------------------------------------------------------------
+# HUELLA SIMHASH
+# -----------------------------------------------------------------------------
+def _palabras(texto: str) -> List[str]:
+    """Minúsculas, sin tildes y con los números reemplazados por '#'."""
+    texto = unicodedata.normalize("NFKD", texto.lower()).encode("ascii", "ignore").decode()
+    return re.findall(r"[a-z]+|#", re.sub(r"\d+", "#", texto))
+
+
+def huella_simhash(texto: str) -> Optional[int]:
+    """
+    Calcula la huella SimHash de 64 bits de un texto.
+
+    Args:
+        texto: Texto del documento
+
+    Returns:
+        int | None: Huella, o None si el texto es demasiado corto
+    """
+    palabras = _palabras(texto)
+    shingles = {
+        " ".join(palabras[i:i + TAMANO_SHINGLE])
+        for i in range(len(palabras) - TAMANO_SHINGLE + 1)
+    }
+    if len(shingles) < MIN_SHINGLES:
+        return None
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "little") for s in shingles),
+        dtype=np.uint64,
+        count=len(shingles)
+    )
+    # Cada shingle vota +1/-1 por bit; el bit de la huella es el signo de la suma
+    unos = ((hashes[:, None] >> _POSICIONES) & np.uint64(1)).sum(axis=0)
+    bits = (2 * unos > len(hashes)).astype(np.uint64)
+    return int((bits << _POSICIONES).sum())
+
+
+def _con_signo(huella: int) -> int:
+    """Huella de 64 bits sin signo -> entero con signo (INTEGER de SQLite)."""
+    return huella - (1 << BITS) if huella >= 1 << (BITS - 1) else huella
+
+
+# -----------------------------------------------------------------------------
+# ÍNDICE DE CASI DUPLICADOS
+# -----------------------------------------------------------------------------
+class IndiceDuplicados:
+    """
+    Huellas SimHash de documentos clasificados con búsqueda LSH por bandas.
+
+    Attributes:
+        distancia_max: Bits distintos tolerados para considerar duplicado
+        max_entradas: Huellas en memoria antes de expulsar la más antigua
+        contexto: Plantilla y modelos con los que se obtuvieron los resultados
+        ruta_sqlite: Archivo SQLite, o None para solo memoria
+    """
+
+    def __init__(
+        self,
+        distancia_max: int,
+        max_entradas: int,
+        contexto: str = "",
+        ruta_sqlite: Optional[str] = None
+    ):
+        self.distancia_max = distancia_max
+        self.max_entradas = max_entradas
+        self.contexto = contexto
+        self.ruta_sqlite = ruta_sqlite or None
+        self._entradas: "OrderedDict[int, Tuple[bool, float, str]]" = OrderedDict()
+        self._lock = threading.Lock()  # Índice en memoria
+        self._lock_disco = threading.Lock()  # Conexión SQLite: nunca se retiene con el índice
+        self._conexion: Optional[sqlite3.Connection] = None
+        self.aciertos = 0
+        self.fallos = 0
+
+        # Bandas de ancho casi igual que cubren los 64 bits
+        num_bandas = distancia_max + 1
+        limites = [round(i * BITS / num_bandas) for i in range(num_bandas + 1)]
+        self._bandas = [(inicio, (1 << (fin - inicio)) - 1) for inicio, fin in zip(limites, limites[1:])]
+        self._tablas: List[Dict[int, List[int]]] = [{} for _ in self._bandas]
+
+        if self.ruta_sqlite:
+            self._abrir_sqlite()
+
+    def _abrir_sqlite(self) -> None:
+        """Abre (o crea) la base de datos y recarga las huellas más recientes."""
+        Path(self.ruta_sqlite).parent.mkdir(parents=True, exist_ok=True)
+        self._conexion = sqlite3.connect(self.ruta_sqlite, check_same_thread=False)
+        self._conexion.execute("PRAGMA journal_mode=WAL")
+        self._conexion.execute("PRAGMA synchronous=NORMAL")
+        self._conexion.execute(
+            "CREATE TABLE IF NOT EXISTS huellas ("
+            "contexto TEXT NOT NULL, huella INTEGER NOT NULL, es_relevante INTEGER NOT NULL, "
+            "confianza REAL NOT NULL, razon TEXT NOT NULL, creado REAL NOT NULL, "
+            "PRIMARY KEY (contexto, huella))"
+        )
+        self._conexion.execute("CREATE INDEX IF NOT EXISTS huellas_creado ON huellas (contexto, creado)")
+        # El disco también queda acotado a las max_entradas más recientes
+        self._conexion.execute(
+            "DELETE FROM huellas WHERE contexto = ? AND creado < ("
+            "SELECT creado FROM huellas WHERE contexto = ? ORDER BY creado DESC LIMIT 1 OFFSET ?)",
+            (self.contexto, self.contexto, self.max_entradas - 1)
+        )
+        self._conexion.commit()
+        filas = self._conexion.execute(
+            "SELECT huella, es_relevante, confianza, razon FROM huellas WHERE contexto = ? ORDER BY creado",
+            (self.contexto,)
+        )
+        for huella, es_relevante, confianza, razon in filas:
+            self._insertar(huella % (1 << BITS), (bool(es_relevante), confianza, razon))
+        logger.info(f"Índice de casi duplicados abierto en {self.ruta_sqlite} ({len(self._entradas)} huellas)")
+
+    def _claves_bandas(self, huella: int) -> List[int]:
+        """Valor de la huella en cada banda."""
+        return [(huella >> inicio) & mascara for inicio, mascara in self._bandas]
+
+    def _insertar(self, huella: int, valor: Tuple[bool, float, str]) -> None:
+        """Inserta en memoria y expulsa la huella más antigua si se supera el límite."""
+        if huella in self._entradas:
+            self._entradas[huella] = valor
+            return
+        self._entradas[huella] = valor
+        for tabla, clave in zip(self._tablas, self._claves_bandas(huella)):
+            tabla.setdefault(clave, []).append(huella)
+        while len(self._entradas) > self.max_entradas:
+            antigua, _ = self._entradas.popitem(last=False)
+            for tabla, clave in zip(self._tablas, self._claves_bandas(antigua)):
+                cubeta = tabla[clave]
+                cubeta.remove(antigua)
+                if not cubeta:
+                    del tabla[clave]
+
+    def buscar_huella(self, huella: int) -> Optional[Tuple[Dict[str, Any], int]]:
+        """
+        Busca la huella indexada más cercana dentro de distancia_max.
+
+        Args:
+            huella: Huella SimHash del documento
+
+        Returns:
+            Tuple[Dict, int] | None: Clasificación guardada y distancia en bits
+        """
+        mejor: Optional[Tuple[int, int]] = None
+        with self._lock:
+            for tabla, clave in zip(self._tablas, self._claves_bandas(huella)):
+                for candidata in tabla.get(clave, ()):
+                    distancia = (candidata ^ huella).bit_count()
+                    if distancia <= self.distancia_max and (mejor is None or distancia < mejor[1]):
+                        mejor = (candidata, distancia)
+            if mejor is None:
+                self.fallos += 1
+                return None
+            self.aciertos += 1
+            es_relevante, confianza, razon = self._entradas[mejor[0]]
+        return {"es_relevante": es_relevante, "confianza": confianza, "razon": razon}, mejor[1]
+
+    def buscar(self, texto: str) -> Optional[Tuple[Dict[str, Any], int]]:
+        """
+        Busca un documento clasificado casi idéntico al texto.
+
+        Args:
+            texto: Texto (o extracto) del documento
+
+        Returns:
+            Tuple[Dict, int] | None: Clasificación y distancia en bits, o None
+        """
+        huella = huella_simhash(texto)
+        return self.buscar_huella(huella) if huella is not None else None
+
+    async def agregar(self, texto: str, resultado: Dict[str, Any]) -> None:
+        """
+        Registra la clasificación de un documento.
+
+        Args:
+            texto: Texto (o extracto) clasificado
+            resultado: es_relevante, confianza y razon
+        """
+        huella = huella_simhash(texto)
+        if huella is not None:
+            await self.agregar_huella(huella, resultado)
+
+    async def agregar_huella(self, huella: int, resultado: Dict[str, Any]) -> None:
+        """
+        Registra una clasificación por su huella (en memoria y, si aplica, en disco).
+
+        La escritura en SQLite (y su commit) corre en un hilo.
+
+        Args:
+            huella: Huella SimHash del documento
+            resultado: es_relevante, confianza y razon
+        """
+        valor = (bool(resultado["es_relevante"]), float(resultado["confianza"]), str(resultado["razon"]))
+        with self._lock:
+            self._insertar(huella, valor)
+        if self._conexion is not None:
+            await asyncio.to_thread(self._guardar_disco, huella, valor, time.time())
+
+    def _guardar_disco(self, huella: int, valor: Tuple[bool, float, str], creado: float) -> None:
+        """Escribe una huella en SQLite (se llama desde un hilo)."""
+        with self._lock_disco:
+            if self._conexion is None:
+                return
+            self._conexion.execute(
+                "INSERT OR REPLACE INTO huellas (contexto, huella, es_relevante, confianza, razon, creado) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (self.contexto, _con_signo(huella), int(valor[0]), valor[1], valor[2], creado)
+            )
+            self._conexion.commit()
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """
+        Devuelve los contadores de uso del índice.
+
+        Returns:
+            Dict: Aciertos, fallos y huellas en memoria
+        """
+        return {"aciertos": self.aciertos, "fallos": self.fallos, "entradas": len(self._entradas)}
+
+    def cerrar(self) -> None:
+        """Cierra la conexión SQLite (si existe)."""
+        with self._lock_disco:
+            if self._conexion is not None:
+                self._conexion.close()
+                self._conexion = None
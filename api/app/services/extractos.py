@@ -0,0 +1,140 @@
+"""
+=============================================================================
+SERVICIO DE EXTRACTOS - extractos.py
+=============================================================================
+Reduce los documentos largos a los pasajes que importan para clasificar,
+antes de construir el prompt.
+
+Un fallo de 100 páginas no cabe en el contexto del modelo (Ollama lo
+truncaría en silencio) y la evaluación del prompt domina la latencia. El
+extracto conserva:
+- La cabecera del documento (partes, tipo de proceso, radicación)
+- Ventanas de texto alrededor de las señales de relevancia (alumbrado,
+  DOLMEN, iluminación, contrato, tarifa...)
+
+todo dentro de un presupuesto configurable de caracteres. Si hay más
+ventanas de las que caben, se priorizan las de señales más fuertes.
+=============================================================================
+"""
+
+# -----------------------------------------------------------------------------
+# IMPORTACIONES
+# -----------------------------------------------------------------------------
+import re  # Para localizar las señales de relevancia
+from dataclasses import dataclass  # Para el resultado del extracto
+from typing import List, Tuple  # Tipos para anotaciones
+
+
+# -----------------------------------------------------------------------------
+# SEÑALES DE RELEVANCIA
+# -----------------------------------------------------------------------------
+# Patrón (tolerante a tildes, sin distinguir mayúsculas) -> peso de la señal
+SENALES = {
+    r"alumbrado": 3,
+    r"dolmen": 3,
+    r"iluminaci[oó]n": 2,
+    r"luminaria": 2,
+    r"contrat[oa]": 1,
+    r"tarifa": 1,
+    r"facturaci[oó]n": 1,
+    r"impuesto": 1,
+}
+
+_PATRON_SENALES = re.compile(
+    "|".join(f"(?P<s{i}>{patron})" for i, patron in enumerate(SENALES)),
+    re.IGNORECASE
+)
+_PESOS = [peso for peso in SENALES.values()]
+
+SEPARADOR = "\n[...]\n"  # Marca los saltos entre pasajes para el modelo
+
+
+# -----------------------------------------------------------------------------
+# RESULTADO DEL EXTRACTO
+# -----------------------------------------------------------------------------
+@dataclass
+class Extracto:
+    """
+    Texto reducido que se envía al modelo.
+
+    Attributes:
+        texto: Extracto (o el texto original si ya cabía en el presupuesto)
+        longitud_original: Caracteres del texto original
+    """
+    texto: str
+    longitud_original: int
+
+    @property
+    def longitud(self) -> int:
+        """Caracteres del extracto."""
+        return len(self.texto)
+
+    @property
+    def ratio_compresion(self) -> float:
+        """Veces que el extracto es más corto que el original (1.0 = sin recorte)."""
+        return round(self.longitud_original / self.longitud, 2) if self.longitud else 1.0
+
+
+# -----------------------------------------------------------------------------
+# FUNCIONES PÚBLICAS
+# -----------------------------------------------------------------------------
+def extraer_fragmentos(texto: str, max_caracteres: int, ventana: int, cabecera: int) -> Extracto:
+    """
+    Selecciona la cabecera y los pasajes alrededor de las señales de relevancia.
+
+    Args:
+        texto: Texto completo del proceso
+        max_caracteres: Presupuesto total del extracto
+        ventana: Caracteres a cada lado de cada señal
+        cabecera: Caracteres iniciales del documento que siempre se conservan
+
+    Returns:
+        Extracto: Texto reducido y métricas de compresión
+    """
+    if len(texto) <= max_caracteres:
+        return Extracto(texto=texto, longitud_original=len(texto))
+
+    cabecera = min(cabecera, max_caracteres)
+    intervalos = _ventanas_con_peso(texto, ventana, desde=cabecera)
+
+    # Elegir primero las ventanas de mayor peso hasta agotar el presupuesto
+    disponible = max_caracteres - cabecera
+    elegidos: List[Tuple[int, int]] = []
+    for inicio, fin, _peso in sorted(intervalos, key=lambda v: v[2], reverse=True):
+        costo = fin - inicio + len(SEPARADOR)
+        if costo > disponible:
+            continue
+        elegidos.append((inicio, fin))
+        disponible -= costo
+
+    partes = [texto[:cabecera]] + [texto[inicio:fin] for inicio, fin in sorted(elegidos)]
+    return Extracto(texto=SEPARADOR.join(partes), longitud_original=len(texto))
+
+
+def _ventanas_con_peso(texto: str, ventana: int, desde: int) -> List[Tuple[int, int, int]]:
+    """
+    Construye ventanas alrededor de cada señal y fusiona las que se solapan
+    (hasta un máximo de 4 ventanas por pasaje).
+
+    Args:
+        texto: Texto completo
+        ventana: Caracteres a cada lado de cada señal
+        desde: Posición a partir de la cual buscar (después de la cabecera)
+
+    Returns:
+        List[Tuple[int, int, int]]: (inicio, fin, peso acumulado) en orden del documento
+    """
+    intervalos: List[Tuple[int, int, int]] = []
+    for coincidencia in _PATRON_SENALES.finditer(texto, desde):
+        peso = _PESOS[int(coincidencia.lastgroup[1:])]
+        inicio = max(desde, coincidencia.start() - ventana)
+        fin = min(len(texto), coincidencia.end() + ventana)
+        if intervalos and inicio <= intervalos[-1][1]:
+            anterior = intervalos[-1]
+            # Fusionar solapadas, sin crear pasajes tan largos que no quepan
+            if max(anterior[1], fin) - anterior[0] <= 4 * ventana:
+                intervalos[-1] = (anterior[0], max(anterior[1], fin), anterior[2] + peso)
+                continue
+            inicio = anterior[1]
+        intervalos.append((inicio, fin, peso))
+    return intervalos
@@ -0,0 +1,180 @@
+"""
+=============================================================================
+SERVICIO DE LIMPIEZA DE TEXTO - limpieza.py
+=============================================================================
+Normaliza el texto extraído de los PDF antes del extracto y del prompt:
+cada encabezado repetido, número de página o racha de espacios es un token
+que Qwen tiene que evaluar sin que aporte a la clasificación.
+
+1. Caracteres de control, guiones blandos y caracteres de reemplazo fuera
+2. Palabras partidas con guion al final de línea se vuelven a unir
+   ("contra-\\ntación" -> "contratación")
+3. Líneas que se repiten en varias páginas (encabezados y pies, iguales
+   salvo por números): se conserva solo la primera aparición
+4. Ruido sin texto: números de página, líneas sin letras, rellenos de
+   puntos o guiones y bloques de firma electrónica / verificación
+5. Espacios: rachas de espacios a uno, líneas partidas a mitad de frase
+   se unen y las líneas en blanco consecutivas se reducen a una
+
+Las palabras del cuerpo no se tocan: las reglas y las señales del extracto
+ven el mismo vocabulario que antes de limpiar.
+=============================================================================
+"""
+
+# -----------------------------------------------------------------------------
+# IMPORTACIONES
+# -----------------------------------------------------------------------------
+import re  # Patrones de ruido y normalización
+from collections import Counter  # Frecuencia de cada línea
+from dataclasses import dataclass  # Resultado de la limpieza
+from app.services.tokens import estimar_tokens  # Reducción de tokens
+
+# Líneas más largas que esto no se consideran encabezados o pies de página
+MAX_CARACTERES_ENCABEZADO = 150
+
+# Con saltos de página (\f), solo las primeras y últimas líneas de cada
+# página pueden ser encabezados o pies
+LINEAS_BORDE = 3
+
+# Caracteres de control (salvo salto de línea, tabulador y salto de página),
+# guion blando, caracteres de ancho cero y de reemplazo
+_CONTROL = re.compile(r"[\x00-\x08\x0b\x0e-\x1f\x7f\u00ad\u200b-\u200d\ufeff\ufffd]")
+_RETORNOS = re.compile(r"\r\n?")
+_GUION_FINAL = re.compile(r"-[ \t]*\n[ \t]*(?=[a-záéíóúñü])")
+# Un espacio simple ya está normalizado: solo rachas y espacios raros
+_ESPACIOS = re.compile(r"[ \t\u00a0\u2000-\u200a\u3000]{2,}|[\t\u00a0\u2000-\u200a\u3000]")
+_RELLENO = re.compile(r"[._\-=*~·•]{4,}")
+_DIGITOS = re.compile(r"\d+")
+_LETRA = re.compile(r"[^\W\d_]")
+_PAGINA = re.compile(
+    r"(p[áa]g(ina)?\.?|hoja|folio)?\s*-?\s*\d+\s*-?\s*((de|/)\s*\d+)?",
+    re.IGNORECASE
+)
+_FIRMA = re.compile(
+    r"firmado\s+(digital|electr[óo]nica)mente|documento\s+firmado|firma\s+(digital|electr[óo]nica)"
+    r"|c[óo]digo\s+de\s+verificaci[óo]n|validez\s+jur[íi]dica|valide\s+(este|la\s+autenticidad)"
+    r"|https?://\S*(firma|valid|verific)"
+)
+_INDICIOS_FIRMA = ("firm", "verific", "valid")  # Filtro barato antes de _FIRMA
+_SALTO_INTERIOR = re.compile(r"\n(?=[a-záéíóúñü(])")
+_LINEAS_BLANCAS = re.compile(r"\n{3,}")
+
+
+# -----------------------------------------------------------------------------
+# RESULTADO DE LA LIMPIEZA
+# -----------------------------------------------------------------------------
+@dataclass
+class TextoLimpio:
+    """
+    Texto normalizado y tokens ahorrados.
+
+    Attributes:
+        texto: Texto limpio
+        tokens_original: Tokens estimados del texto recibido
+        tokens: Tokens estimados del texto limpio
+        lineas_eliminadas: Encabezados repetidos, números de página y ruido quitados
+    """
+    texto: str
+    tokens_original: int
+    tokens: int
+    lineas_eliminadas: int
+
+    @property
+    def reduccion_tokens(self) -> float:
+        """Fracción de tokens eliminada (0 = sin cambios)."""
+        return round(1 - self.tokens / self.tokens_original, 4) if self.tokens_original else 0.0
+
+
+# -----------------------------------------------------------------------------
+# FUNCIONES PÚBLICAS
+# -----------------------------------------------------------------------------
+def limpiar_texto(texto: str, min_repeticiones: int = 3) -> TextoLimpio:
+    """
+    Quita del texto de un PDF lo que cuesta tokens sin aportar contenido.
+
+    Args:
+        texto: Texto extraído del PDF (las páginas separadas por \\f, si las hay)
+        min_repeticiones: Apariciones a partir de las cuales una línea corta
+                          se trata como encabezado o pie de página
+
+    Returns:
+        TextoLimpio: Texto limpio y reducción de tokens
+    """
+    original = texto
+    texto = _CONTROL.sub("", _RETORNOS.sub("\n", texto))
+    texto = _GUION_FINAL.sub(lambda m: "" if _antes_es_letra(texto, m.start()) else m.group(0), texto)
+    texto = _ESPACIOS.sub(" ", _RELLENO.sub(" ", texto)).replace("\f", "\n\f\n")
+
+    # Las sustituciones van sobre todo el texto de una vez (no línea a
+    # línea): un documento de 100 páginas tiene miles de líneas
+    lineas = [linea.strip(" ") for linea in texto.split("\n")]
+    claves = [
+        clave.strip(" ") if len(clave) <= MAX_CARACTERES_ENCABEZADO else ""
+        for clave in _DIGITOS.sub("#", texto.lower()).split("\n")
+    ]
+    bordes = _lineas_de_borde(lineas) if "\f" in texto else None
+    repeticiones = Counter(
+        clave for i, clave in enumerate(claves) if clave and (bordes is None or i in bordes)
+    )
+
+    conservadas = []
+    vistas = set()
+    eliminadas = 0
+    for i, (linea, clave) in enumerate(zip(lineas, claves)):
+        if not linea or linea == "\f":
+            conservadas.append("")
+            continue
+        encabezado = repeticiones[clave] >= min_repeticiones and (bordes is None or i in bordes)
+        if _es_ruido(linea, clave) or (encabezado and clave in vistas):
+            eliminadas += 1
+            continue
+        if encabezado:
+            vistas.add(clave)
+        conservadas.append(linea)
+
+    limpio = "\n".join(conservadas)
+    limpio = _SALTO_INTERIOR.sub(lambda m: m.group(0) if _fin_de_frase(limpio, m.start()) else " ", limpio)
+    limpio = _LINEAS_BLANCAS.sub("\n\n", limpio).strip()
+    return TextoLimpio(
+        texto=limpio,
+        tokens_original=estimar_tokens(original),
+        tokens=estimar_tokens(limpio),
+        lineas_eliminadas=eliminadas
+    )
+
+
+def _antes_es_letra(texto: str, posicion: int) -> bool:
+    """True si el carácter anterior a la posición es una letra (palabra partida)."""
+    return posicion > 0 and texto[posicion - 1].isalpha()
+
+
+def _fin_de_frase(texto: str, posicion: int) -> bool:
+    """True si el salto de línea sigue a un fin de frase o a otra línea (se conserva)."""
+    return posicion == 0 or texto[posicion - 1] in "\n.:;!?"
+
+
+def _lineas_de_borde(lineas: list) -> set:
+    """Índices de las primeras y últimas LINEAS_BORDE líneas no vacías de cada página."""
+    bordes = set()
+    pagina = []
+    for i, linea in enumerate(lineas + ["\f"]):
+        if linea == "\f":
+            bordes.update(pagina[:LINEAS_BORDE] + pagina[-LINEAS_BORDE:])
+            pagina = []
+        elif linea:
+            pagina.append(i)
+    return bordes
+
+
+def _es_ruido(linea: str, clave: str) -> bool:
+    """Número de página, línea corta sin letras o bloque de firma/verificación."""
+    if len(linea) <= 30 and _PAGINA.fullmatch(linea):
+        return True
+    if not _LETRA.search(linea) and (len(linea) <= 12 or not any(c.isdigit() for c in linea)):
+        return True
+    baja = clave or linea.lower()
+    return (
+        len(linea) <= 300
+        and any(indicio in baja for indicio in _INDICIOS_FIRMA)
+        and _FIRMA.search(baja) is not None
+    )
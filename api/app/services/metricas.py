@@ -0,0 +1,260 @@
+"""
+=============================================================================
+SERVICIO DE MÉTRICAS - metricas.py
+=============================================================================
+Métricas Prometheus de la API, expuestas en GET /metrics.
+
+Latencia por etapa (histogramas):
+- Total de la clasificación (por modelo y método de clasificación)
+- Espera en la cola de admisión
+- Construcción del prompt (extracto + plantilla)
+- Llamada a Ollama
+- Parseo del JSON devuelto por el modelo
+
+Limpieza del texto: fracción de tokens eliminada por documento.
+
+Tamaño de contexto: llamadas por cubeta de num_ctx, cambios de cubeta
+(recargas del modelo) y documentos que no cabían en la cubeta mayor.
+
+Corte anticipado del stream: tokens y segundos de generación ahorrados por
+petición al cancelar en cuanto el JSON está completo.
+
+Salidas inválidas del modelo (reparadas localmente, reintentadas o
+descartadas tras agotar los reintentos).
+
+Cascada de modelos: decisiones del modelo rápido y escalados al modelo
+principal (por banda ambigua o fallo); la latencia de cada nivel está en
+el histograma total con metodo IA_RAPIDO / IA_ESCALADO.
+
+Vecinos más cercanos: consultas al índice de embeddings (decididas sin
+generar, indecisas, con índice insuficiente o fallidas) y latencia de
+la llamada de embeddings.
+
+Contadores de Ollama (lo que devuelve cada respuesta de /api/chat):
+- prompt_eval_count / eval_count -> tokens evaluados y generados
+- prompt_eval_duration / eval_duration / load_duration -> segundos
+  (tokens/s = rate(tokens) / rate(segundos); cargas en frío)
+
+El estado de caché, casi duplicados, coalescencia y cola se lee bajo demanda en cada
+scrape (ColectorEstado), sin coste en el camino de cada petición.
+=============================================================================
+"""
+
+# -----------------------------------------------------------------------------
+# IMPORTACIONES
+# -----------------------------------------------------------------------------
+from typing import Any, Iterator, Mapping  # Tipos para anotaciones
+from prometheus_client import Counter, Histogram  # Tipos de métricas
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily  # Métricas bajo demanda
+from prometheus_client.registry import Collector  # Base de colectores propios
+
+# Cubetas en segundos: desde microsegundos (reglas, caché) hasta minutos (documentos largos)
+CUBETAS_LATENCIA = (
+    0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 20.0, 40.0, 80.0, 160.0, 320.0
+)
+
+# Una respuesta con load_duration mayor que esto se cuenta como carga en frío
+UMBRAL_CARGA_EN_FRIO = 1.0
+
+
+# -----------------------------------------------------------------------------
+# LATENCIA POR ETAPA
+# -----------------------------------------------------------------------------
+LATENCIA_CLASIFICACION = Histogram(
+    "qwen_api_clasificacion_segundos",
+    "Latencia total de una clasificación",
+    ["modelo", "metodo"],
+    buckets=CUBETAS_LATENCIA
+)
+ESPERA_COLA = Histogram(
+    "qwen_api_espera_cola_segundos",
+    "Tiempo de espera en la cola de admisión antes de llamar a Ollama",
+    buckets=CUBETAS_LATENCIA
+)
+CONSTRUCCION_PROMPT = Histogram(
+    "qwen_api_construccion_prompt_segundos",
+    "Tiempo de construcción del prompt (extracto + plantilla)",
+    ["modelo"],
+    buckets=CUBETAS_LATENCIA
+)
+LLAMADA_OLLAMA = Histogram(
+    "qwen_api_llamada_ollama_segundos",
+    "Duración de la llamada a Ollama /api/chat",
+    ["modelo"],
+    buckets=CUBETAS_LATENCIA
+)
+PARSEO_JSON = Histogram(
+    "qwen_api_parseo_json_segundos",
+    "Tiempo de extracción y parseo del JSON de la respuesta del modelo",
+    ["modelo"],
+    buckets=CUBETAS_LATENCIA
+)
+
+SALIDAS_INVALIDAS = Counter(
+    "qwen_api_salidas_invalidas",
+    "Salidas del modelo que no eran una clasificación válida",
+    ["modelo", "accion"]  # reparada | reintentada | descartada
+)
+
+CASCADA = Counter(
+    "qwen_api_cascada",
+    "Decisiones del modelo rápido de la cascada",
+    ["modelo", "resultado"]  # decidido | escalado_ambigua | escalado_sin_confianza | escalado_fallo
+)
+
+REDUCCION_LIMPIEZA = Histogram(
+    "qwen_api_limpieza_reduccion_tokens",
+    "Fracción de tokens eliminada por la limpieza del texto de cada documento",
+    buckets=(0.0, 0.01, 0.02, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0)
+)
+
+CONTEXTO_CUBETA = Counter(
+    "qwen_api_contexto_cubeta",
+    "Llamadas a Ollama por cubeta de num_ctx",
+    ["modelo", "num_ctx"]
+)
+CONTEXTO_CAMBIOS = Counter(
+    "qwen_api_contexto_cambios",
+    "Cambios de num_ctx (cada uno recarga el modelo en Ollama)",
+    ["modelo"]
+)
+CONTEXTO_EXCEDIDO = Counter(
+    "qwen_api_contexto_excedido",
+    "Documentos cuyo prompt no cabía en la cubeta mayor de num_ctx",
+    ["accion"]  # extracto | rechazado
+)
+
+CORTE_TOKENS_AHORRADOS = Histogram(
+    "qwen_api_corte_tokens_ahorrados",
+    "Tokens de num_predict no generados al cortar el stream con el JSON completo",
+    ["modelo"],
+    buckets=(0, 5, 10, 20, 40, 60, 80, 100, 150, 200)
+)
+CORTE_SEGUNDOS_AHORRADOS = Histogram(
+    "qwen_api_corte_segundos_ahorrados",
+    "Segundos de generación estimados ahorrados al cortar el stream con el JSON completo",
+    ["modelo"],
+    buckets=CUBETAS_LATENCIA
+)
+
+VECINOS = Counter(
+    "qwen_api_vecinos",
+    "Consultas al índice de vecinos más cercanos",
+    ["resultado"]  # decidido | indeciso | insuficiente | fallo
+)
+LLAMADA_EMBEDDINGS = Histogram(
+    "qwen_api_llamada_embeddings_segundos",
+    "Duración de la llamada a Ollama /api/embeddings",
+    ["modelo"],
+    buckets=CUBETAS_LATENCIA
+)
+
+# -----------------------------------------------------------------------------
+# CONTADORES DE OLLAMA
+# -----------------------------------------------------------------------------
+TOKENS_PROMPT = Counter(
+    "qwen_api_ollama_tokens_prompt",
+    "Tokens de prompt evaluados por Ollama (prompt_eval_count)",
+    ["modelo"]
+)
+TOKENS_GENERADOS = Counter(
+    "qwen_api_ollama_tokens_generados",
+    "Tokens generados por Ollama (eval_count)",
+    ["modelo"]
+)
+SEGUNDOS_PROMPT_EVAL = Counter(
+    "qwen_api_ollama_prompt_eval_segundos",
+    "Segundos de evaluación del prompt (prompt_eval_duration)",
+    ["modelo"]
+)
+SEGUNDOS_GENERACION = Counter(
+    "qwen_api_ollama_generacion_segundos",
+    "Segundos de generación (eval_duration)",
+    ["modelo"]
+)
+SEGUNDOS_CARGA = Counter(
+    "qwen_api_ollama_carga_segundos",
+    "Segundos de carga del modelo (load_duration)",
+    ["modelo"]
+)
+CARGAS_EN_FRIO = Counter(
+    "qwen_api_ollama_cargas_en_frio",
+    f"Respuestas con load_duration > {UMBRAL_CARGA_EN_FRIO}s (modelo cargado desde disco)",
+    ["modelo"]
+)
+
+
+def registrar_respuesta_ollama(modelo: str, respuesta: Mapping[str, Any]) -> None:
+    """
+    Registra los contadores que Ollama incluye en cada respuesta.
+
+    Las duraciones de Ollama vienen en nanosegundos.
+
+    Args:
+        modelo: Modelo usado
+        respuesta: Respuesta de /api/chat
+    """
+    TOKENS_PROMPT.labels(modelo).inc(respuesta.get("prompt_eval_count") or 0)
+    TOKENS_GENERADOS.labels(modelo).inc(respuesta.get("eval_count") or 0)
+    SEGUNDOS_PROMPT_EVAL.labels(modelo).inc((respuesta.get("prompt_eval_duration") or 0) / 1e9)
+    SEGUNDOS_GENERACION.labels(modelo).inc((respuesta.get("eval_duration") or 0) / 1e9)
+    carga = (respuesta.get("load_duration") or 0) / 1e9
+    SEGUNDOS_CARGA.labels(modelo).inc(carga)
+    if carga > UMBRAL_CARGA_EN_FRIO:
+        CARGAS_EN_FRIO.labels(modelo).inc()
+
+
+# -----------------------------------------------------------------------------
+# COLECTOR DE ESTADO (BAJO DEMANDA)
+# -----------------------------------------------------------------------------
+class ColectorEstado(Collector):
+    """
+    Exporta el estado del clasificador (caché, casi duplicados, coalescencia y cola) en cada scrape.
+
+    Attributes:
+        clasificador: Clasificador de la aplicación
+    """
+
+    def __init__(self, clasificador):
+        self.clasificador = clasificador
+
+    def collect(self) -> Iterator:
+        cache = self.clasificador.cache.estadisticas()
+        yield CounterMetricFamily("qwen_api_cache_aciertos", "Aciertos de la caché", value=cache["aciertos"])
+        yield CounterMetricFamily("qwen_api_cache_fallos", "Fallos de la caché", value=cache["fallos"])
+        yield GaugeMetricFamily("qwen_api_cache_entradas", "Entradas en memoria", value=cache["entradas_memoria"])
+
+        if self.clasificador.duplicados is not None:
+            duplicados = self.clasificador.duplicados.estadisticas()
+            yield CounterMetricFamily(
+                "qwen_api_duplicados_aciertos",
+                "Clasificaciones reutilizadas de un casi duplicado",
+                value=duplicados["aciertos"]
+            )
+            yield CounterMetricFamily(
+                "qwen_api_duplicados_fallos",
+                "Consultas sin casi duplicado",
+                value=duplicados["fallos"]
+            )
+            yield GaugeMetricFamily(
+                "qwen_api_duplicados_entradas",
+                "Huellas en el índice de casi duplicados",
+                value=duplicados["entradas"]
+            )
+
+        coalescencia = self.clasificador.coalescedor.estadisticas()
+        yield CounterMetricFamily(
+            "qwen_api_inferencias_coalescidas",
+            "Peticiones que compartieron una inferencia en curso",
+            value=coalescencia["coalescidas"]
+        )
+
+        cola = self.clasificador.admision.estado()
+        yield GaugeMetricFamily("qwen_api_cola_en_espera", "Peticiones esperando turno", value=cola["en_espera"])
+        yield GaugeMetricFamily("qwen_api_cola_en_curso", "Inferencias en curso", value=cola["en_curso"])
+        yield CounterMetricFamily(
+            "qwen_api_cola_rechazadas",
+            "Peticiones rechazadas con 429",
+            value=cola["rechazadas"]
+        )
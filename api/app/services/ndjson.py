@@ -0,0 +1,109 @@
+"""
+=============================================================================
+SERVICIO NDJSON - ndjson.py
+=============================================================================
+Utilidades para recibir y devolver NDJSON (un objeto JSON por línea) en
+streaming, sin cargar el cuerpo completo en memoria.
+
+- leer_lineas: parte el cuerpo en líneas a medida que llegan los bytes
+- RespuestaNDJSON: respuesta en streaming que permite seguir leyendo el
+  cuerpo de la petición mientras se envían resultados (full-duplex)
+=============================================================================
+"""
+
+# -----------------------------------------------------------------------------
+# IMPORTACIONES
+# -----------------------------------------------------------------------------
+from typing import AsyncIterator, Optional, Tuple  # Tipos para anotaciones
+from starlette.responses import StreamingResponse  # Base de la respuesta en streaming
+from starlette.types import Receive, Scope, Send  # Tipos ASGI
+
+MEDIA_TYPE_NDJSON = "application/x-ndjson"
+
+
+# -----------------------------------------------------------------------------
+# LECTURA INCREMENTAL DE LÍNEAS
+# -----------------------------------------------------------------------------
+def _tiene_contenido(linea: bytearray) -> bool:
+    """True si la línea no es vacía ni solo espacios (sin copiarla como strip())."""
+    return bool(linea) and not linea.isspace()
+
+
+async def leer_lineas(
+    chunks: AsyncIterator[bytes],
+    max_bytes_linea: int
+) -> AsyncIterator[Tuple[int, Optional[bytearray]]]:
+    """
+    Recorre un cuerpo NDJSON línea a línea a medida que llegan los chunks.
+
+    Solo se mantiene en memoria la línea en curso. Las líneas vacías se
+    omiten pero cuentan para el índice, de modo que el índice coincide
+    con el número de línea (base 0) del archivo original.
+
+    Args:
+        chunks: Iterador asíncrono de bytes (ej: request.stream())
+        max_bytes_linea: Tamaño máximo de una línea
+
+    Yields:
+        Tuple[int, Optional[bytearray]]: (índice de línea, contenido). El
+        contenido es None si la línea superó max_bytes_linea y se descartó.
+        Cada línea es un bytearray propio (orjson lo decodifica sin copiarlo).
+    """
+    buffer = bytearray()
+    indice = 0
+    descartando = False  # True mientras se salta el resto de una línea demasiado larga
+
+    async for chunk in chunks:
+        vista = memoryview(chunk)  # Rebanadas sin copiar el chunk
+        inicio = 0
+        while True:
+            fin = chunk.find(b"\n", inicio)
+            if fin == -1:
+                if not descartando:
+                    buffer += vista[inicio:]
+                    if len(buffer) > max_bytes_linea:
+                        buffer.clear()
+                        descartando = True
+                        yield indice, None
+                break
+
+            if descartando:
+                descartando = False
+                buffer.clear()
+            else:
+                buffer += vista[inicio:fin]
+                if len(buffer) > max_bytes_linea:
+                    yield indice, None
+                    buffer.clear()
+                elif _tiene_contenido(buffer):
+                    # La línea se entrega tal cual (sin copiarla a bytes) y se
+                    # empieza un buffer nuevo
+                    yield indice, buffer
+                    buffer = bytearray()
+                else:
+                    buffer.clear()
+            indice += 1
+            inicio = fin + 1
+
+    if _tiene_contenido(buffer) and not descartando:
+        yield indice, buffer
+
+
+# -----------------------------------------------------------------------------
+# RESPUESTA EN STREAMING FULL-DUPLEX
+# -----------------------------------------------------------------------------
+class RespuestaNDJSON(StreamingResponse):
+    """
+    Respuesta NDJSON en streaming que no consume el canal de recepción.
+
+    StreamingResponse escucha `receive()` para detectar desconexiones, lo
+    que le robaría los chunks del cuerpo al lector de la petición. Aquí el
+    propio lector detecta la desconexión (ClientDisconnect), por lo que la
+    respuesta solo envía.
+    """
+    media_type = MEDIA_TYPE_NDJSON
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
@@ -0,0 +1,117 @@
+"""
+=============================================================================
+SERVICIO DE CLIENTE OLLAMA - ollama_cliente.py
+=============================================================================
+Crea y cierra el cliente asíncrono compartido hacia el servidor Ollama.
+
+El cliente se crea UNA sola vez en el ciclo de vida de la aplicación
+(lifespan en main.py) y se reutiliza en todas las peticiones:
+- No bloquea el event loop de uvicorn durante la inferencia
+- Mantiene un pool de conexiones keep-alive (sin handshake TCP por petición)
+- Límites y timeouts configurables desde Settings
+=============================================================================
+"""
+
+# -----------------------------------------------------------------------------
+# IMPORTACIONES
+# -----------------------------------------------------------------------------
+from typing import Any, Dict, List, Optional, Tuple  # Tipos para anotaciones
+import httpx  # Transporte compartido y cliente HTTP propio
+import ollama  # Cliente para el servidor de modelos Ollama
+from app.config import Settings  # Tipo de la configuración
+
+
+# -----------------------------------------------------------------------------
+# CREACIÓN Y CIERRE DEL CLIENTE
+# -----------------------------------------------------------------------------
+def crear_cliente_ollama(settings: Settings, **kwargs) -> Tuple[ollama.AsyncClient, httpx.AsyncClient]:
+    """
+    Crea el cliente asíncrono de Ollama y un cliente httpx propio.
+
+    Ambos comparten el mismo transporte (un único pool de conexiones). El
+    cliente httpx es de la aplicación: se usa para los endpoints que
+    ollama 0.1.x no expone (/api/ps) y para cerrar el pool al apagar, sin
+    tocar atributos privados del cliente ollama.
+
+    Args:
+        settings: Configuración de la aplicación
+        **kwargs: Parámetros adicionales para httpx.AsyncClient (ej: transport)
+
+    Returns:
+        Tuple: (cliente ollama, cliente httpx) listos para toda la aplicación
+    """
+    limites = httpx.Limits(
+        max_connections=settings.ollama_max_connections,
+        max_keepalive_connections=settings.ollama_max_keepalive_connections,
+        keepalive_expiry=settings.ollama_keepalive_expiry
+    )
+    transporte = kwargs.pop("transport", None) or httpx.AsyncHTTPTransport(limits=limites)
+    timeout = httpx.Timeout(settings.ollama_timeout, connect=settings.ollama_connect_timeout)
+    cliente = ollama.AsyncClient(
+        host=settings.ollama_base_url,
+        timeout=timeout,
+        transport=transporte,
+        **kwargs
+    )
+    http = httpx.AsyncClient(
+        base_url=settings.ollama_base_url,
+        timeout=timeout,
+        transport=transporte,
+        **kwargs
+    )
+    return cliente, http
+
+
+async def cerrar_cliente_ollama(http: httpx.AsyncClient) -> None:
+    """
+    Cierra las conexiones abiertas del pool al apagar la aplicación.
+
+    Cerrar el cliente httpx propio cierra el transporte compartido y, con
+    él, las conexiones que usaba el cliente ollama.
+
+    Args:
+        http: Cliente httpx devuelto por crear_cliente_ollama
+    """
+    await http.aclose()
+
+
+# -----------------------------------------------------------------------------
+# CONSULTAS SIN MÉTODO PÚBLICO EN ollama 0.1.x
+# -----------------------------------------------------------------------------
+async def modelos_en_memoria(
+    cliente: ollama.AsyncClient,
+    http: Optional[httpx.AsyncClient]
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Lista los modelos cargados en memoria (GET /api/ps de Ollama).
+
+    ollama 0.1.x no tiene un método público para /api/ps: se consulta con
+    el cliente httpx propio de la aplicación. Si el cliente ollama
+    instalado ya expone ps(), se usa ese método.
+
+    Args:
+        cliente: Cliente ollama devuelto por crear_cliente_ollama
+        http: Cliente httpx devuelto por crear_cliente_ollama
+
+    Returns:
+        Optional[List]: Modelos en memoria (cada uno con su "name"), o None
+                        si el servidor Ollama no tiene /api/ps (versión antigua)
+
+    Raises:
+        httpx.HTTPError, ollama.ResponseError: Si Ollama no responde o
+                                               responde con otro error
+    """
+    if hasattr(cliente, "ps"):
+        try:
+            respuesta = await cliente.ps()
+        except ollama.ResponseError as e:
+            if e.status_code == 404:
+                return None
+            raise
+        return list(respuesta.get("models") or [])
+
+    respuesta = await http.get("/api/ps")
+    if respuesta.status_code == 404:
+        return None
+    respuesta.raise_for_status()
+    return respuesta.json().get("models") or []
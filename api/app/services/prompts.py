@@ -0,0 +1,233 @@
+"""
+=============================================================================
+REGISTRO DE PROMPTS - prompts.py
+=============================================================================
+Plantillas de prompt versionadas del clasificador.
+
+Estructura fija de mensajes (desde la versión 2):
+- system: instrucciones estáticas, idénticas byte a byte en cada petición
+- user: solo el texto del proceso
+
+Con las instrucciones al principio y siempre iguales, Ollama/llama.cpp
+reutiliza el prefijo ya evaluado en la caché KV del slot y solo evalúa los
+tokens del documento. Medición: benchmarks/medir_prefijo.py.
+
+Reglas del registro:
+- Una versión publicada NO se modifica: cualquier cambio de texto es una
+  versión nueva (las respuestas y las claves de caché llevan la versión)
+- PROMPT_VERSION elige la versión activa; las anteriores se conservan para
+  reproducir resultados y comparar
+=============================================================================
+"""
+
+# -----------------------------------------------------------------------------
+# IMPORTACIONES
+# -----------------------------------------------------------------------------
+from dataclasses import dataclass  # Para las plantillas inmutables
+from typing import Dict, List, Optional  # Tipos para anotaciones
+
+
+# -----------------------------------------------------------------------------
+# PLANTILLA
+# -----------------------------------------------------------------------------
+@dataclass(frozen=True)
+class PlantillaPrompt:
+    """
+    Una versión de un prompt.
+
+    Attributes:
+        nombre: Tarea del prompt (ej: clasificar_dolmen)
+        version: Versión dentro de la tarea
+        sistema: Mensaje system (vacío = sin mensaje system)
+        usuario: Mensaje user; {texto} se reemplaza por el texto del proceso
+    """
+    nombre: str
+    version: str
+    sistema: str
+    usuario: str
+
+    @property
+    def identificador(self) -> str:
+        """Nombre y versión, ej: clasificar_dolmen@2 (se devuelve en cada respuesta)."""
+        return f"{self.nombre}@{self.version}"
+
+    @property
+    def huella(self) -> str:
+        """Identificador y textos completos (parte de la clave de caché)."""
+        return "\x00".join((self.identificador, self.sistema, self.usuario))
+
+    def mensajes(self, texto: str) -> List[Dict[str, str]]:
+        """
+        Construye los mensajes de /api/chat para un texto.
+
+        Args:
+            texto: Texto (o extracto) del proceso
+
+        Returns:
+            List[Dict]: Mensaje system (si hay) seguido del mensaje user
+        """
+        mensajes = [{"role": "system", "content": self.sistema}] if self.sistema else []
+        mensajes.append({"role": "user", "content": self.usuario.format(texto=texto)})
+        return mensajes
+
+
+# -----------------------------------------------------------------------------
+# VERSIONES DE clasificar_dolmen
+# -----------------------------------------------------------------------------
+# Versión 1: instrucciones y texto en un único mensaje user (diseño original)
+_CLASIFICAR_DOLMEN_V1 = """
+     TAREA:
+     Clasificar un proceso judicial colombiano como RELEVANTE o NO RELEVANTE
+     respecto a ALUMBRADO PÚBLICO o la empresa DOLMEN.
+
+REGLA PRIORITARIA (OBLIGATORIA):
+Si el texto contiene literalmente AL MENOS UNA de las siguientes expresiones:
+- "alumbrado"
+- "alumbrado público"
+- "iluminación pública"
+
+ENTONCES la clasificación DEBE ser:
+"es_relevante": true
+y la confianza DEBE ser >= 0.7
+
+REGLAS DE RELEVANCIA:
+También es RELEVANTE si menciona:
+- "DOLMEN"
+- contratos de alumbrado público
+- servicio de alumbrado público
+- cobros, tarifas, facturación o prestación del alumbrado público
+
+REGLAS DE NO RELEVANCIA:
+Es NO RELEVANTE si el texto trata EXCLUSIVAMENTE de:
+- agua, gas, energía residencial, alcantarillado
+- otros contratos que NO sean de alumbrado público
+- demandas sin relación con alumbrado
+- uso figurativo de la palabra "luz" (ej: "a la luz de la ley")
+
+IMPORTANTE:
+- El tipo de proceso (tutela, ordinario, etc.) NO afecta la decisión
+- El demandado (municipio, empresa, persona) NO afecta la decisión
+- No inventar información
+- No interpretar fuera de las reglas
+
+CONFIDENCIA:
+- 0.9 → menciona "DOLMEN" + alumbrado público
+- 0.7 → mención clara de alumbrado o iluminación pública
+- 0.5 → relación probable pero ambigua
+- 0.3 → mención débil o indirecta
+- 0.0 → no relacionado
+
+RESTRICCIONES:
+- NO explicar
+- NO agregar texto fuera del JSON
+- RESPONDER SOLO JSON válido
+
+FORMATO DE RESPUESTA OBLIGATORIO (INCLUYE LOS 3 CAMPOS):
+{{"es_relevante": true/false, "confianza": 0.9, "razon": "breve explicacion de maximo 50 palabras"}}
+
+IMPORTANTE: Debes incluir OBLIGATORIAMENTE estos 3 campos en tu respuesta:
+1. es_relevante (boolean)
+2. confianza (number)
+3. razon (string con explicación breve)
+
+Ejemplo de respuesta válida:
+{{"es_relevante": true, "confianza": 0.9, "razon": "El texto menciona explícitamente alumbrado público y contrato con DOLMEN"}}
+
+TEXTO A CLASIFICAR:
+{texto}
+"""
+
+# Versión 2: las mismas instrucciones como mensaje system estable
+_CLASIFICAR_DOLMEN_V2_SISTEMA = """TAREA:
+Clasificar un proceso judicial colombiano como RELEVANTE o NO RELEVANTE
+respecto a ALUMBRADO PÚBLICO o la empresa DOLMEN.
+
+REGLA PRIORITARIA (OBLIGATORIA):
+Si el texto contiene literalmente AL MENOS UNA de las siguientes expresiones:
+- "alumbrado"
+- "alumbrado público"
+- "iluminación pública"
+
+ENTONCES la clasificación DEBE ser:
+"es_relevante": true
+y la confianza DEBE ser >= 0.7
+
+REGLAS DE RELEVANCIA:
+También es RELEVANTE si menciona:
+- "DOLMEN"
+- contratos de alumbrado público
+- servicio de alumbrado público
+- cobros, tarifas, facturación o prestación del alumbrado público
+
+REGLAS DE NO RELEVANCIA:
+Es NO RELEVANTE si el texto trata EXCLUSIVAMENTE de:
+- agua, gas, energía residencial, alcantarillado
+- otros contratos que NO sean de alumbrado público
+- demandas sin relación con alumbrado
+- uso figurativo de la palabra "luz" (ej: "a la luz de la ley")
+
+IMPORTANTE:
+- El tipo de proceso (tutela, ordinario, etc.) NO afecta la decisión
+- El demandado (municipio, empresa, persona) NO afecta la decisión
+- No inventar información
+- No interpretar fuera de las reglas
+
+CONFIDENCIA:
+- 0.9 → menciona "DOLMEN" + alumbrado público
+- 0.7 → mención clara de alumbrado o iluminación pública
+- 0.5 → relación probable pero ambigua
+- 0.3 → mención débil o indirecta
+- 0.0 → no relacionado
+
+RESTRICCIONES:
+- NO explicar
+- NO agregar texto fuera del JSON
+- RESPONDER SOLO JSON válido
+
+FORMATO DE RESPUESTA OBLIGATORIO (INCLUYE LOS 3 CAMPOS):
+{"es_relevante": true/false, "confianza": 0.9, "razon": "breve explicacion de maximo 150 caracteres"}
+
+IMPORTANTE: Debes incluir OBLIGATORIAMENTE estos 3 campos en tu respuesta:
+1. es_relevante (boolean)
+2. confianza (number)
+3. razon (string con explicación breve)
+
+Ejemplo de respuesta válida:
+{"es_relevante": true, "confianza": 0.9, "razon": "El texto menciona explícitamente alumbrado público y contrato con DOLMEN"}
+"""
+
+PLANTILLAS: Dict[str, Dict[str, PlantillaPrompt]] = {
+    "clasificar_dolmen": {
+        "1": PlantillaPrompt("clasificar_dolmen", "1", sistema="", usuario=_CLASIFICAR_DOLMEN_V1),
+        "2": PlantillaPrompt(
+            "clasificar_dolmen", "2",
+            sistema=_CLASIFICAR_DOLMEN_V2_SISTEMA,
+            usuario="TEXTO A CLASIFICAR:\n{texto}"
+        ),
+    },
+}
+
+
+# -----------------------------------------------------------------------------
+# ACCESO AL REGISTRO
+# -----------------------------------------------------------------------------
+def obtener_plantilla(nombre: str, version: Optional[str] = None) -> PlantillaPrompt:
+    """
+    Busca una plantilla en el registro.
+
+    Args:
+        nombre: Tarea del prompt
+        version: Versión pedida (None = la más reciente)
+
+    Returns:
+        PlantillaPrompt: Plantilla registrada
+
+    Raises:
+        KeyError: Si la tarea o la versión no existen
+    """
+    versiones = PLANTILLAS[nombre]
+    if version is None:
+        version = max(versiones, key=int)
+    if version not in versiones:
+        raise KeyError(f"Versión '{version}' de '{nombre}' no registrada (disponibles: {sorted(versiones)})")
+    return versiones[version]
@@ -0,0 +1,149 @@
+"""
+=============================================================================
+SERVICIO DE REGLAS DETERMINÍSTICAS - reglas.py
+=============================================================================
+Aplica la REGLA PRIORITARIA del prompt "clasificar_dolmen" sin llamar al
+modelo: si el texto contiene literalmente "alumbrado", "alumbrado público"
+o "iluminación pública", el proceso es RELEVANTE con confianza >= 0.7.
+
+Funcionamiento:
+- El texto se normaliza una sola vez (sin tildes, en minúsculas)
+- Todas las palabras clave se buscan en UNA pasada con un único patrón
+  compilado (alternativas ordenadas de la más larga a la más corta)
+- Si las reglas deciden el resultado se devuelve de inmediato; si no,
+  el texto es ambiguo y se envía al modelo
+=============================================================================
+"""
+
+# -----------------------------------------------------------------------------
+# IMPORTACIONES
+# -----------------------------------------------------------------------------
+import re  # Para compilar el patrón multi-palabra
+import unicodedata  # Para eliminar tildes
+from dataclasses import dataclass, field  # Para el resultado de las reglas
+from typing import List, Optional  # Tipos para anotaciones
+
+
+# -----------------------------------------------------------------------------
+# PALABRAS CLAVE
+# -----------------------------------------------------------------------------
+# Forma normalizada (sin tildes, minúsculas) -> forma reportada al cliente
+PALABRAS_CLAVE = {
+    "alumbrado publico": "alumbrado público",
+    "iluminacion publica": "iluminación pública",
+    "alumbrado": "alumbrado",
+    "dolmen": "DOLMEN",
+    "iluminacion": "iluminación",
+    "luz": "luz",
+}
+
+# Palabras que por sí solas deciden la relevancia (REGLA PRIORITARIA)
+PALABRAS_DECISIVAS = {"alumbrado publico", "iluminacion publica", "alumbrado"}
+
+# Confianza asignada por las reglas (ver escala CONFIDENCIA del prompt)
+CONFIANZA_ALUMBRADO = 0.7  # Mención clara de alumbrado o iluminación pública
+CONFIANZA_DOLMEN_ALUMBRADO = 0.9  # Menciona "DOLMEN" + alumbrado público
+
+
+def _compilar_patron(palabras) -> "re.Pattern":
+    """
+    Compila todas las palabras clave en un único patrón de una pasada.
+
+    Las alternativas se ordenan de la más larga a la más corta para que
+    "alumbrado publico" tenga prioridad sobre "alumbrado". Los espacios
+    admiten cualquier secuencia de blancos (saltos de línea del PDF) y se
+    acepta el plural (-s / -es).
+    """
+    alternativas = sorted(palabras, key=len, reverse=True)
+    cuerpo = "|".join(r"\s+".join(map(re.escape, p.split())) for p in alternativas)
+    return re.compile(rf"\b({cuerpo})(?:es|s)?\b")
+
+
+_PATRON = _compilar_patron(PALABRAS_CLAVE)
+
+
+# -----------------------------------------------------------------------------
+# RESULTADO DE LAS REGLAS
+# -----------------------------------------------------------------------------
+@dataclass
+class ResultadoReglas:
+    """
+    Resultado de aplicar las reglas determinísticas a un texto.
+
+    Attributes:
+        keywords_encontrados: Palabras clave encontradas (en orden de aparición)
+        es_relevante: Decisión de las reglas, None si el texto es ambiguo
+        confianza: Confianza asignada por las reglas
+        razon: Explicación breve de la decisión
+    """
+    keywords_encontrados: List[str] = field(default_factory=list)
+    es_relevante: Optional[bool] = None
+    confianza: float = 0.0
+    razon: str = ""
+
+    @property
+    def decidido(self) -> bool:
+        """True si las reglas deciden el resultado sin necesidad del modelo."""
+        return self.es_relevante is not None
+
+
+# -----------------------------------------------------------------------------
+# FUNCIONES PÚBLICAS
+# -----------------------------------------------------------------------------
+def normalizar_texto(texto: str) -> str:
+    """
+    Normaliza el texto para comparar sin tildes ni mayúsculas.
+
+    Args:
+        texto: Texto original
+
+    Returns:
+        str: Texto en minúsculas y sin tildes ("Iluminación" -> "iluminacion")
+    """
+    sin_tildes = unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode("ascii")
+    return sin_tildes.lower()
+
+
+def buscar_palabras_clave(texto: str) -> List[str]:
+    """
+    Busca todas las palabras clave en una sola pasada sobre el texto.
+
+    Args:
+        texto: Texto a analizar (sin normalizar)
+
+    Returns:
+        List[str]: Palabras clave normalizadas, sin repetir, en orden de aparición
+    """
+    encontradas = {}
+    for coincidencia in _PATRON.finditer(normalizar_texto(texto)):
+        clave = " ".join(coincidencia.group(1).split())
+        encontradas.setdefault(clave, None)
+    return list(encontradas)
+
+
+def evaluar_reglas(texto: str) -> ResultadoReglas:
+    """
+    Aplica la REGLA PRIORITARIA del prompt sobre el texto.
+
+    Args:
+        texto: Texto del proceso (texto_pdf_completo o contenido_demanda)
+
+    Returns:
+        ResultadoReglas: Palabras encontradas y, si aplica, la decisión
+    """
+    claves = buscar_palabras_clave(texto)
+    resultado = ResultadoReglas(keywords_encontrados=[PALABRAS_CLAVE[c] for c in claves])
+
+    decisivas = [c for c in claves if c in PALABRAS_DECISIVAS]
+    if not decisivas:
+        # Sin menciones literales: texto ambiguo o no relacionado -> modelo
+        return resultado
+
+    resultado.es_relevante = True
+    if "dolmen" in claves:
+        resultado.confianza = CONFIANZA_DOLMEN_ALUMBRADO
+        resultado.razon = f"El texto menciona DOLMEN y '{PALABRAS_CLAVE[decisivas[0]]}'"
+    else:
+        resultado.confianza = CONFIANZA_ALUMBRADO
+        resultado.razon = f"El texto menciona literalmente '{PALABRAS_CLAVE[decisivas[0]]}'"
+    return resultado
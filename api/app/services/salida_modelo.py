@@ -0,0 +1,275 @@
+"""
+=============================================================================
+SERVICIO DE SALIDA DEL MODELO - salida_modelo.py
+=============================================================================
+Esquema JSON de la clasificación y lectura tolerante de lo que devuelve
+el modelo.
+
+1. Esquema: se envía a Ollama en el parámetro `format` (salida
+   estructurada), de modo que la gramática de generación solo permite
+   un objeto {es_relevante, confianza, razon} en ese orden
+2. Reparación local: si aun así la salida llega casi válida (truncada
+   por num_predict, con texto alrededor, comas sobrantes, comillas
+   simples, True/False de Python) se corrige sin volver a inferir
+3. Validación: tipos y rangos de cada campo; lo que no se puede
+   interpretar se reporta como SalidaInvalida para que el clasificador
+   decida si reintenta
+4. Corte anticipado: sobre la salida en streaming, DetectorObjetoCompleto
+   avisa en cuanto se cierra un objeto que ya es una clasificación válida,
+   para cancelar el resto de la generación (explicaciones tras la llave)
+=============================================================================
+"""
+
+# -----------------------------------------------------------------------------
+# IMPORTACIONES
+# -----------------------------------------------------------------------------
+import json  # Para parsear la salida
+import re  # Para las reparaciones de sintaxis
+from typing import Any, Dict, List, Optional, Tuple  # Tipos para anotaciones
+
+# Longitud máxima de la razón (también se impone en el esquema)
+MAX_RAZON = 150
+
+# Esquema de salida estructurada (el orden de las propiedades es el de generación)
+ESQUEMA_CLASIFICACION = {
+    "type": "object",
+    "properties": {
+        "es_relevante": {"type": "boolean"},
+        "confianza": {"type": "number", "minimum": 0, "maximum": 1},
+        "razon": {"type": "string", "maxLength": MAX_RAZON},
+    },
+    "required": ["es_relevante", "confianza", "razon"],
+}
+
+# Valores de texto que algunos modelos usan en lugar de booleanos
+BOOLEANOS_TEXTO = {
+    "true": True, "si": True, "sí": True, "yes": True, "relevante": True,
+    "false": False, "no": False, "no relevante": False,
+}
+
+
+class SalidaInvalida(ValueError):
+    """La salida del modelo no se pudo interpretar como una clasificación."""
+
+
+# -----------------------------------------------------------------------------
+# REPARACIÓN DE JSON
+# -----------------------------------------------------------------------------
+def _cerrar_truncado(texto: str) -> str:
+    """
+    Cierra una cadena y los objetos/listas que quedaron abiertos.
+
+    Recorre el texto respetando comillas y escapes; si la salida se cortó
+    a mitad de un valor, descarta el par clave-valor incompleto final.
+    """
+    pila = []
+    en_cadena = False
+    escape = False
+    for caracter in texto:
+        if en_cadena:
+            if escape:
+                escape = False
+            elif caracter == "\\":
+                escape = True
+            elif caracter == '"':
+                en_cadena = False
+        elif caracter == '"':
+            en_cadena = True
+        elif caracter in "{[":
+            pila.append("}" if caracter == "{" else "]")
+        elif caracter in "}]" and pila:
+            pila.pop()
+
+    if en_cadena:
+        texto += '"'
+    texto = texto.rstrip()
+    # Clave sin valor al final (, "razon": ) y separador colgante
+    texto = re.sub(r'([{,])\s*"[^"]*"\s*:?\s*$', r"\1", texto)
+    texto = texto.rstrip().rstrip(",:").rstrip()
+    return texto + "".join(reversed(pila))
+
+
+def reparar_json(texto: str) -> Tuple[Any, bool]:
+    """
+    Parsea la salida del modelo, corrigiendo errores de sintaxis comunes.
+
+    Args:
+        texto: Contenido devuelto por el modelo
+
+    Returns:
+        Tuple[Any, bool]: Valor parseado y si hizo falta repararlo
+
+    Raises:
+        SalidaInvalida: Si ni la reparación produce JSON válido
+    """
+    texto = texto.strip()
+    try:
+        return json.loads(texto), False
+    except json.JSONDecodeError:
+        pass
+
+    # Quitar bloques de código markdown y texto antes del objeto
+    candidato = re.sub(r"^```(?:json)?|```$", "", texto, flags=re.IGNORECASE).strip()
+    inicio = candidato.find("{")
+    if inicio == -1:
+        raise SalidaInvalida(f"No hay un objeto JSON en la salida: {texto[:100]!r}")
+    candidato = candidato[inicio:]
+
+    # Texto después del objeto (explicaciones que el modelo agrega)
+    fin = candidato.rfind("}")
+    if fin != -1:
+        try:
+            return json.loads(candidato[:fin + 1]), True
+        except json.JSONDecodeError:
+            pass
+
+    # Comillas simples, literales de Python y comas sobrantes
+    if '"' not in candidato:
+        candidato = candidato.replace("'", '"')
+    candidato = re.sub(r"\bTrue\b", "true", candidato)
+    candidato = re.sub(r"\bFalse\b", "false", candidato)
+    candidato = re.sub(r"\bNone\b", "null", candidato)
+    candidato = re.sub(r",\s*([}\]])", r"\1", candidato)
+
+    for intento in (candidato, _cerrar_truncado(candidato)):
+        try:
+            return json.loads(intento), True
+        except json.JSONDecodeError:
+            continue
+    raise SalidaInvalida(f"JSON irreparable: {texto[:100]!r}")
+
+
+# -----------------------------------------------------------------------------
+# VALIDACIÓN DE LA CLASIFICACIÓN
+# -----------------------------------------------------------------------------
+def validar_clasificacion(datos: Any) -> Dict[str, Any]:
+    """
+    Comprueba y normaliza los campos de la clasificación.
+
+    Args:
+        datos: Valor parseado de la salida del modelo
+
+    Returns:
+        Dict: es_relevante (bool), confianza (0-1; 0.0 si falta), razon
+              (máx. MAX_RAZON) y confianza_reportada (False si el modelo no
+              devolvió una confianza numérica)
+
+    Raises:
+        SalidaInvalida: Si falta es_relevante o no es interpretable
+    """
+    if not isinstance(datos, dict):
+        raise SalidaInvalida(f"Se esperaba un objeto JSON, llegó {type(datos).__name__}")
+    if "es_relevante" not in datos:
+        raise SalidaInvalida(f"El modelo no devolvió el campo 'es_relevante'. Respuesta: {datos}")
+
+    es_relevante = datos["es_relevante"]
+    if isinstance(es_relevante, str):
+        es_relevante = BOOLEANOS_TEXTO.get(es_relevante.strip().lower(), es_relevante)
+    if not isinstance(es_relevante, bool):
+        raise SalidaInvalida(f"'es_relevante' no es booleano: {datos['es_relevante']!r}")
+
+    # Sin confianza no se inventa una: se marca para que la cascada escale
+    try:
+        confianza = float(datos["confianza"])
+        reportada = confianza == confianza  # NaN no cuenta como reportada
+    except (KeyError, TypeError, ValueError):
+        confianza, reportada = 0.0, False
+    confianza = min(1.0, max(0.0, confianza)) if reportada else 0.0
+
+    # Intentar con y sin tilde
+    razon = datos.get("razon") or datos.get("razón") or "Sin razón proporcionada por el modelo"
+    return {
+        "es_relevante": es_relevante,
+        "confianza": confianza,
+        "razon": str(razon)[:MAX_RAZON],
+        "confianza_reportada": reportada
+    }
+
+
+def interpretar_salida(texto: str) -> Tuple[Dict[str, Any], bool]:
+    """
+    Convierte la salida del modelo en una clasificación.
+
+    Args:
+        texto: Contenido devuelto por el modelo
+
+    Returns:
+        Tuple[Dict, bool]: Clasificación validada y si hizo falta reparar el JSON
+
+    Raises:
+        SalidaInvalida: Si la salida está vacía, no es JSON reparable o no
+                        contiene una clasificación válida
+    """
+    if not texto or not texto.strip():
+        raise SalidaInvalida("El modelo devolvió una respuesta vacía")
+    datos, reparado = reparar_json(texto)
+    return validar_clasificacion(datos), reparado
+
+
+# -----------------------------------------------------------------------------
+# CORTE ANTICIPADO (STREAMING)
+# -----------------------------------------------------------------------------
+class DetectorObjetoCompleto:
+    """
+    Sigue la salida del modelo fragmento a fragmento y detecta el cierre
+    del primer objeto JSON que es una clasificación válida.
+
+    Respeta comillas y escapes, así que una llave dentro de la razón no
+    cierra el objeto. El texto anterior a la primera llave se ignora.
+
+    Attributes:
+        texto: Salida acumulada
+    """
+
+    def __init__(self):
+        self._partes: List[str] = []
+        self._longitud = 0
+        self._profundidad = 0
+        self._inicio: Optional[int] = None
+        self._en_cadena = False
+        self._escape = False
+
+    @property
+    def texto(self) -> str:
+        """Salida acumulada hasta ahora."""
+        return "".join(self._partes)
+
+    def agregar(self, fragmento: str) -> Optional[str]:
+        """
+        Agrega un fragmento de la salida.
+
+        Args:
+            fragmento: Contenido de un chunk del stream (uno o pocos tokens)
+
+        Returns:
+            str | None: Texto del objeto si con este fragmento quedó una
+                        clasificación completa y válida
+        """
+        base = self._longitud
+        self._partes.append(fragmento)
+        self._longitud += len(fragmento)
+        for posicion, caracter in enumerate(fragmento, base):
+            if self._en_cadena:
+                if self._escape:
+                    self._escape = False
+                elif caracter == "\\":
+                    self._escape = True
+                elif caracter == '"':
+                    self._en_cadena = False
+            elif caracter == '"' and self._inicio is not None:
+                self._en_cadena = True
+            elif caracter == "{":
+                if self._inicio is None:
+                    self._inicio = posicion
+                self._profundidad += 1
+            elif caracter == "}" and self._inicio is not None:
+                self._profundidad -= 1
+                if self._profundidad == 0:
+                    objeto = self.texto[self._inicio:posicion + 1]
+                    self._inicio = None
+                    try:
+                        validar_clasificacion(json.loads(objeto))
+                    except (ValueError, SalidaInvalida):
+                        continue  # Objeto inválido: se sigue leyendo
+                    return objeto
+        return None
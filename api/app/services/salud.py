@@ -0,0 +1,162 @@
+"""
+=============================================================================
+SERVICIO DE SALUD - salud.py
+=============================================================================
+Estado de Ollama consultado en segundo plano, para que GET /health
+responda en tiempo constante sin tocar Ollama ni bloquear el event loop.
+
+Cada salud_intervalo segundos se consulta (con el cliente asíncrono
+compartido y un timeout corto):
+- /api/tags: Ollama responde y el modelo configurado está descargado
+- /api/ps: el modelo está cargado en memoria (no habrá arranque en frío);
+  si el servidor no tiene /api/ps, modelo_cargado queda en False
+
+La profundidad de la cola y las inferencias en curso se leen en el momento
+del GET desde el control de admisión (son contadores en memoria).
+=============================================================================
+"""
+
+# -----------------------------------------------------------------------------
+# IMPORTACIONES
+# -----------------------------------------------------------------------------
+import asyncio  # Tarea de refresco en segundo plano
+import logging  # Para logging estructurado
+import time  # Marca de tiempo de la instantánea
+from typing import Any, Dict, Optional  # Tipos para anotaciones
+import httpx  # Tipo del cliente HTTP propio
+from app.config import Settings  # Tipo de la configuración
+from app.services.clasificador import Clasificador  # Cliente y cola de admisión
+from app.services.ollama_cliente import modelos_en_memoria  # GET /api/ps
+
+# Logger para este módulo
+logger = logging.getLogger(__name__)
+
+
+def _coincide_modelo(modelo: str, nombre: str) -> bool:
+    """Permite coincidencias parciales (ej: 'qwen2.5:3b' en 'qwen2.5:3b-instruct')."""
+    return modelo in nombre
+
+
+# -----------------------------------------------------------------------------
+# MONITOR DE SALUD
+# -----------------------------------------------------------------------------
+class MonitorSalud:
+    """
+    Mantiene una instantánea del estado de Ollama refrescada en segundo plano.
+
+    Attributes:
+        clasificador: Clasificador compartido (cliente de Ollama y cola de admisión)
+        http: Cliente httpx propio para /api/ps (ver crear_cliente_ollama)
+        settings: Configuración de la aplicación
+        instantanea: Último estado consultado (None hasta la primera consulta)
+    """
+
+    def __init__(
+        self,
+        clasificador: Clasificador,
+        settings: Settings,
+        http: Optional[httpx.AsyncClient]
+    ):
+        self.clasificador = clasificador
+        self.http = http
+        self.settings = settings
+        self.instantanea: Optional[Dict[str, Any]] = None
+        self._tarea: Optional[asyncio.Task] = None
+        self._sin_ps_avisado = False  # El aviso de Ollama sin /api/ps se registra una vez
+
+    def iniciar(self) -> None:
+        """Lanza la tarea de refresco (llamar dentro del event loop)."""
+        self._tarea = asyncio.create_task(self._refrescar_periodicamente(), name="monitor-salud")
+
+    async def detener(self) -> None:
+        """Cancela la tarea de refresco."""
+        if self._tarea is not None:
+            self._tarea.cancel()
+            await asyncio.gather(self._tarea, return_exceptions=True)
+            self._tarea = None
+
+    async def refrescar(self) -> Dict[str, Any]:
+        """
+        Consulta Ollama y reemplaza la instantánea.
+
+        Returns:
+            Dict: Nueva instantánea (ollama_conectado, modelo_disponible,
+                  modelo_cargado, error, actualizado)
+        """
+        cliente = self.clasificador.cliente
+        modelo = self.settings.model_name
+        try:
+            etiquetas, en_memoria = await asyncio.wait_for(
+                asyncio.gather(cliente.list(), modelos_en_memoria(cliente, self.http)),
+                timeout=self.settings.salud_timeout
+            )
+            if en_memoria is None and not self._sin_ps_avisado:
+                logger.warning("Ollama no tiene /api/ps: no se puede saber si el modelo está cargado")
+                self._sin_ps_avisado = True
+            instantanea = {
+                "ollama_conectado": True,
+                "modelo_disponible": any(
+                    _coincide_modelo(modelo, m.get("name", "")) for m in etiquetas.get("models", [])
+                ),
+                "modelo_cargado": any(
+                    _coincide_modelo(modelo, m.get("name", "")) for m in en_memoria or []
+                ),
+                "error": None,
+            }
+        except Exception as e:
+            logger.warning(f"Consulta de salud a Ollama falló: {e!r}")
+            instantanea = {
+                "ollama_conectado": False,
+                "modelo_disponible": False,
+                "modelo_cargado": False,
+                "error": str(e) or type(e).__name__,
+            }
+        instantanea["actualizado"] = time.time()
+        self.instantanea = instantanea
+        return instantanea
+
+    async def _refrescar_periodicamente(self) -> None:
+        """Refresca la instantánea cada salud_intervalo segundos."""
+        while True:
+            await self.refrescar()
+            await asyncio.sleep(self.settings.salud_intervalo)
+
+    def estado(self) -> Dict[str, Any]:
+        """
+        Combina la instantánea con el estado actual de la cola (tiempo constante).
+
+        Returns:
+            Dict: Campos de HealthResponse
+        """
+        instantanea = self.instantanea
+        admision = self.clasificador.admision
+        base = {
+            "modelo": self.settings.model_name,
+            "version": self.settings.app_version,
+            "en_cola": admision.en_espera,
+            "en_curso": admision.en_curso,
+        }
+        if instantanea is None:
+            return {
+                **base,
+                "status": "iniciando",
+                "ollama_conectado": False,
+                "modelo_cargado": False,
+                "edad_segundos": None,
+                "error": None,
+            }
+
+        if not instantanea["ollama_conectado"]:
+            status = "ollama_no_disponible"
+        elif not instantanea["modelo_disponible"]:
+            status = "modelo_no_encontrado"
+        else:
+            status = "healthy"
+        return {
+            **base,
+            "status": status,
+            "ollama_conectado": instantanea["ollama_conectado"],
+            "modelo_cargado": instantanea["modelo_cargado"],
+            "edad_segundos": round(time.time() - instantanea["actualizado"], 3),
+            "error": instantanea["error"],
+        }
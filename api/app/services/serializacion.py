@@ -0,0 +1,135 @@
+"""
+=============================================================================
+SERVICIO DE SERIALIZACIÓN - serializacion.py
+=============================================================================
+Camino rápido de JSON para documentos legales de varios megabytes.
+
+- RespuestaJSON: respuesta por defecto de la app, serializada con orjson
+  (el JSONResponse de Starlette usa json.dumps, ~4x más lento con textos
+  largos)
+- respuesta_json: serializa modelos directamente con orjson, sin pasar por
+  jsonable_encoder (que recorre y copia todo el árbol en cada respuesta)
+- leer_cuerpo_json / validar_cuerpo: decodifican el cuerpo con orjson y
+  validan el objeto ya decodificado, con los mismos errores 422 que FastAPI
+- linea_ndjson: una línea NDJSON serializada con orjson
+
+orjson crea cada string una sola vez desde los bytes del cuerpo y Pydantic
+valida esos mismos objetos sin copiarlos. Ver benchmarks/medir_json.py.
+=============================================================================
+"""
+
+# -----------------------------------------------------------------------------
+# IMPORTACIONES
+# -----------------------------------------------------------------------------
+from typing import Any, Sequence, Union  # Tipos para anotaciones
+import orjson  # Codificación y decodificación JSON en Rust
+from fastapi.exceptions import RequestValidationError  # Errores 422 de FastAPI
+from fastapi.responses import ORJSONResponse  # Respuesta JSON con orjson
+from pydantic import BaseModel, TypeAdapter, ValidationError  # Validación del objeto decodificado
+from starlette.requests import Request  # Petición cruda
+
+# Respuesta por defecto de la aplicación (ver main.py)
+RespuestaJSON = ORJSONResponse
+
+
+def _volcar(contenido: Union[BaseModel, Sequence[BaseModel]]) -> Any:
+    """Modelo (o lista de modelos) -> objetos de Python que orjson serializa."""
+    if isinstance(contenido, BaseModel):
+        return contenido.model_dump()
+    return [modelo.model_dump() for modelo in contenido]
+
+
+# -----------------------------------------------------------------------------
+# RESPUESTAS
+# -----------------------------------------------------------------------------
+def respuesta_json(contenido: Union[BaseModel, Sequence[BaseModel]], status_code: int = 200) -> RespuestaJSON:
+    """
+    Crea la respuesta JSON de uno o varios modelos sin jsonable_encoder.
+
+    Los strings del modelo pasan a orjson sin copias intermedias.
+
+    Args:
+        contenido: Modelo o lista de modelos de respuesta
+        status_code: Código HTTP
+
+    Returns:
+        RespuestaJSON: Respuesta serializada
+    """
+    return RespuestaJSON(content=_volcar(contenido), status_code=status_code)
+
+
+def linea_ndjson(modelo: BaseModel) -> bytes:
+    """
+    Serializa un modelo como una línea NDJSON.
+
+    Args:
+        modelo: Modelo a serializar
+
+    Returns:
+        bytes: JSON del modelo terminado en salto de línea
+    """
+    return orjson.dumps(modelo.model_dump(), option=orjson.OPT_APPEND_NEWLINE)
+
+
+# -----------------------------------------------------------------------------
+# DECODIFICACIÓN
+# -----------------------------------------------------------------------------
+def decodificar(contenido: Union[bytes, bytearray, memoryview]) -> Any:
+    """
+    Decodifica el cuerpo de una petición con orjson.
+
+    Args:
+        contenido: JSON en bytes
+
+    Returns:
+        Any: Objeto decodificado
+
+    Raises:
+        RequestValidationError: Si el contenido no es JSON válido (422)
+    """
+    try:
+        return orjson.loads(contenido)
+    except orjson.JSONDecodeError as e:
+        raise RequestValidationError(
+            [{"type": "json_invalid", "loc": ("body", e.pos), "msg": "JSON decode error", "input": {},
+              "ctx": {"error": e.msg}}]
+        )
+
+
+def validar_cuerpo(adaptador: TypeAdapter, datos: Any) -> Any:
+    """
+    Valida un objeto ya decodificado con el mismo formato de error que FastAPI.
+
+    Args:
+        adaptador: TypeAdapter del tipo esperado (ej: List[ProcesoLegalRequest])
+        datos: Objeto decodificado
+
+    Returns:
+        Any: Objeto validado
+
+    Raises:
+        RequestValidationError: Si no es válido (422)
+    """
+    try:
+        return adaptador.validate_python(datos)
+    except ValidationError as e:
+        raise RequestValidationError(
+            [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)]
+        )
+
+
+async def leer_cuerpo_json(request: Request, adaptador: TypeAdapter) -> Any:
+    """
+    Lee, decodifica con orjson y valida el cuerpo de una petición.
+
+    Args:
+        request: Petición cruda
+        adaptador: TypeAdapter del tipo esperado
+
+    Returns:
+        Any: Cuerpo validado
+
+    Raises:
+        RequestValidationError: Si el cuerpo no es JSON válido o no cumple el tipo (422)
+    """
+    return validar_cuerpo(adaptador, decodificar(await request.body()))
@@ -0,0 +1,132 @@
+"""
+=============================================================================
+SERVICIO DE CONTEO DE TOKENS - tokens.py
+=============================================================================
+Conteo local del número de tokens de un texto, sin llamar a Ollama.
+
+ContadorTokens usa el tokenizador del modelo (tokenizer.json de Qwen, con
+el paquete opcional tokenizers) si está configurado; si no, la estimación
+de estimar_tokens con un margen de seguridad.
+
+estimar_tokens aproxima el tokenizador BPE de Qwen en español:
+- Cada palabra cuesta un token por cada 4 letras (las palabras comunes son
+  un token; las largas se parten)
+- Cada dígito es un token (Qwen tokeniza los números dígito a dígito)
+- Cada signo de puntuación es un token
+- Un espacio simple va pegado a la palabra siguiente (gratis); un salto
+  de línea o una racha de espacios es un token
+
+En documentos grandes se estima sobre muestras repartidas por el texto y
+se extrapola, para que el coste no crezca con el tamaño del documento.
+=============================================================================
+"""
+
+# -----------------------------------------------------------------------------
+# IMPORTACIONES
+# -----------------------------------------------------------------------------
+import logging  # Avisos si el tokenizador no se puede cargar
+import re  # Piezas del texto que cuestan un token
+from typing import Dict, List  # Tipos para anotaciones
+
+try:
+    from tokenizers import Tokenizer  # Tokenizador exacto (opcional)
+except ImportError:  # pragma: no cover - depende del entorno
+    Tokenizer = None
+
+# Logger para este módulo
+logger = logging.getLogger(__name__)
+
+# Una coincidencia = un token estimado
+_PIEZAS = re.compile(r"[^\W\d_]{1,4}|\d|[^\w\s]|\n+|\s{2,}")
+
+# Por encima de este tamaño se estima con muestras
+MAX_CARACTERES_EXACTO = 200_000
+MUESTRAS = 16
+CARACTERES_MUESTRA = 8_000
+
+# Plantilla de chat de Qwen: <|im_start|>rol\n ... <|im_end|>\n por mensaje
+# y <|im_start|>assistant\n al final
+TOKENS_POR_MENSAJE = 5
+TOKENS_INICIO_RESPUESTA = 3
+
+# La estimación puede quedarse corta: se cuenta un 15% más
+MARGEN_ESTIMACION = 1.15
+
+
+def estimar_tokens(texto: str) -> int:
+    """
+    Estima los tokens que el modelo evaluaría para un texto.
+
+    Args:
+        texto: Texto a medir
+
+    Returns:
+        int: Tokens estimados
+    """
+    if len(texto) <= MAX_CARACTERES_EXACTO:
+        return len(_PIEZAS.findall(texto))
+    paso = (len(texto) - CARACTERES_MUESTRA) // (MUESTRAS - 1)
+    medidos = sum(
+        len(_PIEZAS.findall(texto, inicio, inicio + CARACTERES_MUESTRA))
+        for inicio in range(0, paso * MUESTRAS, paso)
+    )
+    return round(medidos * len(texto) / (MUESTRAS * CARACTERES_MUESTRA))
+
+
+# -----------------------------------------------------------------------------
+# CONTADOR
+# -----------------------------------------------------------------------------
+class ContadorTokens:
+    """
+    Cuenta los tokens de un texto o de los mensajes de un prompt.
+
+    Attributes:
+        tokenizador: Tokenizador del modelo (None = estimación)
+    """
+
+    def __init__(self, ruta_tokenizador: str = ""):
+        """
+        Args:
+            ruta_tokenizador: tokenizer.json del modelo (vacío = estimación)
+        """
+        self.tokenizador = None
+        if not ruta_tokenizador:
+            return
+        if Tokenizer is None:
+            logger.warning("Paquete tokenizers no instalado: los tokens se estiman")
+            return
+        try:
+            self.tokenizador = Tokenizer.from_file(ruta_tokenizador)
+        except Exception as e:
+            logger.warning(f"No se pudo cargar el tokenizador {ruta_tokenizador}, los tokens se estiman: {e}")
+
+    @property
+    def exacto(self) -> bool:
+        """True si cuenta con el tokenizador del modelo."""
+        return self.tokenizador is not None
+
+    def contar(self, texto: str) -> int:
+        """
+        Cuenta los tokens de un texto.
+
+        Args:
+            texto: Texto a medir
+
+        Returns:
+            int: Tokens (estimados con margen si no hay tokenizador)
+        """
+        if self.tokenizador is None:
+            return int(estimar_tokens(texto) * MARGEN_ESTIMACION)
+        return len(self.tokenizador.encode(texto, add_special_tokens=False).ids)
+
+    def contar_mensajes(self, mensajes: List[Dict[str, str]]) -> int:
+        """
+        Cuenta los tokens del prompt que Ollama evalúa para unos mensajes de chat.
+
+        Args:
+            mensajes: Mensajes (role + content)
+
+        Returns:
+            int: Tokens del prompt, incluida la plantilla de chat
+        """
+        return sum(self.contar(m["content"]) + TOKENS_POR_MENSAJE for m in mensajes) + TOKENS_INICIO_RESPUESTA
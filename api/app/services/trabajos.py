@@ -0,0 +1,479 @@
+"""
+=============================================================================
+SERVICIO DE TRABAJOS ASÍNCRONOS - trabajos.py
+=============================================================================
+Cola persistente de clasificaciones para documentos cuya inferencia puede
+tardar más que el timeout del proxy inverso.
+
+Flujo:
+1. POST /api/v1/trabajos guarda la solicitud en SQLite y responde al
+   instante con el id del trabajo
+2. Los trabajadores del propio proceso de la API toman los trabajos
+   pendientes en orden de llegada y los pasan por el Clasificador
+3. GET /api/v1/trabajos/{id} consulta el estado y el resultado; si el
+   trabajo trae callback_url, además se notifica con un POST
+
+La base de datos usa modo WAL, así que los trabajos sobreviven un reinicio
+del contenedor: los que quedaron "en_proceso" vuelven a "pendiente" al
+arrancar, salvo que ya se hayan tomado max_intentos veces (un trabajo que
+tumba el proceso no se repite para siempre). Los trabajos terminados se
+purgan periódicamente tras la retención. El ritmo lo marca la capacidad de
+Ollama (cola de admisión del Clasificador), no la vida de las conexiones de
+los clientes.
+
+callback_url solo se acepta con un esquema y un host de la lista permitida
+(TRABAJOS_CALLBACK_HOSTS): sin ella, cualquiera con API key podría hacer
+que el servidor llame a direcciones internas.
+=============================================================================
+"""
+
+# -----------------------------------------------------------------------------
+# IMPORTACIONES
+# -----------------------------------------------------------------------------
+import asyncio  # Tareas de los trabajadores
+import json  # Para serializar solicitudes y resultados
+import logging  # Para logging estructurado
+import sqlite3  # Almacenamiento persistente de la cola
+import threading  # Para proteger la conexión SQLite
+import time  # Marcas de tiempo y reintentos diferidos
+import uuid  # Identificadores de trabajo
+from pathlib import Path  # Para crear el directorio de la base de datos
+from typing import Any, Dict, List, Optional  # Tipos para anotaciones
+from urllib.parse import urlsplit  # Esquema y host de callback_url
+import httpx  # Envío de callbacks
+from fastapi import HTTPException  # Errores del pipeline
+from app.config import Settings  # Lista de callbacks permitidos
+from app.models import EstadoTrabajo, ModoRespuesta, ProcesoLegalRequest  # Modelos de datos
+from app.services.clasificador import Clasificador, construir_respuesta, texto_a_clasificar  # Pipeline
+
+# Logger para este módulo
+logger = logging.getLogger(__name__)
+
+# Intentos de entrega de un callback antes de darlo por perdido
+INTENTOS_CALLBACK = 3
+
+
+# -----------------------------------------------------------------------------
+# VALIDACIÓN DEL CALLBACK
+# -----------------------------------------------------------------------------
+def validar_callback(url: str, settings: Settings) -> None:
+    """
+    Comprueba que callback_url apunta a un esquema y un host permitidos.
+
+    Args:
+        url: callback_url recibida
+        settings: Configuración (trabajos_callback_hosts y trabajos_callback_esquemas)
+
+    Raises:
+        HTTPException: Error 400 si el esquema o el host no están permitidos
+    """
+    partes = urlsplit(url)
+    esquemas = {e.strip().lower() for e in settings.trabajos_callback_esquemas.split(",") if e.strip()}
+    hosts = [h.strip().lower() for h in settings.trabajos_callback_hosts.split(",") if h.strip()]
+    host = (partes.hostname or "").lower()
+    permitido = any(
+        host.endswith(patron[1:]) if patron.startswith("*.") else host == patron
+        for patron in hosts
+    )
+    if partes.scheme.lower() not in esquemas or not permitido:
+        logger.warning(f"callback_url rechazada: {partes.scheme}://{host}")
+        raise HTTPException(
+            status_code=400,
+            detail="callback_url no permitida: el esquema y el host deben estar en "
+                   "TRABAJOS_CALLBACK_ESQUEMAS y TRABAJOS_CALLBACK_HOSTS"
+        )
+
+
+# -----------------------------------------------------------------------------
+# ALMACÉN PERSISTENTE
+# -----------------------------------------------------------------------------
+class AlmacenTrabajos:
+    """
+    Cola de trabajos en SQLite (modo WAL).
+
+    Los métodos son síncronos y rápidos; desde código asíncrono se llaman
+    con asyncio.to_thread para no bloquear el event loop.
+
+    Attributes:
+        ruta_sqlite: Ruta del archivo SQLite
+        retencion_segundos: Vida de un trabajo terminado antes de purgarlo
+        max_intentos: Veces que se toma un trabajo antes de darlo por fallido
+    """
+
+    def __init__(self, ruta_sqlite: str, retencion_segundos: float, max_intentos: int = 3):
+        self.ruta_sqlite = ruta_sqlite
+        self.retencion_segundos = retencion_segundos
+        self.max_intentos = max_intentos
+        self._lock = threading.Lock()
+        Path(ruta_sqlite).parent.mkdir(parents=True, exist_ok=True)
+        self._conexion = sqlite3.connect(ruta_sqlite, check_same_thread=False)
+        self._conexion.row_factory = sqlite3.Row
+        self._conexion.execute("PRAGMA journal_mode=WAL")
+        self._conexion.execute("PRAGMA synchronous=NORMAL")
+        self._conexion.execute(
+            "CREATE TABLE IF NOT EXISTS trabajos ("
+            "id TEXT PRIMARY KEY, "
+            "estado TEXT NOT NULL, "
+            "modo TEXT NOT NULL, "
+            "solicitud TEXT NOT NULL, "
+            "callback_url TEXT, "
+            "resultado TEXT, "
+            "error TEXT, "
+            "status_code INTEGER, "
+            "intentos INTEGER NOT NULL DEFAULT 0, "
+            "disponible_desde REAL NOT NULL, "
+            "creado REAL NOT NULL, "
+            "actualizado REAL NOT NULL)"
+        )
+        self._conexion.execute(
+            "CREATE INDEX IF NOT EXISTS trabajos_pendientes "
+            "ON trabajos (estado, disponible_desde, creado)"
+        )
+        ahora = time.time()
+        # Un trabajo interrumpido max_intentos veces probablemente es el que
+        # tumba el proceso: se da por fallido en lugar de repetirlo
+        agotados = self._conexion.execute(
+            "UPDATE trabajos SET estado = ?, status_code = 500, error = ?, actualizado = ? "
+            "WHERE estado = ? AND intentos >= ?",
+            (
+                EstadoTrabajo.error.value,
+                f"El trabajo se interrumpió {max_intentos} veces sin terminar",
+                ahora,
+                EstadoTrabajo.en_proceso.value,
+                max_intentos
+            )
+        ).rowcount
+        # Los demás trabajos interrumpidos por un reinicio vuelven a la cola
+        recuperados = self._conexion.execute(
+            "UPDATE trabajos SET estado = ?, actualizado = ? WHERE estado = ?",
+            (EstadoTrabajo.pendiente.value, ahora, EstadoTrabajo.en_proceso.value)
+        ).rowcount
+        self._conexion.commit()
+        self.purgar()
+        logger.info(
+            f"Cola de trabajos abierta en {ruta_sqlite} ({recuperados} recuperados, "
+            f"{agotados} fallidos por agotar {max_intentos} intentos)"
+        )
+
+    def purgar(self) -> int:
+        """
+        Borra los trabajos terminados hace más de la retención.
+
+        Returns:
+            int: Trabajos borrados
+        """
+        with self._lock:
+            borrados = self._conexion.execute(
+                "DELETE FROM trabajos WHERE estado IN (?, ?) AND actualizado < ?",
+                (EstadoTrabajo.completado.value, EstadoTrabajo.error.value, time.time() - self.retencion_segundos)
+            ).rowcount
+            self._conexion.commit()
+        return borrados
+
+    def crear(self, solicitud: str, modo: str, callback_url: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Encola un trabajo nuevo.
+
+        Args:
+            solicitud: Proceso serializado a JSON
+            modo: Forma del resultado (completo o resumido)
+            callback_url: URL a notificar al terminar (opcional)
+
+        Returns:
+            Dict: Trabajo creado
+        """
+        ahora = time.time()
+        trabajo_id = uuid.uuid4().hex
+        with self._lock:
+            self._conexion.execute(
+                "INSERT INTO trabajos (id, estado, modo, solicitud, callback_url, "
+                "disponible_desde, creado, actualizado) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (trabajo_id, EstadoTrabajo.pendiente.value, modo, solicitud, callback_url, ahora, ahora, ahora)
+            )
+            self._conexion.commit()
+        return self.obtener(trabajo_id)
+
+    def obtener(self, trabajo_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Busca un trabajo por id.
+
+        Args:
+            trabajo_id: Id devuelto al crear el trabajo
+
+        Returns:
+            Optional[Dict]: Trabajo (resultado ya deserializado), o None si no existe
+        """
+        with self._lock:
+            fila = self._conexion.execute("SELECT * FROM trabajos WHERE id = ?", (trabajo_id,)).fetchone()
+        return self._a_dict(fila) if fila is not None else None
+
+    def reclamar(self) -> Optional[Dict[str, Any]]:
+        """
+        Toma el trabajo pendiente más antiguo y lo marca en_proceso.
+
+        Returns:
+            Optional[Dict]: Trabajo reclamado, o None si no hay pendientes
+        """
+        ahora = time.time()
+        with self._lock:
+            fila = self._conexion.execute(
+                "SELECT * FROM trabajos WHERE estado = ? AND disponible_desde <= ? "
+                "ORDER BY creado LIMIT 1",
+                (EstadoTrabajo.pendiente.value, ahora)
+            ).fetchone()
+            if fila is None:
+                return None
+            self._conexion.execute(
+                "UPDATE trabajos SET estado = ?, intentos = intentos + 1, actualizado = ? WHERE id = ?",
+                (EstadoTrabajo.en_proceso.value, ahora, fila["id"])
+            )
+            self._conexion.commit()
+        trabajo = self._a_dict(fila)
+        trabajo["estado"] = EstadoTrabajo.en_proceso.value
+        trabajo["intentos"] += 1
+        return trabajo
+
+    def completar(self, trabajo_id: str, resultado: Dict[str, Any]) -> None:
+        """
+        Guarda el resultado de un trabajo terminado.
+
+        Args:
+            trabajo_id: Id del trabajo
+            resultado: Proceso clasificado serializable a JSON
+        """
+        self._terminar(trabajo_id, EstadoTrabajo.completado, 200, json.dumps(resultado), None)
+
+    def fallar(self, trabajo_id: str, status_code: int, error: str) -> None:
+        """
+        Marca un trabajo como fallido.
+
+        Args:
+            trabajo_id: Id del trabajo
+            status_code: Código HTTP equivalente al error
+            error: Descripción del error
+        """
+        self._terminar(trabajo_id, EstadoTrabajo.error, status_code, None, error)
+
+    def _terminar(
+        self,
+        trabajo_id: str,
+        estado: EstadoTrabajo,
+        status_code: int,
+        resultado: Optional[str],
+        error: Optional[str]
+    ) -> None:
+        """Actualiza un trabajo a su estado final."""
+        with self._lock:
+            self._conexion.execute(
+                "UPDATE trabajos SET estado = ?, status_code = ?, resultado = ?, error = ?, "
+                "actualizado = ? WHERE id = ?",
+                (estado.value, status_code, resultado, error, time.time(), trabajo_id)
+            )
+            self._conexion.commit()
+
+    def reencolar(self, trabajo_id: str, retraso: float) -> None:
+        """
+        Devuelve un trabajo a la cola para reintentarlo más tarde.
+
+        No cuenta como intento: el trabajo no llegó a procesarse.
+
+        Args:
+            trabajo_id: Id del trabajo
+            retraso: Segundos antes de que vuelva a estar disponible
+        """
+        ahora = time.time()
+        with self._lock:
+            self._conexion.execute(
+                "UPDATE trabajos SET estado = ?, intentos = intentos - 1, disponible_desde = ?, "
+                "actualizado = ? WHERE id = ?",
+                (EstadoTrabajo.pendiente.value, ahora + retraso, ahora, trabajo_id)
+            )
+            self._conexion.commit()
+
+    def contar(self) -> Dict[str, int]:
+        """
+        Cuenta los trabajos por estado.
+
+        Returns:
+            Dict: {estado: cantidad} para todos los estados
+        """
+        with self._lock:
+            filas = self._conexion.execute(
+                "SELECT estado, COUNT(*) FROM trabajos GROUP BY estado"
+            ).fetchall()
+        conteo = {estado.value: 0 for estado in EstadoTrabajo}
+        conteo.update({estado: cantidad for estado, cantidad in filas})
+        return conteo
+
+    def cerrar(self) -> None:
+        """Cierra la conexión SQLite."""
+        with self._lock:
+            self._conexion.close()
+
+    @staticmethod
+    def _a_dict(fila: sqlite3.Row) -> Dict[str, Any]:
+        """Convierte una fila en diccionario deserializando el resultado."""
+        trabajo = dict(fila)
+        if trabajo["resultado"] is not None:
+            trabajo["resultado"] = json.loads(trabajo["resultado"])
+        return trabajo
+
+
+# -----------------------------------------------------------------------------
+# TRABAJADORES
+# -----------------------------------------------------------------------------
+class PoolTrabajadores:
+    """
+    Trabajadores asíncronos que consumen la cola de trabajos.
+
+    Cada trabajador pasa por la cola de admisión del Clasificador igual que
+    una petición síncrona, así que varios trabajadores nunca superan
+    OLLAMA_NUM_PARALLEL inferencias simultáneas.
+
+    Attributes:
+        almacen: Cola persistente de trabajos
+        clasificador: Pipeline de clasificación compartido
+        num_trabajadores: Tareas que consumen la cola
+        intervalo_sondeo: Segundos entre consultas cuando no hay aviso de trabajo nuevo
+        intervalo_purga: Segundos entre purgas de trabajos terminados
+    """
+
+    def __init__(
+        self,
+        almacen: AlmacenTrabajos,
+        clasificador: Clasificador,
+        num_trabajadores: int,
+        intervalo_sondeo: float = 1.0,
+        intervalo_purga: float = 3600.0
+    ):
+        self.almacen = almacen
+        self.clasificador = clasificador
+        self.num_trabajadores = num_trabajadores
+        self.intervalo_sondeo = intervalo_sondeo
+        self.intervalo_purga = intervalo_purga
+        self._aviso = asyncio.Event()
+        self._tareas: List[asyncio.Task] = []
+        self._http: Optional[httpx.AsyncClient] = None
+
+    def iniciar(self) -> None:
+        """Arranca los trabajadores (llamar dentro del event loop)."""
+        self._http = httpx.AsyncClient(timeout=10.0)
+        self._tareas = [
+            asyncio.create_task(self._trabajador(), name=f"trabajador-{n}")
+            for n in range(self.num_trabajadores)
+        ]
+        self._tareas.append(asyncio.create_task(self._purgar_periodicamente(), name="purga-trabajos"))
+        logger.info(f"{self.num_trabajadores} trabajadores de la cola iniciados")
+
+    async def detener(self) -> None:
+        """
+        Cancela los trabajadores.
+
+        Un trabajo interrumpido queda en_proceso en la base de datos y se
+        recupera al siguiente arranque.
+        """
+        for tarea in self._tareas:
+            tarea.cancel()
+        await asyncio.gather(*self._tareas, return_exceptions=True)
+        self._tareas = []
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    def notificar(self) -> None:
+        """Despierta a los trabajadores tras encolar un trabajo."""
+        self._aviso.set()
+
+    async def _purgar_periodicamente(self) -> None:
+        """Purga los trabajos vencidos cada intervalo_purga segundos (el archivo no crece sin límite)."""
+        while True:
+            await asyncio.sleep(self.intervalo_purga)
+            try:
+                borrados = await asyncio.to_thread(self.almacen.purgar)
+            except Exception as e:
+                logger.error(f"Error purgando la cola de trabajos: {e}")
+                continue
+            if borrados:
+                logger.info(f"{borrados} trabajos terminados purgados")
+
+    async def _trabajador(self) -> None:
+        """Bucle de un trabajador: reclamar, clasificar, guardar, notificar."""
+        while True:
+            try:
+                trabajo = await asyncio.to_thread(self.almacen.reclamar)
+            except Exception as e:
+                logger.error(f"Error leyendo la cola de trabajos: {e}")
+                trabajo = None
+            if trabajo is None:
+                try:
+                    await asyncio.wait_for(self._aviso.wait(), timeout=self.intervalo_sondeo)
+                except asyncio.TimeoutError:
+                    pass
+                self._aviso.clear()
+                continue
+            try:
+                await self._procesar(trabajo)
+            except Exception as e:
+                # Un error al guardar (ej: SQLite bloqueado) no debe matar al
+                # trabajador: el trabajo queda en_proceso y se recupera al reiniciar
+                logger.error(f"Error guardando el trabajo {trabajo['id']}: {e!r}")
+
+    async def _procesar(self, trabajo: Dict[str, Any]) -> None:
+        """
+        Clasifica un trabajo y guarda su resultado o su error.
+
+        Un 429 de la cola de admisión no es un fallo: el trabajo vuelve a la
+        cola y se reintenta pasado el Retry-After.
+
+        Args:
+            trabajo: Trabajo reclamado con AlmacenTrabajos.reclamar
+        """
+        trabajo_id = trabajo["id"]
+        try:
+            proceso = ProcesoLegalRequest.model_validate_json(trabajo["solicitud"])
+            clasificacion = await self.clasificador.clasificar(texto_a_clasificar(proceso))
+            respuesta = construir_respuesta(proceso, ModoRespuesta(trabajo["modo"]), **clasificacion)
+        except HTTPException as e:
+            if e.status_code == 429:
+                retraso = float((e.headers or {}).get("Retry-After", self.intervalo_sondeo))
+                await asyncio.to_thread(self.almacen.reencolar, trabajo_id, retraso)
+                return
+            await asyncio.to_thread(self.almacen.fallar, trabajo_id, e.status_code, str(e.detail))
+        except Exception as e:
+            logger.error(f"Error procesando el trabajo {trabajo_id}: {e}")
+            await asyncio.to_thread(self.almacen.fallar, trabajo_id, 500, f"Error al procesar: {str(e)}")
+        else:
+            await asyncio.to_thread(self.almacen.completar, trabajo_id, respuesta.model_dump())
+            logger.info(f"Trabajo {trabajo_id} completado")
+
+        if trabajo["callback_url"]:
+            await self._enviar_callback(trabajo["callback_url"], trabajo_id)
+
+    async def _enviar_callback(self, url: str, trabajo_id: str) -> None:
+        """
+        Envía el trabajo terminado por POST a la URL del cliente.
+
+        Se reintenta con espera exponencial; un callback perdido no afecta
+        al trabajo, que sigue disponible en GET /api/v1/trabajos/{id}.
+
+        Args:
+            url: callback_url del trabajo
+            trabajo_id: Id del trabajo terminado
+        """
+        trabajo = await asyncio.to_thread(self.almacen.obtener, trabajo_id)
+        if trabajo is None:
+            logger.warning(f"Callback del trabajo {trabajo_id} no enviado: el trabajo ya no existe")
+            return
+        cuerpo = {campo: trabajo[campo] for campo in (
+            "id", "estado", "modo", "status_code", "resultado", "error", "creado", "actualizado"
+        )}
+        for intento in range(INTENTOS_CALLBACK):
+            try:
+                respuesta = await self._http.post(url, json=cuerpo)
+                if respuesta.status_code < 500:
+                    return
+            except httpx.HTTPError as e:
+                logger.warning(f"Callback del trabajo {trabajo_id} falló: {e}")
+            if intento + 1 < INTENTOS_CALLBACK:
+                await asyncio.sleep(2 ** intento)
+        logger.error(f"Callback del trabajo {trabajo_id} no entregado tras {INTENTOS_CALLBACK} intentos")
@@ -0,0 +1,239 @@
+"""
+=============================================================================
+SERVICIO DE VECINOS MÁS CERCANOS - vecinos.py
+=============================================================================
+Índice de embeddings de documentos ya clasificados, para decidir sin
+generar cuando un documento nuevo se parece lo suficiente a ejemplos
+etiquetados (la generación es lo más caro del pipeline; un embedding
+cuesta una fracción).
+
+1. Cada ejemplo es el embedding normalizado (L2) de su extracto y su
+   etiqueta es_relevante
+2. La similitud coseno contra todos los ejemplos es un producto
+   matriz-vector en NumPy
+3. Los k vecinos más similares votan con peso = similitud; solo votan a
+   favor los que superan similitud_min. Si la etiqueta mayoritaria reúne
+   al menos acuerdo_min del peso total, se decide sin llamar al chat
+
+Persistencia (opcional, ruta no vacía):
+- embeddings.f32: matriz float32 fila a fila, abierta con np.memmap
+  (no se carga en RAM; el sistema operativo pagina lo que se usa)
+- etiquetas.u8: una etiqueta (0/1) por fila
+- indice.json: dimensión y modelo de embeddings
+Agregar ejemplos añade bytes al final de los archivos y vuelve a mapear,
+sin reescribir el índice ni reiniciar la API.
+=============================================================================
+"""
+
+# -----------------------------------------------------------------------------
+# IMPORTACIONES
+# -----------------------------------------------------------------------------
+import json  # Metadatos del índice
+import logging  # Para logging estructurado
+import os  # Recorte de escrituras incompletas
+import threading  # Para proteger los archivos al agregar
+from dataclasses import dataclass  # Resultado del voto
+from pathlib import Path  # Rutas de los archivos del índice
+from typing import Any, Dict, Optional, Sequence  # Tipos para anotaciones
+
+import numpy as np  # Matriz de embeddings y similitudes
+
+# Logger para este módulo
+logger = logging.getLogger(__name__)
+
+# Archivos del índice persistente
+ARCHIVO_EMBEDDINGS = "embeddings.f32"
+ARCHIVO_ETIQUETAS = "etiquetas.u8"
+ARCHIVO_METADATOS = "indice.json"
+
+
+@dataclass
+class VotoVecinos:
+    """
+    Resultado del voto de los vecinos más cercanos.
+
+    Attributes:
+        es_relevante: Etiqueta mayoritaria
+        acuerdo: Fracción del peso de los k vecinos a favor de la mayoría (0-1)
+        votantes: Vecinos con similitud >= similitud_min
+        similitud_max: Similitud del vecino más cercano
+        decidido: True si el acuerdo alcanza acuerdo_min
+    """
+    es_relevante: bool
+    acuerdo: float
+    votantes: int
+    similitud_max: float
+    decidido: bool
+
+
+def normalizar(vectores: Any) -> np.ndarray:
+    """
+    Convierte a float32 y normaliza cada fila a norma 1.
+
+    Args:
+        vectores: Un vector o una matriz (una fila por vector)
+
+    Returns:
+        np.ndarray: Matriz (n, dimensión) normalizada
+    """
+    matriz = np.atleast_2d(np.asarray(vectores, dtype=np.float32))
+    normas = np.linalg.norm(matriz, axis=1, keepdims=True)
+    return matriz / np.maximum(normas, 1e-12)
+
+
+# -----------------------------------------------------------------------------
+# ÍNDICE
+# -----------------------------------------------------------------------------
+class IndiceVecinos:
+    """
+    Matriz de embeddings etiquetados con búsqueda por similitud coseno.
+
+    Attributes:
+        ruta: Directorio del índice persistente (vacío = solo memoria)
+        modelo: Modelo de embeddings con el que se construyó el índice
+        dimension: Dimensión de los embeddings (None hasta el primer ejemplo)
+    """
+
+    def __init__(self, ruta: str = "", modelo: str = ""):
+        self.ruta = Path(ruta) if ruta else None
+        self.modelo = modelo
+        self.dimension: Optional[int] = None
+        self._matriz = np.empty((0, 0), dtype=np.float32)
+        self._etiquetas = np.empty(0, dtype=np.uint8)
+        self._lock = threading.Lock()
+        if self.ruta is not None:
+            self.ruta.mkdir(parents=True, exist_ok=True)
+            self._abrir()
+
+    def _abrir(self) -> None:
+        """Lee los metadatos y mapea la matriz del disco."""
+        metadatos = self.ruta / ARCHIVO_METADATOS
+        if not metadatos.exists():
+            return
+        datos = json.loads(metadatos.read_text(encoding="utf-8"))
+        if self.modelo and datos.get("modelo") and datos["modelo"] != self.modelo:
+            raise ValueError(
+                f"El índice de {self.ruta} se construyó con {datos['modelo']}, "
+                f"no con {self.modelo}; borre el directorio para reconstruirlo"
+            )
+        self.dimension = int(datos["dimension"])
+        self._mapear()
+        logger.info(f"Índice de vecinos abierto en {self.ruta} ({len(self)} ejemplos)")
+
+    def _mapear(self) -> None:
+        """Mapea los archivos; filas incompletas de una escritura cortada se ignoran."""
+        ruta_etiquetas = self.ruta / ARCHIVO_ETIQUETAS
+        ruta_embeddings = self.ruta / ARCHIVO_EMBEDDINGS
+        etiquetas = np.fromfile(ruta_etiquetas, dtype=np.uint8) if ruta_etiquetas.exists() else self._etiquetas[:0]
+        tamano = ruta_embeddings.stat().st_size if ruta_embeddings.exists() else 0
+        filas = min(len(etiquetas), tamano // (4 * self.dimension))
+        self._etiquetas = etiquetas[:filas]
+        self._matriz = (
+            np.memmap(ruta_embeddings, dtype=np.float32, mode="r", shape=(filas, self.dimension))
+            if filas else np.empty((0, self.dimension), dtype=np.float32)
+        )
+
+    def __len__(self) -> int:
+        return len(self._etiquetas)
+
+    def agregar(self, vectores: Any, etiquetas: Sequence[bool]) -> int:
+        """
+        Agrega ejemplos etiquetados al índice (y al disco si es persistente).
+
+        Args:
+            vectores: Embeddings, uno por fila
+            etiquetas: es_relevante de cada ejemplo
+
+        Returns:
+            int: Ejemplos en el índice tras agregar
+
+        Raises:
+            ValueError: Si la dimensión no coincide con la del índice
+        """
+        matriz = normalizar(vectores)
+        nuevas = np.asarray(etiquetas, dtype=np.uint8)
+        if len(matriz) != len(nuevas):
+            raise ValueError(f"{len(matriz)} embeddings para {len(nuevas)} etiquetas")
+
+        with self._lock:
+            if self.dimension is None:
+                self.dimension = matriz.shape[1]
+                if self.ruta is not None:
+                    (self.ruta / ARCHIVO_METADATOS).write_text(
+                        json.dumps({"dimension": self.dimension, "modelo": self.modelo}), encoding="utf-8"
+                    )
+            if matriz.shape[1] != self.dimension:
+                raise ValueError(f"Embedding de dimensión {matriz.shape[1]}; el índice usa {self.dimension}")
+
+            if self.ruta is None:
+                self._matriz = np.vstack([self._matriz.reshape(-1, self.dimension), matriz])
+                self._etiquetas = np.concatenate([self._etiquetas, nuevas])
+            else:
+                # Descartar restos de una escritura cortada antes de añadir
+                filas = len(self)
+                for nombre, tamano in ((ARCHIVO_EMBEDDINGS, filas * 4 * self.dimension), (ARCHIVO_ETIQUETAS, filas)):
+                    ruta = self.ruta / nombre
+                    if ruta.exists() and ruta.stat().st_size > tamano:
+                        os.truncate(ruta, tamano)
+                # Primero los embeddings: una etiqueta sin fila completa no cuenta
+                with open(self.ruta / ARCHIVO_EMBEDDINGS, "ab") as archivo:
+                    archivo.write(matriz.tobytes())
+                with open(self.ruta / ARCHIVO_ETIQUETAS, "ab") as archivo:
+                    archivo.write(nuevas.tobytes())
+                self._mapear()
+            return len(self)
+
+    def votar(self, vector: Any, k: int, similitud_min: float, acuerdo_min: float) -> Optional[VotoVecinos]:
+        """
+        Busca los k ejemplos más similares y hace que voten la etiqueta.
+
+        Args:
+            vector: Embedding del documento
+            k: Vecinos que votan
+            similitud_min: Similitud coseno mínima para votar
+            acuerdo_min: Fracción del peso necesaria para decidir
+
+        Returns:
+            VotoVecinos | None: None si el índice tiene menos de k ejemplos
+        """
+        with self._lock:
+            matriz, etiquetas = self._matriz, self._etiquetas
+        if len(etiquetas) < k or k < 1:
+            return None
+        consulta = normalizar(vector)[0]
+        if len(consulta) != matriz.shape[1]:
+            raise ValueError(f"Embedding de dimensión {len(consulta)}; el índice usa {matriz.shape[1]}")
+
+        similitudes = matriz @ consulta
+        cercanos = np.argpartition(-similitudes, k - 1)[:k]
+        pesos = np.clip(similitudes[cercanos], 0.0, None)
+        votos = etiquetas[cercanos].astype(bool)
+        votantes = pesos >= similitud_min
+
+        peso_total = float(pesos.sum())
+        peso_relevante = float(pesos[votantes & votos].sum())
+        peso_no_relevante = float(pesos[votantes & ~votos].sum())
+        es_relevante = peso_relevante > peso_no_relevante
+        acuerdo = max(peso_relevante, peso_no_relevante) / peso_total if peso_total > 0 else 0.0
+        return VotoVecinos(
+            es_relevante=es_relevante,
+            acuerdo=round(acuerdo, 4),
+            votantes=int(votantes.sum()),
+            similitud_max=round(float(pesos.max()), 4),
+            decidido=acuerdo >= acuerdo_min
+        )
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """
+        Devuelve el tamaño y la composición del índice.
+
+        Returns:
+            Dict: ejemplos, relevantes, dimension, modelo y persistente
+        """
+        return {
+            "ejemplos": len(self),
+            "relevantes": int(self._etiquetas.sum()),
+            "dimension": self.dimension,
+            "modelo": self.modelo,
+            "persistente": self.ruta is not None,
+        }
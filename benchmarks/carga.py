@@ -0,0 +1,419 @@
+"""
+=============================================================================
+GENERADOR DE CARGA - carga.py
+=============================================================================
+Prueba de carga asíncrona y reproducible de la API (reemplaza a
+test_velocidad.py).
+
+Modos:
+- Lazo cerrado (--concurrencias 1,4,8): N clientes envían peticiones una
+  tras otra; mide la latencia y el throughput a concurrencia fija
+- Lazo abierto (--tasas 0.5,1,2): llegadas de Poisson a una tasa fija
+  (peticiones/segundo) sin esperar a las respuestas; sirve para encontrar
+  el punto de saturación (la latencia y los 429 se disparan)
+
+Tamaños de petición (--mezcla corto:0.8,largo:0.2):
+- corto: contenido_demanda de un párrafo
+- largo: texto_pdf_completo de --paginas páginas (100 por defecto)
+
+Cada nivel reporta p50/p95/p99 de latencia, throughput y tasa de error.
+Los resultados se guardan en JSON (--salida) y se comparan contra una
+línea base (--linea-base): si p95, throughput o tasa de error empeoran
+más que --tolerancia, el script termina con código 1.
+
+Con --ollama-falso la API se ejecuta en el mismo proceso contra
+benchmarks/ollama_falso.py (sin red ni modelo): mide el coste propio de
+la API (colas, admisión, parseo) con un modelo de velocidad conocida.
+--factor-tiempo escala las esperas simuladas (0 = modelo instantáneo).
+
+Uso:
+    python benchmarks/carga.py --api-key $API_KEY --concurrencias 1,4 --peticiones 50
+    python benchmarks/carga.py --tasas 0.5,1,2 --duracion 60 --salida resultados.json
+    python benchmarks/carga.py --concurrencias 4 --linea-base benchmarks/linea_base.json
+    python benchmarks/carga.py --concurrencias 4 --guardar-linea-base benchmarks/linea_base.json
+    python benchmarks/carga.py --ollama-falso --concurrencias 1,4,8 --factor-tiempo 0.1
+=============================================================================
+"""
+
+# -----------------------------------------------------------------------------
+# IMPORTACIONES
+# -----------------------------------------------------------------------------
+import argparse  # Argumentos de línea de comandos
+import asyncio  # Concurrencia del generador
+import json  # Resultados y línea base
+import os  # API_KEY desde el entorno
+import platform  # Metadatos del equipo
+import random  # Tamaños, textos y llegadas (con semilla)
+import statistics  # Media de latencias
+import sys  # Código de salida
+import time  # Reloj del generador
+from collections import Counter  # Conteo de códigos de estado
+from contextlib import asynccontextmanager  # API en proceso
+from datetime import datetime, timezone  # Fecha de la ejecución
+from pathlib import Path  # Rutas de salida
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple  # Tipos para anotaciones
+
+import httpx  # Cliente HTTP asíncrono
+
+# Caracteres aproximados de una página de una providencia
+CARACTERES_POR_PAGINA = 3000
+
+# Frases de relleno con vocabulario jurídico; ninguna activa las reglas
+# determinísticas (no mencionan alumbrado), así que llegan al modelo
+FRASES = [
+    "El despacho procede a resolver la solicitud presentada por la parte actora.",
+    "Se advierte que el término para interponer el recurso se encuentra vencido.",
+    "La entidad demandada contestó la demanda dentro de la oportunidad legal.",
+    "Obra en el expediente el contrato de prestación de servicios suscrito entre las partes.",
+    "El municipio alega la falta de legitimación en la causa por pasiva.",
+    "Se decretan las pruebas documentales aportadas con la demanda.",
+    "La tarifa cobrada en la factura no corresponde al servicio efectivamente prestado.",
+    "El Tribunal confirma la sentencia de primera instancia en todas sus partes.",
+    "Se reconoce personería al apoderado judicial de la parte demandante.",
+    "El acto administrativo acusado fue expedido por funcionario competente.",
+]
+
+
+# -----------------------------------------------------------------------------
+# GENERACIÓN DE PETICIONES
+# -----------------------------------------------------------------------------
+def parsear_mezcla(mezcla: str) -> List[Tuple[str, float]]:
+    """Convierte 'corto:0.8,largo:0.2' en [('corto', 0.8), ('largo', 0.2)]."""
+    pares = []
+    for parte in mezcla.split(","):
+        tipo, peso = parte.split(":")
+        if tipo not in ("corto", "largo"):
+            raise ValueError(f"Tipo de petición desconocido: {tipo}")
+        pares.append((tipo, float(peso)))
+    return pares
+
+
+def generar_texto(rng: random.Random, caracteres: int) -> str:
+    """Genera texto jurídico de relleno de aproximadamente `caracteres` caracteres."""
+    partes, total = [], 0
+    while total < caracteres:
+        frase = rng.choice(FRASES)
+        partes.append(frase)
+        total += len(frase) + 1
+    return " ".join(partes)
+
+
+def generar_peticion(rng: random.Random, tipo: str, paginas: int, indice: int) -> Dict[str, Any]:
+    """
+    Construye el cuerpo de una petición a /api/v1/clasificar.
+
+    Cada petición lleva un identificador único al inicio del texto para que
+    la caché de la API no convierta la prueba en una prueba de la caché.
+    """
+    marca = f"Radicado de prueba {indice}-{rng.getrandbits(32):08x}. "
+    proceso = {"radicacion": f"CARGA-{indice:06d}", "reg": str(indice)}
+    if tipo == "corto":
+        proceso["contenido_demanda"] = marca + generar_texto(rng, 400)
+    else:
+        proceso["texto_pdf_completo"] = marca + generar_texto(rng, paginas * CARACTERES_POR_PAGINA)
+    return proceso
+
+
+class GeneradorPeticiones:
+    """Produce peticiones reproducibles según la mezcla de tamaños y la semilla."""
+
+    def __init__(self, mezcla: List[Tuple[str, float]], paginas: int, semilla: int):
+        self.tipos = [tipo for tipo, _ in mezcla]
+        self.pesos = [peso for _, peso in mezcla]
+        self.paginas = paginas
+        self.rng = random.Random(semilla)
+        self.indice = 0
+
+    def siguiente(self) -> Tuple[str, Dict[str, Any]]:
+        """Devuelve (tipo, cuerpo) de la siguiente petición."""
+        tipo = self.rng.choices(self.tipos, weights=self.pesos)[0]
+        self.indice += 1
+        return tipo, generar_peticion(self.rng, tipo, self.paginas, self.indice)
+
+
+# -----------------------------------------------------------------------------
+# EJECUCIÓN Y MEDICIÓN
+# -----------------------------------------------------------------------------
+def percentil(valores: List[float], p: float) -> Optional[float]:
+    """Percentil p (0-100) con interpolación lineal; None si no hay valores."""
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    posicion = (len(ordenados) - 1) * p / 100
+    inferior = int(posicion)
+    superior = min(inferior + 1, len(ordenados) - 1)
+    return ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * (posicion - inferior)
+
+
+class Medicion:
+    """Acumula el resultado de cada petición de un nivel."""
+
+    def __init__(self):
+        self.latencias_ms: List[float] = []
+        self.estados: Counter = Counter()
+
+    async def enviar(self, cliente: httpx.AsyncClient, endpoint: str, cuerpo: Dict[str, Any]) -> None:
+        """Envía una petición y registra su latencia y su código de estado."""
+        inicio = time.perf_counter()
+        try:
+            respuesta = await cliente.post(endpoint, json=cuerpo)
+            estado = str(respuesta.status_code)
+        except httpx.HTTPError as e:
+            estado = type(e).__name__
+        self.estados[estado] += 1
+        if estado == "200":
+            self.latencias_ms.append((time.perf_counter() - inicio) * 1000)
+
+    def resumen(self, modo: str, valor: float, segundos: float) -> Dict[str, Any]:
+        """Resume el nivel: latencias de las exitosas, throughput y errores."""
+        enviadas = sum(self.estados.values())
+        exitosas = self.estados.get("200", 0)
+
+        def redondear(x: Optional[float]) -> Optional[float]:
+            return round(x, 1) if x is not None else None
+
+        return {
+            "modo": modo,
+            "valor": valor,
+            "segundos": round(segundos, 2),
+            "enviadas": enviadas,
+            "exitosas": exitosas,
+            "tasa_error": round(1 - exitosas / enviadas, 4) if enviadas else 0.0,
+            "throughput_rps": round(exitosas / segundos, 3) if segundos else 0.0,
+            "latencia_ms": {
+                "p50": redondear(percentil(self.latencias_ms, 50)),
+                "p95": redondear(percentil(self.latencias_ms, 95)),
+                "p99": redondear(percentil(self.latencias_ms, 99)),
+                "media": redondear(statistics.mean(self.latencias_ms)) if self.latencias_ms else None,
+                "max": redondear(max(self.latencias_ms)) if self.latencias_ms else None,
+            },
+            "estados": dict(self.estados),
+        }
+
+
+async def lazo_cerrado(cliente: httpx.AsyncClient, args: argparse.Namespace,
+                       generador: GeneradorPeticiones, concurrencia: int) -> Dict[str, Any]:
+    """N clientes concurrentes, cada uno envía la siguiente petición al recibir la anterior."""
+    medicion = Medicion()
+    limite = time.monotonic() + args.duracion if args.duracion else None
+    restantes = [args.peticiones]
+
+    async def usuario() -> None:
+        while (limite is None and restantes[0] > 0) or (limite is not None and time.monotonic() < limite):
+            restantes[0] -= 1
+            _, cuerpo = generador.siguiente()
+            await medicion.enviar(cliente, args.endpoint, cuerpo)
+
+    inicio = time.monotonic()
+    await asyncio.gather(*(usuario() for _ in range(concurrencia)))
+    return medicion.resumen("concurrencia", concurrencia, time.monotonic() - inicio)
+
+
+async def lazo_abierto(cliente: httpx.AsyncClient, args: argparse.Namespace,
+                       generador: GeneradorPeticiones, tasa: float) -> Dict[str, Any]:
+    """Llegadas de Poisson a `tasa` peticiones/segundo, sin esperar las respuestas."""
+    medicion = Medicion()
+    rng = random.Random(args.semilla)
+    duracion = args.duracion or args.peticiones / tasa
+    pendientes = set()
+
+    inicio = time.monotonic()
+    proxima = inicio
+    while proxima - inicio < duracion:
+        await asyncio.sleep(max(0.0, proxima - time.monotonic()))
+        if len(pendientes) >= args.max_pendientes:
+            medicion.estados["descartada_cliente"] += 1  # El generador también se saturó
+        else:
+            _, cuerpo = generador.siguiente()
+            tarea = asyncio.create_task(medicion.enviar(cliente, args.endpoint, cuerpo))
+            pendientes.add(tarea)
+            tarea.add_done_callback(pendientes.discard)
+        proxima += rng.expovariate(tasa)
+    await asyncio.gather(*pendientes)
+    return medicion.resumen("tasa", tasa, time.monotonic() - inicio)
+
+
+# -----------------------------------------------------------------------------
+# LÍNEA BASE
+# -----------------------------------------------------------------------------
+def comparar(actual: Dict[str, Any], base: Dict[str, Any], tolerancia: float) -> List[str]:
+    """
+    Compara cada nivel con el mismo nivel de la línea base.
+
+    Returns:
+        List[str]: Regresiones encontradas (vacía si no hay)
+    """
+    niveles_base = {(n["modo"], n["valor"]): n for n in base["niveles"]}
+    regresiones = []
+    print("\n=== COMPARACIÓN CON LA LÍNEA BASE ===")
+    for nivel in actual["niveles"]:
+        clave = (nivel["modo"], nivel["valor"])
+        anterior = niveles_base.get(clave)
+        if anterior is None:
+            print(f"{clave}: sin nivel equivalente en la línea base")
+            continue
+        p95, p95_base = nivel["latencia_ms"]["p95"], anterior["latencia_ms"]["p95"]
+        rps, rps_base = nivel["throughput_rps"], anterior["throughput_rps"]
+        error, error_base = nivel["tasa_error"], anterior["tasa_error"]
+        print(
+            f"{clave[0]}={clave[1]}: p95 {p95_base} -> {p95} ms, "
+            f"throughput {rps_base} -> {rps} req/s, error {error_base:.2%} -> {error:.2%}"
+        )
+        if p95 is not None and p95_base and p95 > p95_base * (1 + tolerancia):
+            regresiones.append(f"{clave}: p95 empeoró {p95 / p95_base - 1:.1%}")
+        if rps_base and rps < rps_base * (1 - tolerancia):
+            regresiones.append(f"{clave}: throughput cayó {1 - rps / rps_base:.1%}")
+        if error > error_base + 0.01:
+            regresiones.append(f"{clave}: tasa de error subió de {error_base:.2%} a {error:.2%}")
+    return regresiones
+
+
+# -----------------------------------------------------------------------------
+# API EN PROCESO CONTRA EL OLLAMA FALSO
+# -----------------------------------------------------------------------------
+@asynccontextmanager
+async def api_en_proceso(factor_tiempo: float) -> AsyncIterator[Tuple[httpx.AsyncBaseTransport, str]]:
+    """
+    Arranca la API (con su lifespan) conectada al Ollama falso, sin red.
+
+    Args:
+        factor_tiempo: Escala de las esperas del modelo simulado
+
+    Yields:
+        Tuple: Transporte httpx hacia la API y su API key
+    """
+    sys.path.insert(0, str(Path(__file__).parent.parent / "api"))
+    import app.main as api_main
+    from ollama_falso import ConfigOllamaFalso, crear_app
+
+    settings = api_main.settings
+    falso = crear_app(ConfigOllamaFalso(
+        modelos=[settings.model_name],
+        slots=settings.ollama_num_parallel,
+        factor_tiempo=factor_tiempo
+    ))
+    crear_original = api_main.crear_cliente_ollama
+    api_main.crear_cliente_ollama = lambda s: crear_original(s, transport=httpx.ASGITransport(app=falso))
+    try:
+        async with api_main.app.router.lifespan_context(api_main.app):
+            yield httpx.ASGITransport(app=api_main.app), settings.api_key
+    finally:
+        api_main.crear_cliente_ollama = crear_original
+        print(f"Ollama falso: {falso.state.falso.estadisticas}")
+
+
+# -----------------------------------------------------------------------------
+# PROGRAMA PRINCIPAL
+# -----------------------------------------------------------------------------
+async def ejecutar(args: argparse.Namespace) -> Dict[str, Any]:
+    """Ejecuta todos los niveles pedidos y devuelve el reporte completo."""
+    if args.ollama_falso:
+        async with api_en_proceso(args.factor_tiempo) as (transporte, api_key):
+            args.transporte, args.api_key = transporte, api_key
+            return await medir(args)
+    return await medir(args)
+
+
+async def medir(args: argparse.Namespace) -> Dict[str, Any]:
+    """Ejecuta los niveles contra la API indicada en args."""
+    generador = GeneradorPeticiones(parsear_mezcla(args.mezcla), args.paginas, args.semilla)
+    concurrencias = [int(c) for c in args.concurrencias.split(",")] if args.concurrencias else []
+    tasas = [float(t) for t in args.tasas.split(",")] if args.tasas else []
+
+    limites = httpx.Limits(max_connections=args.max_pendientes, max_keepalive_connections=args.max_pendientes)
+    niveles = []
+    async with httpx.AsyncClient(
+        base_url=args.url,
+        headers={"X-API-Key": args.api_key},
+        timeout=args.timeout,
+        limits=limites,
+        transport=args.transporte
+    ) as cliente:
+        for concurrencia in concurrencias:
+            niveles.append(await lazo_cerrado(cliente, args, generador, concurrencia))
+            imprimir_nivel(niveles[-1])
+        for tasa in tasas:
+            niveles.append(await lazo_abierto(cliente, args, generador, tasa))
+            imprimir_nivel(niveles[-1])
+
+    return {
+        "meta": {
+            "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "url": "en proceso (ollama falso)" if args.ollama_falso else args.url,
+            "endpoint": args.endpoint,
+            "mezcla": args.mezcla,
+            "paginas": args.paginas,
+            "semilla": args.semilla,
+            "python": platform.python_version(),
+            "equipo": platform.node(),
+        },
+        "niveles": niveles,
+    }
+
+
+def imprimir_nivel(nivel: Dict[str, Any]) -> None:
+    """Imprime una línea de resumen por nivel."""
+    latencia = nivel["latencia_ms"]
+    print(
+        f"{nivel['modo']}={nivel['valor']}: {nivel['exitosas']}/{nivel['enviadas']} ok, "
+        f"{nivel['throughput_rps']} req/s, p50 {latencia['p50']} ms, p95 {latencia['p95']} ms, "
+        f"p99 {latencia['p99']} ms, error {nivel['tasa_error']:.2%} {nivel['estados']}"
+    )
+
+
+def crear_parser() -> argparse.ArgumentParser:
+    """Argumentos de línea de comandos."""
+    parser = argparse.ArgumentParser(description="Generador de carga de la API de clasificación")
+    parser.add_argument("--url", default="http://localhost:8000", help="URL base de la API")
+    parser.add_argument("--api-key", default=os.environ.get("API_KEY", ""), help="API key (por defecto $API_KEY)")
+    parser.add_argument("--endpoint", default="/api/v1/clasificar", help="Endpoint a probar")
+    parser.add_argument("--concurrencias", default="", help="Niveles de lazo cerrado, ej: 1,4,8")
+    parser.add_argument("--tasas", default="", help="Niveles de lazo abierto en peticiones/s, ej: 0.5,1,2")
+    parser.add_argument("--peticiones", type=int, default=50, help="Peticiones por nivel (si no hay --duracion)")
+    parser.add_argument("--duracion", type=float, default=0, help="Segundos por nivel (0 = usar --peticiones)")
+    parser.add_argument("--mezcla", default="corto:0.8,largo:0.2", help="Distribución de tamaños")
+    parser.add_argument("--paginas", type=int, default=100, help="Páginas de las peticiones largas")
+    parser.add_argument("--semilla", type=int, default=42, help="Semilla de textos, tamaños y llegadas")
+    parser.add_argument("--timeout", type=float, default=600.0, help="Timeout por petición (segundos)")
+    parser.add_argument("--max-pendientes", type=int, default=256, help="Peticiones abiertas como máximo")
+    parser.add_argument("--salida", help="Archivo JSON donde guardar los resultados")
+    parser.add_argument("--linea-base", help="Resultados anteriores contra los que comparar")
+    parser.add_argument("--guardar-linea-base", help="Guardar estos resultados como nueva línea base")
+    parser.add_argument("--tolerancia", type=float, default=0.10, help="Empeoramiento tolerado (0.10 = 10%%)")
+    parser.add_argument("--ollama-falso", action="store_true", help="API en proceso contra el Ollama falso (sin red)")
+    parser.add_argument("--factor-tiempo", type=float, default=1.0, help="Escala de las esperas del Ollama falso")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None, transporte: Optional[httpx.AsyncBaseTransport] = None) -> int:
+    """
+    Punto de entrada; devuelve el código de salida.
+
+    Args:
+        argv: Argumentos (None = sys.argv)
+        transporte: Transporte httpx alternativo (ej: ASGITransport para probar sin red)
+    """
+    args = crear_parser().parse_args(argv)
+    if not args.concurrencias and not args.tasas:
+        args.concurrencias = "1"
+    args.transporte = transporte
+
+    reporte = asyncio.run(ejecutar(args))
+    texto = json.dumps(reporte, indent=2, ensure_ascii=False)
+    for ruta in filter(None, (args.salida, args.guardar_linea_base)):
+        Path(ruta).write_text(texto, encoding="utf-8")
+
+    if args.linea_base:
+        base = json.loads(Path(args.linea_base).read_text(encoding="utf-8"))
+        regresiones = comparar(reporte, base, args.tolerancia)
+        if regresiones:
+            print("\nREGRESIONES:")
+            for regresion in regresiones:
+                print(f"  - {regresion}")
+            return 1
+        print("\nSin regresiones respecto a la línea base")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""
+=============================================================================
+MEDICIÓN DEL ÍNDICE DE CASI DUPLICADOS - medir_duplicados.py
+=============================================================================
+Llena el índice SimHash con N huellas aleatorias y mide la latencia de
+búsqueda (huellas desconocidas y casi duplicadas a distancia_max bits),
+la memoria usada y el coste de calcular la huella de un documento.
+
+No necesita Ollama ni la API en marcha.
+
+Uso:
+    python benchmarks/medir_duplicados.py --entradas 1000000 --distancia 4
+=============================================================================
+"""
+
+# -----------------------------------------------------------------------------
+# IMPORTACIONES
+# -----------------------------------------------------------------------------
+import argparse  # Argumentos de línea de comandos
+import asyncio  # agregar_huella es asíncrono
+import random  # Huellas aleatorias (con semilla)
+import resource  # Memoria máxima del proceso
+import sys  # Para importar la app
+import time  # Cronómetro
+from pathlib import Path  # Ruta de la app
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "api"))
+
+from app.services.duplicados import BITS, IndiceDuplicados, huella_simhash  # noqa: E402
+
+
+def percentiles_us(tiempos):
+    """p50 y p99 en microsegundos."""
+    ordenados = sorted(tiempos)
+    return (
+        round(ordenados[len(ordenados) // 2] * 1e6, 1),
+        round(ordenados[int(len(ordenados) * 0.99)] * 1e6, 1),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Latencia del índice de casi duplicados")
+    parser.add_argument("--entradas", type=int, default=1_000_000, help="Huellas en el índice")
+    parser.add_argument("--distancia", type=int, default=4, help="distancia_max del índice")
+    parser.add_argument("--consultas", type=int, default=10_000, help="Búsquedas por escenario")
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.semilla)
+    indice = IndiceDuplicados(args.distancia, max_entradas=args.entradas)
+    resultado = {"es_relevante": False, "confianza": 0.2, "razon": "Auto de notificación sin relación"}
+
+    memoria_inicial = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    inicio = time.perf_counter()
+    huellas = [rng.getrandbits(BITS) for _ in range(args.entradas)]
+
+    async def cargar():
+        for huella in huellas:
+            await indice.agregar_huella(huella, resultado)
+
+    asyncio.run(cargar())
+    carga = time.perf_counter() - inicio
+    memoria_mb = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - memoria_inicial) / 1024
+    print(f"{len(indice)} huellas cargadas en {carga:.1f}s (~{memoria_mb:.0f} MB)")
+
+    def medir(consultas):
+        tiempos, aciertos = [], 0
+        for huella in consultas:
+            t = time.perf_counter()
+            aciertos += indice.buscar_huella(huella) is not None
+            tiempos.append(time.perf_counter() - t)
+        return percentiles_us(tiempos), aciertos
+
+    desconocidas = [rng.getrandbits(BITS) for _ in range(args.consultas)]
+    cercanas = []
+    for _ in range(args.consultas):
+        huella = rng.choice(huellas)
+        for bit in rng.sample(range(BITS), args.distancia):
+            huella ^= 1 << bit
+        cercanas.append(huella)
+
+    for nombre, consultas in (("desconocidas", desconocidas), ("casi duplicadas", cercanas)):
+        (p50, p99), aciertos = medir(consultas)
+        print(f"{nombre}: p50 {p50} µs, p99 {p99} µs, aciertos {aciertos}/{len(consultas)}")
+
+    documento = " ".join(f"palabra{rng.randrange(5000)}" for _ in range(3000))
+    inicio = time.perf_counter()
+    for _ in range(20):
+        huella_simhash(documento)
+    print(f"huella de un documento de 3000 palabras: {(time.perf_counter() - inicio) / 20 * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+=============================================================================
+MEDICIÓN DE LA SERIALIZACIÓN JSON - medir_json.py
+=============================================================================
+Mide el CPU por petición de decodificar y codificar procesos con textos de
+10 KB, 1 MB y 10 MB, con el camino estándar de FastAPI y con el camino
+rápido (app/services/serializacion.py):
+
+- Lote: json.loads + validación (FastAPI) frente a orjson + validación
+- Respuesta: jsonable_encoder + JSONResponse (json.dumps) frente a
+  respuesta_json (model_dump + orjson)
+- NDJSON: model_validate_json + model_dump_json frente a orjson
+
+No necesita Ollama ni la API en marcha.
+
+Uso:
+    python benchmarks/medir_json.py --tamanos 10000,1000000,10000000
+=============================================================================
+"""
+
+# -----------------------------------------------------------------------------
+# IMPORTACIONES
+# -----------------------------------------------------------------------------
+import argparse  # Argumentos de línea de comandos
+import json  # Decodificador estándar (el que usa FastAPI)
+import sys  # Para importar la app
+import time  # CPU del proceso
+from pathlib import Path  # Ruta de la app
+from typing import List  # Tipos para anotaciones
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "api"))
+
+import orjson  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from starlette.responses import JSONResponse  # noqa: E402
+from app.models import ModoRespuesta, ProcesoLegalRequest, ResultadoLoteItem  # noqa: E402
+from app.services.clasificador import construir_respuesta  # noqa: E402
+from app.services.serializacion import decodificar, linea_ndjson, respuesta_json, validar_cuerpo  # noqa: E402
+
+LOTE = TypeAdapter(List[ProcesoLegalRequest])
+CLASIFICACION = {"es_relevante": False, "confianza": 0.2, "razon": "Sin relación", "metodo_clasificacion": "IA"}
+
+
+def cpu_ms(funcion, repeticiones: int) -> float:
+    """CPU medio (ms) de una llamada, tras una llamada de calentamiento."""
+    funcion()
+    inicio = time.process_time()
+    for _ in range(repeticiones):
+        funcion()
+    return (time.process_time() - inicio) / repeticiones * 1000
+
+
+def texto_de(tamano: int) -> str:
+    """Texto de un auto con tildes, comillas y saltos de línea."""
+    linea = "Demanda de nulidad contra el municipio por el \"cobro\" de la tarifa, según el artículo 5.\n"
+    return (linea * (tamano // len(linea) + 1))[:tamano]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="CPU por petición de la serialización JSON")
+    parser.add_argument("--tamanos", default="10000,1000000,10000000", help="Bytes del texto, separados por comas")
+    parser.add_argument("--repeticiones", type=int, default=0, help="0 = según el tamaño")
+    args = parser.parse_args()
+
+    print(f"{'tamaño':>10} {'etapa':<10} {'FastAPI ms':>11} {'rápido ms':>10} {'ahorro ms':>10} {'x':>6}")
+    for tamano in map(int, args.tamanos.split(",")):
+        repeticiones = args.repeticiones or max(3, 20_000_000 // (tamano * 10))
+        proceso = {"radicacion": "11001-03-15-000-2024-00001-00", "texto_pdf_completo": texto_de(tamano)}
+        cuerpo_lote = json.dumps([proceso]).encode()
+        linea = json.dumps(proceso).encode()
+        request = ProcesoLegalRequest(**proceso)
+        respuesta = construir_respuesta(request, ModoRespuesta.completo, **CLASIFICACION)
+        item = ResultadoLoteItem(indice=0, resultado=respuesta)
+
+        etapas = {
+            "lote": (
+                lambda: LOTE.validate_python(json.loads(cuerpo_lote)),
+                lambda: validar_cuerpo(LOTE, decodificar(cuerpo_lote)),
+            ),
+            "respuesta": (
+                lambda: JSONResponse(jsonable_encoder(respuesta)).body,
+                lambda: respuesta_json(respuesta).body,
+            ),
+            "ndjson": (
+                lambda: ResultadoLoteItem(
+                    indice=0,
+                    resultado=construir_respuesta(
+                        ProcesoLegalRequest.model_validate_json(linea), ModoRespuesta.completo, **CLASIFICACION
+                    )
+                ).model_dump_json() + "\n",
+                lambda: linea_ndjson(ResultadoLoteItem(
+                    indice=0,
+                    resultado=construir_respuesta(
+                        ProcesoLegalRequest.model_validate(orjson.loads(linea)), ModoRespuesta.completo,
+                        **CLASIFICACION
+                    )
+                )),
+            ),
+        }
+        assert orjson.loads(etapas["respuesta"][1]()) == json.loads(etapas["respuesta"][0]())
+        assert orjson.loads(linea_ndjson(item)) == json.loads(item.model_dump_json())
+
+        for nombre, (estandar, rapido) in etapas.items():
+            antes, despues = cpu_ms(estandar, repeticiones), cpu_ms(rapido, repeticiones)
+            print(
+                f"{tamano:>10} {nombre:<10} {antes:>11.3f} {despues:>10.3f} "
+                f"{antes - despues:>10.3f} {antes / max(despues, 1e-9):>6.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
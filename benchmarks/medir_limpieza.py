@@ -0,0 +1,200 @@
+"""
+=============================================================================
+MEDICIÓN DE LA LIMPIEZA DEL TEXTO - medir_limpieza.py
+=============================================================================
+Pasa un conjunto de referencia de documentos con la forma del texto
+extraído de un PDF (encabezados y pies en cada página, números de página,
+palabras partidas con guion, índices con puntos de relleno y bloque de
+firma electrónica) por la limpieza de app/services/limpieza.py y reporta
+por documento:
+
+- Tokens estimados del texto y del extracto, sin y con limpieza
+- Si las reglas deciden lo mismo sobre el texto limpio
+
+Con --ollama además clasifica cada documento con el extracto sin limpiar
+y con el limpio, y compara es_relevante, prompt_eval_count y
+prompt_eval_duration.
+
+Uso:
+    python benchmarks/medir_limpieza.py
+    python benchmarks/medir_limpieza.py --documentos procesos.jsonl
+    python benchmarks/medir_limpieza.py --ollama http://localhost:11434 --modelo qwen2.5:3b
+=============================================================================
+"""
+
+# -----------------------------------------------------------------------------
+# IMPORTACIONES
+# -----------------------------------------------------------------------------
+import argparse  # Argumentos de línea de comandos
+import asyncio  # Cliente asíncrono de Ollama
+import json  # Lectura de documentos
+import random  # Documentos de referencia (con semilla)
+import statistics  # Medias
+import sys  # Para importar la app
+from pathlib import Path  # Rutas
+from typing import Any, Dict, List, Tuple  # Tipos para anotaciones
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "api"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from carga import generar_texto  # noqa: E402  Texto jurídico de relleno
+from app.config import Settings  # noqa: E402  Presupuesto del extracto
+from app.services.clasificador import OPCIONES_GENERACION  # noqa: E402  Mismas opciones que la API
+from app.services.extractos import extraer_fragmentos  # noqa: E402  Extracto enviado al modelo
+from app.services.limpieza import limpiar_texto  # noqa: E402  Etapa medida
+from app.services.prompts import obtener_plantilla  # noqa: E402  Registro de prompts
+from app.services.reglas import evaluar_reglas  # noqa: E402  Decisión sin modelo
+from app.services.salida_modelo import ESQUEMA_CLASIFICACION, interpretar_salida  # noqa: E402
+from app.services.tokens import estimar_tokens  # noqa: E402  Tokens estimados
+
+# Hechos del documento de referencia: (frase, es_relevante esperado)
+HECHOS = [
+    ("La demanda cuestiona la liquidación del impuesto de alumbrado público del municipio.", True),
+    ("Se discute el contrato de concesión con DOLMEN para la modernización de luminarias.", True),
+    ("El actor reclama por el cobro de la tarifa de iluminación en el recibo de energía.", True),
+    ("La acción de tutela se dirige contra la EPS por la negación de un medicamento.", False),
+    ("Se demanda la nulidad del acto que negó la pensión de sobrevivientes.", False),
+    ("El proceso versa sobre la responsabilidad del municipio por una inundación.", False),
+]
+
+CABECERA = (
+    "REPÚBLICA DE COLOMBIA\n"
+    "TRIBUNAL ADMINISTRATIVO DE CUNDINAMARCA - SECCIÓN PRIMERA\n"
+    "Radicación: 25000-23-41-000-{anio}-{numero:05d}-00"
+)
+FIRMA = (
+    "Documento firmado electrónicamente por: MAGISTRADO PONENTE\n"
+    "Código de verificación: {codigo}\n"
+    "Valide este documento en https://samai.consejodeestado.gov.co/validar"
+)
+
+
+def documento_pdf(rng: random.Random, numero: int, paginas: int) -> Tuple[str, bool]:
+    """Documento con la forma del texto de un PDF: páginas separadas por \\f."""
+    hecho, relevante = HECHOS[numero % len(HECHOS)]
+    cabecera = CABECERA.format(anio=2020 + numero % 5, numero=numero)
+    indice = "\n".join(f"{titulo} {'.' * 40} {n}" for n, titulo in enumerate(["ANTECEDENTES", "CONSIDERACIONES"], 2))
+    hojas = []
+    for pagina in range(1, paginas + 1):
+        cuerpo = generar_texto(rng, 2500)
+        if pagina == 2:
+            cuerpo = hecho + " " + cuerpo
+        # Líneas de ~90 caracteres cortadas en espacios; algunas palabras partidas con guion
+        lineas, actual = [], ""
+        for palabra in cuerpo.split():
+            if len(actual) + len(palabra) > 90:
+                if len(palabra) > 8 and rng.random() < 0.3:
+                    corte = len(palabra) // 2
+                    lineas.append(f"{actual} {palabra[:corte]}-")
+                    actual = palabra[corte:]
+                    continue
+                lineas.append(actual)
+                actual = palabra
+            else:
+                actual = f"{actual} {palabra}".strip()
+        lineas.append(actual)
+        partes = [cabecera, indice if pagina == 1 else "", "\n".join(lineas), f"Página {pagina} de {paginas}"]
+        if pagina == paginas:
+            partes.insert(3, FIRMA.format(codigo=f"{rng.getrandbits(128):032x}"))
+        hojas.append("\n".join(p for p in partes if p))
+    return "\f".join(hojas), relevante
+
+
+def cargar_documentos(ruta: str) -> List[Tuple[str, Any]]:
+    """Lee un JSONL de procesos (es_relevante opcional)."""
+    documentos = []
+    with open(ruta, encoding="utf-8") as archivo:
+        for linea in archivo:
+            if linea.strip():
+                proceso = json.loads(linea)
+                texto = proceso.get("texto_pdf_completo") or proceso.get("contenido_demanda") or ""
+                if texto.strip():
+                    documentos.append((texto, proceso.get("es_relevante")))
+    return documentos
+
+
+def extracto(texto: str, settings: Settings) -> str:
+    """Extracto con la configuración por defecto de la API."""
+    return extraer_fragmentos(
+        texto, settings.extracto_max_caracteres, settings.extracto_ventana, settings.extracto_cabecera
+    ).texto
+
+
+async def clasificar(cliente, modelo: str, texto: str) -> Dict[str, Any]:
+    """Clasifica un extracto y devuelve es_relevante y las métricas del prompt."""
+    respuesta = await cliente.chat(
+        model=modelo,
+        messages=obtener_plantilla("clasificar_dolmen").mensajes(texto),
+        format=ESQUEMA_CLASIFICACION,
+        options=OPCIONES_GENERACION
+    )
+    clasificacion, _ = interpretar_salida(respuesta["message"]["content"])
+    return {
+        "es_relevante": clasificacion["es_relevante"],
+        "tokens": respuesta.get("prompt_eval_count") or 0,
+        "ms": (respuesta.get("prompt_eval_duration") or 0) / 1e6,
+    }
+
+
+async def comparar_con_ollama(args: argparse.Namespace, pares: List[Tuple[str, str, Any]]) -> None:
+    """Clasifica cada extracto sin y con limpieza y compara resultados y prompt_eval."""
+    import ollama  # Solo hace falta con --ollama
+
+    cliente = ollama.AsyncClient(host=args.ollama, timeout=args.timeout)
+    await clasificar(cliente, args.modelo, pares[0][0])  # Calentamiento
+    iguales, ms_crudo, ms_limpio = 0, [], []
+    for crudo, limpio, esperado in pares:
+        a = await clasificar(cliente, args.modelo, crudo)
+        b = await clasificar(cliente, args.modelo, limpio)
+        iguales += a["es_relevante"] == b["es_relevante"]
+        ms_crudo.append(a["ms"])
+        ms_limpio.append(b["ms"])
+        print(
+            f"  esperado {esperado!s:5}  sin limpiar {a['es_relevante']!s:5} ({a['tokens']} tok, {a['ms']:.0f} ms)"
+            f"  limpio {b['es_relevante']!s:5} ({b['tokens']} tok, {b['ms']:.0f} ms)"
+        )
+    print(
+        f"Clasificaciones iguales: {iguales}/{len(pares)}  "
+        f"prompt_eval medio: {statistics.mean(ms_crudo):.0f} -> {statistics.mean(ms_limpio):.0f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Reducción de tokens de la limpieza del texto")
+    parser.add_argument("--documentos", help="JSONL de procesos (si no, conjunto de referencia)")
+    parser.add_argument("--cantidad", type=int, default=12, help="Documentos de referencia")
+    parser.add_argument("--paginas", type=int, default=20, help="Páginas por documento de referencia")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--ollama", help="URL de Ollama para comparar las clasificaciones")
+    parser.add_argument("--modelo", default="qwen2.5:3b", help="Modelo a usar con --ollama")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Timeout por petición (segundos)")
+    args = parser.parse_args()
+
+    settings = Settings(api_key="medicion")
+    rng = random.Random(args.semilla)
+    documentos = (
+        cargar_documentos(args.documentos) if args.documentos
+        else [documento_pdf(rng, numero, args.paginas) for numero in range(args.cantidad)]
+    )
+
+    print(f"{'doc':>4} {'tokens':>8} {'limpio':>8} {'reducción':>10} {'extracto':>9} {'limpio':>8} {'reglas':>7}")
+    pares, reducciones = [], []
+    for numero, (texto, esperado) in enumerate(documentos):
+        limpio = limpiar_texto(texto, settings.limpieza_min_repeticiones)
+        crudo_extracto, limpio_extracto = extracto(texto, settings), extracto(limpio.texto, settings)
+        reglas_crudo, reglas_limpio = evaluar_reglas(texto), evaluar_reglas(limpio.texto)
+        iguales = (reglas_crudo.decidido, reglas_crudo.es_relevante) == (reglas_limpio.decidido, reglas_limpio.es_relevante)
+        reducciones.append(limpio.reduccion_tokens)
+        pares.append((crudo_extracto, limpio_extracto, esperado))
+        print(
+            f"{numero:>4} {limpio.tokens_original:>8} {limpio.tokens:>8} {limpio.reduccion_tokens:>10.1%} "
+            f"{estimar_tokens(crudo_extracto):>9} {estimar_tokens(limpio_extracto):>8} {'=' if iguales else 'DIFF':>7}"
+        )
+    print(f"Reducción media de tokens: {statistics.mean(reducciones):.1%}")
+
+    if args.ollama:
+        asyncio.run(comparar_con_ollama(args, pares))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+=============================================================================
+MEDICIÓN DE REUTILIZACIÓN DEL PREFIJO - medir_prefijo.py
+=============================================================================
+Mide cuánto prompt evalúa Ollama por petición con y sin reutilización del
+prefijo (caché KV de llama.cpp) para la plantilla activa del clasificador.
+
+Escenarios (cada uno en secuencia, sobre los mismos documentos):
+- reutilizado: mensajes tal como los envía la API (system estable + user)
+- sin_reutilizar: igual, pero con un nonce al inicio del mensaje system,
+  que obliga a re-evaluar las instrucciones en cada petición
+- version_1: la plantilla original (instrucciones y texto en un solo user)
+
+Para cada escenario reporta tokens evaluados (prompt_eval_count) y tiempo
+de evaluación del prompt (prompt_eval_duration). Se generan muy pocos
+tokens para aislar la fase de prompt.
+
+Uso (con Ollama corriendo y el modelo descargado):
+    python benchmarks/medir_prefijo.py --host http://localhost:11434
+    python benchmarks/medir_prefijo.py --documentos procesos.jsonl --salida prefijo.json
+=============================================================================
+"""
+
+# -----------------------------------------------------------------------------
+# IMPORTACIONES
+# -----------------------------------------------------------------------------
+import argparse  # Argumentos de línea de comandos
+import asyncio  # Cliente asíncrono de Ollama
+import json  # Lectura de documentos y salida del reporte
+import statistics  # Medianas y medias
+import sys  # Para importar la app
+import uuid  # Nonce que rompe el prefijo
+from pathlib import Path  # Rutas
+from typing import Any, Dict, List  # Tipos para anotaciones
+
+import ollama  # Cliente para el servidor de modelos Ollama
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "api"))
+from app.services.clasificador import OPCIONES_GENERACION  # noqa: E402  Mismas opciones que la API
+from app.services.prompts import obtener_plantilla  # noqa: E402  Registro de prompts
+
+# Documentos de ejemplo si no se pasa --documentos (distintos entre sí)
+DOCUMENTOS_EJEMPLO = [
+    "Acción de tutela contra el municipio por el cobro del impuesto predial del año 2021.",
+    "Demanda de nulidad contra el acuerdo municipal que fijó la tarifa del servicio de aseo.",
+    "Reparación directa por la falla en la red de acueducto que inundó la vivienda del actor.",
+    "Controversia contractual por el contrato de suministro de luminarias LED para la vía principal.",
+    "Nulidad y restablecimiento del derecho de un docente por la liquidación de sus cesantías.",
+    "Demanda contra la empresa de energía por cortes del servicio residencial en el barrio.",
+]
+
+
+def cargar_documentos(ruta: str) -> List[str]:
+    """Lee un JSONL de procesos y devuelve sus textos."""
+    textos = []
+    with open(ruta, encoding="utf-8") as archivo:
+        for linea in archivo:
+            if linea.strip():
+                proceso = json.loads(linea)
+                texto = proceso.get("texto_pdf_completo") or proceso.get("contenido_demanda") or ""
+                if texto.strip():
+                    textos.append(texto)
+    return textos
+
+
+def mensajes_escenario(escenario: str, texto: str, version: str) -> List[Dict[str, str]]:
+    """Construye los mensajes de un escenario para un texto."""
+    if escenario == "version_1":
+        return obtener_plantilla("clasificar_dolmen", "1").mensajes(texto)
+    mensajes = obtener_plantilla("clasificar_dolmen", version or None).mensajes(texto)
+    if escenario == "sin_reutilizar":
+        mensajes[0] = {**mensajes[0], "content": f"[{uuid.uuid4().hex}]\n" + mensajes[0]["content"]}
+    return mensajes
+
+
+async def medir(cliente: ollama.AsyncClient, modelo: str, escenario: str,
+                documentos: List[str], version: str) -> Dict[str, Any]:
+    """
+    Ejecuta un escenario y resume prompt_eval_count y prompt_eval_duration.
+
+    La primera petición (calentamiento) no se cuenta.
+    """
+    opciones = {**OPCIONES_GENERACION, "num_predict": 1}
+    tokens, milisegundos = [], []
+    for indice, texto in enumerate([documentos[0]] + documentos):
+        respuesta = await cliente.chat(
+            model=modelo,
+            messages=mensajes_escenario(escenario, texto, version),
+            options=opciones
+        )
+        if indice == 0:
+            continue
+        tokens.append(respuesta.get("prompt_eval_count") or 0)
+        milisegundos.append((respuesta.get("prompt_eval_duration") or 0) / 1e6)
+    return {
+        "escenario": escenario,
+        "peticiones": len(tokens),
+        "tokens_evaluados_media": round(statistics.mean(tokens), 1),
+        "prompt_eval_ms_media": round(statistics.mean(milisegundos), 1),
+        "prompt_eval_ms_p50": round(statistics.median(milisegundos), 1),
+    }
+
+
+async def principal(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """Ejecuta los tres escenarios en secuencia."""
+    documentos = cargar_documentos(args.documentos) if args.documentos else DOCUMENTOS_EJEMPLO
+    documentos = documentos[:args.max_documentos]
+    cliente = ollama.AsyncClient(host=args.host, timeout=args.timeout)
+    resultados = []
+    for escenario in ("reutilizado", "sin_reutilizar", "version_1"):
+        resultado = await medir(cliente, args.modelo, escenario, documentos, args.version)
+        print(
+            f"{escenario:15s} tokens evaluados: {resultado['tokens_evaluados_media']:8.1f}  "
+            f"prompt_eval: {resultado['prompt_eval_ms_media']:8.1f} ms (p50 {resultado['prompt_eval_ms_p50']:.1f})"
+        )
+        resultados.append(resultado)
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mide la reutilización del prefijo del prompt en Ollama")
+    parser.add_argument("--host", default="http://localhost:11434", help="URL de Ollama")
+    parser.add_argument("--modelo", default="qwen2.5:3b", help="Modelo a usar")
+    parser.add_argument("--version", default="", help="Versión de clasificar_dolmen (vacío = la más reciente)")
+    parser.add_argument("--documentos", help="JSONL de procesos (texto_pdf_completo o contenido_demanda)")
+    parser.add_argument("--max-documentos", type=int, default=20, help="Documentos por escenario")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Timeout por petición (segundos)")
+    parser.add_argument("--salida", help="Archivo JSON donde guardar el reporte")
+    args = parser.parse_args()
+
+    reporte = asyncio.run(principal(args))
+    if args.salida:
+        Path(args.salida).write_text(json.dumps(reporte, indent=2, ensure_ascii=False), encoding="utf-8")
@@ -0,0 +1,449 @@
+"""
+=============================================================================
+SERVIDOR OLLAMA FALSO - ollama_falso.py
+=============================================================================
+Sustituto local de Ollama que habla su API HTTP, para medir el coste
+propio de la API (concurrencia, colas, parseo, serialización) y ejecutar
+tests y pruebas de carga sin modelo, de forma determinística.
+
+Endpoints implementados:
+- POST /api/chat (con y sin stream), POST /api/generate (precarga)
+- POST /api/embeddings (bolsa de palabras con hashing: textos con las
+  mismas palabras dan vectores similares)
+- GET /api/tags (modelos descargados), GET /api/ps (modelos en memoria)
+- GET /falso/estadisticas (contadores del propio servidor falso)
+
+Comportamiento configurable (ConfigOllamaFalso):
+- Carga del modelo: demora en la primera petición, tras vencer keep_alive
+  o al pedir otro num_ctx (como Ollama, que recarga el modelo); un prompt
+  más largo que num_ctx se cuenta como truncado
+- Velocidad de evaluación del prompt y de generación (tokens/s); el prefijo
+  repetido en el mismo slot no se vuelve a evaluar (como la caché KV)
+- Slots paralelos (OLLAMA_NUM_PARALLEL): las peticiones de más esperan
+- Fallos inyectados (HTTP 500) y salidas JSON inválidas o truncadas
+- Texto tras el JSON (texto_tras_json) para medir el corte anticipado del
+  stream; los streams que el cliente corta se cuentan en streams_cortados
+- factor_tiempo=0 elimina todas las esperas (tests)
+
+La respuesta es determinística: relevante si el mensaje user menciona
+alumbrado, iluminación, luminarias o DOLMEN.
+
+Uso como servidor (la API se apunta con OLLAMA_HOST/OLLAMA_PORT):
+    python benchmarks/ollama_falso.py --puerto 11434 --slots 4 --tokens-generacion 30
+
+Uso en tests (sin red):
+    transporte = httpx.ASGITransport(app=crear_app(ConfigOllamaFalso(factor_tiempo=0)))
+    cliente, http = crear_cliente_ollama(settings, transport=transporte)
+=============================================================================
+"""
+
+# -----------------------------------------------------------------------------
+# IMPORTACIONES
+# -----------------------------------------------------------------------------
+import argparse  # Argumentos de línea de comandos
+import asyncio  # Esperas simuladas y slots
+import hashlib  # Embeddings determinísticos
+import json  # Cuerpos de respuesta
+import random  # Fallos inyectados (con semilla)
+import re  # Duraciones de keep_alive
+import time  # Reloj de carga y keep_alive
+from dataclasses import dataclass, field  # Configuración
+from datetime import datetime, timedelta, timezone  # Fechas en formato Ollama
+from typing import Any, AsyncIterator, Dict, List, Optional  # Tipos para anotaciones
+
+from fastapi import FastAPI, Request  # Servidor HTTP
+from fastapi.responses import JSONResponse, StreamingResponse  # Respuestas
+
+# Caracteres por token (aproximación para textos en español)
+CARACTERES_POR_TOKEN = 4
+
+# Dimensión de los embeddings simulados
+DIMENSION_EMBEDDING = 64
+
+# Palabras que hacen "relevante" un texto para el modelo falso
+SENALES_RELEVANCIA = ("alumbrado", "iluminación", "iluminacion", "luminaria", "dolmen")
+
+
+@dataclass
+class ConfigOllamaFalso:
+    """
+    Comportamiento del servidor falso.
+
+    Attributes:
+        modelos: Modelos "descargados" (/api/tags)
+        carga_segundos: Demora de carga del modelo en memoria
+        tokens_prompt_por_segundo: Velocidad de evaluación del prompt
+        tokens_generacion_por_segundo: Velocidad de generación
+        slots: Peticiones atendidas en paralelo (como OLLAMA_NUM_PARALLEL)
+        tasa_fallos: Probabilidad de responder HTTP 500
+        tasa_json_invalido: Probabilidad de devolver una salida que no es JSON
+        tasa_json_truncado: Probabilidad de cortar la salida a la mitad
+        tasa_json_invalido_por_modelo: tasa_json_invalido propia de algunos modelos
+        texto_tras_json: Explicación que el modelo escribe tras el JSON (como los Qwen pequeños)
+        keep_alive_defecto: Segundos en memoria si la petición no indica keep_alive
+        num_ctx_defecto: Contexto si la petición no indica num_ctx (otro num_ctx recarga el modelo)
+        factor_tiempo: Multiplica todas las esperas (0 = sin esperas)
+        semilla: Semilla de los fallos inyectados
+    """
+    modelos: List[str] = field(default_factory=lambda: ["qwen2.5:3b"])
+    carga_segundos: float = 2.0
+    tokens_prompt_por_segundo: float = 400.0
+    tokens_generacion_por_segundo: float = 30.0
+    slots: int = 1
+    tasa_fallos: float = 0.0
+    tasa_json_invalido: float = 0.0
+    tasa_json_truncado: float = 0.0
+    tasa_json_invalido_por_modelo: Dict[str, float] = field(default_factory=dict)
+    texto_tras_json: str = ""
+    keep_alive_defecto: float = 300.0
+    num_ctx_defecto: int = 2048
+    factor_tiempo: float = 1.0
+    semilla: int = 0
+
+
+# -----------------------------------------------------------------------------
+# UTILIDADES
+# -----------------------------------------------------------------------------
+def contar_tokens(texto: str) -> int:
+    """Aproximación de tokens de un texto."""
+    return max(1, len(texto) // CARACTERES_POR_TOKEN)
+
+
+def parsear_keep_alive(valor: Any, defecto: float) -> float:
+    """Convierte '60m', '30s', '1h', 300 o -1 en segundos (inf = siempre)."""
+    if valor is None or valor == "":
+        return defecto
+    if isinstance(valor, (int, float)):
+        return float("inf") if valor < 0 else float(valor)
+    coincidencia = re.fullmatch(r"(-?\d+(?:\.\d+)?)(ms|s|m|h)?", str(valor).strip())
+    if not coincidencia:
+        return defecto
+    numero = float(coincidencia.group(1))
+    if numero < 0:
+        return float("inf")
+    return numero * {"ms": 0.001, "s": 1, "m": 60, "h": 3600, None: 1}[coincidencia.group(2)]
+
+
+def embedding_falso(texto: str) -> List[float]:
+    """Bolsa de palabras proyectada con hashing en DIMENSION_EMBEDDING posiciones."""
+    vector = [0.0] * DIMENSION_EMBEDDING
+    for palabra in re.findall(r"\w+", texto.lower()):
+        vector[int(hashlib.md5(palabra.encode()).hexdigest(), 16) % DIMENSION_EMBEDDING] += 1.0
+    return vector
+
+
+def ahora_iso(desplazamiento: float = 0.0) -> str:
+    """Fecha en el formato que usa Ollama."""
+    if desplazamiento == float("inf"):
+        desplazamiento = 10 * 365 * 24 * 3600
+    return (datetime.now(timezone.utc) + timedelta(seconds=desplazamiento)).isoformat()
+
+
+def prefijo_comun(a: str, b: str) -> int:
+    """Longitud del prefijo común de dos textos."""
+    limite = min(len(a), len(b))
+    i = 0
+    while i < limite and a[i] == b[i]:
+        i += 1
+    return i
+
+
+# -----------------------------------------------------------------------------
+# ESTADO DEL SERVIDOR FALSO
+# -----------------------------------------------------------------------------
+class OllamaFalso:
+    """
+    Estado compartido del servidor: modelos cargados, slots y contadores.
+
+    Attributes:
+        config: Comportamiento configurado
+        estadisticas: Contadores expuestos en /falso/estadisticas
+    """
+
+    def __init__(self, config: ConfigOllamaFalso):
+        self.config = config
+        self.rng = random.Random(config.semilla)
+        self._cargado_hasta: Dict[str, float] = {}  # modelo -> vencimiento (monotonic)
+        self._num_ctx: Dict[str, int] = {}  # modelo -> num_ctx con el que está cargado
+        self._lock_carga = asyncio.Lock()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._ultimo_prompt: List[str] = [""] * config.slots  # Caché de prefijo por slot
+        self._slots_libres = list(range(config.slots))
+        self.estadisticas = {
+            "chat": 0, "generate": 0, "cargas": 0, "fallos_inyectados": 0,
+            "json_invalidos": 0, "en_curso": 0, "max_en_curso": 0,
+            "tokens_prompt": 0, "tokens_prompt_reutilizados": 0, "chat_por_modelo": {}, "embeddings": 0,
+            "recargas_num_ctx": 0, "prompts_truncados": 0, "num_ctx": {}, "streams_cortados": 0,
+        }
+
+    async def esperar(self, segundos: float) -> None:
+        """Espera simulada escalada por factor_tiempo."""
+        if segundos > 0 and self.config.factor_tiempo > 0:
+            await asyncio.sleep(segundos * self.config.factor_tiempo)
+
+    def cargado(self, modelo: str) -> bool:
+        """True si el modelo está en memoria (keep_alive vigente)."""
+        return self._cargado_hasta.get(modelo, 0) > time.monotonic()
+
+    async def asegurar_cargado(self, modelo: str, keep_alive: Any, opciones: Optional[Dict[str, Any]] = None) -> float:
+        """
+        Carga el modelo si no está en memoria (o con otro num_ctx) y renueva su keep_alive.
+
+        Returns:
+            float: Segundos de carga (0 si ya estaba cargado)
+        """
+        duracion = parsear_keep_alive(keep_alive, self.config.keep_alive_defecto)
+        num_ctx = (opciones or {}).get("num_ctx") or self.config.num_ctx_defecto
+        carga = 0.0
+        async with self._lock_carga:
+            recarga = self.cargado(modelo) and self._num_ctx.get(modelo) != num_ctx
+            if recarga:
+                self.estadisticas["recargas_num_ctx"] += 1
+            if not self.cargado(modelo) or recarga:
+                self._num_ctx[modelo] = num_ctx
+                self._ultimo_prompt = [""] * self.config.slots  # La caché KV se pierde al recargar
+                self.estadisticas["cargas"] += 1
+                carga = self.config.carga_segundos
+                await self.esperar(carga)
+            self._cargado_hasta[modelo] = time.monotonic() + duracion
+        return carga
+
+    def modelos_en_memoria(self) -> List[Dict[str, Any]]:
+        """Modelos cargados, en el formato de /api/ps."""
+        ahora = time.monotonic()
+        return [
+            {"name": m, "model": m, "size": 2_000_000_000, "size_vram": 0,
+             "expires_at": ahora_iso(vence - ahora)}
+            for m, vence in self._cargado_hasta.items() if vence > ahora
+        ]
+
+    def tomar_slot(self) -> int:
+        """Índice del slot asignado (para la caché de prefijo)."""
+        return self._slots_libres.pop(0)
+
+    def liberar_slot(self, slot: int) -> None:
+        """Devuelve el slot a la lista de libres."""
+        self._slots_libres.append(slot)
+
+    @property
+    def semaforo(self) -> asyncio.Semaphore:
+        """Semáforo de slots (se crea dentro del event loop del servidor)."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.config.slots)
+        return self._slots
+
+    def generar_contenido(self, modelo: str, mensajes: List[Dict[str, str]]) -> str:
+        """Salida del modelo según el texto del usuario y los fallos configurados."""
+        usuario = next((m["content"] for m in reversed(mensajes) if m.get("role") == "user"), "")
+        relevante = any(senal in usuario.lower() for senal in SENALES_RELEVANCIA)
+        contenido = json.dumps({
+            "es_relevante": relevante,
+            "confianza": 0.7 if relevante else 0.2,
+            "razon": "Menciona alumbrado público" if relevante else "Sin relación con alumbrado público",
+        }, ensure_ascii=False)
+
+        sorteo = self.rng.random()
+        tasa_invalido = self.config.tasa_json_invalido_por_modelo.get(modelo, self.config.tasa_json_invalido)
+        if sorteo < tasa_invalido:
+            self.estadisticas["json_invalidos"] += 1
+            return "No puedo clasificar este texto."
+        if sorteo < tasa_invalido + self.config.tasa_json_truncado:
+            self.estadisticas["json_invalidos"] += 1
+            return contenido[:len(contenido) // 2]
+        return contenido + self.config.texto_tras_json
+
+
+# -----------------------------------------------------------------------------
+# APLICACIÓN
+# -----------------------------------------------------------------------------
+def crear_app(config: Optional[ConfigOllamaFalso] = None) -> FastAPI:
+    """
+    Crea la aplicación ASGI del servidor falso.
+
+    Args:
+        config: Comportamiento (None = valores por defecto)
+
+    Returns:
+        FastAPI: Aplicación con la API de Ollama (app.state.falso = OllamaFalso)
+    """
+    falso = OllamaFalso(config or ConfigOllamaFalso())
+    app = FastAPI(title="Ollama falso")
+    app.state.falso = falso
+
+    def modelo_no_encontrado(modelo: str) -> JSONResponse:
+        return JSONResponse(status_code=404, content={"error": f"model '{modelo}' not found, try pulling it first"})
+
+    @app.get("/api/tags")
+    async def tags():
+        return {"models": [{"name": m, "model": m, "size": 2_000_000_000} for m in falso.config.modelos]}
+
+    @app.get("/api/ps")
+    async def ps():
+        return {"models": falso.modelos_en_memoria()}
+
+    @app.get("/falso/estadisticas")
+    async def estadisticas():
+        return falso.estadisticas
+
+    @app.post("/api/generate")
+    async def generate(request: Request):
+        cuerpo = await request.json()
+        modelo = cuerpo.get("model", "")
+        if modelo not in falso.config.modelos:
+            return modelo_no_encontrado(modelo)
+        falso.estadisticas["generate"] += 1
+        carga = await falso.asegurar_cargado(modelo, cuerpo.get("keep_alive"), cuerpo.get("options"))
+        return {
+            "model": modelo, "created_at": ahora_iso(), "response": "", "done": True,
+            "load_duration": int(carga * 1e9), "total_duration": int(carga * 1e9),
+        }
+
+    @app.post("/api/embeddings")
+    async def embeddings(request: Request):
+        cuerpo = await request.json()
+        modelo = cuerpo.get("model", "")
+        if modelo not in falso.config.modelos:
+            return modelo_no_encontrado(modelo)
+        falso.estadisticas["embeddings"] += 1
+        await falso.asegurar_cargado(modelo, cuerpo.get("keep_alive"))
+        await falso.esperar(contar_tokens(cuerpo.get("prompt", "")) / falso.config.tokens_prompt_por_segundo)
+        return {"embedding": embedding_falso(cuerpo.get("prompt", ""))}
+
+    @app.post("/api/chat")
+    async def chat(request: Request):
+        cuerpo = await request.json()
+        modelo = cuerpo.get("model", "")
+        if modelo not in falso.config.modelos:
+            return modelo_no_encontrado(modelo)
+        falso.estadisticas["chat"] += 1
+        por_modelo = falso.estadisticas["chat_por_modelo"]
+        por_modelo[modelo] = por_modelo.get(modelo, 0) + 1
+        if falso.rng.random() < falso.config.tasa_fallos:
+            falso.estadisticas["fallos_inyectados"] += 1
+            return JSONResponse(status_code=500, content={"error": "fallo inyectado por ollama_falso"})
+
+        mensajes = cuerpo.get("messages") or []
+        opciones = cuerpo.get("options") or {}
+        prompt = "\n".join(m.get("content", "") for m in mensajes)
+        contenido = falso.generar_contenido(modelo, mensajes)
+        num_predict = opciones.get("num_predict") or 128
+        tokens_salida = contenido_en_tokens(contenido)[:num_predict]
+
+        async def ejecutar() -> Dict[str, Any]:
+            """Ocupa un slot, carga el modelo y evalúa el prompt; devuelve las duraciones."""
+            await falso.semaforo.acquire()
+            slot = falso.tomar_slot()
+            falso.estadisticas["en_curso"] += 1
+            falso.estadisticas["max_en_curso"] = max(falso.estadisticas["max_en_curso"], falso.estadisticas["en_curso"])
+            carga = await falso.asegurar_cargado(modelo, cuerpo.get("keep_alive"), opciones)
+            num_ctx = falso._num_ctx[modelo]
+            por_cubeta = falso.estadisticas["num_ctx"]
+            por_cubeta[num_ctx] = por_cubeta.get(num_ctx, 0) + 1
+            if contar_tokens(prompt) > num_ctx:
+                falso.estadisticas["prompts_truncados"] += 1  # llama.cpp descarta el inicio en silencio
+            reutilizados = contar_tokens(prompt[:prefijo_comun(prompt, falso._ultimo_prompt[slot])]) - 1
+            evaluados = max(1, contar_tokens(prompt) - max(0, reutilizados))
+            falso._ultimo_prompt[slot] = prompt
+            falso.estadisticas["tokens_prompt"] += evaluados
+            falso.estadisticas["tokens_prompt_reutilizados"] += max(0, reutilizados)
+            prompt_eval = evaluados / falso.config.tokens_prompt_por_segundo
+            await falso.esperar(prompt_eval)
+            return {"slot": slot, "carga": carga, "evaluados": evaluados, "prompt_eval": prompt_eval}
+
+        def liberar(estado: Dict[str, Any]) -> None:
+            falso.estadisticas["en_curso"] -= 1
+            falso.liberar_slot(estado["slot"])
+            falso.semaforo.release()
+
+        def final(estado: Dict[str, Any], generacion: float) -> Dict[str, Any]:
+            return {
+                "model": modelo, "created_at": ahora_iso(), "done": True,
+                "done_reason": "length" if len(tokens_salida) >= num_predict else "stop",
+                "total_duration": int((estado["carga"] + estado["prompt_eval"] + generacion) * 1e9),
+                "load_duration": int(estado["carga"] * 1e9),
+                "prompt_eval_count": estado["evaluados"],
+                "prompt_eval_duration": int(estado["prompt_eval"] * 1e9),
+                "eval_count": len(tokens_salida),
+                "eval_duration": int(generacion * 1e9),
+            }
+
+        por_token = 1 / falso.config.tokens_generacion_por_segundo
+
+        if not cuerpo.get("stream", True):
+            estado = await ejecutar()
+            try:
+                await falso.esperar(len(tokens_salida) * por_token)
+            finally:
+                liberar(estado)
+            return {
+                **final(estado, len(tokens_salida) * por_token),
+                "message": {"role": "assistant", "content": "".join(tokens_salida)},
+            }
+
+        async def flujo() -> AsyncIterator[bytes]:
+            estado = await ejecutar()
+            generados = 0
+            try:
+                for token in tokens_salida:
+                    await falso.esperar(por_token)
+                    generados += 1
+                    yield json.dumps({
+                        "model": modelo, "created_at": ahora_iso(),
+                        "message": {"role": "assistant", "content": token}, "done": False,
+                    }).encode() + b"\n"
+                yield json.dumps({
+                    **final(estado, generados * por_token),
+                    "message": {"role": "assistant", "content": ""},
+                }).encode() + b"\n"
+            finally:
+                # Si el cliente corta el stream, el slot se libera de inmediato
+                if generados < len(tokens_salida):
+                    falso.estadisticas["streams_cortados"] += 1
+                liberar(estado)
+
+        return StreamingResponse(flujo(), media_type="application/x-ndjson")
+
+    return app
+
+
+def contenido_en_tokens(contenido: str) -> List[str]:
+    """Parte la salida en "tokens" de CARACTERES_POR_TOKEN caracteres."""
+    return [contenido[i:i + CARACTERES_POR_TOKEN] for i in range(0, len(contenido), CARACTERES_POR_TOKEN)]
+
+
+# -----------------------------------------------------------------------------
+# EJECUCIÓN COMO SERVIDOR
+# -----------------------------------------------------------------------------
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Servidor Ollama falso para tests y benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=11434)
+    parser.add_argument("--modelos", default="qwen2.5:3b", help="Modelos separados por comas")
+    parser.add_argument("--carga", type=float, default=2.0, help="Segundos de carga del modelo")
+    parser.add_argument("--tokens-prompt", type=float, default=400.0, help="Tokens/s de evaluación del prompt")
+    parser.add_argument("--tokens-generacion", type=float, default=30.0, help="Tokens/s de generación")
+    parser.add_argument("--slots", type=int, default=1, help="Peticiones en paralelo (OLLAMA_NUM_PARALLEL)")
+    parser.add_argument("--tasa-fallos", type=float, default=0.0, help="Probabilidad de HTTP 500")
+    parser.add_argument("--tasa-json-invalido", type=float, default=0.0, help="Probabilidad de salida no JSON")
+    parser.add_argument("--tasa-json-truncado", type=float, default=0.0, help="Probabilidad de salida truncada")
+    parser.add_argument("--texto-tras-json", default="", help="Texto que el modelo escribe tras el JSON")
+    parser.add_argument("--factor-tiempo", type=float, default=1.0, help="Escala de todas las esperas")
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+
+    configuracion = ConfigOllamaFalso(
+        modelos=args.modelos.split(","),
+        carga_segundos=args.carga,
+        tokens_prompt_por_segundo=args.tokens_prompt,
+        tokens_generacion_por_segundo=args.tokens_generacion,
+        slots=args.slots,
+        tasa_fallos=args.tasa_fallos,
+        tasa_json_invalido=args.tasa_json_invalido,
+        tasa_json_truncado=args.tasa_json_truncado,
+        texto_tras_json=args.texto_tras_json,
+        factor_tiempo=args.factor_tiempo,
+        semilla=args.semilla,
+    )
+    uvicorn.run(crear_app(configuracion), host=args.host, port=args.puerto, log_level="warning")
@@ -10,12 +10,63 @@ Este archivo configura pytest para que pueda encontrar los módulos de la app.
 - Aquí configuramos el path de Python para importar 'app'
 
 Sin este archivo, pytest no podría encontrar 'from app.config import ...'
+
+También apunta la cola de trabajos asíncronos a un directorio temporal,
+para que los tests no dejen bases de datos en el repositorio, y desactiva
+la precarga del modelo (no hay Ollama en los tests).
+
+El fixture ollama_falso conecta la app con benchmarks/ollama_falso.py
+(en memoria, sin red) para probar el camino completo hasta el modelo.
 =============================================================================
 """
+import functools
+import os
 import sys
+import tempfile
 from pathlib import Path
 
+import httpx
+import pytest
+
 # Agregamos la carpeta 'api' al path de Python
 # Esto permite que 'from app.xxx import yyy' funcione en los tests
 api_path = Path(__file__).parent.parent / "api"
 sys.path.insert(0, str(api_path))
+sys.path.insert(0, str(Path(__file__).parent.parent / "benchmarks"))
+
+# La cola de trabajos es persistente por defecto (data/trabajos.sqlite3)
+os.environ.setdefault(
+    "TRABAJOS_RUTA_SQLITE",
+    str(Path(tempfile.mkdtemp(prefix="qwen-api-tests-")) / "trabajos.sqlite3")
+)
+
+# Sin Ollama, la precarga solo reintentaría en segundo plano
+os.environ.setdefault("PRECARGA_HABILITADA", "false")
+
+# Sin resolución DNS del host "ollama": el apagado de la app espera a que
+# termine la consulta de salud en curso, y una resolución lenta lo colgaba
+os.environ.setdefault("OLLAMA_HOST", "127.0.0.1")
+
+
+@pytest.fixture
+def ollama_falso(monkeypatch):
+    """
+    Fixture que reemplaza Ollama por el servidor falso en memoria.
+
+    Devuelve una función que recibe parámetros de ConfigOllamaFalso
+    (sin esperas por defecto) y retorna el estado del servidor falso;
+    hay que llamarla antes de abrir el TestClient.
+    """
+    import app.main
+    from ollama_falso import ConfigOllamaFalso, crear_app
+
+    def configurar(**parametros):
+        parametros.setdefault("factor_tiempo", 0)
+        falso = crear_app(ConfigOllamaFalso(**parametros))
+        monkeypatch.setattr(
+            app.main, "crear_cliente_ollama",
+            functools.partial(app.main.crear_cliente_ollama, transport=httpx.ASGITransport(app=falso))
+        )
+        return falso.state.falso
+
+    return configurar
@@ -0,0 +1,83 @@
+"""
+=============================================================================
+TESTS DE CONTROL DE ADMISIÓN - test_admision.py
+=============================================================================
+Tests para verificar la cola acotada delante de Ollama y el rechazo
+rápido con 429 / Retry-After.
+
+Para ejecutar:
+    pytest tests/test_admision.py -v
+=============================================================================
+"""
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+
+# =============================================================================
+# TEST 1: Cola llena -> 429 con Retry-After
+# =============================================================================
+def test_cola_llena_rechaza_con_retry_after():
+    """
+    Verifica que con el slot ocupado y la cola llena, una nueva petición
+    se rechaza de inmediato con 429 y un Retry-After calculado.
+    """
+    from app.services.admision import ControlAdmision
+
+    async def escenario():
+        control = ControlAdmision(concurrencia=1, max_cola=1, tiempo_servicio_inicial=4.0)
+        liberar = asyncio.Event()
+
+        async def ocupar():
+            async with control.turno():
+                await liberar.wait()
+
+        tareas = [asyncio.create_task(ocupar()) for _ in range(2)]  # 1 en curso + 1 en cola
+        await asyncio.sleep(0)
+        with pytest.raises(HTTPException) as error:
+            async with control.turno():
+                pass
+        liberar.set()
+        await asyncio.gather(*tareas)
+        return control, error.value
+
+    control, error = asyncio.run(escenario())
+
+    assert error.status_code == 429
+    assert int(error.headers["Retry-After"]) >= 1
+    assert control.estado()["rechazadas"] == 1
+    assert control.estado()["admitidas"] == 2
+
+
+# =============================================================================
+# TEST 2: Espera estimada mayor que el plazo -> 429
+# =============================================================================
+def test_plazo_menor_que_espera_estimada():
+    """
+    Verifica que una petición con un plazo menor que la espera estimada
+    se rechaza sin entrar en la cola.
+    """
+    from app.services.admision import ControlAdmision
+
+    async def escenario():
+        control = ControlAdmision(concurrencia=1, max_cola=10, tiempo_servicio_inicial=30.0)
+        liberar = asyncio.Event()
+
+        async def ocupar():
+            async with control.turno():
+                await liberar.wait()
+
+        tarea = asyncio.create_task(ocupar())
+        await asyncio.sleep(0)
+        with pytest.raises(HTTPException) as error:
+            async with control.turno(plazo=5.0):
+                pass
+        liberar.set()
+        await tarea
+        return error.value
+
+    error = asyncio.run(escenario())
+
+    assert error.status_code == 429
+    assert error.headers["Retry-After"] == "30"
@@ -32,11 +32,15 @@ def client():
     - Es una función que prepara datos o recursos para los tests
     - Se ejecuta antes de cada test que lo use
     - pytest lo inyecta automáticamente como parámetro
+
+    Se usa como context manager para que se ejecute el lifespan de la
+    app (creación y cierre del cliente compartido de Ollama).
     """
     from app.main import app
 
     # Creamos un cliente de pruebas con nuestra app
-    return TestClient(app)
+    with TestClient(app) as test_client:
+        yield test_client
 
 
 @pytest.fixture
@@ -184,3 +188,246 @@ def test_estructura_respuesta_raiz(client):
     actual_keys = set(data.keys())
 
     assert actual_keys == expected_keys, f"Claves inesperadas: {actual_keys - expected_keys}"
+
+
+
+# =============================================================================
+# TEST 7: Clasificación por reglas (sin llamar al modelo)
+# =============================================================================
+def test_clasificar_por_reglas(client, api_key):
+    """
+    Verifica que un texto con mención literal de alumbrado público se
+    clasifica con las reglas determinísticas, sin necesidad de Ollama.
+    """
+    response = client.post(
+        "/api/v1/clasificar",
+        json={
+            "radicacion": "2024-00001",
+            "texto_pdf_completo": "Demanda por cobros de alumbrado público"
+        },
+        headers={
+            "X-API-Key": api_key
+        }
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["es_relevante"] is True
+    assert data["confianza"] >= 0.7
+    assert data["metodo_clasificacion"] == "REGLAS"
+    assert "alumbrado público" in data["keywords_encontrados"]
+
+
+# =============================================================================
+# TEST 8: Clasificación por lotes con errores por ítem
+# =============================================================================
+def test_clasificar_lote(client, api_key):
+    """
+    Verifica que el lote devuelve un resultado por proceso, en el mismo
+    orden, y que un proceso sin texto no hace fallar el lote completo.
+    """
+    response = client.post(
+        "/api/v1/clasificar/lote",
+        json=[
+            {"radicacion": "A", "texto_pdf_completo": "Cobro de alumbrado público"},
+            {"radicacion": "B"},
+            {"radicacion": "C", "texto_pdf_completo": "Cobro de alumbrado público"},
+        ],
+        headers={
+            "X-API-Key": api_key
+        }
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["indice"] for item in data] == [0, 1, 2]
+    assert data[0]["resultado"]["radicacion"] == "A"
+    assert data[0]["resultado"]["metodo_clasificacion"] == "REGLAS"
+    assert data[1]["status_code"] == 400
+    assert data[1]["resultado"] is None
+    assert data[2]["resultado"]["radicacion"] == "C"
+
+
+# =============================================================================
+# TEST 9: Ingesta NDJSON en streaming
+# =============================================================================
+def test_clasificar_ndjson(client, api_key):
+    """
+    Verifica que cada línea NDJSON produce un resultado con su índice
+    de línea, y que las líneas inválidas se reportan sin cortar el flujo.
+    """
+    import json
+
+    cuerpo = (
+        '{"radicacion": "A", "texto_pdf_completo": "Cobro de alumbrado público"}\n'
+        '\n'
+        'esto no es json\n'
+        '{"radicacion": "B", "contenido_demanda": "Iluminación pública del municipio"}'
+    )
+    response = client.post(
+        "/api/v1/clasificar/ndjson",
+        content=cuerpo.encode("utf-8"),
+        headers={
+            "X-API-Key": api_key,
+            "Content-Type": "application/x-ndjson"
+        }
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    resultados = {r["indice"]: r for r in map(json.loads, response.text.splitlines())}
+    assert set(resultados) == {0, 2, 3}
+    assert resultados[0]["resultado"]["radicacion"] == "A"
+    assert resultados[2]["status_code"] == 422
+    assert resultados[3]["resultado"]["metodo_clasificacion"] == "REGLAS"
+
+
+# =============================================================================
+# TEST 10: Modo resumido (sin devolver el texto del documento)
+# =============================================================================
+def test_clasificar_modo_resumido(client, api_key):
+    """
+    Verifica que ?modo=resumido devuelve solo identificadores y
+    clasificación, sin repetir el texto que el cliente ya tiene.
+    """
+    response = client.post(
+        "/api/v1/clasificar?modo=resumido",
+        json={
+            "radicacion": "2024-00001",
+            "reg": "12345",
+            "enlace": " https://ejemplo.gov.co/proceso ",
+            "texto_pdf_completo": "Demanda por cobros de alumbrado público"
+        },
+        headers={
+            "X-API-Key": api_key
+        }
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["radicacion"] == "2024-00001"
+    assert data["enlace"] == "https://ejemplo.gov.co/proceso"
+    assert "texto_pdf_completo" not in data
+    assert "contenido_demanda" not in data
+    assert data["metodo_clasificacion"] == "REGLAS"
+
+
+# =============================================================================
+# TEST 11: Endpoint de métricas Prometheus
+# =============================================================================
+def test_endpoint_metricas(client, api_key):
+    """
+    Verifica que /metrics expone las métricas de latencia y de estado
+    en formato Prometheus.
+    """
+    client.post(
+        "/api/v1/clasificar",
+        json={"texto_pdf_completo": "Cobro de alumbrado público"},
+        headers={"X-API-Key": api_key}
+    )
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "qwen_api_clasificacion_segundos_count" in response.text
+    assert 'metodo="REGLAS"' in response.text
+    assert "qwen_api_cola_en_espera" in response.text
+
+
+# =============================================================================
+# TEST 12: Lote decodificado con orjson
+# =============================================================================
+def test_clasificar_lote_cuerpo_invalido(client, api_key):
+    """
+    Verifica que el lote, decodificado con orjson fuera de FastAPI,
+    mantiene los errores 422 de FastAPI y su documentación en OpenAPI.
+
+    ¿Por qué es importante?
+    - Los clientes que ya manejan los 422 de FastAPI no deben notar el
+      cambio de decodificador
+    """
+    cabeceras = {"X-API-Key": api_key, "Content-Type": "application/json"}
+
+    vacio = client.post("/api/v1/clasificar/lote", content=b"[]", headers=cabeceras)
+    roto = client.post("/api/v1/clasificar/lote", content=b"[{", headers=cabeceras)
+    tipo = client.post("/api/v1/clasificar/lote", content=b'[{"reg": 5}]', headers=cabeceras)
+
+    assert vacio.status_code == roto.status_code == tipo.status_code == 422
+    assert roto.json()["detail"][0]["type"] == "json_invalid"
+    assert tipo.json()["detail"][0]["loc"] == ["body", 0, "reg"]
+
+    esquema = client.get("/openapi.json").json()["paths"]["/api/v1/clasificar/lote"]["post"]["requestBody"]
+    assert esquema["content"]["application/json"]["schema"]["items"] == {
+        "$ref": "#/components/schemas/ProcesoLegalRequest"
+    }
+
+
+def _clasificar_que_falla(monkeypatch):
+    """Hace que clasificar lance un error que no es HTTPException con los textos que dicen FALLA."""
+    from app.services.clasificador import Clasificador
+
+    original = Clasificador.clasificar
+
+    async def clasificar(self, texto, plazo=None):
+        if "FALLA" in texto:
+            raise RuntimeError("fallo inesperado")
+        return await original(self, texto, plazo)
+
+    monkeypatch.setattr(Clasificador, "clasificar", clasificar)
+
+
+# =============================================================================
+# TEST 13: Un error inesperado en una línea NDJSON no cuelga el flujo
+# =============================================================================
+def test_clasificar_ndjson_error_inesperado(client, api_key, monkeypatch):
+    """
+    Verifica que un error que no es HTTPException se reporta como 500 en
+    su línea y que la respuesta termina con las demás líneas clasificadas.
+
+    ¿Por qué es importante?
+    - Un trabajador que muere sin avisar deja la respuesta NDJSON abierta
+      para siempre
+    """
+    import json
+
+    _clasificar_que_falla(monkeypatch)
+    cuerpo = (
+        '{"radicacion": "A", "contenido_demanda": "FALLA"}\n'
+        '{"radicacion": "B", "texto_pdf_completo": "Cobro de alumbrado público"}\n'
+    )
+    response = client.post(
+        "/api/v1/clasificar/ndjson",
+        content=cuerpo.encode("utf-8"),
+        headers={"X-API-Key": api_key, "Content-Type": "application/x-ndjson"}
+    )
+
+    assert response.status_code == 200
+    resultados = {r["indice"]: r for r in map(json.loads, response.text.splitlines())}
+    assert resultados[0]["status_code"] == 500
+    assert resultados[1]["resultado"]["radicacion"] == "B"
+
+
+# =============================================================================
+# TEST 14: Un error inesperado en un proceso no hace fallar el lote
+# =============================================================================
+def test_clasificar_lote_error_inesperado(client, api_key, monkeypatch):
+    """
+    Verifica que un error que no es HTTPException se reporta como 500 en
+    los ítems de ese texto y que los demás procesos se clasifican.
+    """
+    _clasificar_que_falla(monkeypatch)
+    response = client.post(
+        "/api/v1/clasificar/lote",
+        json=[
+            {"radicacion": "A", "contenido_demanda": "FALLA"},
+            {"radicacion": "B", "texto_pdf_completo": "Cobro de alumbrado público"},
+            {"radicacion": "C", "contenido_demanda": "FALLA"},
+        ],
+        headers={"X-API-Key": api_key}
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["status_code"] for item in data] == [500, 200, 500]
+    assert data[1]["resultado"]["metodo_clasificacion"] == "REGLAS"
@@ -0,0 +1,131 @@
+"""
+=============================================================================
+TESTS DE CACHÉ - test_cache.py
+=============================================================================
+Tests para verificar la caché de clasificaciones por contenido
+(LRU en memoria con TTL y nivel persistente en SQLite).
+
+Para ejecutar:
+    pytest tests/test_cache.py -v
+=============================================================================
+"""
+
+import asyncio
+
+RESULTADO = {"es_relevante": True, "confianza": 0.9, "razon": "Menciona DOLMEN"}
+
+
+# =============================================================================
+# TEST 1: La clave depende del contenido, no del espaciado
+# =============================================================================
+def test_clave_por_contenido():
+    """
+    Verifica que el espaciado no cambia la clave, pero el modelo sí.
+    """
+    from app.services.cache import calcular_clave
+
+    opciones = {"temperature": 0.1}
+    clave = calcular_clave("texto  del\nproceso", "plantilla", "qwen2.5:3b", opciones)
+
+    assert clave == calcular_clave("texto del proceso", "plantilla", "qwen2.5:3b", opciones)
+    assert clave != calcular_clave("texto del proceso", "plantilla", "qwen2.5:1.5b", opciones)
+
+
+# =============================================================================
+# TEST 2: Aciertos, fallos y expulsión LRU
+# =============================================================================
+def test_lru_y_contadores():
+    """
+    Verifica que la caché cuenta aciertos/fallos y expulsa la entrada
+    menos usada al superar el límite.
+    """
+    from app.services.cache import CacheClasificaciones
+
+    cache = CacheClasificaciones(max_entradas=2, ttl_segundos=60)
+    asyncio.run(cache.guardar("a", RESULTADO))
+    asyncio.run(cache.guardar("b", RESULTADO))
+    assert asyncio.run(cache.obtener("a")) == RESULTADO  # "a" pasa a ser la más reciente
+    asyncio.run(cache.guardar("c", RESULTADO))  # Expulsa "b"
+
+    assert asyncio.run(cache.obtener("b")) is None
+    estadisticas = cache.estadisticas()
+    assert estadisticas["aciertos"] == 1
+    assert estadisticas["fallos"] == 1
+    assert estadisticas["entradas_memoria"] == 2
+
+
+# =============================================================================
+# TEST 3: Las entradas vencidas no se devuelven
+# =============================================================================
+def test_ttl_vencido():
+    """
+    Verifica que una entrada con TTL vencido cuenta como fallo.
+    """
+    from app.services.cache import CacheClasificaciones
+
+    cache = CacheClasificaciones(max_entradas=10, ttl_segundos=0)
+    asyncio.run(cache.guardar("a", RESULTADO))
+
+    assert asyncio.run(cache.obtener("a")) is None
+
+
+# =============================================================================
+# TEST 4: El nivel SQLite sobrevive a un reinicio
+# =============================================================================
+def test_persistencia_sqlite(tmp_path):
+    """
+    Verifica que una nueva instancia (reinicio del contenedor) encuentra
+    las clasificaciones guardadas en disco.
+    """
+    from app.services.cache import CacheClasificaciones
+
+    ruta = str(tmp_path / "cache.sqlite3")
+    primera = CacheClasificaciones(max_entradas=10, ttl_segundos=60, ruta_sqlite=ruta)
+    asyncio.run(primera.guardar("a", RESULTADO))
+    primera.cerrar()
+
+    segunda = CacheClasificaciones(max_entradas=10, ttl_segundos=60, ruta_sqlite=ruta)
+    assert asyncio.run(segunda.obtener("a")) == RESULTADO
+    assert segunda.estadisticas()["aciertos_disco"] == 1
+    segunda.cerrar()
+
+
+# =============================================================================
+# TEST 5: Un acierto no vuelve a preparar el texto
+# =============================================================================
+def test_acierto_no_limpia_ni_recorta(ollama_falso, monkeypatch):
+    """
+    Verifica que la caché se consulta con el texto recibido, antes de la
+    limpieza, el extracto y el conteo de tokens, y que un acierto devuelve
+    los mismos datos del extracto que la primera clasificación.
+
+    ¿Por qué es importante?
+    - Limpiar un PDF largo cuesta CPU en el event loop: un reenvío del
+      mismo documento no debe volver a pagarla
+    """
+    from fastapi.testclient import TestClient
+    from app.config import get_settings
+    from app.main import app, settings
+    from app.services.clasificador import Clasificador
+
+    monkeypatch.setattr(settings, "reglas_habilitadas", False)
+    preparaciones = []
+    original = Clasificador.preparar
+
+    def preparar(self, texto):
+        preparaciones.append(texto)
+        return original(self, texto)
+
+    monkeypatch.setattr(Clasificador, "preparar", preparar)
+    cabeceras = {"X-API-Key": get_settings().api_key}
+    cuerpo = {"radicacion": "A", "texto_pdf_completo": "Demanda por el cobro del servicio de aseo.\fPágina 2"}
+
+    falso = ollama_falso()
+    with TestClient(app) as client:
+        primera = client.post("/api/v1/clasificar", headers=cabeceras, json=cuerpo).json()
+        segunda = client.post("/api/v1/clasificar", headers=cabeceras, json=cuerpo).json()
+
+    assert len(preparaciones) == 1
+    assert falso.estadisticas["chat"] == 1
+    for campo in ("es_relevante", "longitud_extracto", "ratio_compresion", "tokens_original", "tokens_limpio"):
+        assert segunda[campo] == primera[campo]
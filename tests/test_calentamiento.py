@@ -0,0 +1,124 @@
+"""
+=============================================================================
+TESTS DE CALENTAMIENTO DEL MODELO - test_calentamiento.py
+=============================================================================
+Tests para verificar la precarga, el calentamiento y /ready.
+
+Para ejecutar:
+    pytest tests/test_calentamiento.py -v
+=============================================================================
+"""
+import asyncio
+
+
+class ClienteFalso:
+    """Cliente de Ollama que falla las primeras `fallos` llamadas a generate."""
+
+    def __init__(self, fallos=0):
+        self.fallos = fallos
+        self.precargas = []
+        self.chats = 0
+
+    async def generate(self, **kwargs):
+        if self.fallos:
+            self.fallos -= 1
+            raise ConnectionError("Ollama no responde")
+        self.precargas.append(kwargs)
+        return {"done": True}
+
+    async def chat(self, **kwargs):
+        self.chats += 1
+        return {"message": {"content": '{"es_relevante": false, "confianza": 0.1, "razon": "agua"}'}}
+
+
+def _calentador(cliente, **ajustes):
+    from app.config import get_settings
+    from app.services.cache import CacheClasificaciones
+    from app.services.calentamiento import CalentadorModelo
+    from app.services.clasificador import Clasificador
+
+    # ClienteFalso responde sin streaming
+    settings = get_settings().model_copy(
+        update={"precarga_habilitada": True, "generacion_corte_anticipado": False, **ajustes}
+    )
+    clasificador = Clasificador(cliente, CacheClasificaciones(10, 60), settings)
+    return CalentadorModelo(clasificador, settings)
+
+
+# =============================================================================
+# TEST 1: No listo hasta terminar el calentamiento (con reintentos)
+# =============================================================================
+def test_listo_solo_tras_calentar(monkeypatch):
+    """
+    Verifica que el calentador reintenta mientras Ollama no responde y
+    solo se declara listo tras precargar y ejecutar una inferencia.
+
+    ¿Por qué es importante?
+    - /ready usa este estado: una réplica en frío no debe recibir tráfico
+    """
+    from app.services import calentamiento
+
+    monkeypatch.setattr(calentamiento, "ESPERA_REINTENTO_INICIAL", 0.01)
+    cliente = ClienteFalso(fallos=2)
+    calentador = _calentador(cliente, mantener_caliente_intervalo=0, ollama_keep_alive="60m")
+
+    async def escenario():
+        calentador.iniciar()
+        assert calentador.estado()["listo"] is False
+        for _ in range(200):
+            if calentador.listo:
+                break
+            await asyncio.sleep(0.01)
+        await calentador.detener()
+
+    asyncio.run(escenario())
+
+    assert calentador.listo is True
+    assert calentador.estado()["segundos_calentamiento"] is not None
+    assert cliente.precargas[0]["keep_alive"] == "60m"
+    assert cliente.chats == 1
+
+
+# =============================================================================
+# TEST 2: Mantener caliente solo tras inactividad
+# =============================================================================
+def test_mantener_caliente_renueva_tras_inactividad():
+    """
+    Verifica que la tarea de mantener caliente renueva el keep_alive
+    cuando no ha habido llamadas al modelo durante el intervalo.
+    """
+    cliente = ClienteFalso()
+    calentador = _calentador(cliente, mantener_caliente_intervalo=0.05)
+
+    async def escenario():
+        calentador.iniciar()
+        await asyncio.sleep(0.3)
+        await calentador.detener()
+
+    asyncio.run(escenario())
+
+    # Precarga inicial + al menos una renovación por inactividad
+    assert len(cliente.precargas) >= 2
+
+
+# =============================================================================
+# TEST 3: Endpoint /ready
+# =============================================================================
+def test_endpoint_ready():
+    """
+    Verifica que /ready responde 200 cuando el calentador está listo
+    (en los tests la precarga está deshabilitada) y 503 mientras no.
+    """
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as client:
+        response = client.get("/ready")
+        assert response.status_code == 200
+        assert response.json()["listo"] is True
+
+        app.state.calentador.listo = False
+        app.state.calentador.detalle = "calentando"
+        response = client.get("/ready")
+        assert response.status_code == 503
+        assert response.json()["detalle"] == "calentando"
@@ -0,0 +1,70 @@
+"""
+=============================================================================
+TESTS DEL GENERADOR DE CARGA - test_carga.py
+=============================================================================
+Tests para verificar las estadísticas, la reproducibilidad y la
+comparación con la línea base de benchmarks/carga.py.
+
+Para ejecutar:
+    pytest tests/test_carga.py -v
+=============================================================================
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "benchmarks"))
+
+import carga  # noqa: E402
+
+
+# =============================================================================
+# TEST 1: Percentiles
+# =============================================================================
+def test_percentiles():
+    """
+    Verifica el cálculo de percentiles con interpolación lineal.
+    """
+    valores = [float(v) for v in range(1, 101)]
+
+    assert carga.percentil(valores, 50) == 50.5
+    assert carga.percentil(valores, 99) == 99.01
+    assert carga.percentil([], 95) is None
+
+
+# =============================================================================
+# TEST 2: Peticiones reproducibles
+# =============================================================================
+def test_peticiones_reproducibles_y_unicas():
+    """
+    Verifica que la misma semilla produce las mismas peticiones y que cada
+    petición es distinta (para no medir la caché de la API).
+    """
+    mezcla = carga.parsear_mezcla("corto:0.5,largo:0.5")
+    uno = carga.GeneradorPeticiones(mezcla, paginas=1, semilla=7)
+    otro = carga.GeneradorPeticiones(mezcla, paginas=1, semilla=7)
+
+    peticiones = [uno.siguiente() for _ in range(10)]
+    assert peticiones == [otro.siguiente() for _ in range(10)]
+    assert len({str(p) for p in peticiones}) == 10
+    assert {tipo for tipo, _ in peticiones} == {"corto", "largo"}
+
+
+# =============================================================================
+# TEST 3: Comparación con la línea base
+# =============================================================================
+def test_comparacion_detecta_regresiones():
+    """
+    Verifica que un p95 peor que la tolerancia se reporta como regresión
+    y que una variación menor no.
+    """
+    def reporte(p95, rps, error=0.0):
+        return {"niveles": [{
+            "modo": "concurrencia", "valor": 4, "throughput_rps": rps,
+            "tasa_error": error, "latencia_ms": {"p95": p95},
+        }]}
+
+    base = reporte(p95=1000.0, rps=2.0)
+
+    assert carga.comparar(reporte(1050.0, 1.95), base, tolerancia=0.10) == []
+    assert len(carga.comparar(reporte(1300.0, 2.0), base, tolerancia=0.10)) == 1
+    assert len(carga.comparar(reporte(1000.0, 1.0, error=0.05), base, tolerancia=0.10)) == 2
@@ -0,0 +1,69 @@
+"""
+=============================================================================
+TESTS DE COALESCENCIA - test_coalescencia.py
+=============================================================================
+Tests para verificar que las inferencias idénticas simultáneas se
+comparten y que cancelar a un llamador no afecta a los demás.
+
+Para ejecutar:
+    pytest tests/test_coalescencia.py -v
+=============================================================================
+"""
+import asyncio
+
+
+# =============================================================================
+# TEST 1: Peticiones simultáneas con la misma clave comparten la ejecución
+# =============================================================================
+def test_peticiones_identicas_comparten_inferencia():
+    """
+    Verifica que tres peticiones con la misma clave ejecutan la función una vez.
+    """
+    from app.services.coalescencia import CoalescedorInferencias
+
+    llamadas = []
+
+    async def inferir():
+        llamadas.append(1)
+        await asyncio.sleep(0.01)
+        return {"es_relevante": True}
+
+    async def escenario():
+        coalescedor = CoalescedorInferencias()
+        resultados = await asyncio.gather(*(coalescedor.ejecutar("clave", inferir) for _ in range(3)))
+        return coalescedor, resultados
+
+    coalescedor, resultados = asyncio.run(escenario())
+
+    assert len(llamadas) == 1
+    assert all(r == {"es_relevante": True} for r in resultados)
+    assert coalescedor.estadisticas() == {"ejecuciones": 1, "coalescidas": 2, "en_vuelo": 0}
+
+
+# =============================================================================
+# TEST 2: Cancelar al primer llamador no cancela la inferencia compartida
+# =============================================================================
+def test_cancelacion_del_primer_llamador():
+    """
+    Verifica que si el primer cliente se desconecta, el segundo recibe
+    igualmente el resultado de la inferencia compartida.
+    """
+    from app.services.coalescencia import CoalescedorInferencias
+
+    async def inferir():
+        await asyncio.sleep(0.02)
+        return "resultado"
+
+    async def escenario():
+        coalescedor = CoalescedorInferencias()
+        primero = asyncio.create_task(coalescedor.ejecutar("clave", inferir))
+        await asyncio.sleep(0)
+        segundo = asyncio.create_task(coalescedor.ejecutar("clave", inferir))
+        await asyncio.sleep(0)
+        primero.cancel()
+        return await segundo, primero.cancelled()
+
+    resultado, primero_cancelado = asyncio.run(escenario())
+
+    assert resultado == "resultado"
+    assert primero_cancelado
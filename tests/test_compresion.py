@@ -0,0 +1,154 @@
+"""
+=============================================================================
+TESTS DE COMPRESIÓN - test_compresion.py
+=============================================================================
+Tests para verificar la descompresión de peticiones (gzip y zstd), el
+límite del cuerpo descomprimido y la compresión negociada de respuestas.
+
+Para ejecutar:
+    pytest tests/test_compresion.py -v
+=============================================================================
+"""
+import gzip
+import json
+
+import pytest
+import zstandard
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+TEXTO = "Demanda por el cobro del alumbrado público del municipio. " * 200
+
+
+@pytest.fixture
+def client():
+    """Cliente de pruebas con el lifespan de la app."""
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def api_key():
+    """API key configurada."""
+    from app.config import get_settings
+
+    return get_settings().api_key
+
+
+# =============================================================================
+# TEST 1: Petición gzip, respuesta gzip
+# =============================================================================
+def test_clasificar_con_cuerpo_y_respuesta_gzip(client, api_key):
+    """
+    Verifica que /clasificar acepta un cuerpo gzip y devuelve la
+    respuesta comprimida cuando el cliente la acepta.
+    """
+    cuerpo = gzip.compress(json.dumps({"radicacion": "A", "texto_pdf_completo": TEXTO}).encode())
+
+    response = client.post("/api/v1/clasificar", content=cuerpo, headers={
+        "X-API-Key": api_key,
+        "Content-Type": "application/json",
+        "Content-Encoding": "gzip",
+        "Accept-Encoding": "gzip"
+    })
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.json()["texto_pdf_completo"] == TEXTO  # httpx descomprime gzip
+    assert response.json()["metodo_clasificacion"] == "REGLAS"
+
+
+# =============================================================================
+# TEST 2: zstd en el lote y en el streaming NDJSON
+# =============================================================================
+def test_lote_y_ndjson_con_zstd(client, api_key):
+    """
+    Verifica que los endpoints de carga masiva aceptan zstd y que la
+    respuesta NDJSON en streaming se comprime con zstd.
+
+    ¿Por qué es importante?
+    - El scraper envía miles de textos completos; comprimidos viajan
+      5-10 veces más rápido por la red
+    """
+    compresor = zstandard.ZstdCompressor()
+    procesos = [{"radicacion": str(i), "texto_pdf_completo": TEXTO} for i in range(3)]
+
+    lote = client.post("/api/v1/clasificar/lote", content=compresor.compress(json.dumps(procesos).encode()), headers={
+        "X-API-Key": api_key, "Content-Type": "application/json", "Content-Encoding": "zstd"
+    })
+    ndjson = client.post(
+        "/api/v1/clasificar/ndjson?modo=completo",
+        content=compresor.compress("\n".join(json.dumps(p) for p in procesos).encode()),
+        headers={
+            "X-API-Key": api_key,
+            "Content-Type": "application/x-ndjson",
+            "Content-Encoding": "zstd",
+            "Accept-Encoding": "zstd"
+        }
+    )
+
+    assert [item["status_code"] for item in lote.json()] == [200, 200, 200]
+    assert ndjson.headers["content-encoding"] == "zstd"
+    lineas = zstandard.ZstdDecompressor().decompressobj().decompress(ndjson.content).splitlines()
+    assert sorted(json.loads(linea)["indice"] for linea in lineas) == [0, 1, 2]
+
+
+# =============================================================================
+# TEST 3: Cuerpos inválidos y bombas de compresión
+# =============================================================================
+def test_cuerpos_comprimidos_invalidos(client, api_key):
+    """
+    Verifica que una codificación desconocida responde 415, un gzip o
+    zstd corrupto o incompleto 400, y que el límite del cuerpo descomprimido
+    corta una bomba de compresión sin descomprimirla entera.
+    """
+    from app.services.compresion import Descompresor
+
+    cabeceras = {"X-API-Key": api_key, "Content-Type": "application/json"}
+    desconocida = client.post("/api/v1/clasificar", content=b"{}", headers={**cabeceras, "Content-Encoding": "br"})
+    corrupto = client.post("/api/v1/clasificar", content=b"no es gzip", headers={**cabeceras, "Content-Encoding": "gzip"})
+    incompleto = client.post(
+        "/api/v1/clasificar",
+        content=gzip.compress(b'{"texto_pdf_completo": "alumbrado"}')[:-10],
+        headers={**cabeceras, "Content-Encoding": "gzip"}
+    )
+    zstd_incompleto = client.post(
+        "/api/v1/clasificar",
+        content=zstandard.ZstdCompressor().compress(b'{"texto_pdf_completo": "' + b"alumbrado " * 200 + b'"}')[:-10],
+        headers={**cabeceras, "Content-Encoding": "zstd"}
+    )
+    assert desconocida.status_code == 415
+    assert corrupto.status_code == 400
+    assert incompleto.status_code == 400
+    assert zstd_incompleto.status_code == 400
+    assert "zstd incompleto" in zstd_incompleto.json()["detail"]
+
+    bomba = gzip.compress(b"\0" * 50_000_000)  # ~50 KB comprimidos
+    descompresor = Descompresor("gzip", max_bytes=1_000_000)
+    with pytest.raises(HTTPException) as error:
+        descompresor.descomprimir(bomba)
+    assert error.value.status_code == 413
+    assert descompresor.total <= 1_000_000 + 64 * 1024
+
+
+# =============================================================================
+# TEST 4: Negociación de la respuesta
+# =============================================================================
+def test_negociacion_de_la_codificacion(client, api_key):
+    """
+    Verifica la elección según Accept-Encoding y que las respuestas
+    pequeñas no se comprimen.
+    """
+    from app.services.compresion import elegir_codificacion
+
+    assert elegir_codificacion("gzip, zstd", ["zstd", "gzip"]) == "zstd"
+    assert elegir_codificacion("zstd;q=0.5, gzip", ["zstd", "gzip"]) == "gzip"
+    assert elegir_codificacion("zstd;q=0, br", ["zstd", "gzip"]) is None
+    assert elegir_codificacion("*", ["gzip"]) == "gzip"
+    assert elegir_codificacion("", ["zstd", "gzip"]) is None
+
+    pequena = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in pequena.headers
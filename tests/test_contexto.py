@@ -0,0 +1,128 @@
+"""
+=============================================================================
+TESTS DEL TAMAÑO DE CONTEXTO - test_contexto.py
+=============================================================================
+Tests para verificar el conteo local de tokens, la elección de num_ctx
+por cubetas y el tratamiento explícito de los documentos que no caben.
+
+Para ejecutar:
+    pytest tests/test_contexto.py -v
+=============================================================================
+"""
+
+from fastapi.testclient import TestClient
+
+TEXTO_LARGO = "El actor demanda la nulidad del acto administrativo que fijó la tarifa. " * 400
+
+
+# =============================================================================
+# TEST 1: Menor cubeta que cabe, con histéresis
+# =============================================================================
+def test_selector_elige_la_menor_cubeta_con_histeresis():
+    """
+    Verifica que se elige la menor cubeta en la que caben prompt y
+    num_predict, que se sube de inmediato y que solo se baja tras
+    bajar_tras peticiones seguidas que caben en una menor.
+
+    ¿Por qué es importante?
+    - Cada cambio de num_ctx recarga el modelo en Ollama: una mezcla de
+      documentos cortos y largos no debe recargarlo en cada petición
+    """
+    import pytest
+    from app.services.contexto import SelectorContexto, parsear_cubetas
+
+    selector = SelectorContexto(parsear_cubetas("4096, 2048,8192"), num_predict=100, bajar_tras=2)
+
+    assert selector.cubetas == [2048, 4096, 8192]
+    assert selector.elegir("qwen", 500) == 2048
+    assert selector.elegir("qwen", 3000) == 4096  # Sube de inmediato
+    assert selector.elegir("qwen", 500) == 4096  # Primera que cabe en 2048: se mantiene
+    assert selector.elegir("qwen", 500) == 2048  # Segunda seguida: baja
+    assert selector.elegir("otro", 3000) == 4096  # Cada modelo tiene su cubeta
+    assert selector.maximo == 8092
+    with pytest.raises(ValueError):
+        selector.elegir("qwen", 8093)
+
+
+# =============================================================================
+# TEST 2: Conteo de tokens sin tokenizador
+# =============================================================================
+def test_contador_sin_tokenizador_estima_con_margen():
+    """
+    Verifica que, sin tokenizer.json (o si no se puede cargar), los tokens
+    se estiman con margen y los mensajes suman la plantilla de chat.
+    """
+    from app.services.tokens import ContadorTokens, estimar_tokens
+
+    contador = ContadorTokens("/no/existe/tokenizer.json")
+    texto = "Demanda por el cobro del alumbrado público."
+    mensajes = [{"role": "system", "content": "Clasifica."}, {"role": "user", "content": texto}]
+
+    assert contador.exacto is False
+    assert contador.contar(texto) >= estimar_tokens(texto)
+    assert contador.contar_mensajes(mensajes) > contador.contar(texto) + contador.contar("Clasifica.")
+
+
+# =============================================================================
+# TEST 3: La API envía la cubeta mínima y no recarga el modelo
+# =============================================================================
+def test_clasificar_envia_num_ctx_minimo(ollama_falso, monkeypatch):
+    """
+    Verifica que un documento corto se clasifica con la cubeta menor,
+    sin recargas ni truncado en Ollama, y que /metrics reporta la cubeta.
+    """
+    from app.config import get_settings
+    from app.main import app, settings
+
+    monkeypatch.setattr(settings, "reglas_habilitadas", False)
+    cabeceras = {"X-API-Key": get_settings().api_key}
+
+    falso = ollama_falso()
+    with TestClient(app) as client:
+        for radicacion in ("A", "B"):
+            respuesta = client.post("/api/v1/clasificar", headers=cabeceras, json={
+                "radicacion": radicacion, "contenido_demanda": f"Demanda {radicacion} por el cobro del servicio de aseo."
+            })
+            assert respuesta.status_code == 200
+        metricas = client.get("/metrics").text
+
+    assert falso.estadisticas["num_ctx"] == {2048: 2}
+    assert falso.estadisticas["recargas_num_ctx"] == 0
+    assert falso.estadisticas["prompts_truncados"] == 0
+    assert 'qwen_api_contexto_cubeta_total{modelo="qwen2.5:3b",num_ctx="2048"}' in metricas
+
+
+# =============================================================================
+# TEST 4: Documentos que no caben: extracto explícito o rechazo
+# =============================================================================
+def test_documento_excedido_se_recorta_o_rechaza(ollama_falso, monkeypatch):
+    """
+    Verifica que un documento que no cabe en la cubeta mayor se recorta
+    antes de enviarlo (nunca lo trunca Ollama) o se rechaza con 413.
+    """
+    from app.config import get_settings
+    from app.main import app, settings
+
+    monkeypatch.setattr(settings, "reglas_habilitadas", False)
+    monkeypatch.setattr(settings, "extracto_habilitado", False)
+    monkeypatch.setattr(settings, "contexto_cubetas", "1024,2048")
+    cabeceras = {"X-API-Key": get_settings().api_key}
+    cuerpo = {"radicacion": "A", "texto_pdf_completo": TEXTO_LARGO}
+
+    falso = ollama_falso()
+    with TestClient(app) as client:
+        recortado = client.post("/api/v1/clasificar", headers=cabeceras, json=cuerpo)
+
+    assert recortado.status_code == 200
+    assert recortado.json()["longitud_extracto"] < len(TEXTO_LARGO)
+    assert falso.estadisticas["num_ctx"] == {2048: 1}
+    assert falso.estadisticas["prompts_truncados"] == 0
+
+    monkeypatch.setattr(settings, "contexto_excedido", "rechazar")
+    falso = ollama_falso()
+    with TestClient(app) as client:
+        rechazado = client.post("/api/v1/clasificar", headers=cabeceras, json=cuerpo)
+
+    assert rechazado.status_code == 413
+    assert "CONTEXTO_CUBETAS" in rechazado.json()["detail"]
+    assert falso.estadisticas["chat"] == 0
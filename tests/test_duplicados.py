@@ -0,0 +1,119 @@
+"""
+=============================================================================
+TESTS DEL ÍNDICE DE CASI DUPLICADOS - test_duplicados.py
+=============================================================================
+Tests para verificar la huella SimHash, la memoria acotada, la
+persistencia en SQLite y la reutilización de clasificaciones sin generar.
+
+Para ejecutar:
+    pytest tests/test_duplicados.py -v
+=============================================================================
+"""
+import asyncio
+import random
+from fastapi.testclient import TestClient
+
+RESULTADO = {"es_relevante": False, "confianza": 0.2, "razon": "Sin relación con alumbrado público"}
+
+
+def documento(semilla: int, palabras: int = 800) -> str:
+    """Documento de palabras aleatorias (sin números ni palabras clave)."""
+    rng = random.Random(semilla)
+    letras = "bcdfghjkmnpqrstvwxz"
+    return " ".join("".join(rng.choice(letras) for _ in range(6)) for _ in range(palabras))
+
+
+def variante(texto: str) -> str:
+    """El mismo documento con otra radicación, otra fecha y una palabra cambiada."""
+    palabras = texto.split()
+    palabras[400] = "Distinta"
+    return f"Radicado 2024-00917 del 3 de marzo de 2024. {' '.join(palabras)}"
+
+
+# =============================================================================
+# TEST 1: Huella y búsqueda
+# =============================================================================
+def test_casi_duplicado_se_encuentra_y_un_documento_distinto_no():
+    """
+    Verifica que un documento que solo cambia en números y una palabra
+    queda a pocos bits del original, y que otro documento no coincide.
+    """
+    from app.services.duplicados import IndiceDuplicados, huella_simhash
+
+    assert huella_simhash("Auto admisorio") is None  # Demasiado corto para indexar
+
+    original = documento(1)
+    indice = IndiceDuplicados(distancia_max=4, max_entradas=100)
+    asyncio.run(indice.agregar(original, RESULTADO))
+
+    encontrado = indice.buscar(variante(original))
+    assert encontrado is not None
+    resultado, distancia = encontrado
+    assert resultado == RESULTADO
+    assert distancia <= 4
+
+    assert indice.buscar(documento(2)) is None
+    assert indice.estadisticas() == {"aciertos": 1, "fallos": 1, "entradas": 1}
+
+
+# =============================================================================
+# TEST 2: Memoria acotada y persistencia
+# =============================================================================
+def test_indice_acotado_y_persistente(tmp_path):
+    """
+    Verifica que se expulsa la huella más antigua al superar max_entradas
+    y que al reabrir se recargan solo las huellas del mismo contexto.
+
+    ¿Por qué es importante?
+    - El índice debe caber en memoria aunque la API clasifique millones
+      de documentos, y no debe perderse con cada despliegue
+    - Un cambio de prompt o de modelo invalida las clasificaciones guardadas
+    """
+    from app.services.duplicados import IndiceDuplicados
+
+    ruta = str(tmp_path / "duplicados.sqlite3")
+    indice = IndiceDuplicados(distancia_max=0, max_entradas=2, contexto="v1", ruta_sqlite=ruta)
+    for huella in (1, 2, 1 << 63):  # La última no cabe en un INTEGER con signo sin convertir
+        asyncio.run(indice.agregar_huella(huella, RESULTADO))
+    assert len(indice) == 2
+    assert indice.buscar_huella(1) is None  # Expulsada
+    indice.cerrar()
+
+    reabierto = IndiceDuplicados(distancia_max=0, max_entradas=2, contexto="v1", ruta_sqlite=ruta)
+    assert reabierto.buscar_huella(1 << 63) == (RESULTADO, 0)
+    assert reabierto.buscar_huella(2) is not None
+    reabierto.cerrar()
+
+    assert len(IndiceDuplicados(distancia_max=0, max_entradas=2, contexto="v2", ruta_sqlite=ruta)) == 0
+
+
+# =============================================================================
+# TEST 3: Clasificación sin generar
+# =============================================================================
+def test_clasificar_casi_duplicado_sin_llamar_al_chat(ollama_falso, monkeypatch):
+    """
+    Verifica que el segundo envío de un documento casi idéntico reutiliza
+    la clasificación del modelo (metodo DUPLICADO) sin llamar al chat.
+    """
+    from app.config import get_settings
+    from app.main import app, settings
+
+    monkeypatch.setattr(settings, "duplicados_habilitado", True)
+    cabeceras = {"X-API-Key": get_settings().api_key}
+    original = documento(3)
+
+    falso = ollama_falso()
+    with TestClient(app) as client:
+        primero = client.post("/api/v1/clasificar", headers=cabeceras, json={
+            "radicacion": "A", "texto_pdf_completo": original
+        })
+        segundo = client.post("/api/v1/clasificar", headers=cabeceras, json={
+            "radicacion": "B", "texto_pdf_completo": variante(original)
+        })
+        metricas = client.get("/metrics").text
+
+    assert primero.json()["metodo_clasificacion"] == "IA"
+    assert segundo.json()["metodo_clasificacion"] == "DUPLICADO"
+    assert segundo.json()["es_relevante"] == primero.json()["es_relevante"]
+    assert falso.estadisticas["chat"] == 1
+    assert "qwen_api_duplicados_aciertos_total 1.0" in metricas
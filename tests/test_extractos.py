@@ -0,0 +1,48 @@
+"""
+=============================================================================
+TESTS DE EXTRACTOS - test_extractos.py
+=============================================================================
+Tests para verificar la reducción de documentos largos a los pasajes
+alrededor de las señales de relevancia.
+
+Para ejecutar:
+    pytest tests/test_extractos.py -v
+=============================================================================
+"""
+
+
+# =============================================================================
+# TEST 1: Un texto corto no se modifica
+# =============================================================================
+def test_texto_corto_sin_cambios():
+    """
+    Verifica que un texto dentro del presupuesto se envía completo.
+    """
+    from app.services.extractos import extraer_fragmentos
+
+    extracto = extraer_fragmentos("Demanda por alumbrado", max_caracteres=100, ventana=10, cabecera=20)
+
+    assert extracto.texto == "Demanda por alumbrado"
+    assert extracto.ratio_compresion == 1.0
+
+
+# =============================================================================
+# TEST 2: Un documento largo conserva cabecera y pasajes relevantes
+# =============================================================================
+def test_documento_largo_conserva_senales():
+    """
+    Verifica que el extracto respeta el presupuesto, conserva la cabecera
+    y el pasaje con la señal de relevancia, y descarta el relleno.
+    """
+    from app.services.extractos import extraer_fragmentos
+
+    texto = (
+        "RADICACIÓN 2024-00001. " + "considerando general. " * 2000
+        + "el contrato de alumbrado con DOLMEN" + " párrafo final." * 2000
+    )
+    extracto = extraer_fragmentos(texto, max_caracteres=1000, ventana=50, cabecera=100)
+
+    assert extracto.longitud <= 1000
+    assert extracto.texto.startswith("RADICACIÓN 2024-00001.")
+    assert "contrato de alumbrado con DOLMEN" in extracto.texto
+    assert extracto.ratio_compresion > 10
@@ -0,0 +1,140 @@
+"""
+=============================================================================
+TESTS DE LIMPIEZA DE TEXTO - test_limpieza.py
+=============================================================================
+Tests para verificar la limpieza del texto de los PDF antes del extracto:
+encabezados repetidos, números de página, guiones de fin de línea, firmas
+y espacios.
+
+Para ejecutar:
+    pytest tests/test_limpieza.py -v
+=============================================================================
+"""
+
+from fastapi.testclient import TestClient
+
+
+def documento_pdf(paginas: int = 5) -> str:
+    """Texto con la forma de un PDF: encabezado, cuerpo partido en líneas y pie por página."""
+    hojas = []
+    for pagina in range(1, paginas + 1):
+        hojas.append(
+            "CONSEJO DE ESTADO\n"
+            f"Radicación: 11001-03-15-000-2024-0000{pagina}-00\n"
+            "El actor solicita la nulidad del acto que fijó la tarifa del con-\n"
+            "trato de suministro del municipio y reclama    la devolución\n"
+            "de lo cobrado en la factura.\n"
+            "El municipio contestó la demanda.\n"
+            "Se decretan las pruebas documentales aportadas con la demanda.\n"
+            "El despacho procede a resolver la solicitud de la parte actora.\n"
+            f"Página {pagina} de {paginas}"
+        )
+    hojas[-1] += "\nDocumento firmado electrónicamente\nCódigo de verificación: 9f2c41aa07d3e8b1"
+    return "\f".join(hojas)
+
+
+# =============================================================================
+# TEST 1: Encabezados, números de página, guiones y firma fuera
+# =============================================================================
+def test_limpieza_quita_ruido_del_pdf():
+    """
+    Verifica que el encabezado se conserva una sola vez, que desaparecen
+    los números de página y la firma y que las palabras partidas se unen.
+    """
+    from app.services.limpieza import limpiar_texto
+
+    limpio = limpiar_texto(documento_pdf())
+
+    assert limpio.texto.count("CONSEJO DE ESTADO") == 1
+    assert limpio.texto.count("Radicación") == 1
+    assert "Página" not in limpio.texto
+    assert "firmado" not in limpio.texto and "verificación" not in limpio.texto
+    assert "tarifa del contrato de suministro del municipio y reclama la devolución de lo cobrado" in limpio.texto
+    assert limpio.tokens < limpio.tokens_original
+    assert limpio.reduccion_tokens > 0.1
+
+
+# =============================================================================
+# TEST 2: El cuerpo del documento no se toca
+# =============================================================================
+def test_limpieza_conserva_el_cuerpo():
+    """
+    Verifica que las líneas del cuerpo que se repiten en distintas páginas
+    no se confunden con encabezados y que las reglas deciden lo mismo.
+
+    ¿Por qué es importante?
+    - La limpieza solo debe ahorrar tokens: si cambia lo que ven las reglas
+      o el modelo, cambia la clasificación
+    """
+    from app.services.limpieza import limpiar_texto
+    from app.services.reglas import evaluar_reglas
+
+    texto = documento_pdf()
+    limpio = limpiar_texto(texto)
+
+    assert limpio.texto.count("El municipio contestó la demanda.") == 5
+    assert evaluar_reglas(limpio.texto) == evaluar_reglas(texto)
+    assert limpiar_texto("Demanda por el cobro del servicio de aseo.").texto == (
+        "Demanda por el cobro del servicio de aseo."
+    )
+
+
+# =============================================================================
+# TEST 3: La respuesta reporta los tokens y el modelo recibe menos
+# =============================================================================
+def test_clasificar_reporta_reduccion_de_tokens(ollama_falso, monkeypatch):
+    """
+    Verifica que /clasificar devuelve tokens_original y tokens_limpio y que
+    Ollama evalúa menos tokens de prompt que sin la limpieza.
+    """
+    from app.config import get_settings
+    from app.main import app, settings
+
+    monkeypatch.setattr(settings, "reglas_habilitadas", False)
+    cabeceras = {"X-API-Key": get_settings().api_key}
+    cuerpo = {"radicacion": "A", "texto_pdf_completo": documento_pdf(20)}
+
+    evaluados = {}
+    for habilitada in (False, True):
+        monkeypatch.setattr(settings, "limpieza_habilitada", habilitada)
+        falso = ollama_falso()
+        with TestClient(app) as client:
+            respuesta = client.post("/api/v1/clasificar", headers=cabeceras, json=cuerpo)
+        assert respuesta.status_code == 200
+        evaluados[habilitada] = falso.estadisticas["tokens_prompt"]
+
+    datos = respuesta.json()
+    assert datos["tokens_limpio"] < datos["tokens_original"]
+    assert evaluados[True] < evaluados[False]
+
+
+# =============================================================================
+# TEST 4: Textos que la limpieza deja vacíos
+# =============================================================================
+def test_clasificar_texto_que_queda_vacio_tras_limpiar(ollama_falso, monkeypatch):
+    """
+    Verifica que un texto que solo tiene ruido (espacios, números sueltos,
+    un número de página) se clasifica con el texto recibido en lugar de
+    fallar con 500 tras pagar la inferencia.
+    """
+    from app.config import get_settings
+    from app.main import app, settings
+
+    monkeypatch.setattr(settings, "reglas_habilitadas", False)
+    cabeceras = {"X-API-Key": get_settings().api_key}
+    textos = ["   \n  ", "1\n2\n3\n", "Página 1 de 3"]
+
+    ollama_falso()
+    with TestClient(app) as client:
+        for texto in textos:
+            respuesta = client.post("/api/v1/clasificar", headers=cabeceras, json={
+                "radicacion": "A", "contenido_demanda": texto
+            })
+            assert respuesta.status_code == 200, texto
+            assert respuesta.json()["tokens_limpio"] is None
+        lote = client.post("/api/v1/clasificar/lote", headers=cabeceras, json=[
+            {"radicacion": str(i), "contenido_demanda": texto} for i, texto in enumerate(textos)
+        ])
+
+    assert lote.status_code == 200
+    assert [item["status_code"] for item in lote.json()] == [200, 200, 200]
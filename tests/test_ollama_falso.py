@@ -0,0 +1,174 @@
+"""
+=============================================================================
+TESTS CONTRA EL OLLAMA FALSO - test_ollama_falso.py
+=============================================================================
+Tests de extremo a extremo que pasan por el modelo sin tener Ollama:
+la API habla por HTTP (en memoria) con benchmarks/ollama_falso.py.
+
+Para ejecutar:
+    pytest tests/test_ollama_falso.py -v
+=============================================================================
+"""
+import asyncio
+import json
+
+import httpx
+from fastapi.testclient import TestClient
+
+# Texto sin menciones literales: las reglas no deciden y se llama al modelo
+TEXTO_IA = "Proceso sobre luminarias instaladas por la empresa DOLMEN en el municipio"
+
+
+def _clasificar(client, texto=TEXTO_IA):
+    from app.config import get_settings
+
+    return client.post(
+        "/api/v1/clasificar",
+        json={"radicacion": "2024-00001", "texto_pdf_completo": texto},
+        headers={"X-API-Key": get_settings().api_key}
+    )
+
+
+# =============================================================================
+# TEST 1: Clasificación completa por IA
+# =============================================================================
+def test_clasificar_por_ia_contra_ollama_falso(ollama_falso):
+    """
+    Verifica el camino completo hasta el modelo: la API envía el chat,
+    interpreta el JSON y /health ve el modelo cargado en memoria.
+
+    ¿Por qué es importante?
+    - Sin Ollama, los tests solo cubrían el camino de las reglas
+    """
+    from app.main import app
+
+    falso = ollama_falso()
+    with TestClient(app) as client:
+        response = _clasificar(client)
+        client.portal.call(app.state.salud.refrescar)
+        salud = client.get("/health").json()
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["metodo_clasificacion"] == "IA"
+    assert data["es_relevante"] is True
+    assert falso.estadisticas["chat"] == 1
+    assert salud["ollama_conectado"] is True
+    assert salud["modelo_cargado"] is True
+
+
+# =============================================================================
+# TEST 2: Fallos inyectados y salidas inválidas
+# =============================================================================
+def test_fallos_y_json_invalido_devuelven_500(ollama_falso):
+    """
+    Verifica que un error HTTP de Ollama y una salida que no es JSON
+    (tras agotar los reintentos) terminan en 500.
+    """
+    from app.config import get_settings
+    from app.main import app
+
+    falso = ollama_falso(tasa_fallos=1.0)
+    with TestClient(app) as client:
+        assert _clasificar(client).status_code == 500
+    assert falso.estadisticas["fallos_inyectados"] == 1
+
+    falso = ollama_falso(tasa_json_invalido=1.0)
+    with TestClient(app) as client:
+        assert _clasificar(client).status_code == 500
+    assert falso.estadisticas["chat"] == get_settings().salida_max_reintentos + 1
+
+
+# =============================================================================
+# TEST 3: Límite de slots paralelos y estadísticas de Ollama
+# =============================================================================
+def test_slots_limitan_la_concurrencia():
+    """
+    Verifica que el servidor falso no atiende más peticiones a la vez que
+    sus slots, y que reporta carga, prompt y generación como Ollama.
+
+    ¿Por qué es importante?
+    - Las pruebas de carga offline solo sirven si la cola de Ollama
+      se comporta como la real
+    """
+    from ollama_falso import ConfigOllamaFalso, crear_app
+
+    falso = crear_app(ConfigOllamaFalso(slots=2, factor_tiempo=0.01, carga_segundos=1.0))
+    cuerpo = {
+        "model": "qwen2.5:3b", "stream": False,
+        "messages": [{"role": "user", "content": "alumbrado " * 40}],
+    }
+
+    async def ejecutar():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=falso), base_url="http://ollama") as cliente:
+            return await asyncio.gather(*(cliente.post("/api/chat", json=cuerpo) for _ in range(6)))
+
+    respuestas = [r.json() for r in asyncio.run(ejecutar())]
+
+    assert falso.state.falso.estadisticas["max_en_curso"] == 2
+    assert falso.state.falso.estadisticas["cargas"] == 1
+    assert json.loads(respuestas[0]["message"]["content"])["es_relevante"] is True
+    assert sum(r["load_duration"] > 0 for r in respuestas) == 1
+    assert all(r["eval_count"] > 0 and r["prompt_eval_count"] > 0 for r in respuestas)
+
+
+# =============================================================================
+# TEST 4: Benchmark de carga sin red
+# =============================================================================
+def test_benchmark_de_carga_offline(tmp_path):
+    """
+    Verifica que benchmarks/carga.py puede medir la API en proceso contra
+    el Ollama falso, sin servidor ni modelo.
+    """
+    import carga
+
+    salida = tmp_path / "resultados.json"
+    codigo = carga.main([
+        "--ollama-falso", "--concurrencias", "2", "--peticiones", "6",
+        "--factor-tiempo", "0", "--paginas", "1", "--salida", str(salida),
+    ])
+
+    nivel = json.loads(salida.read_text(encoding="utf-8"))["niveles"][0]
+    assert codigo == 0
+    assert nivel["exitosas"] == 6
+
+
+# =============================================================================
+# TEST 5: Cascada de modelos
+# =============================================================================
+def test_cascada_decide_con_el_modelo_rapido_o_escala(ollama_falso, monkeypatch):
+    """
+    Verifica que el modelo rápido decide los casos claros, que una
+    confianza dentro de la banda ambigua o una salida inválida escalan al
+    modelo principal, y que metodo_clasificacion indica el nivel.
+
+    ¿Por qué es importante?
+    - El modelo pequeño es varias veces más rápido; solo los casos
+      dudosos deben pagar el modelo grande
+    """
+    from app.main import app, settings
+
+    # El Ollama falso responde confianza 0.7 (relevante) o 0.2 (no relevante)
+    for campo, valor in {
+        "cascada_modelo_rapido": "qwen2.5:0.5b",
+        "cascada_confianza_min": 0.6,
+        "cascada_confianza_max": 0.8,
+    }.items():
+        monkeypatch.setattr(settings, campo, valor)
+
+    falso = ollama_falso(modelos=["qwen2.5:0.5b", "qwen2.5:3b"])
+    with TestClient(app) as client:
+        claro = _clasificar(client, "Proceso ejecutivo por cobro de cuotas de administración").json()
+        ambiguo = _clasificar(client).json()
+
+    assert claro["metodo_clasificacion"] == "IA_RAPIDO"
+    assert ambiguo["metodo_clasificacion"] == "IA_ESCALADO"
+    assert falso.estadisticas["chat_por_modelo"] == {"qwen2.5:0.5b": 2, "qwen2.5:3b": 1}
+
+    falso = ollama_falso(modelos=["qwen2.5:0.5b", "qwen2.5:3b"], tasa_json_invalido_por_modelo={"qwen2.5:0.5b": 1.0})
+    with TestClient(app) as client:
+        invalido = _clasificar(client, "Proceso ejecutivo por cobro de cuotas de administración").json()
+
+    assert invalido["metodo_clasificacion"] == "IA_ESCALADO"
+    assert invalido["es_relevante"] is False
+    assert falso.estadisticas["chat_por_modelo"] == {"qwen2.5:0.5b": 1, "qwen2.5:3b": 1}
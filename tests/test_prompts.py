@@ -0,0 +1,93 @@
+"""
+=============================================================================
+TESTS DEL REGISTRO DE PROMPTS - test_prompts.py
+=============================================================================
+Tests para verificar la estructura fija de mensajes (prefijo estable) y
+el versionado de las plantillas.
+
+Para ejecutar:
+    pytest tests/test_prompts.py -v
+=============================================================================
+"""
+import asyncio
+
+import pytest
+
+
+# =============================================================================
+# TEST 1: Prefijo estable entre documentos
+# =============================================================================
+def test_mensaje_system_identico_entre_documentos():
+    """
+    Verifica que la plantilla activa pone las instrucciones en un mensaje
+    system idéntico para cualquier documento y el texto solo en el user.
+
+    ¿Por qué es importante?
+    - Ollama/llama.cpp solo reutiliza el prefijo evaluado si es idéntico
+      byte a byte; cualquier dato variable en el system lo invalida
+    """
+    from app.services.prompts import obtener_plantilla
+
+    plantilla = obtener_plantilla("clasificar_dolmen")
+    uno = plantilla.mensajes("Demanda por alumbrado")
+    otro = plantilla.mensajes("Tutela por el servicio de agua")
+
+    assert [m["role"] for m in uno] == ["system", "user"]
+    assert uno[0] == otro[0]
+    assert uno[1]["content"].endswith("Demanda por alumbrado")
+    assert "REGLA PRIORITARIA" not in uno[1]["content"]
+
+
+# =============================================================================
+# TEST 2: Versiones del registro
+# =============================================================================
+def test_registro_versionado():
+    """
+    Verifica que la versión 1 (diseño original) sigue disponible, que las
+    versiones tienen huellas distintas y que una versión inexistente falla.
+    """
+    from app.services.prompts import obtener_plantilla
+
+    v1 = obtener_plantilla("clasificar_dolmen", "1")
+    v2 = obtener_plantilla("clasificar_dolmen", "2")
+
+    assert [m["role"] for m in v1.mensajes("x")] == ["user"]
+    assert v2.identificador == "clasificar_dolmen@2"
+    assert v1.huella != v2.huella
+    with pytest.raises(KeyError):
+        obtener_plantilla("clasificar_dolmen", "999")
+
+
+# =============================================================================
+# TEST 3: La versión viaja en la respuesta y en la clave de caché
+# =============================================================================
+def test_version_en_respuesta_y_clave_de_cache():
+    """
+    Verifica que una clasificación del modelo indica la versión del prompt
+    y que cambiar de versión no reutiliza resultados de la caché.
+    """
+    from app.config import get_settings
+    from app.services.cache import CacheClasificaciones
+    from app.services.clasificador import Clasificador
+
+    class ClienteFalso:
+        def __init__(self):
+            self.llamadas = []
+
+        async def chat(self, **kwargs):
+            self.llamadas.append(kwargs)
+            return {"message": {"content": '{"es_relevante": false, "confianza": 0.1, "razon": "agua"}'}}
+
+    cache = CacheClasificaciones(10, 60)
+    cliente = ClienteFalso()
+    texto = "Demanda por el servicio de acueducto"
+    for version in ("1", "2", "2"):
+        settings = get_settings().model_copy(
+            update={"prompt_version": version, "generacion_corte_anticipado": False}  # Sin streaming
+        )
+        resultado = asyncio.run(Clasificador(cliente, cache, settings).clasificar(texto))
+        assert resultado["version_prompt"] == f"clasificar_dolmen@{version}"
+
+    # v1 y v2 llaman al modelo; la segunda v2 sale de la caché
+    assert len(cliente.llamadas) == 2
+    assert cliente.llamadas[1]["messages"][0]["role"] == "system"
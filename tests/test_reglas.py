@@ -0,0 +1,76 @@
+"""
+=============================================================================
+TESTS DE REGLAS - test_reglas.py
+=============================================================================
+Tests para verificar el atajo determinístico que clasifica sin llamar
+al modelo cuando el texto contiene menciones literales de alumbrado.
+
+Para ejecutar:
+    pytest tests/test_reglas.py -v
+=============================================================================
+"""
+
+
+# =============================================================================
+# TEST 1: Normalización sin tildes ni mayúsculas
+# =============================================================================
+def test_normalizar_texto():
+    """
+    Verifica que la normalización elimina tildes y mayúsculas.
+    """
+    from app.services.reglas import normalizar_texto
+
+    assert normalizar_texto("ILUMINACIÓN Pública") == "iluminacion publica"
+
+
+# =============================================================================
+# TEST 2: Mención literal de alumbrado decide sin modelo
+# =============================================================================
+def test_alumbrado_publico_es_decisivo():
+    """
+    Verifica la REGLA PRIORITARIA: "alumbrado público" es relevante (>= 0.7).
+
+    Los saltos de línea del PDF entre palabras no deben impedir la coincidencia.
+    """
+    from app.services.reglas import evaluar_reglas
+
+    resultado = evaluar_reglas("Cobro del servicio de ALUMBRADO\nPÚBLICO en el municipio")
+
+    assert resultado.decidido
+    assert resultado.es_relevante is True
+    assert resultado.confianza >= 0.7
+    assert resultado.keywords_encontrados == ["alumbrado público"]
+
+
+# =============================================================================
+# TEST 3: DOLMEN + alumbrado sube la confianza
+# =============================================================================
+def test_dolmen_y_alumbrado():
+    """
+    Verifica que DOLMEN junto con alumbrado asigna confianza 0.9.
+    """
+    from app.services.reglas import evaluar_reglas
+
+    resultado = evaluar_reglas("Contrato con Dolmen para iluminación pública")
+
+    assert resultado.confianza == 0.9
+    assert resultado.keywords_encontrados == ["DOLMEN", "iluminación pública"]
+
+
+# =============================================================================
+# TEST 4: Textos ambiguos van al modelo
+# =============================================================================
+def test_texto_ambiguo_no_decide():
+    """
+    Verifica que el uso figurativo de "luz" o la ausencia de palabras
+    clave NO deciden la clasificación (el texto se envía al modelo).
+    """
+    from app.services.reglas import evaluar_reglas
+
+    figurativo = evaluar_reglas("Se resuelve a la luz de la ley 1437")
+    sin_claves = evaluar_reglas("Demanda por el servicio de acueducto")
+
+    assert not figurativo.decidido
+    assert figurativo.keywords_encontrados == ["luz"]
+    assert not sin_claves.decidido
+    assert sin_claves.keywords_encontrados == []
@@ -0,0 +1,237 @@
+"""
+=============================================================================
+TESTS DE SALIDA DEL MODELO - test_salida_modelo.py
+=============================================================================
+Tests para verificar la reparación local y la validación de la salida
+JSON del modelo.
+
+Para ejecutar:
+    pytest tests/test_salida_modelo.py -v
+=============================================================================
+"""
+import pytest
+
+
+# =============================================================================
+# TEST 1: Salida válida
+# =============================================================================
+def test_salida_valida_no_se_repara():
+    """
+    Verifica que una salida que ya cumple el esquema pasa sin reparación.
+    """
+    from app.services.salida_modelo import interpretar_salida
+
+    resultado, reparado = interpretar_salida(
+        '{"es_relevante": true, "confianza": 0.9, "razon": "Menciona DOLMEN"}'
+    )
+
+    assert resultado == {
+        "es_relevante": True, "confianza": 0.9, "razon": "Menciona DOLMEN", "confianza_reportada": True
+    }
+    assert reparado is False
+
+
+# =============================================================================
+# TEST 2: Salidas casi válidas se reparan sin volver a inferir
+# =============================================================================
+@pytest.mark.parametrize("salida, esperado", [
+    # Truncada por num_predict a mitad de la razón
+    ('{"es_relevante": true, "confianza": 0.7, "razon": "El texto menc', (True, 0.7, "El texto menc")),
+    # Bloque markdown y texto alrededor
+    ('Respuesta:\n```json\n{"es_relevante": false, "confianza": 0.3, "razon": "agua"}\n```', (False, 0.3, "agua")),
+    # Comillas simples, True de Python y coma sobrante
+    ("{'es_relevante': True, 'confianza': 0.5, 'razon': 'ambiguo',}", (True, 0.5, "ambiguo")),
+    # Booleano como texto y confianza fuera de rango
+    ('{"es_relevante": "no", "confianza": 3, "razón": "sin relación"}', (False, 1.0, "sin relación")),
+])
+def test_salidas_casi_validas_se_reparan(salida, esperado):
+    """
+    Verifica que los errores típicos de un modelo pequeño se corrigen
+    localmente.
+
+    ¿Por qué es importante?
+    - Cada salida reparada es una inferencia que no hay que repetir
+    """
+    from app.services.salida_modelo import interpretar_salida
+
+    resultado, _ = interpretar_salida(salida)
+
+    assert (resultado["es_relevante"], resultado["confianza"], resultado["razon"]) == esperado
+
+
+# =============================================================================
+# TEST 3: Salidas irreparables
+# =============================================================================
+@pytest.mark.parametrize("salida", [
+    "",
+    "No puedo clasificar este texto",
+    '{"confianza": 0.9, "razon": "falta el campo principal"}',
+    '{"es_relevante": "quizás", "confianza": 0.5, "razon": "x"}',
+])
+def test_salidas_irreparables_lanzan_salida_invalida(salida):
+    """
+    Verifica que lo que no se puede interpretar se reporta como
+    SalidaInvalida (el clasificador decide si reintenta).
+    """
+    from app.services.salida_modelo import SalidaInvalida, interpretar_salida
+
+    with pytest.raises(SalidaInvalida):
+        interpretar_salida(salida)
+
+
+# =============================================================================
+# TEST 4: Reintento acotado ante salida irreparable
+# =============================================================================
+def test_clasificador_reintenta_salida_irreparable():
+    """
+    Verifica que el clasificador envía el esquema a Ollama y reintenta una
+    sola vez (salida_max_reintentos=1) cuando la salida es irreparable.
+    """
+    import asyncio
+    from fastapi import HTTPException
+    from app.config import get_settings
+    from app.services.cache import CacheClasificaciones
+    from app.services.clasificador import Clasificador
+    from app.services.salida_modelo import ESQUEMA_CLASIFICACION
+
+    class ClienteFalso:
+        def __init__(self, salidas):
+            self.salidas = list(salidas)
+            self.llamadas = []
+
+        async def chat(self, **kwargs):
+            self.llamadas.append(kwargs)
+            return {"message": {"content": self.salidas.pop(0)}}
+
+    def clasificador(cliente):
+        settings = get_settings().model_copy(
+            update={"salida_max_reintentos": 1, "generacion_corte_anticipado": False}  # Sin streaming
+        )
+        return Clasificador(cliente, CacheClasificaciones(10, 60), settings)
+
+    cliente = ClienteFalso(["basura", '{"es_relevante": false, "confianza": 0.2, "razon": "agua"}'])
+    resultado = asyncio.run(clasificador(cliente).clasificar("Demanda por el servicio de agua"))
+    assert resultado["es_relevante"] is False
+    assert len(cliente.llamadas) == 2
+    assert cliente.llamadas[0]["format"] == ESQUEMA_CLASIFICACION
+
+    cliente = ClienteFalso(["basura", "más basura", "nunca se pide"])
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(clasificador(cliente).clasificar("Demanda por el servicio de gas"))
+    assert error.value.status_code == 500
+    assert len(cliente.llamadas) == 2
+
+
+# =============================================================================
+# TEST 5: Detección del objeto completo en streaming
+# =============================================================================
+def test_detector_objeto_completo():
+    """
+    Verifica que el detector avisa al cerrarse una clasificación válida,
+    ignora llaves dentro de cadenas y sigue leyendo tras un objeto inválido.
+    """
+    from app.services.salida_modelo import DetectorObjetoCompleto
+
+    detector = DetectorObjetoCompleto()
+    fragmentos = ['Aquí va: {"x": 1} ', '{"es_', 'relevante": true, "confianza": 0.8, ',
+                  '"razon": "cita } y \\" dentro"', '}', "\n\nExplicación adicional"]
+    avisos = [detector.agregar(fragmento) for fragmento in fragmentos]
+
+    assert avisos[:4] == [None] * 4  # {"x": 1} no es una clasificación
+    assert avisos[4] == '{"es_relevante": true, "confianza": 0.8, "razon": "cita } y \\" dentro"}'
+
+
+# =============================================================================
+# TEST 6: Corte anticipado de la generación
+# =============================================================================
+def test_clasificar_corta_el_stream_con_el_json_completo(ollama_falso, monkeypatch):
+    """
+    Verifica que, cuando el modelo sigue escribiendo tras el JSON, la API
+    corta el stream sin necesitar reparación y registra lo ahorrado.
+
+    ¿Por qué es importante?
+    - Los modelos pequeños añaden explicaciones tras la llave de cierre:
+      cada token de más es tiempo de generación que nadie lee
+    """
+    from fastapi.testclient import TestClient
+    from prometheus_client import REGISTRY
+    from app.config import get_settings
+    from app.main import app, settings
+
+    monkeypatch.setattr(settings, "reglas_habilitadas", False)
+    cabeceras = {"X-API-Key": get_settings().api_key}
+    etiquetas = {"modelo": settings.model_name}
+
+    def muestra(nombre, **extra):
+        return REGISTRY.get_sample_value(nombre, {**etiquetas, **extra}) or 0
+
+    def clasificar(texto):
+        with TestClient(app) as client:
+            respuesta = client.post("/api/v1/clasificar", headers=cabeceras, json={
+                "radicacion": "A", "contenido_demanda": texto
+            })
+        assert respuesta.status_code == 200
+        return respuesta.json()
+
+    # El modelo termina justo tras el JSON: no hay nada que cortar
+    cortes = muestra("qwen_api_corte_tokens_ahorrados_count")
+    ollama_falso()
+    clasificar("Demanda por el cobro del servicio de gas.")
+    assert muestra("qwen_api_corte_tokens_ahorrados_count") == cortes
+
+    reparadas = muestra("qwen_api_salidas_invalidas_total", accion="reparada")
+    ollama_falso(texto_tras_json="\n\nExplicación: el proceso trata del servicio de aseo. " * 3)
+    datos = clasificar("Demanda por el cobro del servicio de aseo.")
+
+    assert datos["razon"] == "Sin relación con alumbrado público"
+    assert muestra("qwen_api_corte_tokens_ahorrados_count") == cortes + 1
+    assert muestra("qwen_api_corte_tokens_ahorrados_sum") > 0
+    assert muestra("qwen_api_salidas_invalidas_total", accion="reparada") == reparadas
+
+
+# =============================================================================
+# TEST 7: Sin confianza, la cascada escala
+# =============================================================================
+def test_cascada_escala_si_falta_la_confianza():
+    """
+    Verifica que una salida sin confianza (o no numérica) se marca como
+    no reportada y que la cascada la escala al modelo principal en lugar
+    de aceptar un 0.0 inventado como confianza baja.
+    """
+    import asyncio
+    from app.config import get_settings
+    from app.services.cache import CacheClasificaciones
+    from app.services.clasificador import Clasificador
+    from app.services.salida_modelo import validar_clasificacion
+
+    assert validar_clasificacion({"es_relevante": False})["confianza_reportada"] is False
+    assert validar_clasificacion({"es_relevante": False, "confianza": "alta"})["confianza_reportada"] is False
+    assert validar_clasificacion({"es_relevante": False, "confianza": 0.0})["confianza_reportada"] is True
+
+    class ClienteFalso:
+        def __init__(self):
+            self.modelos = []
+
+        async def chat(self, model, **kwargs):
+            self.modelos.append(model)
+            if model == "qwen2.5:0.5b":
+                return {"message": {"content": '{"es_relevante": false, "razon": "agua"}'}}
+            return {"message": {"content": '{"es_relevante": true, "confianza": 0.9, "razon": "luminarias"}'}}
+
+    settings = get_settings().model_copy(update={
+        "model_name": "qwen2.5:3b",
+        "cascada_modelo_rapido": "qwen2.5:0.5b",
+        "cascada_confianza_min": 0.4,
+        "cascada_confianza_max": 0.6,
+        "reglas_habilitadas": False,
+        "generacion_corte_anticipado": False  # Sin streaming
+    })
+    cliente = ClienteFalso()
+    resultado = asyncio.run(
+        Clasificador(cliente, CacheClasificaciones(10, 60), settings).clasificar("Demanda por el servicio de acueducto")
+    )
+
+    assert cliente.modelos == ["qwen2.5:0.5b", "qwen2.5:3b"]
+    assert resultado["metodo_clasificacion"] == "IA_ESCALADO"
+    assert resultado["confianza"] == 0.9
+    assert "confianza_reportada" not in resultado
@@ -0,0 +1,170 @@
+"""
+=============================================================================
+TESTS DEL MONITOR DE SALUD - test_salud.py
+=============================================================================
+Tests para verificar que /health se sirve desde una instantánea refrescada
+en segundo plano e informa si el modelo está cargado y el estado de la cola.
+
+Para ejecutar:
+    pytest tests/test_salud.py -v
+=============================================================================
+"""
+import asyncio
+
+
+class ClienteFalso:
+    """Cliente de Ollama con /api/tags y /api/ps simulados."""
+
+    def __init__(self, descargados, en_memoria, falla=False):
+        self.descargados = descargados
+        self.en_memoria = en_memoria
+        self.falla = falla
+        self.consultas = 0
+
+    async def list(self):
+        self.consultas += 1
+        if self.falla:
+            raise ConnectionError("Ollama no responde")
+        return {"models": [{"name": nombre} for nombre in self.descargados]}
+
+    async def ps(self):
+        return {"models": [{"name": nombre} for nombre in self.en_memoria]}
+
+
+def _monitor(cliente, http=None):
+    from app.config import get_settings
+    from app.services.cache import CacheClasificaciones
+    from app.services.clasificador import Clasificador
+    from app.services.salud import MonitorSalud
+
+    settings = get_settings().model_copy(update={"model_name": "qwen2.5:3b"})
+    return MonitorSalud(Clasificador(cliente, CacheClasificaciones(10, 60), settings), settings, http)
+
+
+# =============================================================================
+# TEST 1: Modelo descargado pero no cargado en memoria
+# =============================================================================
+def test_instantanea_distingue_descargado_y_cargado():
+    """
+    Verifica que la instantánea informa por separado si el modelo está
+    descargado (/api/tags) y si está cargado en memoria (/api/ps).
+
+    ¿Por qué es importante?
+    - Un modelo descargado pero no cargado implica un arranque en frío
+    """
+    cliente = ClienteFalso(descargados=["qwen2.5:3b"], en_memoria=[])
+    monitor = _monitor(cliente)
+    asyncio.run(monitor.refrescar())
+
+    estado = monitor.estado()
+    assert estado["status"] == "healthy"
+    assert estado["ollama_conectado"] is True
+    assert estado["modelo_cargado"] is False
+
+    cliente.en_memoria = ["qwen2.5:3b"]
+    asyncio.run(monitor.refrescar())
+    assert monitor.estado()["modelo_cargado"] is True
+
+
+# =============================================================================
+# TEST 2: Leer el estado no consulta Ollama
+# =============================================================================
+def test_estado_no_consulta_ollama():
+    """
+    Verifica que leer el estado (lo que hace cada GET /health) no llama a
+    Ollama e incluye la cola en el momento de la lectura.
+    """
+    cliente = ClienteFalso(descargados=["qwen2.5:3b"], en_memoria=["qwen2.5:3b"])
+    monitor = _monitor(cliente)
+    asyncio.run(monitor.refrescar())
+
+    monitor.clasificador.admision.en_espera = 3
+    for _ in range(100):
+        estado = monitor.estado()
+
+    assert cliente.consultas == 1
+    assert estado["en_cola"] == 3
+    assert estado["en_curso"] == 0
+
+
+# =============================================================================
+# TEST 3: Ollama caído -> status ollama_no_disponible
+# =============================================================================
+def test_ollama_caido():
+    """
+    Verifica que un fallo de la consulta queda registrado en la instantánea
+    y que antes de la primera consulta el estado es 'iniciando'.
+    """
+    monitor = _monitor(ClienteFalso(descargados=[], en_memoria=[], falla=True))
+    assert monitor.estado()["status"] == "iniciando"
+
+    asyncio.run(monitor.refrescar())
+    estado = monitor.estado()
+    assert estado["status"] == "ollama_no_disponible"
+    assert "Ollama no responde" in estado["error"]
+
+
+# =============================================================================
+# TEST 4: Endpoint /health
+# =============================================================================
+def test_endpoint_health_desde_instantanea():
+    """
+    Verifica que /health devuelve 200 con la instantánea cuando Ollama
+    está disponible y 503 cuando no.
+    """
+    import time
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as client:
+        monitor = app.state.salud
+        client.portal.call(monitor.detener)  # Sin refresco de fondo que pise la instantánea
+        monitor.instantanea = {
+            "ollama_conectado": True, "modelo_disponible": True, "modelo_cargado": True,
+            "error": None, "actualizado": time.time(),
+        }
+        response = client.get("/health")
+        assert response.status_code == 200
+        assert response.json()["modelo_cargado"] is True
+
+        monitor.instantanea = {**monitor.instantanea, "ollama_conectado": False, "error": "caído"}
+        response = client.get("/health")
+        assert response.status_code == 503
+        assert response.json()["status"] == "ollama_no_disponible"
+
+
+# =============================================================================
+# TEST 5: /api/ps con el cliente real de Ollama, y servidor sin /api/ps
+# =============================================================================
+def test_modelos_en_memoria_con_el_cliente_real():
+    """
+    Verifica que /api/ps se consulta sin métodos privados del cliente
+    ollama y que un servidor sin /api/ps (404) deja modelo_cargado en
+    False sin marcar a Ollama como caído.
+    """
+    import httpx
+    from app.config import get_settings
+    from app.services.ollama_cliente import crear_cliente_ollama, modelos_en_memoria
+
+    con_ps = True
+
+    def responder(peticion: httpx.Request) -> httpx.Response:
+        if peticion.url.path == "/api/tags":
+            return httpx.Response(200, json={"models": [{"name": "qwen2.5:3b"}]})
+        if peticion.url.path == "/api/ps" and con_ps:
+            return httpx.Response(200, json={"models": [{"name": "qwen2.5:3b"}]})
+        return httpx.Response(404, json={"error": "not found"})
+
+    cliente, http = crear_cliente_ollama(get_settings(), transport=httpx.MockTransport(responder))
+    monitor = _monitor(cliente, http)
+
+    assert asyncio.run(modelos_en_memoria(cliente, http)) == [{"name": "qwen2.5:3b"}]
+    asyncio.run(monitor.refrescar())
+    assert monitor.estado()["modelo_cargado"] is True
+
+    con_ps = False
+    assert asyncio.run(modelos_en_memoria(cliente, http)) is None
+    asyncio.run(monitor.refrescar())
+    estado = monitor.estado()
+    assert estado["status"] == "healthy"
+    assert estado["modelo_cargado"] is False
@@ -0,0 +1,260 @@
+"""
+=============================================================================
+TESTS DE TRABAJOS ASÍNCRONOS - test_trabajos.py
+=============================================================================
+Tests para verificar la cola persistente de trabajos, sus trabajadores y
+los endpoints POST/GET /api/v1/trabajos.
+
+Para ejecutar:
+    pytest tests/test_trabajos.py -v
+=============================================================================
+"""
+import asyncio
+import json
+import time
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+
+class ClasificadorFalso:
+    """Clasificador que responde sin modelo (o con el error indicado)."""
+
+    def __init__(self, error=None):
+        self.error = error
+        self.llamadas = 0
+
+    async def clasificar(self, texto, plazo=None):
+        self.llamadas += 1
+        if self.error is not None:
+            raise self.error
+        return {"es_relevante": False, "confianza": 0.8, "razon": "prueba"}
+
+
+# =============================================================================
+# TEST 1: Un trabajo en curso sobrevive al reinicio
+# =============================================================================
+def test_trabajo_en_proceso_se_recupera_al_reabrir(tmp_path):
+    """
+    Verifica que un trabajo que estaba en_proceso cuando se cayó la API
+    vuelve a pendiente al reabrir la base de datos.
+
+    ¿Por qué es importante?
+    - Reiniciar el contenedor api no debe perder trabajos aceptados
+    """
+    from app.services.trabajos import AlmacenTrabajos
+
+    ruta = str(tmp_path / "trabajos.sqlite3")
+    almacen = AlmacenTrabajos(ruta, retencion_segundos=3600)
+    creado = almacen.crear(json.dumps({"contenido_demanda": "texto"}), "resumido")
+    reclamado = almacen.reclamar()
+    assert reclamado["id"] == creado["id"]
+    assert reclamado["estado"] == "en_proceso"
+    assert almacen.reclamar() is None
+    almacen.cerrar()
+
+    reabierto = AlmacenTrabajos(ruta, retencion_segundos=3600, max_intentos=2)
+    assert reabierto.obtener(creado["id"])["estado"] == "pendiente"
+    assert reabierto.reclamar()["intentos"] == 2
+    reabierto.cerrar()
+
+    # Interrumpido max_intentos veces: se da por fallido en lugar de repetirlo
+    agotado = AlmacenTrabajos(ruta, retencion_segundos=3600, max_intentos=2)
+    trabajo = agotado.obtener(creado["id"])
+    assert trabajo["estado"] == "error"
+    assert trabajo["status_code"] == 500
+    assert agotado.reclamar() is None
+    agotado.cerrar()
+
+
+# =============================================================================
+# TEST 2: Trabajadores completan y reencolan ante 429
+# =============================================================================
+def test_trabajador_completa_y_reencola_ante_429(tmp_path):
+    """
+    Verifica que el trabajador guarda el resultado en modo resumido y que
+    un 429 de la cola de admisión devuelve el trabajo a pendiente con el
+    retraso del Retry-After, en lugar de marcarlo como error.
+    """
+    from app.services.trabajos import AlmacenTrabajos, PoolTrabajadores
+
+    almacen = AlmacenTrabajos(str(tmp_path / "trabajos.sqlite3"), retencion_segundos=3600)
+    solicitud = json.dumps({"radicacion": "R-1", "contenido_demanda": "texto"})
+
+    async def procesar(clasificador):
+        pool = PoolTrabajadores(almacen, clasificador, num_trabajadores=1)
+        trabajo = await asyncio.to_thread(almacen.crear, solicitud, "resumido")
+        await pool._procesar(almacen.reclamar())
+        return almacen.obtener(trabajo["id"])
+
+    completado = asyncio.run(procesar(ClasificadorFalso()))
+    assert completado["estado"] == "completado"
+    assert completado["resultado"]["radicacion"] == "R-1"
+    assert "contenido_demanda" not in completado["resultado"]
+
+    saturado = HTTPException(status_code=429, detail="cola llena", headers={"Retry-After": "30"})
+    reencolado = asyncio.run(procesar(ClasificadorFalso(error=saturado)))
+    assert reencolado["estado"] == "pendiente"
+    assert reencolado["intentos"] == 0  # Un 429 no cuenta como intento
+    assert reencolado["disponible_desde"] > time.time() + 20
+    assert reencolado["error"] is None
+
+    fallido = asyncio.run(procesar(ClasificadorFalso(error=HTTPException(status_code=500, detail="boom"))))
+    assert fallido["estado"] == "error"
+    assert fallido["status_code"] == 500
+    almacen.cerrar()
+
+
+# =============================================================================
+# TEST 3: Enviar y consultar por la API
+# =============================================================================
+def test_enviar_y_consultar_trabajo():
+    """
+    Verifica el ciclo completo: POST responde 202 con el id al instante y
+    GET devuelve el resultado cuando el trabajador termina.
+
+    Se usa un texto que deciden las reglas, así que no requiere Ollama.
+    """
+    from app.config import get_settings
+    from app.main import app
+
+    headers = {"X-API-Key": get_settings().api_key}
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/v1/trabajos",
+            json={"radicacion": "R-2", "contenido_demanda": "Cobro del servicio de alumbrado público"},
+            headers=headers
+        )
+        assert response.status_code == 202
+        creado = response.json()
+        assert response.headers["Location"] == creado["url"]
+
+        data = None
+        for _ in range(100):
+            data = client.get(creado["url"], headers=headers).json()
+            if data["estado"] in ("completado", "error"):
+                break
+            time.sleep(0.05)
+
+        assert data["estado"] == "completado"
+        assert data["resultado"]["radicacion"] == "R-2"
+        assert data["resultado"]["metodo_clasificacion"] == "REGLAS"
+
+        assert client.get("/api/v1/trabajos/no-existe", headers=headers).status_code == 404
+        sin_texto = client.post("/api/v1/trabajos", json={"radicacion": "R-3"}, headers=headers)
+        assert sin_texto.status_code == 400
+
+
+# =============================================================================
+# TEST 4: Purga periódica de trabajos terminados
+# =============================================================================
+def test_trabajos_terminados_se_purgan_sin_reiniciar(tmp_path):
+    """
+    Verifica que los trabajos terminados se purgan mientras la API sigue
+    corriendo, no solo al arrancar.
+
+    ¿Por qué es importante?
+    - Una réplica que no se reinicia no debe hacer crecer el SQLite sin límite
+    """
+    from app.services.trabajos import AlmacenTrabajos, PoolTrabajadores
+
+    almacen = AlmacenTrabajos(str(tmp_path / "trabajos.sqlite3"), retencion_segundos=0)
+
+    async def esperar_purga():
+        pool = PoolTrabajadores(almacen, ClasificadorFalso(), num_trabajadores=1, intervalo_purga=0.01)
+        pool.iniciar()
+        trabajo = await asyncio.to_thread(almacen.crear, json.dumps({"contenido_demanda": "texto"}), "resumido")
+        pool.notificar()
+        for _ in range(200):
+            await asyncio.sleep(0.01)
+            if almacen.obtener(trabajo["id"]) is None:
+                break
+        await pool.detener()
+        return trabajo
+
+    trabajo = asyncio.run(esperar_purga())
+    assert almacen.obtener(trabajo["id"]) is None
+    almacen.cerrar()
+
+
+# =============================================================================
+# TEST 5: callback_url solo hacia hosts permitidos
+# =============================================================================
+def test_callback_url_fuera_de_la_lista_se_rechaza(monkeypatch):
+    """
+    Verifica que callback_url se valida contra los esquemas y hosts
+    permitidos y que, sin lista, no se aceptan callbacks.
+
+    ¿Por qué es importante?
+    - Sin la lista, cualquiera con API key podría hacer que el servidor
+      llame a direcciones internas (SSRF)
+    """
+    from app.config import get_settings
+    from app.main import app, settings
+
+    headers = {"X-API-Key": get_settings().api_key}
+    cuerpo = {"radicacion": "R-4", "contenido_demanda": "Cobro del servicio de alumbrado público"}
+
+    def enviar(client, url):
+        return client.post("/api/v1/trabajos", params={"callback_url": url}, json=cuerpo, headers=headers)
+
+    with TestClient(app) as client:
+        assert enviar(client, "https://clientes.ejemplo.com/avisos").status_code == 400
+
+        monkeypatch.setattr(settings, "trabajos_callback_hosts", "clientes.ejemplo.com,*.interno.ejemplo.com")
+        assert enviar(client, "https://clientes.ejemplo.com/avisos").status_code == 202
+        assert enviar(client, "https://avisos.interno.ejemplo.com/x").status_code == 202
+        assert enviar(client, "http://clientes.ejemplo.com/avisos").status_code == 400
+        assert enviar(client, "https://169.254.169.254/latest/meta-data").status_code == 400
+        assert enviar(client, "https://clientes.ejemplo.com.atacante.net/").status_code == 400
+
+
+# =============================================================================
+# TEST 6: Un error al guardar no detiene al trabajador
+# =============================================================================
+def test_error_al_guardar_no_detiene_al_trabajador(tmp_path, monkeypatch):
+    """
+    Verifica que si guardar un resultado falla (ej: SQLite bloqueado), el
+    trabajador registra el error y sigue con el siguiente trabajo.
+
+    ¿Por qué es importante?
+    - Sin supervisor, un trabajador que muere deja la cola sin consumir
+      mientras POST /trabajos sigue respondiendo 202
+    """
+    import sqlite3
+    from app.services.trabajos import AlmacenTrabajos, PoolTrabajadores
+
+    almacen = AlmacenTrabajos(str(tmp_path / "trabajos.sqlite3"), retencion_segundos=3600)
+    completar = almacen.completar
+    fallos = []
+
+    def completar_una_vez_falla(trabajo_id, resultado):
+        if not fallos:
+            fallos.append(trabajo_id)
+            raise sqlite3.OperationalError("database is locked")
+        completar(trabajo_id, resultado)
+
+    monkeypatch.setattr(almacen, "completar", completar_una_vez_falla)
+
+    async def procesar_dos():
+        pool = PoolTrabajadores(almacen, ClasificadorFalso(), num_trabajadores=1, intervalo_sondeo=0.01)
+        primero = await asyncio.to_thread(almacen.crear, json.dumps({"contenido_demanda": "uno"}), "resumido")
+        pool.iniciar()
+        for _ in range(200):
+            await asyncio.sleep(0.01)
+            if fallos:
+                break
+        segundo = await asyncio.to_thread(almacen.crear, json.dumps({"contenido_demanda": "dos"}), "resumido")
+        pool.notificar()
+        for _ in range(200):
+            await asyncio.sleep(0.01)
+            if almacen.obtener(segundo["id"])["estado"] == "completado":
+                break
+        await pool.detener()
+        return primero, segundo
+
+    primero, segundo = asyncio.run(procesar_dos())
+    assert fallos == [primero["id"]]
+    assert almacen.obtener(segundo["id"])["estado"] == "completado"
+    almacen.cerrar()
@@ -0,0 +1,137 @@
+"""
+=============================================================================
+TESTS DEL ÍNDICE DE VECINOS - test_vecinos.py
+=============================================================================
+Tests para verificar el voto de los vecinos más cercanos, la persistencia
+mapeada en disco y la clasificación sin generar.
+
+Para ejecutar:
+    pytest tests/test_vecinos.py -v
+=============================================================================
+"""
+import numpy as np
+from fastapi.testclient import TestClient
+
+
+# =============================================================================
+# TEST 1: Voto de los vecinos
+# =============================================================================
+def test_voto_decide_solo_con_vecinos_similares_y_de_acuerdo():
+    """
+    Verifica que los k vecinos más similares deciden cuando coinciden y
+    que un documento lejano de todos los ejemplos no se decide.
+    """
+    from app.services.vecinos import IndiceVecinos
+
+    indice = IndiceVecinos()
+    assert indice.votar([1.0, 0.0, 0.0], k=3, similitud_min=0.9, acuerdo_min=0.9) is None  # Vacío
+
+    indice.agregar([[1.0, 0.0, 0.0], [0.99, 0.1, 0.0], [0.98, 0.0, 0.1], [0.0, 1.0, 0.0]], [True, True, True, False])
+
+    cercano = indice.votar([1.0, 0.05, 0.0], k=3, similitud_min=0.9, acuerdo_min=0.9)
+    assert cercano.decidido and cercano.es_relevante
+    assert cercano.votantes == 3
+
+    lejano = indice.votar([0.0, 0.0, 1.0], k=3, similitud_min=0.9, acuerdo_min=0.9)
+    assert not lejano.decidido
+
+
+# =============================================================================
+# TEST 2: Persistencia mapeada en disco
+# =============================================================================
+def test_indice_persistente_se_reabre_mapeado(tmp_path):
+    """
+    Verifica que los ejemplos agregados sobreviven a un reinicio, que la
+    matriz se abre con np.memmap y que se puede seguir agregando.
+
+    ¿Por qué es importante?
+    - El índice crece con cada ejemplo etiquetado; reconstruirlo al
+      arrancar obligaría a recalcular todos los embeddings
+    """
+    from app.services.vecinos import IndiceVecinos
+
+    ruta = str(tmp_path / "vecinos")
+    IndiceVecinos(ruta, modelo="emb").agregar([[1.0, 0.0], [0.0, 1.0]], [True, False])
+
+    indice = IndiceVecinos(ruta, modelo="emb")
+    assert isinstance(indice._matriz, np.memmap)
+    assert indice.agregar([[0.5, 0.5]], [True]) == 3
+    assert IndiceVecinos(ruta, modelo="emb").estadisticas()["relevantes"] == 2
+
+
+# =============================================================================
+# TEST 3: Clasificación sin generar
+# =============================================================================
+def test_clasificar_por_vecinos_sin_llamar_al_chat(ollama_falso, monkeypatch, tmp_path):
+    """
+    Verifica que, tras agregar ejemplos por la API, un documento similar
+    se clasifica por vecinos sin generar y uno distinto llega al chat.
+    """
+    from app.config import get_settings
+    from app.main import app, settings
+
+    monkeypatch.setattr(settings, "vecinos_modelo_embeddings", "nomic-embed-text")
+    monkeypatch.setattr(settings, "vecinos_ruta", str(tmp_path / "vecinos"))
+    monkeypatch.setattr(settings, "vecinos_k", 2)
+    cabeceras = {"X-API-Key": get_settings().api_key}
+    ejemplo = "Acción de grupo contra el municipio por el cobro del impuesto de luminarias de DOLMEN"
+
+    falso = ollama_falso(modelos=["qwen2.5:3b", "nomic-embed-text"])
+    with TestClient(app) as client:
+        agregados = client.post("/api/v1/vecinos/ejemplos", headers=cabeceras, json=[
+            {"radicacion": "A", "texto_pdf_completo": ejemplo, "es_relevante": True},
+            {"radicacion": "B", "contenido_demanda": ejemplo + " en Bogotá", "es_relevante": True},
+        ])
+        similar = client.post("/api/v1/clasificar", headers=cabeceras, json={
+            "radicacion": "C", "texto_pdf_completo": ejemplo + " en Cali"
+        })
+        distinto = client.post("/api/v1/clasificar", headers=cabeceras, json={
+            "radicacion": "D", "texto_pdf_completo": "Nulidad y restablecimiento del derecho laboral"
+        })
+        estadisticas = client.get("/api/v1/vecinos/estadisticas", headers=cabeceras).json()
+
+    assert agregados.json() == {"agregados": 2, "ejemplos": 2}
+    assert similar.json()["metodo_clasificacion"] == "VECINOS"
+    assert similar.json()["es_relevante"] is True
+    assert distinto.json()["metodo_clasificacion"] == "IA"
+    assert falso.estadisticas["chat"] == 1
+    assert estadisticas["ejemplos"] == 2
+
+
+# =============================================================================
+# TEST 4: Las decisiones de los vecinos no quedan en caché
+# =============================================================================
+def test_ejemplos_nuevos_cambian_la_decision_de_vecinos(ollama_falso, monkeypatch, tmp_path):
+    """
+    Verifica que un documento ya clasificado por vecinos se vuelve a votar
+    tras agregar ejemplos nuevos, en lugar de devolver la decisión anterior.
+
+    ¿Por qué es importante?
+    - Corregir el índice con ejemplos etiquetados debe surtir efecto de
+      inmediato, no cuando expire el TTL de la caché
+    """
+    from app.config import get_settings
+    from app.main import app, settings
+
+    monkeypatch.setattr(settings, "vecinos_modelo_embeddings", "nomic-embed-text")
+    monkeypatch.setattr(settings, "vecinos_ruta", str(tmp_path / "vecinos"))
+    monkeypatch.setattr(settings, "vecinos_k", 2)
+    cabeceras = {"X-API-Key": get_settings().api_key}
+    ejemplo = "Acción de grupo contra el municipio por el cobro del impuesto de luminarias de DOLMEN"
+    documento = {"radicacion": "C", "texto_pdf_completo": ejemplo + " en Cali"}
+
+    ollama_falso(modelos=["qwen2.5:3b", "nomic-embed-text"])
+    with TestClient(app) as client:
+        client.post("/api/v1/vecinos/ejemplos", headers=cabeceras, json=[
+            {"radicacion": "A", "texto_pdf_completo": ejemplo, "es_relevante": True},
+            {"radicacion": "B", "contenido_demanda": ejemplo + " en Bogotá", "es_relevante": True},
+        ])
+        antes = client.post("/api/v1/clasificar", headers=cabeceras, json=documento).json()
+        client.post("/api/v1/vecinos/ejemplos", headers=cabeceras, json=[
+            {"radicacion": "E", "texto_pdf_completo": documento["texto_pdf_completo"], "es_relevante": False},
+            {"radicacion": "F", "contenido_demanda": documento["texto_pdf_completo"], "es_relevante": False},
+        ])
+        despues = client.post("/api/v1/clasificar", headers=cabeceras, json=documento).json()
+
+    assert antes["metodo_clasificacion"] == "VECINOS" and antes["es_relevante"] is True
+    assert despues["metodo_clasificacion"] == "VECINOS" and despues["es_relevante"] is False